@@ -132,7 +132,7 @@ class MachineFeedSearchTests(TestDataMixin, TestCase):
         self.client.force_login(self.maintainer_user)
         response = self.client.get(self.feed_url, {"q": "flipper"})
 
-        self.assertContains(response, "Replaced flipper coil")
+        self.assertContains(response, "Replaced <mark>flipper</mark> coil")
         self.assertNotContains(response, "Adjusted targets")
 
     def test_search_finds_log_by_maintainer_names(self):
@@ -167,7 +167,7 @@ class MachineFeedSearchTests(TestDataMixin, TestCase):
         self.client.force_login(self.maintainer_user)
         response = self.client.get(self.feed_url, {"q": "flickering"})
 
-        self.assertContains(response, "Lights flickering badly")
+        self.assertContains(response, "Lights <mark>flickering</mark> badly")
         self.assertNotContains(response, "Ball stuck")
 
     def test_search_finds_problem_by_reporter_name(self):
@@ -256,7 +256,7 @@ class MachineFeedFilteredSearchTests(TestDataMixin, TestCase):
     def test_logs_filter_search_includes_problem_report_description(self):
         """Logs filter search should match attached problem report description."""
         report = create_problem_report(machine=self.machine, description="Coil stop broken")
-        log_with_report = create_log_entry(
+        create_log_entry(
             machine=self.machine,
             text="Investigated noisy coil",
             problem_report=report,
@@ -266,7 +266,8 @@ class MachineFeedFilteredSearchTests(TestDataMixin, TestCase):
         self.client.force_login(self.maintainer_user)
         response = self.client.get(self.feed_url, {"f": "logs", "q": "coil stop"})
 
-        self.assertContains(response, log_with_report.text)
+        # Searched cards show a highlighted excerpt of the entry's own text
+        self.assertContains(response, "Investigated noisy <mark>coil</mark>")
         self.assertNotContains(response, "Adjusted flipper alignment")
 
     def test_logs_filter_search_includes_problem_report_reporter_name(self):
@@ -19,7 +19,7 @@ from flipfix.apps.catalog.forms import (
     MachineModelForm,
 )
 from flipfix.apps.catalog.models import Location, MachineInstance, MachineModel
-from flipfix.apps.core.feed import FEED_CONFIGS, PageCursor, get_feed_page
+from flipfix.apps.core.feed import FEED_CONFIGS, PageCursor, get_feed_page, get_next_cursor
 from flipfix.apps.core.forms import SearchForm
 from flipfix.apps.maintenance.models import ProblemReport
 
@@ -145,7 +145,11 @@ class MachineFeedView(TemplateView):
             {
                 "machine": self.machine,
                 "entries": entries,
-                "page_obj": PageCursor(has_next=has_next, page_num=1),
+                "page_obj": PageCursor(
+                    has_next=has_next,
+                    page_num=1,
+                    next_cursor=get_next_cursor(entries, has_next),
+                ),
                 "active_filter": self.feed_filter_type,
                 "search_form": SearchForm(initial={"q": search_query}),
                 "locations": Location.objects.all(),
@@ -190,6 +194,7 @@ class MachineFeedPartialView(View):
             entry_types=feed_config.entry_types,
             page_num=page_num,
             search_query=search_query,
+            cursor=request.GET.get("cursor"),
         )
 
         # Render each entry using the activity_entry dispatcher template
@@ -205,6 +210,7 @@ class MachineFeedPartialView(View):
                 "items": items_html,
                 "has_next": has_next,
                 "next_page": page_num + 1 if has_next else None,
+                "next_cursor": get_next_cursor(page_items, has_next) or None,
             }
         )
 
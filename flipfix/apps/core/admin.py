@@ -16,6 +16,7 @@ class MediaInline(admin.TabularInline):
         "thumbnail_file",
         "transcoded_file",
         "poster_file",
+        "hls_playlist",
         "transcode_status",
         "display_order",
     )
@@ -23,5 +24,6 @@ class MediaInline(admin.TabularInline):
         "thumbnail_file",
         "transcoded_file",
         "poster_file",
+        "hls_playlist",
         "transcode_status",
     )
@@ -0,0 +1,223 @@
+"""Resumable media uploads sent in fixed-size chunks.
+
+For large videos over flaky Wi-Fi, where a single multipart POST would
+restart from zero whenever the connection drops:
+
+1. ``start_chunked_upload()`` creates a ``ChunkedUpload`` session
+   (the ``start_chunked_upload`` action of ``MediaUploadMixin``).
+2. The client PUTs the file in chunks of ``settings.CHUNKED_UPLOAD_CHUNK_SIZE``
+   bytes to ``ChunkedUploadView``, each at the offset the previous one ended
+   and with the SHA-256 of its bytes.  ``write_chunk()`` streams the request
+   body straight into a ``.part`` file under ``settings.CHUNKED_UPLOAD_DIR``
+   and keeps the chunk only if it arrived whole and matches its checksum.
+3. ``finish_chunked_upload()`` checks every byte has arrived (the
+   ``finish_chunked_upload`` action), and the file is attached with
+   ``attach_media_files()`` like a one-shot upload.
+
+Checksumming each chunk means the browser never holds more than a chunk
+of the file in memory, which a whole-file digest would need.
+
+The ``.part`` file's size is the upload's offset.  A client whose
+connection dropped asks ``ChunkedUploadView`` for it and resumes from
+there, resending the chunk that was interrupted.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import IO, Any
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import UploadedFile
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+
+from flipfix.apps.core.media import ALLOWED_MEDIA_EXTENSIONS, MAX_MEDIA_FILE_SIZE_BYTES
+from flipfix.apps.core.models import ChunkedUpload
+from flipfix.apps.core.upload_handlers import new_content_hasher
+
+logger = logging.getLogger(__name__)
+
+_COPY_BLOCK_SIZE = 1024 * 1024
+"""Bytes read at a time, from the request when writing and from disk when hashing."""
+
+
+class ChunkOffsetError(Exception):
+    """Raised when a chunk doesn't start where the bytes received so far end."""
+
+    def __init__(self, offset: int):
+        self.offset = offset
+        super().__init__(f"Chunk must start at offset {offset}")
+
+
+class ChunkChecksumError(Exception):
+    """Raised when a chunk's bytes don't match the checksum the client sent."""
+
+    def __init__(self, offset: int):
+        self.offset = offset
+        super().__init__("Chunk checksum mismatch; send it again")
+
+
+class ChunkedUploadedFile(UploadedFile):
+    """The file of a finished chunked upload, read from its ``.part`` file.
+
+    Like Django's ``TemporaryUploadedFile`` it exposes
+    ``temporary_file_path()``, so file system storage moves the file into
+    place instead of copying it.  ``content_hash`` is set as by
+    ``core/upload_handlers.py``.
+    """
+
+    def __init__(self, path: Path, upload: ChunkedUpload, content_hash: str):
+        super().__init__(
+            path.open("rb"), upload.filename, upload.content_type or None, upload.size, None
+        )
+        self.path = path
+        self.content_hash = content_hash
+
+    def temporary_file_path(self) -> str:
+        return str(self.path)
+
+
+def start_chunked_upload(
+    *, user: Any, media_model: type[Any], parent: Any, filename: str, size: str, content_type: str
+) -> ChunkedUpload:
+    """Create an upload session for a file of ``size`` bytes, after checking it's acceptable.
+
+    Also deletes sessions abandoned for longer than
+    ``settings.CHUNKED_UPLOAD_EXPIRY_HOURS``.
+
+    Raises:
+        ValidationError: If the size or file type isn't acceptable.
+    """
+    try:
+        total_size = int(size)
+    except (TypeError, ValueError) as e:
+        raise ValidationError("Invalid file size") from e
+    if total_size <= 0:
+        raise ValidationError("Invalid file size")
+    if total_size > MAX_MEDIA_FILE_SIZE_BYTES:
+        raise ValidationError("File too large. Maximum size is 200MB.")
+
+    content_type = (content_type or "").lower()
+    if not content_type.startswith(("image/", "video/")) and (
+        Path(filename).suffix.lower() not in ALLOWED_MEDIA_EXTENSIONS
+    ):
+        raise ValidationError("Upload a valid image or video.")
+
+    delete_expired_chunked_uploads()
+    return ChunkedUpload.objects.create(
+        created_by=user,
+        media_model_name=media_model.__name__,
+        parent_id=parent.pk,
+        filename=Path(filename).name[:255],
+        content_type=content_type[:100],
+        size=total_size,
+    )
+
+
+def received_bytes(upload: ChunkedUpload) -> int:
+    """Return how many bytes of the file have been received, i.e. the next chunk's offset."""
+    try:
+        return _part_path(upload).stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+def write_chunk(
+    upload: ChunkedUpload, stream: IO[bytes], offset: int, length: int, sha256: str
+) -> int:
+    """Append ``length`` bytes read from ``stream`` to the upload's file.
+
+    The bytes are copied to disk as they're read, a block at a time, and
+    cut off again unless all of them arrived and match ``sha256``.
+    Retried requests for the same upload are serialized with a file lock,
+    so a chunk is only ever written at the current end of the file.
+
+    Returns:
+        The offset of the next chunk.
+
+    Raises:
+        ChunkOffsetError: If ``offset`` isn't where the received bytes end.
+        ChunkChecksumError: If the chunk was cut short or doesn't match.
+        ValidationError: If the chunk is larger than a chunk, or than the
+            rest of the file.
+    """
+    if length > settings.CHUNKED_UPLOAD_CHUNK_SIZE:
+        raise ValidationError(f"Chunks are at most {settings.CHUNKED_UPLOAD_CHUNK_SIZE} bytes")
+    if offset + length > upload.size:
+        raise ValidationError("Chunk extends past the end of the file")
+
+    path = _part_path(upload)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("ab") as part:
+        fcntl.flock(part, fcntl.LOCK_EX)
+        end = part.seek(0, 2)
+        if end != offset:
+            raise ChunkOffsetError(end)
+
+        checksum = hashlib.sha256()
+        remaining = length
+        while remaining:
+            block = stream.read(min(_COPY_BLOCK_SIZE, remaining))
+            if not block:  # Client went away
+                break
+            part.write(block)
+            checksum.update(block)
+            remaining -= len(block)
+
+        if remaining or not constant_time_compare(checksum.hexdigest(), (sha256 or "").lower()):
+            part.truncate(offset)
+            logger.warning(
+                "chunked_upload_chunk_rejected",
+                extra={
+                    "upload_id": str(upload.id),
+                    "offset": offset,
+                    "received": length - remaining,
+                },
+            )
+            raise ChunkChecksumError(offset)
+        return part.tell()
+
+
+def finish_chunked_upload(upload: ChunkedUpload) -> ChunkedUploadedFile:
+    """Return the uploaded file, once all of its chunks have arrived.
+
+    Each chunk was checked against its checksum by ``write_chunk()``; the
+    file's content hash is computed here, from the assembled file.
+
+    Raises:
+        ValidationError: If bytes are missing.
+    """
+    received = received_bytes(upload)
+    if received != upload.size:
+        raise ValidationError(f"Upload incomplete: received {received} of {upload.size} bytes")
+
+    path = _part_path(upload)
+    content_hasher = new_content_hasher()
+    with path.open("rb") as part:
+        while block := part.read(_COPY_BLOCK_SIZE):
+            content_hasher.update(block)
+
+    return ChunkedUploadedFile(path, upload, content_hasher.hexdigest())
+
+
+def discard_chunked_upload(upload: ChunkedUpload) -> None:
+    """Delete an upload session and whatever remains of its file."""
+    _part_path(upload).unlink(missing_ok=True)
+    upload.delete()
+
+
+def delete_expired_chunked_uploads() -> None:
+    """Delete upload sessions started more than ``CHUNKED_UPLOAD_EXPIRY_HOURS`` ago."""
+    cutoff = timezone.now() - timedelta(hours=settings.CHUNKED_UPLOAD_EXPIRY_HOURS)
+    for upload in ChunkedUpload.objects.filter(created_at__lt=cutoff):
+        discard_chunked_upload(upload)
+
+
+def _part_path(upload: ChunkedUpload) -> Path:
+    return Path(settings.CHUNKED_UPLOAD_DIR) / f"{upload.id}.part"
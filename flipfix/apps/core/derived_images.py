@@ -0,0 +1,170 @@
+"""On-demand photo derivatives, generated on first request and kept in storage.
+
+``/media/derived/<model>/<id>/<spec>/`` serves a photo resized and re-encoded
+to a spec such as ``640.webp`` (longest side 640px, WebP at the format's
+default quality) or ``640-q50.avif`` (AVIF at quality 50).  Only the sizes,
+formats and qualities in the ``DERIVED_IMAGE_*`` settings are accepted, so
+the endpoint can't be used to fill the disk with arbitrary sizes.
+
+The first request encodes the derivative from the photo's current file and
+saves it as ``derived/<model>/<id>/<file digest>/<spec>``; later requests
+stream the stored file.  The digest changes when the photo's file is
+replaced, so a derivative of an old file is never served.
+
+Concurrent first requests for the same derivative, from any thread or
+process on the host, wait on a file lock; whoever gets it first encodes,
+and the rest find the stored result, so each derivative is encoded once.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import re
+import tempfile
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from django.conf import settings
+from django.core.files.storage import Storage
+from django.core.files.uploadedfile import UploadedFile
+
+from flipfix.apps.core.image_processing import resize_image_with_variants
+from flipfix.apps.core.media import WEB_NATIVE_FORMATS
+
+DERIVED_PREFIX = "derived"
+
+LOCK_STRIPES = 64
+"""Number of lock files that generation locks are spread over."""
+
+_SPEC_RE = re.compile(r"(?P<size>[1-9][0-9]*)(?:-q(?P<quality>[1-9][0-9]*))?\.(?P<ext>[a-z]+)")
+_FORMATS_BY_EXTENSION = {fmt.extension: name for name, fmt in WEB_NATIVE_FORMATS.items()}
+
+
+@dataclass(frozen=True)
+class DerivedImageSpec:
+    """The longest side, Pillow format and optional encoder quality of a derivative."""
+
+    max_dimension: int
+    format: str  # A key of WEB_NATIVE_FORMATS
+    quality: int | None = None  # None = the format's default
+
+    def __str__(self) -> str:
+        quality = f"-q{self.quality}" if self.quality is not None else ""
+        return f"{self.max_dimension}{quality}.{WEB_NATIVE_FORMATS[self.format].extension}"
+
+    @property
+    def content_type(self) -> str:
+        return WEB_NATIVE_FORMATS[self.format].content_type
+
+
+def parse_spec(spec: str) -> DerivedImageSpec:
+    """Parse a spec such as ``"640.webp"`` or ``"640-q50.avif"``.
+
+    Raises:
+        ValueError: If the spec is malformed or not allowed by the settings.
+    """
+    match = _SPEC_RE.fullmatch(spec)
+    if not match:
+        raise ValueError(f"Malformed image spec: {spec}")
+
+    image_format = _FORMATS_BY_EXTENSION.get(match["ext"], "")
+    quality = int(match["quality"]) if match["quality"] else None
+    allowed_formats = {f.upper() for f in settings.DERIVED_IMAGE_FORMATS}
+    if (
+        int(match["size"]) not in settings.DERIVED_IMAGE_SIZES
+        or image_format not in allowed_formats
+        or (
+            quality is not None
+            and (
+                quality not in settings.DERIVED_IMAGE_QUALITIES
+                or WEB_NATIVE_FORMATS[image_format].quality is None  # Lossless
+            )
+        )
+    ):
+        raise ValueError(f"Image spec not allowed: {spec}")
+    return DerivedImageSpec(int(match["size"]), image_format, quality)
+
+
+def derived_image_name(media: Any, spec: DerivedImageSpec) -> str:
+    """Return the storage name of a photo's derivative."""
+    digest = hashlib.sha256(media.file.name.encode()).hexdigest()[:16]
+    return f"{_media_prefix(media)}/{digest}/{spec}"
+
+
+def get_or_create_derived_image(media: Any, spec: DerivedImageSpec) -> str | None:
+    """Return the storage name of a photo's derivative, encoding it on first use.
+
+    Returns None if the photo can't be decoded, or the derivative can't be
+    made (JPEG of a transparent image, or a format Pillow can't encode).
+    """
+    storage = media.file.storage
+    name = derived_image_name(media, spec)
+    if storage.exists(name):
+        return name
+
+    with _generation_lock(name):
+        if storage.exists(name):
+            return name  # Made by a concurrent request while we waited
+        derived = _encode_derivative(media, spec)
+        if derived is None:
+            return None
+        return storage.save(name, derived)
+
+
+def delete_derived_images(media: Any) -> None:
+    """Delete every stored derivative of a photo."""
+    _delete_tree(media.file.storage, _media_prefix(media))
+
+
+# ---------------------------------------------------------------------------
+# Internal helpers
+# ---------------------------------------------------------------------------
+
+
+def _media_prefix(media: Any) -> str:
+    return f"{DERIVED_PREFIX}/{type(media).__name__}/{media.pk}"
+
+
+def _encode_derivative(media: Any, spec: DerivedImageSpec) -> UploadedFile | None:
+    with media.file.open("rb") as original:
+        _derivatives, variants = resize_image_with_variants(
+            original,
+            [],
+            [spec.max_dimension],
+            [spec.format],
+            variant_quality=spec.quality,
+        )
+    return variants[0].file if variants else None
+
+
+@contextmanager
+def _generation_lock(name: str) -> Iterator[None]:
+    """Hold an exclusive lock for generating *name*, shared by all processes on the host.
+
+    ``flock()`` locks belong to the open file, so threads of one process
+    exclude each other too.  Names hash onto a fixed set of lock files,
+    which are never deleted.
+    """
+    stripe = int(hashlib.sha256(name.encode()).hexdigest(), 16) % LOCK_STRIPES
+    lock_path = Path(tempfile.gettempdir()) / f"flipfix-derived-image-{stripe}.lock"
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _delete_tree(storage: Storage, path: str) -> None:
+    try:
+        dirs, files = storage.listdir(path)
+    except FileNotFoundError:
+        return
+    for file_name in files:
+        storage.delete(f"{path}/{file_name}")
+    for dir_name in dirs:
+        _delete_tree(storage, f"{path}/{dir_name}")
@@ -13,11 +13,20 @@ core/markdown_links.py (link types) and core/models.py (media models).
 
 from __future__ import annotations
 
+import base64
+import binascii
+from collections import defaultdict
 from dataclasses import dataclass
-from typing import TYPE_CHECKING, Any
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, cast
 
 from django.conf import settings
-from django.db.models import QuerySet
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.db.models.signals import post_delete, post_save
+
+from flipfix.apps.core.markdown_links import prefetch_links
+from flipfix.apps.core.models import FeedEntry, SearchableQuerySetMixin
 
 if TYPE_CHECKING:
     from collections.abc import Callable
@@ -72,11 +81,14 @@ class PageCursor:
     """Pagination cursor for templates that expect page_obj interface.
 
     Used when merging multiple querysets where Django's Paginator can't be used.
+    ``next_cursor`` is the opaque keyset token for the following page (see
+    ``FeedCursor``); infinite scroll sends it back so deep pages stay cheap.
     """
 
-    def __init__(self, has_next: bool, page_num: int = 1):
+    def __init__(self, has_next: bool, page_num: int = 1, next_cursor: str = ""):
         self._has_next = has_next
         self._page_num = page_num
+        self.next_cursor = next_cursor if has_next else ""
 
     def has_next(self) -> bool:
         return self._has_next
@@ -85,6 +97,72 @@ class PageCursor:
         return self._page_num + 1
 
 
+@dataclass(frozen=True)
+class FeedCursor:
+    """Position in the feed's ``(occurred_at, entry_type, pk)`` sort order.
+
+    The feed is ordered by this key descending.  ``entry_type`` and ``pk``
+    break ties between entries that share a timestamp, so every entry has a
+    unique position and a page can resume strictly after the previous one.
+
+    Serialized as an opaque URL-safe token for the infinite-scroll client.
+    """
+
+    occurred_at: datetime
+    entry_type: str
+    pk: int
+
+    @classmethod
+    def for_entry(cls, entry: Any) -> FeedCursor:
+        """Return the cursor positioned at a tagged feed entry."""
+        return cls(occurred_at=entry.occurred_at, entry_type=entry.entry_type, pk=entry.pk)
+
+    def encode(self) -> str:
+        raw = f"{self.occurred_at.isoformat()}|{self.entry_type}|{self.pk}"
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+    @classmethod
+    def decode(cls, token: str | None) -> FeedCursor | None:
+        """Parse a token from ``encode()``. Returns None if it is missing or malformed."""
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode()).decode()
+            occurred_at, entry_type, pk = raw.split("|")
+            return cls(
+                occurred_at=datetime.fromisoformat(occurred_at),
+                entry_type=entry_type,
+                pk=int(pk),
+            )
+        except (binascii.Error, UnicodeDecodeError, ValueError):
+            return None
+
+    def entries_after_q(self, entry_type: str) -> Q:
+        """Build a filter for entries of *entry_type* that sort after this cursor."""
+        older = Q(occurred_at__lt=self.occurred_at)
+        if entry_type < self.entry_type:
+            return older | Q(occurred_at=self.occurred_at)
+        if entry_type == self.entry_type:
+            return older | Q(occurred_at=self.occurred_at, pk__lt=self.pk)
+        return older
+
+    def index_after_q(self) -> Q:
+        """Build a FeedEntry filter for index rows that sort after this cursor."""
+        return (
+            Q(occurred_at__lt=self.occurred_at)
+            | Q(occurred_at=self.occurred_at, entry_type__lt=self.entry_type)
+            | Q(occurred_at=self.occurred_at, entry_type=self.entry_type, object_id__lt=self.pk)
+        )
+
+
+def get_next_cursor(page_items: list[Any], has_next: bool) -> str:
+    """Return the encoded cursor for the page after *page_items*, or "" on the last page."""
+    if not has_next or not page_items:
+        return ""
+    return FeedCursor.for_entry(page_items[-1]).encode()
+
+
 @dataclass(frozen=True)
 class FeedEntrySource:
     """Describes how to fetch one type of entry for the unified feed.
@@ -96,6 +174,8 @@ class FeedEntrySource:
     - global_select_related: additional select_related fields for global (non-machine) scope
     - machine_template: template path for rendering in machine-scoped feeds
     - global_template: template path for rendering in global (all-machines) feeds
+    - markdown_fields: fields the templates render as markdown, whose links are
+      resolved in one batch for the whole page
     """
 
     entry_type: str
@@ -104,6 +184,7 @@ class FeedEntrySource:
     global_select_related: tuple[str, ...]
     machine_template: str
     global_template: str
+    markdown_fields: tuple[str, ...] = ()
 
 
 # ---------------------------------------------------------------------------
@@ -118,7 +199,8 @@ class FeedEntrySource:
 # 1. In the owning app's AppConfig.ready(), call register_feed_source()
 #    with template paths for machine and global feeds
 # 2. Create the entry templates
-# That's it — no enums, dispatchers, or other files to edit.
+# That's it — no enums, dispatchers, or other files to edit.  Registration
+# also hooks the source's model into the FeedEntry index (see below).
 # ---------------------------------------------------------------------------
 
 _feed_source_registry: dict[str, FeedEntrySource] = {}
@@ -129,6 +211,7 @@ def register_feed_source(source: FeedEntrySource) -> None:
     if source.entry_type in _feed_source_registry:
         raise ValueError(f"Feed source '{source.entry_type}' is already registered")
     _feed_source_registry[source.entry_type] = source
+    _connect_feed_index_hooks(source)
 
 
 def get_all_entry_types() -> tuple[str, ...]:
@@ -141,12 +224,125 @@ def clear_feed_source_registry() -> None:
     _feed_source_registry.clear()
 
 
+# ---------------------------------------------------------------------------
+# Feed index maintenance
+#
+# Every registered source's model is mirrored into core.FeedEntry so that an
+# unsearched feed page is one indexed range scan over all entry types.  The
+# post_save/post_delete hooks are connected by register_feed_source(), so new
+# entry types are indexed without extra wiring.
+# ---------------------------------------------------------------------------
+
+_INDEX_BATCH_SIZE = 1000
+
+
+def _source_model(source: FeedEntrySource) -> Any:
+    return source.get_base_queryset().model
+
+
+def _connect_feed_index_hooks(source: FeedEntrySource) -> None:
+    model = _source_model(source)
+    if model is None:
+        return  # Placeholder querysets (registry tests) have no model to index
+
+    # Only these fields feed into an index row; saves that touch neither are skipped
+    machine_field, _, parent_machine_path = source.machine_filter_field.partition("__")
+    indexed_fields = {"occurred_at", machine_field}
+
+    def _index_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or (update_fields and not indexed_fields & set(update_fields)):
+            return
+        _reindex(source, model._default_manager.filter(pk=instance.pk))
+
+    def _unindex_deleted(sender, instance, **kwargs):
+        FeedEntry.objects.filter(entry_type=source.entry_type, object_id=instance.pk).delete()
+
+    uid = f"feed_index_{source.entry_type}"
+    post_save.connect(_index_saved, sender=model, weak=False, dispatch_uid=f"{uid}_save")
+    post_delete.connect(_unindex_deleted, sender=model, weak=False, dispatch_uid=f"{uid}_delete")
+
+    if not parent_machine_path:
+        return
+
+    # Sources scoped to a machine through a parent record (e.g. a part request
+    # update via part_request__machine) must follow the parent when it moves.
+    parent_model = model._meta.get_field(machine_field).related_model
+    parent_field = parent_machine_path.split("__")[0]
+
+    def _index_children(sender, instance, raw=False, update_fields=None, **kwargs):
+        if raw or (update_fields and parent_field not in update_fields):
+            return
+        _reindex(source, model._default_manager.filter(**{machine_field: instance}))
+
+    post_save.connect(
+        _index_children, sender=parent_model, weak=False, dispatch_uid=f"{uid}_parent_save"
+    )
+
+
+def _reindex(source: FeedEntrySource, queryset: QuerySet[Any]) -> int:
+    rows = queryset.values_list("pk", source.machine_filter_field, "occurred_at")
+    count = 0
+    batch: list[FeedEntry] = []
+    for pk, machine_id, occurred_at in rows.iterator(chunk_size=_INDEX_BATCH_SIZE):
+        batch.append(
+            FeedEntry(
+                entry_type=source.entry_type,
+                object_id=pk,
+                machine_id=machine_id,
+                occurred_at=occurred_at,
+            )
+        )
+        if len(batch) >= _INDEX_BATCH_SIZE:
+            count += _upsert_feed_entries(batch)
+            batch = []
+    if batch:
+        count += _upsert_feed_entries(batch)
+    return count
+
+
+def _upsert_feed_entries(batch: list[FeedEntry]) -> int:
+    FeedEntry.objects.bulk_create(
+        batch,
+        update_conflicts=True,
+        unique_fields=["entry_type", "object_id"],
+        update_fields=["machine_id", "occurred_at"],
+    )
+    return len(batch)
+
+
+def reindex_feed_entries(entry_type: str, queryset: QuerySet[Any]) -> int:
+    """Refresh the FeedEntry rows for the records in *queryset*.
+
+    Call this after a bulk ``QuerySet.update()`` that changes a feed record's
+    ``occurred_at`` or machine, since bulk updates bypass the post_save hooks.
+    Returns the number of rows written.
+    """
+    return _reindex(_feed_source_registry[entry_type], queryset)
+
+
+def rebuild_feed_index() -> dict[str, int]:
+    """Rebuild the whole FeedEntry index from the registered sources.
+
+    Drops rows for entry types that are no longer registered.  Returns the
+    number of rows indexed per entry type.
+    """
+    counts: dict[str, int] = {}
+    with transaction.atomic():
+        FeedEntry.objects.exclude(entry_type__in=get_all_entry_types()).delete()
+        for source in _feed_source_registry.values():
+            model = _source_model(source)
+            FeedEntry.objects.filter(entry_type=source.entry_type).delete()
+            counts[source.entry_type] = _reindex(source, model._default_manager.all())
+    return counts
+
+
 def get_feed_page(
     page_num: int = 1,
     page_size: int = settings.LIST_PAGE_SIZE,
     search_query: str | None = None,
     machine: MachineInstance | None = None,
     entry_types: tuple[str, ...] = (),
+    cursor: str | None = None,
 ) -> tuple[list[Any], bool]:
     """Get a paginated page of activity entries.
 
@@ -157,64 +353,142 @@ def get_feed_page(
 
     An empty ``entry_types`` tuple means "all registered types".
 
-    Uses merge-sort style pagination: fetches just enough from each table
-    to construct the requested page.
+    Fetching is two-phase: first find the page's (entry_type, pk) keys,
+    then hydrate only those records with each source's select_related and
+    prefetch_related.  Unsearched pages find their keys with one range scan
+    of the FeedEntry index.  Searches use merge-sort style pagination
+    instead: fetch just enough sort keys from each table to construct the
+    requested page.
+
+    With a valid ``cursor`` (from ``get_next_cursor``) rows are read only
+    past that position, so the cost of a page is constant no matter how
+    deep the user has scrolled; ``page_num`` is ignored in that mode.
+    Without one, falls back to offset pagination by ``page_num``.
 
     Returns (page_items, has_next) tuple.
     """
     if not entry_types:
         entry_types = get_all_entry_types()
 
-    offset = (page_num - 1) * page_size
+    after = FeedCursor.decode(cursor)
+    offset = 0 if after else (page_num - 1) * page_size
     # Fetch one extra to detect if more pages exist (countless pagination pattern)
     fetch_limit = offset + page_size + 1
 
-    all_entries: list[Any] = []
+    if not search_query:
+        return _get_indexed_page(entry_types, machine, page_size, offset, after)
+
+    # Phase 1: order.  Fetch only sort keys from each table, no joins or prefetches
+    all_keys: list[tuple[datetime, str, int]] = []
 
     for entry_type in entry_types:
         source = _feed_source_registry.get(entry_type)
         if source:
-            all_entries.extend(_fetch_entries(source, machine, search_query, fetch_limit))
+            all_keys.extend(_fetch_sort_keys(source, machine, search_query, fetch_limit, after))
 
-    # Sort by occurred_at descending (all entry types share this field)
-    combined = sorted(
-        all_entries,
-        key=lambda x: x.occurred_at,
-        reverse=True,
-    )
+    # Sort by occurred_at descending (all entry types share this field),
+    # with entry type and pk as tie-breakers so cursors are unambiguous
+    combined = sorted(all_keys, reverse=True)
 
     # Slice to requested page
-    page_items = combined[offset : offset + page_size]
+    page_keys = combined[offset : offset + page_size]
     has_next = len(combined) > offset + page_size
 
-    return page_items, has_next
+    # Phase 2: hydrate.  Load full records only for the visible page
+    keys = [(entry_type, pk) for _occurred_at, entry_type, pk in page_keys]
+    return _hydrate_entries(keys, machine, search_query), has_next
+
+
+def _get_indexed_page(
+    entry_types: tuple[str, ...],
+    machine: MachineInstance | None,
+    page_size: int,
+    offset: int,
+    after: FeedCursor | None,
+) -> tuple[list[Any], bool]:
+    """Find a page via the FeedEntry index, then hydrate just those records."""
+    rows = FeedEntry.objects.filter(entry_type__in=entry_types)
+    if machine:
+        rows = rows.filter(machine_id=machine.pk)
+    if after:
+        rows = rows.filter(after.index_after_q())
+
+    keys = list(
+        rows.order_by("-occurred_at", "-entry_type", "-object_id").values_list(
+            "entry_type", "object_id"
+        )[offset : offset + page_size + 1]
+    )
+    has_next = len(keys) > page_size
+    return _hydrate_entries(keys[:page_size], machine), has_next
 
 
-def _fetch_entries(
+def _hydrate_entries(
+    keys: list[tuple[str, int]],
+    machine: MachineInstance | None,
+    search_query: str | None = None,
+) -> list[Any]:
+    """Load the records for (entry_type, pk) keys with one query per type, in key order.
+
+    For searches, each record also gets a ``search_snippet`` showing why it
+    matched, so the cards can show that instead of the full text.  The
+    records' markdown fields are queued for batch link resolution.
+    """
+    ids_by_type: dict[str, list[int]] = defaultdict(list)
+    for entry_type, pk in keys:
+        ids_by_type[entry_type].append(pk)
+
+    loaded: dict[tuple[str, int], Any] = {}
+    for entry_type, ids in ids_by_type.items():
+        source = _feed_source_registry.get(entry_type)
+        if not source:
+            continue
+        queryset = source.get_base_queryset().filter(pk__in=ids)
+        if not machine:
+            queryset = queryset.select_related(*source.global_select_related)
+        if search_query:
+            # Every feed source's queryset is searchable
+            queryset = cast(SearchableQuerySetMixin, queryset).with_search_snippets(search_query)
+        entries = _tag_entries(source, list(queryset))
+        prefetch_links(getattr(entry, f) for entry in entries for f in source.markdown_fields)
+        for entry in entries:
+            loaded[(entry_type, entry.pk)] = entry
+
+    # A record deleted between the index scan and hydration is simply skipped
+    return [loaded[key] for key in keys if key in loaded]
+
+
+def _tag_entries(source: FeedEntrySource, entries: list[Any]) -> list[Any]:
+    """Tag entries with metadata from their source for template rendering."""
+    for entry in entries:
+        entry.entry_type = source.entry_type
+        entry.machine_template = source.machine_template
+        entry.global_template = source.global_template
+    return entries
+
+
+def _fetch_sort_keys(
     source: FeedEntrySource,
     machine: MachineInstance | None,
     search_query: str | None,
     limit: int,
-) -> list[Any]:
-    """Fetch entries for a single source, scoped to machine or global."""
-    queryset = source.get_base_queryset()
+    after: FeedCursor | None = None,
+) -> list[tuple[datetime, str, int]]:
+    """Fetch (occurred_at, entry_type, pk) sort keys for one source, scoped to machine or global.
+
+    Uses the model's plain queryset rather than ``get_base_queryset()`` so no
+    select_related/prefetch_related work is done for rows that won't be shown.
+    """
+    queryset = _source_model(source)._default_manager.all()
 
     if machine:
         queryset = queryset.filter(**{source.machine_filter_field: machine})
         if search_query:
-            queryset = queryset.search_for_machine(search_query)  # type: ignore[attr-defined]
-    else:
-        queryset = queryset.select_related(*source.global_select_related)
-        if search_query:
-            queryset = queryset.search(search_query)  # type: ignore[attr-defined]
-
-    queryset = queryset.order_by("-occurred_at")
-    entries = list(queryset[:limit])
+            queryset = queryset.search_for_machine(search_query)
+    elif search_query:
+        queryset = queryset.search(search_query)
 
-    # Tag entries with metadata from their source for template rendering
-    for entry in entries:
-        entry.entry_type = source.entry_type  # type: ignore[attr-defined]
-        entry.machine_template = source.machine_template  # type: ignore[attr-defined]
-        entry.global_template = source.global_template  # type: ignore[attr-defined]
+    if after:
+        queryset = queryset.filter(after.entries_after_q(source.entry_type))
 
-    return entries
+    rows = queryset.order_by("-occurred_at", "-pk").values_list("occurred_at", "pk")[:limit]
+    return [(occurred_at, source.entry_type, pk) for occurred_at, pk in rows]
@@ -5,7 +5,8 @@ Provides resizing and format conversion for uploaded images, including:
 - Preservation of web-native formats (JPEG, PNG, WebP, AVIF)
 - Downscaling large images to reasonable web dimensions
 - EXIF orientation correction
-- Thumbnail generation
+- Thumbnail generation, from the same decode as the full-size image
+- Responsive variants (several sizes in WebP/AVIF/JPEG) for ``srcset``
 
 This module intentionally avoids importing Django models to keep it
 focused purely on image transformation logic.
@@ -14,6 +15,9 @@ focused purely on image transformation logic.
 from __future__ import annotations
 
 import logging
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 from typing import TYPE_CHECKING, Any
@@ -37,6 +41,22 @@ MAX_IMAGE_DIMENSION = 2400
 THUMB_IMAGE_DIMENSION = 800
 """Maximum dimension (width or height) for thumbnail images."""
 
+RESIZE_REDUCING_GAP = 3.0
+"""Pillow ``reducing_gap`` for downscaling: large reductions first shrink by an
+integer factor with a cheap box filter, then finish with LANCZOS over at least
+this many times the target size.  3.0 is visually indistinguishable from a
+full LANCZOS pass."""
+
+
+@dataclass(frozen=True)
+class ImageVariant:
+    """One size and format of a photo, for responsive ``<picture>``/``srcset`` markup."""
+
+    file: UploadedFile
+    format: str  # Pillow format name, a key of WEB_NATIVE_FORMATS
+    width: int
+    height: int
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
@@ -48,6 +68,67 @@ def _with_extension(name: str, ext: str) -> str:
     return str(Path(name).with_suffix(f".{ext}"))
 
 
+def _seek_start(uploaded_file: UploadedFile) -> None:
+    try:
+        uploaded_file.seek(0)
+    except Exception:  # noqa: S110 - seek failure is benign
+        pass
+
+
+def _contained_size(size: tuple[int, int], max_dimension: int) -> tuple[int, int]:
+    """Return *size* scaled to fit a max_dimension square, rounded like ImageOps.contain()."""
+    width, height = size
+    if width >= height:
+        return max_dimension, max(1, round(height / width * max_dimension))
+    return max(1, round(width / height * max_dimension)), max_dimension
+
+
+def _encode(
+    image: Image.Image,
+    uploaded_file: UploadedFile,
+    target_format: str,
+    name_suffix: str = "",
+    quality: int | None = None,
+) -> InMemoryUploadedFile:
+    fmt_info = WEB_NATIVE_FORMATS[target_format]
+    buffer = BytesIO()
+    save_kwargs: dict[str, Any] = {"format": target_format}
+    if quality is not None or fmt_info.quality is not None:
+        save_kwargs["quality"] = quality if quality is not None else fmt_info.quality
+    if fmt_info.optimize:
+        save_kwargs["optimize"] = True
+    if fmt_info.speed is not None:
+        save_kwargs["speed"] = fmt_info.speed
+    image.save(buffer, **save_kwargs)
+    size = buffer.tell()
+    buffer.seek(0)
+
+    name = Path(uploaded_file.name or "upload")
+    return InMemoryUploadedFile(
+        buffer,
+        getattr(uploaded_file, "field_name", None),
+        _with_extension(str(name.with_stem(name.stem + name_suffix)), fmt_info.extension),
+        fmt_info.content_type,
+        size,
+        None,
+    )
+
+
+def _can_encode(image_format: str) -> bool:
+    """Whether Pillow was built with an encoder for *image_format* (AVIF is optional)."""
+    Image.init()
+    return image_format in WEB_NATIVE_FORMATS and image_format in Image.SAVE
+
+
+def _variant_image(image: Image.Image, image_format: str, has_alpha: bool) -> Image.Image:
+    """Return *image* in a mode the variant format can encode."""
+    if image_format == "JPEG":
+        return image if image.mode in {"RGB", "L"} else image.convert("RGB")
+    if image.mode in {"RGB", "RGBA"}:
+        return image
+    return image.convert("RGBA" if has_alpha else "RGB")
+
+
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
@@ -65,6 +146,9 @@ def resize_image_file(
     JPEG.  Returns the original file if it is not an image or cannot be
     identified.
 
+    To make several sizes of the same upload, use ``resize_image_derivatives()``,
+    which decodes the source only once.
+
     Args:
         uploaded_file: The uploaded file to process.
         max_dimension: Maximum width/height. Pass None to skip resizing
@@ -73,6 +157,74 @@ def resize_image_file(
     Returns:
         The processed file (may be the original if no processing needed).
     """
+    return resize_image_derivatives(uploaded_file, [max_dimension])[0]
+
+
+def resize_image_derivatives(
+    uploaded_file: UploadedFile,
+    max_dimensions: Sequence[int | None],
+) -> list[UploadedFile]:
+    """
+    Decode an image once and make one resized file per max dimension.
+
+    Each result is what ``resize_image_file(uploaded_file, max_dimension)``
+    would return, but the source is opened, decoded and EXIF-transposed only
+    once.  JPEGs are decoded with Pillow's ``draft()`` at the smallest DCT
+    scale (1/2, 1/4 or 1/8) that still covers the largest requested size, so
+    a 48 MP photo is never decoded at full resolution.  Sizes are produced
+    largest first, each from the previous one.
+
+    Args:
+        uploaded_file: The uploaded file to process.
+        max_dimensions: Maximum width/height of each derivative. None skips
+            resizing but still performs format conversion if needed.
+
+    Returns:
+        The processed files, in the order of *max_dimensions*.  Derivatives
+        that need no processing are the original file.
+    """
+    derivatives, _variants = resize_image_with_variants(uploaded_file, max_dimensions, (), ())
+    return derivatives
+
+
+def resize_image_with_variants(
+    uploaded_file: UploadedFile,
+    max_dimensions: Sequence[int | None],
+    variant_sizes: Sequence[int],
+    variant_formats: Sequence[str],
+    *,
+    variant_quality: int | None = None,
+) -> tuple[list[UploadedFile], list[ImageVariant]]:
+    """
+    Make ``resize_image_derivatives()`` files plus responsive variants, from one decode.
+
+    A variant is made for every combination of size (longest side, in
+    pixels) and format (a ``WEB_NATIVE_FORMATS`` key).  Sizes larger than
+    the image collapse into one variant at its own size, since upscaling
+    adds bytes but no detail.  Formats this Pillow build can't encode are
+    skipped, and so is JPEG for images with transparency.  A variant in the
+    derivatives' format at a derivative's size is skipped too, since it
+    would duplicate that file.
+
+    Args:
+        uploaded_file: The uploaded file to process.
+        max_dimensions: As for ``resize_image_derivatives()``.
+        variant_sizes: Longest side of each variant.
+        variant_formats: Pillow format names, e.g. ``["AVIF", "WEBP", "JPEG"]``.
+        variant_quality: Encoder quality for the variants, instead of each
+            format's ``WEB_NATIVE_FORMATS`` default.
+
+    Returns:
+        The derivatives, in the order of *max_dimensions*, and the variants,
+        largest first and in *variant_formats* order within each size.  Files
+        that aren't images get no variants.
+    """
+    formats = [f for f in dict.fromkeys(f.upper() for f in variant_formats) if _can_encode(f)]
+    sizes = set(variant_sizes) if formats else set()
+    if not max_dimensions and not sizes:
+        return [], []
+    passthrough = [uploaded_file] * len(max_dimensions)
+
     content_type = (getattr(uploaded_file, "content_type", "") or "").lower()
     ext = Path(getattr(uploaded_file, "name", "")).suffix.lower()
     if (
@@ -85,46 +237,42 @@ def resize_image_file(
             content_type,
             uploaded_file,
         )
-        return uploaded_file
+        return passthrough, []
 
     # Always seek to start in case the file has been read already.
-    try:
-        uploaded_file.seek(0)
-    except Exception:  # noqa: S110 - seek failure is benign
-        pass
+    _seek_start(uploaded_file)
 
     try:
         image: Image.Image = Image.open(uploaded_file)  # type: ignore[assignment]
     except UnidentifiedImageError:
-        try:
-            uploaded_file.seek(0)
-        except Exception:  # noqa: S110 - seek failure is benign
-            pass
+        _seek_start(uploaded_file)
         logger.debug(
             "resize_image_file: not an image or unreadable (%s)", getattr(uploaded_file, "name", "")
         )
-        return uploaded_file
+        return passthrough, []
 
     # Capture format before transpose (exif_transpose returns a copy that loses format attr)
     original_format = (image.format or "").upper()
+    full_size = image.size
+
+    # DCT-domain downscaling: decode JPEGs at just the resolution the largest
+    # derivative needs.  Sizes are still computed from the full dimensions.
+    if original_format == "JPEG" and None not in max_dimensions:
+        largest = max(d for d in [*max_dimensions, *sizes] if d is not None)
+        if max(full_size) > largest:
+            image.draft(None, _contained_size(full_size, largest))
+    decoded_size = image.size
 
     transposed = ImageOps.exif_transpose(image)
     needs_transpose = transposed is not None and transposed is not image
     if transposed is None:
         transposed = image
     image = transposed
+    if image.size != decoded_size:
+        full_size = (full_size[1], full_size[0])  # Rotated by EXIF orientation
     is_heif = original_format in {"HEIC", "HEIF"}
-    needs_resize = max_dimension is not None and max(image.size) > max_dimension
     needs_format_conversion = is_heif or original_format not in WEB_NATIVE_FORMATS
 
-    # Skip re-encoding if no transformation needed
-    if not needs_resize and not needs_format_conversion and not needs_transpose:
-        try:
-            uploaded_file.seek(0)
-        except (OSError, AttributeError):
-            pass
-        return uploaded_file
-
     # Determine output format: preserve web-native formats, convert others to JPEG.
     # Special case: PNG with transparency stays PNG regardless.
     if original_format == "PNG" and image.mode in {"RGBA", "LA"}:
@@ -134,41 +282,100 @@ def resize_image_file(
     else:
         target_format = "JPEG"
 
-    fmt_info = WEB_NATIVE_FORMATS[target_format]
-    content_type_out = fmt_info.content_type
-    filename = _with_extension(uploaded_file.name or "upload", fmt_info.extension)
-
     if target_format == "JPEG" and image.mode not in {"RGB", "L"}:
         image = image.convert("RGB")
-
-    if needs_resize and max_dimension:
-        image = ImageOps.contain(image, (max_dimension, max_dimension), Image.Resampling.LANCZOS)
-
-    logger.debug(
-        "resize_image_file: name=%s format=%s heif=%s resized=%s size=%s target_format=%s",
-        getattr(uploaded_file, "name", ""),
-        original_format,
-        is_heif,
-        needs_resize,
-        image.size,
-        target_format,
+    has_alpha = image.mode in {"RGBA", "LA", "PA"} or (
+        image.mode == "P" and "transparency" in image.info
     )
 
-    buffer = BytesIO()
-    save_kwargs: dict[str, Any] = {"format": target_format}
-    if fmt_info.quality is not None:
-        save_kwargs["quality"] = fmt_info.quality
-    if fmt_info.optimize:
-        save_kwargs["optimize"] = True
-    image.save(buffer, **save_kwargs)
-    size = buffer.tell()
-    buffer.seek(0)
+    # Never upscale: sizes beyond the image become one variant at its own size
+    sizes = {min(size, max(full_size)) for size in sizes}
+    derivative_sizes = {
+        max(full_size) if d is None else min(d, max(full_size)) for d in max_dimensions
+    }
+
+    results: dict[int | None, UploadedFile] = {}
+    variants: list[ImageVariant] = []
+    # Largest first (None = full size), so each resize starts from the previous one
+    steps = set(max_dimensions) | sizes
+    for max_dimension in sorted(steps, key=lambda d: -math.inf if d is None else -d):
+        needs_resize = max_dimension is not None and max(full_size) > max_dimension
+
+        if needs_resize and max_dimension:
+            image = image.resize(
+                _contained_size(full_size, max_dimension),
+                Image.Resampling.LANCZOS,
+                reducing_gap=RESIZE_REDUCING_GAP,
+            )
+
+        if max_dimension in sizes:
+            for image_format in formats:
+                if has_alpha and image_format == "JPEG":
+                    continue
+                if image_format == target_format and max_dimension in derivative_sizes:
+                    continue
+                variant = _variant_image(image, image_format, has_alpha)
+                variants.append(
+                    ImageVariant(
+                        file=_encode(
+                            variant,
+                            uploaded_file,
+                            image_format,
+                            f"-{image.width}w",
+                            quality=variant_quality,
+                        ),
+                        format=image_format,
+                        width=image.width,
+                        height=image.height,
+                    )
+                )
+
+        if max_dimension not in max_dimensions:
+            continue
+
+        # Skip re-encoding if no transformation needed
+        if not needs_resize and not needs_format_conversion and not needs_transpose:
+            _seek_start(uploaded_file)
+            results[max_dimension] = uploaded_file
+            continue
 
-    return InMemoryUploadedFile(
-        buffer,
-        getattr(uploaded_file, "field_name", None),
-        filename,
-        content_type_out,
-        size,
-        None,
+        logger.debug(
+            "resize_image_file: name=%s format=%s heif=%s resized=%s size=%s target_format=%s",
+            getattr(uploaded_file, "name", ""),
+            original_format,
+            is_heif,
+            needs_resize,
+            image.size,
+            target_format,
+        )
+        results[max_dimension] = _encode(image, uploaded_file, target_format)
+
+    return [results[max_dimension] for max_dimension in max_dimensions], variants
+
+
+def describe_image_variant(uploaded_file: UploadedFile) -> ImageVariant:
+    """
+    Identify an already-encoded variant file, e.g. one uploaded by the worker.
+
+    Only the image header is read.
+
+    Raises:
+        ValueError: If the file isn't an image in a web-native format.
+    """
+    _seek_start(uploaded_file)
+    try:
+        with Image.open(uploaded_file) as image:
+            image_format = (image.format or "").upper()
+            width, height = image.size
+    except UnidentifiedImageError:
+        raise ValueError(f"Not an image: {uploaded_file.name}") from None
+    finally:
+        _seek_start(uploaded_file)
+    if image_format not in WEB_NATIVE_FORMATS:
+        raise ValueError(f"Unsupported variant format: {image_format or 'unknown'}")
+    return ImageVariant(
+        file=uploaded_file,
+        format=image_format,
+        width=width,
+        height=height,
     )
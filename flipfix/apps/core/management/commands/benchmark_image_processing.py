@@ -0,0 +1,125 @@
+"""Time and measure memory of photo derivative generation on a generated photo."""
+
+from __future__ import annotations
+
+import json
+import os
+import resource
+import sys
+import time
+from collections.abc import Callable
+from io import BytesIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from PIL import Image, ImageOps
+
+from flipfix.apps.core.image_processing import (
+    MAX_IMAGE_DIMENSION,
+    THUMB_IMAGE_DIMENSION,
+    resize_image_derivatives,
+)
+from flipfix.apps.core.media import WEB_NATIVE_FORMATS
+
+SIZES = (MAX_IMAGE_DIMENSION, THUMB_IMAGE_DIMENSION)
+
+
+def _decode_per_derivative(data: bytes) -> None:
+    """The previous path: a full-resolution decode and LANCZOS resize per size."""
+    fmt = WEB_NATIVE_FORMATS["JPEG"]
+    for max_dimension in SIZES:
+        image = ImageOps.exif_transpose(Image.open(BytesIO(data)))
+        image = ImageOps.contain(image, (max_dimension, max_dimension), Image.Resampling.LANCZOS)
+        image.save(BytesIO(), format="JPEG", quality=fmt.quality, optimize=fmt.optimize)
+
+
+def _single_decode(data: bytes) -> None:
+    upload = SimpleUploadedFile("photo.jpg", data, content_type="image/jpeg")
+    resize_image_derivatives(upload, SIZES)
+
+
+STRATEGIES: list[tuple[str, Callable[[bytes], None]]] = [
+    ("decode per derivative", _decode_per_derivative),
+    ("single decode + draft", _single_decode),
+]
+
+
+def _max_rss_bytes() -> int:
+    # ru_maxrss is kilobytes on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def _measure(strategy: Callable[[bytes], None], data: bytes) -> tuple[float, int]:
+    """Run one strategy in a forked process; return (seconds, peak RSS growth in bytes).
+
+    A fresh process per run keeps earlier runs from masking the peak.  Uses a
+    bare fork rather than multiprocessing, which daemonic processes (such as
+    parallel test runners) may not use.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # pragma: no cover - child process
+        status = 1
+        try:
+            os.close(read_fd)
+            baseline = _max_rss_bytes()
+            start = time.perf_counter()
+            strategy(data)
+            result = [time.perf_counter() - start, _max_rss_bytes() - baseline]
+            os.write(write_fd, json.dumps(result).encode())
+            status = 0
+        finally:
+            os._exit(status)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as reader:
+        payload = reader.read()
+    _pid, status = os.waitpid(pid, 0)
+    if not payload:
+        raise CommandError(f"Benchmark process failed (wait status {status})")
+    seconds, peak = json.loads(payload)
+    return seconds, peak
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark making the web-size image and thumbnail of a generated JPEG "
+        "(48 MP by default): one decode per derivative vs. the single-decode pipeline"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--megapixels", type=float, default=48, help="Source photo size")
+        parser.add_argument(
+            "--repeat", type=int, default=3, help="Runs per strategy (best is shown)"
+        )
+
+    def handle(self, *args, **options):
+        if options["megapixels"] <= 0 or options["repeat"] < 1:
+            raise CommandError("--megapixels must be positive and --repeat at least 1")
+
+        data, size = self._build_photo(options["megapixels"])
+        self.stdout.write(
+            f"Source: {size[0]}x{size[1]} JPEG, {size[0] * size[1] / 1e6:.1f} MP, "
+            f"{len(data) / 1e6:.1f} MB"
+        )
+
+        for name, strategy in STRATEGIES:
+            runs = [_measure(strategy, data) for _ in range(options["repeat"])]
+            seconds = min(run[0] for run in runs)
+            peak = min(run[1] for run in runs)
+            self.stdout.write(
+                f"{name:<24} {seconds * 1000:9.1f} ms   peak RSS +{peak / 1e6:7.1f} MB"
+            )
+
+    @staticmethod
+    def _build_photo(megapixels: float) -> tuple[bytes, tuple[int, int]]:
+        """Return a noisy 4:3 JPEG, so it compresses like a real photo."""
+        width = int((megapixels * 1e6 * 4 / 3) ** 0.5)
+        size = (width, width * 3 // 4)
+        noise = Image.effect_noise(size, 48)
+        gradient = Image.linear_gradient("L").resize(size)
+        image = Image.merge("RGB", (noise, gradient, noise))
+        buffer = BytesIO()
+        image.save(buffer, format="JPEG", quality=90)
+        return buffer.getvalue(), size
@@ -0,0 +1,99 @@
+"""Time [[type:ref]] link processing on a large generated wiki page."""
+
+from __future__ import annotations
+
+import itertools
+import time
+from collections.abc import Callable
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from flipfix.apps.core.markdown_links import (
+    convert_authoring_to_storage,
+    convert_storage_to_authoring,
+    get_enabled_link_types,
+    render_all_links,
+    sync_references,
+)
+
+FILLER = (
+    "The left flipper was weak again after the rebuild, so we checked the EOS "
+    "switch gap, cleaned the contacts, and re-tensioned the coil stop. "
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark rendering, conversion and reference syncing of [[type:ref]] "
+        "links on a generated page (200 KB with 1,000 links by default)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--size", type=int, default=200_000, help="Page size in bytes")
+        parser.add_argument("--links", type=int, default=1000, help="Number of links")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per step (best is shown)")
+
+    def handle(self, *args, **options):
+        if options["links"] < 1 or options["repeat"] < 1:
+            raise CommandError("--links and --repeat must be at least 1")
+
+        targets = self._link_targets()
+        if not targets:
+            raise CommandError("No link types are registered")
+        text = self._build_page(targets, options["size"], options["links"])
+        authoring = convert_storage_to_authoring(text)
+        self.stdout.write(f"Page: {len(text):,} bytes, {options['links']:,} links")
+
+        source = next((obj for _lt, obj in targets if obj is not None), None)
+        steps: list[tuple[str, Callable[[], object]]] = [
+            ("render_all_links", lambda: render_all_links(text)),
+            ("convert_storage_to_authoring", lambda: convert_storage_to_authoring(text)),
+            ("convert_authoring_to_storage", lambda: self._to_storage(authoring)),
+        ]
+        if source is not None:
+            steps.append(("sync_references", lambda: self._sync_and_roll_back(source, text)))
+
+        for name, step in steps:
+            best = min(self._time(step) for _ in range(options["repeat"]))
+            self.stdout.write(f"{name:<30} {best * 1000:9.1f} ms")
+
+    @staticmethod
+    def _link_targets():
+        """Return (link type, existing record or None) pairs to link to."""
+        targets = []
+        for lt in get_enabled_link_types():
+            objs = list(lt.get_model().objects.order_by("pk")[:20]) or [None]
+            targets.extend((lt, obj) for obj in objs)
+        return targets
+
+    @staticmethod
+    def _build_page(targets, size: int, links: int) -> str:
+        refs = []
+        for lt, obj in itertools.islice(itertools.cycle(targets), links):
+            pk = obj.pk if obj is not None else 999_999
+            ref = f"id:{pk}" if lt.slug_field is not None else str(pk)
+            refs.append(f" [[{lt.name}:{ref}]]\n")
+        filler_per_link = max((size - sum(map(len, refs))) // links, 0)
+        filler = (FILLER * (filler_per_link // len(FILLER) + 1))[:filler_per_link]
+        return "".join(filler + ref for ref in refs)
+
+    @staticmethod
+    def _to_storage(authoring: str) -> None:
+        try:
+            convert_authoring_to_storage(authoring)
+        except ValidationError:
+            pass  # Broken links are reported after the full scan; timing still counts
+
+    @staticmethod
+    def _sync_and_roll_back(source, text: str) -> None:
+        with transaction.atomic():
+            sync_references(source, text)
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _time(step: Callable[[], object]) -> float:
+        start = time.perf_counter()
+        step()
+        return time.perf_counter() - start
@@ -0,0 +1,28 @@
+"""Rebuild the denormalized activity feed index."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from flipfix.apps.core.feed import rebuild_feed_index
+from flipfix.apps.core.models import FeedEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the FeedEntry index used by the activity feeds from the source records"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Only rebuild if the index has no rows yet (used after migrate on deploy)",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_empty"] and FeedEntry.objects.exists():
+            self.stdout.write("Feed index already populated; skipping")
+            return
+        counts = rebuild_feed_index()
+        for entry_type, count in counts.items():
+            self.stdout.write(f"{entry_type}: {count} indexed")
+        self.stdout.write(self.style.SUCCESS(f"✓ Feed index rebuilt ({sum(counts.values())} rows)"))
@@ -0,0 +1,30 @@
+"""Rebuild the stored full-text search documents."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from flipfix.apps.core.models import SearchDocument
+from flipfix.apps.core.search import rebuild_search_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the SearchDocument rows used by full-text search from the source records"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--if-empty",
+            action="store_true",
+            help="Only rebuild if there are no documents yet (used after migrate on deploy)",
+        )
+
+    def handle(self, *args, **options):
+        if options["if_empty"] and SearchDocument.objects.exists():
+            self.stdout.write("Search index already populated; skipping")
+            return
+        counts = rebuild_search_documents()
+        for label, count in counts.items():
+            self.stdout.write(f"{label}: {count} indexed")
+        self.stdout.write(
+            self.style.SUCCESS(f"✓ Search index rebuilt ({sum(counts.values())} documents)")
+        )
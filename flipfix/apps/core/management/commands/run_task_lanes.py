@@ -0,0 +1,51 @@
+"""Run a django-q2 worker cluster for every background task lane."""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a qcluster process for each task lane in settings.TASK_LANES, "
+        "and stop them all when one exits"
+    )
+
+    def handle(self, *args, **options):
+        processes = {
+            lane: subprocess.Popen(
+                [sys.executable, "-m", "django", "qcluster"],
+                env={**os.environ, "Q_CLUSTER_NAME": cluster},
+            )
+            for lane, cluster in settings.TASK_LANES.items()
+        }
+        for lane, process in processes.items():
+            self.stdout.write(f"Started {lane} lane worker (pid {process.pid})")
+
+        def forward(signum, _frame):
+            for process in processes.values():
+                if process.poll() is None:
+                    process.send_signal(signum)
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+
+        # Once any lane's worker exits, stop the others, so that the service
+        # restarts with every lane running rather than limping on without one
+        exited_pid, status = os.wait()
+        exit_code = os.waitstatus_to_exitcode(status)
+        exited_lane = next(lane for lane, p in processes.items() if p.pid == exited_pid)
+        for lane, process in processes.items():
+            if lane != exited_lane:
+                process.terminate()
+                process.wait()
+
+        if exit_code:
+            raise CommandError(f"{exited_lane} lane worker exited with code {exit_code}")
+        self.stdout.write(f"{exited_lane} lane worker exited; stopped the others")
@@ -2,9 +2,20 @@
 
 Shared utility for converting markdown text to sanitized HTML. Used by
 the ``render_markdown`` template filter and the wiki action rendering tag.
+``render_markdown_text()`` renders to plain text instead, for excerpts.
 """
 
+from __future__ import annotations
+
+import math
 import re
+from bisect import bisect_right
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from functools import lru_cache
+from html import unescape
+from types import MappingProxyType
+from typing import Any
 
 import nh3
 from django.utils.safestring import mark_safe
@@ -68,6 +79,9 @@ ALLOWED_ATTRIBUTES = {
 # Group 2: the check character to determine checked state (spaces or empty = unchecked)
 _TASK_LIST_RE = re.compile(r"<li>(\s*<p>)?\s*\[( *|[xX])\]")
 
+# Tags that end a line of text, so plain-text rendering keeps words apart
+_LINE_END_RE = re.compile(r"<br\s*/?>|</(?:p|li|h[1-6]|pre|blockquote|tr|th|td)>")
+
 
 def _convert_task_list_items(html: str) -> str:
     """Convert task list markers in <li> tags to checkbox HTML.
@@ -102,33 +116,68 @@ def _convert_task_list_items(html: str) -> str:
     return _TASK_LIST_RE.sub(_replace, html)
 
 
+@dataclass(frozen=True)
+class ParsedMarkdown:
+    """A markdown string parsed once, for everything that inspects or renders it.
+
+    Get instances from ``parse_markdown()``, which shares them between all
+    callers with the same text, e.g. the fence checks of a wiki save.
+    Rendering parses the text after link rendering, so it only reuses that
+    parse when the text has no ``[[type:ref]]`` links.  Shared instances are
+    immutable; callers must not modify the tokens either.
+    """
+
+    content: str
+    tokens: tuple[Any, ...]
+    # (start, end) character-position ranges of fenced code blocks, in order
+    fence_ranges: tuple[tuple[int, int], ...]
+    env: Mapping[str, Any] = field(repr=False)
+
+    @classmethod
+    def parse(cls, content: str) -> ParsedMarkdown:
+        env: dict[str, Any] = {}
+        tokens = tuple(_md.parse(content, env))
+        fences = [t.map for t in tokens if t.type == "fence" and t.map]
+        fence_ranges: tuple[tuple[int, int], ...] = ()
+        if fences:
+            # Character offset of the start of each line
+            offsets = [0, *(m.end() for m in re.finditer("\n", content))]
+            fence_ranges = tuple(
+                (offsets[start], offsets[end] if end < len(offsets) else len(content))
+                for start, end in fences
+            )
+        return cls(content, tokens, fence_ranges, MappingProxyType(env))
+
+    def in_fence(self, pos: int) -> bool:
+        """Whether character position *pos* falls inside a fenced code block."""
+        i = bisect_right(self.fence_ranges, (pos, math.inf)) - 1
+        return i >= 0 and pos < self.fence_ranges[i][1]
+
+    def render(self) -> str:
+        """Render the tokens to (unsanitized) HTML."""
+        return _md.renderer.render(list(self.tokens), _md.options, dict(self.env))
+
+
+@lru_cache(maxsize=16)
+def parse_markdown(content: str) -> ParsedMarkdown:
+    """Return the shared, immutable ParsedMarkdown for exactly *content*."""
+    return ParsedMarkdown.parse(content)
+
+
 def fenced_code_ranges(content: str) -> list[tuple[int, int]]:
     """Return (start, end) character-position ranges of fenced code blocks.
 
     Uses the MarkdownIt parser to identify code fences, ensuring consistency
     with how the content will actually be rendered.
     """
-    tokens = _md.parse(content)
-    line_ranges = [t.map for t in tokens if t.type == "fence" and t.map]
-    if not line_ranges:
-        return []
-
-    # Build line-number → character-offset mapping
-    offsets = [0]
-    for i, ch in enumerate(content):
-        if ch == "\n":
-            offsets.append(i + 1)
-
-    return [
-        (offsets[start], offsets[end] if end < len(offsets) else len(content))
-        for start, end in line_ranges
-    ]
+    return list(parse_markdown(content).fence_ranges)
 
 
 def render_markdown_html(text: str) -> str:
     """Convert markdown text to sanitized HTML.
 
     Full pipeline: wiki links → markdown (with linkify) → nh3 → checkboxes.
+    Results are cached by core/markdown_cache.py.
 
     Args:
         text: Raw markdown text (may contain ``[[type:ref]]`` links).
@@ -138,13 +187,39 @@ def render_markdown_html(text: str) -> str:
     """
     if not text:
         return ""
+    from flipfix.apps.core.markdown_cache import get_or_render
+
+    html = get_or_render(text, _render_markdown_uncached)
+    return mark_safe(html)  # noqa: S308 — HTML sanitized by nh3
+
+
+def _render_markdown_uncached(text: str) -> str:
+    """Run the full rendering pipeline, bypassing the cache."""
     # Convert [[type:ref]] links to markdown links (before markdown processing)
     from flipfix.apps.core.markdown_links import render_all_links
 
     text = render_all_links(text)
-    # Convert markdown to HTML (bare URLs are auto-linked during parsing)
-    html = _md.render(text)
+    # Convert markdown to HTML (bare URLs are auto-linked during parsing).
+    # Keyed by the text after link rendering, so this reuses the parse of
+    # earlier fence checks only when the text has no links.
+    html = parse_markdown(text).render()
     # Sanitize to prevent XSS
     safe_html = nh3.clean(html, tags=ALLOWED_TAGS, attributes=ALLOWED_ATTRIBUTES)
     # Convert task list markers to checkboxes (after sanitization for security)
-    return mark_safe(_convert_task_list_items(safe_html))  # noqa: S308 — HTML sanitized by nh3
+    return _convert_task_list_items(safe_html)
+
+
+def render_markdown_text(text: str) -> str:
+    """Convert markdown text to plain text, on one line.
+
+    Links render as their labels and formatting is dropped, so the result
+    reads like the rendered card.  Not cached; meant for building stored
+    text such as search snippets.
+    """
+    if not text:
+        return ""
+    from flipfix.apps.core.markdown_links import render_all_links
+
+    html = _md.render(render_all_links(text, plain_text=True))
+    plain = nh3.clean(_LINE_END_RE.sub(" ", html), tags=set())
+    return " ".join(unescape(plain).split())
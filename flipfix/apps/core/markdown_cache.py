@@ -0,0 +1,146 @@
+"""Persisted cache of rendered markdown HTML.
+
+``render_markdown_html()`` output depends on two things: the markdown text,
+and the labels and URLs of the records its ``[[type:ref]]`` links point to.
+Entries are therefore keyed by a hash of the text plus a version stamp made
+of one version token per link target.  Text without links is never
+invalidated.
+
+When a link target is saved or deleted, its token is dropped (after the
+transaction commits), so every cached rendering that links to it misses and
+is rebuilt with the new label or URL, e.g. after a machine rename.  This
+doesn't consult ``RecordReference``: text rendered without a
+``sync_references()`` call, such as the front page, is invalidated too, and
+renderings that don't link to the target keep their entries.
+
+The store is the Django cache alias named by ``settings.MARKDOWN_CACHE_ALIAS``.
+It's a ``DummyCache`` (caching off) unless ``MARKDOWN_CACHE_BACKEND`` names a
+store every process shares, such as Redis or a ``DatabaseCache`` table; a
+per-process ``LocMemCache`` would miss invalidations made elsewhere.  Bump
+``CACHE_VERSION`` whenever the rendering pipeline itself changes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import uuid
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+
+if TYPE_CHECKING:
+    from flipfix.apps.core.markdown_links import LinkType
+
+CACHE_VERSION = 1
+_HTML_KEY_PREFIX = "markdown-html"
+_VERSION_KEY_PREFIX = "markdown-target"
+
+
+def get_store() -> BaseCache:
+    """Return the cache that holds rendered HTML and target version tokens."""
+    return caches[settings.MARKDOWN_CACHE_ALIAS]
+
+
+def _version_key(link_type_name: str, pk: int) -> str:
+    return f"{_VERSION_KEY_PREFIX}:{link_type_name}:{pk}"
+
+
+def _link_stamp(store: BaseCache, text: str) -> str | None:
+    """Return the version stamp for the link targets in text.
+
+    Targets without a token get a fresh random one via ``add()``, so a
+    stamp never repeats once a token has been dropped or culled.  Returns
+    None when the text can't be cached (authoring-format links).
+    """
+    from flipfix.apps.core.markdown_links import find_link_targets, get_enabled_link_types
+
+    targets = find_link_targets(text)
+    if targets is None:
+        return None
+    enabled = ",".join(sorted(lt.name for lt in get_enabled_link_types()))
+    if not targets:
+        return enabled
+
+    keys = [_version_key(lt.name, pk) for lt, pk in targets]
+    tokens = store.get_many(keys)
+    missing = [key for key in keys if key not in tokens]
+    if missing:
+        for key in missing:
+            store.add(key, uuid.uuid4().hex, timeout=None)
+        tokens.update(store.get_many(missing))
+    return enabled + "|" + ",".join(f"{key}={tokens.get(key, '')}" for key in keys)
+
+
+def _html_key(text: str, stamp: str) -> str:
+    digest = hashlib.sha256(f"{text}\0{stamp}".encode()).hexdigest()
+    return f"{_HTML_KEY_PREFIX}:{CACHE_VERSION}:{digest}"
+
+
+def get_or_render(text: str, render: Callable[[str], str]) -> str:
+    """Return cached HTML for text, calling ``render(text)`` on a miss."""
+    store = get_store()
+    stamp = _link_stamp(store, text)
+    if stamp is None:
+        return render(text)
+    key = _html_key(text, stamp)
+    html = store.get(key)
+    if html is None:
+        html = render(text)
+        store.set(key, html)
+    return html
+
+
+# ---------------------------------------------------------------------------
+# Invalidation
+# ---------------------------------------------------------------------------
+
+
+def invalidate_link_targets(link_type_name: str, pks: list[int]) -> None:
+    """Drop the version tokens of the given targets once the transaction commits."""
+    if not pks:
+        return
+    keys = [_version_key(link_type_name, pk) for pk in pks]
+    transaction.on_commit(lambda: get_store().delete_many(keys))
+
+
+def _link_targets_changed(sender, instance, **kwargs):
+    """post_save/post_delete receiver: invalidate renderings that link here."""
+    from flipfix.apps.core.markdown_links import get_all_link_types
+
+    label = sender._meta.label
+    for lt in get_all_link_types():
+        if lt.model_path == label:
+            invalidate_link_targets(lt.name, [instance.pk])
+        for dependency, lookup in lt.label_dependencies:
+            if dependency == label:
+                model = lt.get_model()
+                pks = list(
+                    model.objects.filter(**{lookup: instance.pk}).values_list("pk", flat=True)
+                )
+                invalidate_link_targets(lt.name, pks)
+
+
+def connect_invalidation_signals(link_type: LinkType) -> None:
+    """Connect the invalidation receivers to a link type's model and label dependencies.
+
+    Called by ``markdown_links.register()``, so saves of models no link
+    points at never reach the receiver.
+    """
+    from django.db.models.signals import post_delete, post_save
+
+    model_paths = (link_type.model_path, *(path for path, _ in link_type.label_dependencies))
+    for model_path in model_paths:
+        # Lazy "app_label.Model" senders resolve once the model is loaded
+        post_save.connect(
+            _link_targets_changed,
+            sender=model_path,
+            dispatch_uid=f"markdown_cache_post_save_{model_path}",
+        )
+        post_delete.connect(
+            _link_targets_changed,
+            sender=model_path,
+            dispatch_uid=f"markdown_cache_post_delete_{model_path}",
+        )
@@ -15,14 +15,18 @@ Public API:
 - convert_storage_to_authoring()         — on edit load
 - sync_references()                       — on save
 - render_all_links()                      — in render_markdown template filter
+- link_resolution(), prefetch_links()     — request-scoped batch resolution
+- find_link_targets()                     — for the rendered-HTML cache
 - save_inline_markdown_field()             — for inline AJAX text edits
 - link_preview()                          — for label truncation
 """
 
 from __future__ import annotations
 
+import contextvars
 import re
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Any
 
@@ -85,6 +89,12 @@ class LinkType:
     # --- Display order in type picker (lower = higher in list) ---
     sort_order: int = 100
 
+    # --- Rendered-HTML cache invalidation ---
+    # Other models whose changes alter this type's label or URL, as
+    # (model_path, lookup from this type's model to it) pairs, e.g. wiki page
+    # titles: (("wiki.WikiPage", "page"),).  See core/markdown_cache.py.
+    label_dependencies: tuple[tuple[str, str], ...] = ()
+
     def get_model(self) -> type[Any]:
         """Resolve the model class lazily via Django's app registry."""
         from django.apps import apps
@@ -112,31 +122,29 @@ class LinkType:
 # ---------------------------------------------------------------------------
 
 _registry: dict[str, LinkType] = {}
-_patterns: dict[str, dict[str, re.Pattern[str]]] = {}
+# One alternation over every registered type name, so a text is scanned once
+# no matter how many types exist.  Rebuilt by register().
+_link_pattern: re.Pattern[str] | None = None
 
 
 def register(link_type: LinkType) -> None:
     """Register a link type. Called from each app's AppConfig.ready()."""
+    global _link_pattern
     if link_type.name in _registry:
         raise ValueError(f"Link type '{link_type.name}' is already registered")
     _registry[link_type.name] = link_type
-    # Compile regex patterns eagerly
-    name = re.escape(link_type.name)
-    if link_type.slug_field is not None:
-        _patterns[link_type.name] = {
-            "storage": re.compile(rf"\[\[{name}:id:(\d+)\]\]"),
-            "authoring": re.compile(rf"\[\[{name}:(?!id:)([^\]]+)\]\]"),
-        }
-    else:
-        _patterns[link_type.name] = {
-            "id": re.compile(rf"\[\[{name}:(\d+)\]\]"),
-        }
+    from flipfix.apps.core.markdown_cache import connect_invalidation_signals
+
+    connect_invalidation_signals(link_type)
+    names = "|".join(re.escape(name) for name in sorted(_registry, key=len, reverse=True))
+    _link_pattern = re.compile(rf"\[\[({names}):([^\]]+)\]\]")
 
 
 def clear_registry() -> None:
     """Reset registry state. For tests only."""
+    global _link_pattern
     _registry.clear()
-    _patterns.clear()
+    _link_pattern = None
 
 
 def get_link_type(name: str) -> LinkType | None:
@@ -144,6 +152,11 @@ def get_link_type(name: str) -> LinkType | None:
     return _registry.get(name)
 
 
+def get_all_link_types() -> list[LinkType]:
+    """Return all registered link types, enabled or not."""
+    return list(_registry.values())
+
+
 def get_enabled_link_types() -> list[LinkType]:
     """Return all currently enabled link types."""
     return [lt for lt in _registry.values() if lt.is_enabled()]
@@ -161,9 +174,177 @@ def get_enabled_slug_types() -> list[LinkType]:
     return [lt for lt in get_enabled_link_types() if lt.slug_field is not None]
 
 
-def get_patterns(link_type: LinkType) -> dict[str, re.Pattern[str]]:
-    """Get compiled regex patterns for a link type."""
-    return _patterns[link_type.name]
+# ---------------------------------------------------------------------------
+# Scanning
+#
+# Every operation below (rendering, conversion, reference syncing) starts with
+# one pass of the combined pattern over the text, then resolves targets with
+# one query per link type and rebuilds the text in a single join.
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class _Link:
+    """One [[type:ref]] link found in a text."""
+
+    lt: LinkType
+    pk: int | None  # Storage format ([[type:id:N]]) and ID-based types
+    key: str | None  # Authoring format of slug-based types ([[type:slug]])
+    start: int
+    end: int
+
+
+def _parse_ref(lt: LinkType, ref: str) -> tuple[int | None, str | None] | None:
+    """Split a link's ref into (pk, authoring key), or None if it isn't a valid link."""
+    if lt.slug_field is None:
+        return (int(ref), None) if ref.isdecimal() else None
+    if ref.startswith("id:"):
+        pk = ref[3:]
+        return (int(pk), None) if pk.isdecimal() else None
+    return None, ref
+
+
+def _scan_links(text: str) -> list[_Link]:
+    """Find all links of enabled types in text, in order, with a single regex scan."""
+    if _link_pattern is None or "[[" not in text:
+        return []
+    enabled = {lt.name: lt for lt in get_enabled_link_types()}
+    links = []
+    for match in _link_pattern.finditer(text):
+        lt = enabled.get(match.group(1))
+        parsed = _parse_ref(lt, match.group(2)) if lt else None
+        if lt and parsed:
+            links.append(_Link(lt, *parsed, match.start(), match.end()))
+    return links
+
+
+def _replace_links(text: str, links: list[_Link], replace: Callable[[_Link], str]) -> str:
+    """Rebuild text with each link swapped for ``replace(link)``."""
+    pieces = []
+    pos = 0
+    for link in links:
+        pieces.append(text[pos : link.start])
+        pieces.append(replace(link))
+        pos = link.end
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+def _group_pks(links: Iterable[_Link]) -> dict[str, set[int]]:
+    """Group the storage-format links' PKs by link type name."""
+    pks: dict[str, set[int]] = {}
+    for link in links:
+        if link.pk is not None:
+            pks.setdefault(link.lt.name, set()).add(link.pk)
+    return pks
+
+
+def _group_keys(links: Iterable[_Link]) -> dict[str, set[str]]:
+    """Group the authoring-format links' keys by link type name."""
+    keys: dict[str, set[str]] = {}
+    for link in links:
+        if link.key is not None:
+            keys.setdefault(link.lt.name, set()).add(link.key)
+    return keys
+
+
+def _lookup_keys(lt: LinkType, keys: Iterable[str]) -> dict[str, Any]:
+    """Look up slug-based link targets by authoring key with one query."""
+    if lt.slug_field is None:
+        raise ValueError(f"LinkType '{lt.name}' is not slug-based")
+    model = lt.get_model()
+    if lt.authoring_lookup:
+        return lt.authoring_lookup(model, list(keys))
+    qs = model.objects.filter(**{f"{lt.slug_field}__in": list(keys)})
+    if lt.select_related:
+        qs = qs.select_related(*lt.select_related)
+    return {getattr(obj, lt.slug_field): obj for obj in qs}
+
+
+# ---------------------------------------------------------------------------
+# Request-scoped batch resolution
+#
+# A page renders many markdown fields (feed cards, sidebars, wiki content),
+# and each would otherwise look up its own links: one query per link type per
+# field.  Inside link_resolution() (opened per request by
+# LinkResolutionMiddleware), views queue the page's texts with
+# prefetch_links(); the first render that needs a target then resolves every
+# queued link with one query per link type, and later renders reuse the
+# results.  Resolution is lazy so fields served from the rendered-HTML cache
+# (core/markdown_cache.py) never cause a lookup.
+# ---------------------------------------------------------------------------
+
+
+class LinkResolver:
+    """Resolved link targets shared by everything rendered in one request."""
+
+    def __init__(self) -> None:
+        self._pending: list[str] = []
+        self._resolved: dict[str, dict[int, Any]] = {}  # type name → {pk: obj or None}
+
+    def prefetch(self, texts: Iterable[str | None]) -> None:
+        """Queue texts whose links should be resolved in the next batch."""
+        self._pending.extend(text for text in texts if text)
+
+    def get_many(self, lt: LinkType, ids: set[int]) -> dict[int, Any]:
+        """Return ``{pk: obj}`` for the ids that exist, resolving queued texts first."""
+        wanted = self._take_pending()
+        wanted.setdefault(lt.name, set()).update(ids)
+        for name, type_ids in wanted.items():
+            self._fetch(_registry[name], type_ids)
+        resolved = self._resolved[lt.name]
+        return {pk: resolved[pk] for pk in ids if resolved.get(pk) is not None}
+
+    def _take_pending(self) -> dict[str, set[int]]:
+        wanted = _group_pks(link for text in self._pending for link in _scan_links(text))
+        self._pending.clear()
+        return wanted
+
+    def _fetch(self, lt: LinkType, ids: set[int]) -> None:
+        resolved = self._resolved.setdefault(lt.name, {})
+        missing = ids - resolved.keys()
+        if not missing:
+            return
+        by_id = _fetch_by_id(lt, missing)
+        resolved.update({pk: by_id.get(pk) for pk in missing})
+
+
+_active_resolver: contextvars.ContextVar[LinkResolver | None] = contextvars.ContextVar(
+    "link_resolver", default=None
+)
+
+
+@contextmanager
+def link_resolution() -> Iterator[LinkResolver]:
+    """Share one LinkResolver across all rendering inside the block.
+
+    Nested blocks reuse the outer resolver.
+    """
+    resolver = _active_resolver.get()
+    if resolver is not None:
+        yield resolver
+        return
+    resolver = LinkResolver()
+    token = _active_resolver.set(resolver)
+    try:
+        yield resolver
+    finally:
+        _active_resolver.reset(token)
+
+
+def prefetch_links(texts: Iterable[str | None]) -> None:
+    """Queue texts for batch link resolution. No-op outside ``link_resolution()``."""
+    resolver = _active_resolver.get()
+    if resolver is not None:
+        resolver.prefetch(texts)
+
+
+def _fetch_by_id(lt: LinkType, ids: Iterable[int]) -> dict[int, Any]:
+    """Look up link targets by PK with one query."""
+    qs = lt.get_model().objects.filter(pk__in=ids)
+    if lt.select_related:
+        qs = qs.select_related(*lt.select_related)
+    return {obj.pk: obj for obj in qs}
 
 
 # ---------------------------------------------------------------------------
@@ -175,7 +356,9 @@ def render_all_links(text: str, base_url: str = "", plain_text: bool = False) ->
     """Convert all [[type:ref]] links in text to markdown links.
 
     Handles both storage format (primary path) and authoring format
-    (defense-in-depth for unconverted content).
+    (defense-in-depth for unconverted content).  The text is scanned once
+    and each link type's targets are looked up with one query, through the
+    active request's LinkResolver when there is one.
 
     Missing targets render as ``*[broken link]*`` (or ``[broken link]``
     in plain-text mode).
@@ -189,14 +372,54 @@ def render_all_links(text: str, base_url: str = "", plain_text: bool = False) ->
             syntax.  Useful for short preview snippets where markdown
             links would be truncated.
     """
-    for lt in get_enabled_link_types():
-        pats = get_patterns(lt)
-        if lt.slug_field is not None:
-            text = _render_by_id(text, lt, pats["storage"], base_url, plain_text)
-            text = _render_by_slug(text, lt, pats["authoring"], base_url, plain_text)
-        else:
-            text = _render_by_id(text, lt, pats["id"], base_url, plain_text)
-    return text
+    links = _scan_links(text)
+    if not links:
+        return text
+
+    resolver = _active_resolver.get()
+    by_pk = {
+        name: resolver.get_many(_registry[name], pks)
+        if resolver
+        else _fetch_by_id(_registry[name], pks)
+        for name, pks in _group_pks(links).items()
+    }
+    by_key = {
+        name: _lookup_keys(_registry[name], keys) for name, keys in _group_keys(links).items()
+    }
+
+    # Pages often repeat the same link; format (reverse() the URL) once per target
+    formatted: dict[tuple[str, int | None, str | None], str] = {}
+
+    def _replace(link: _Link) -> str:
+        cache_key = (link.lt.name, link.pk, link.key)
+        if cache_key not in formatted:
+            if link.pk is not None:
+                obj = by_pk[link.lt.name].get(link.pk)
+            elif link.key is not None:
+                obj = by_key[link.lt.name].get(link.key)
+            else:
+                obj = None  # Unreachable: every scanned link has a pk or an authoring key
+            formatted[cache_key] = _format_link(link.lt, obj, base_url, plain_text)
+        return formatted[cache_key]
+
+    return _replace_links(text, links, _replace)
+
+
+def find_link_targets(text: str) -> list[tuple[LinkType, int]] | None:
+    """Return the (link type, pk) targets of the storage-format links in text.
+
+    Only enabled types are considered, matching ``render_all_links()``.
+    Returns None when the text also contains authoring-format links, whose
+    targets can only be found by looking them up.
+    """
+    links = _scan_links(text)
+    if any(link.key is not None for link in links):
+        return None
+    return [
+        (_registry[name], pk)
+        for name, pks in sorted(_group_pks(links).items())
+        for pk in sorted(pks)
+    ]
 
 
 def _format_link(lt: LinkType, obj: Any | None, base_url: str, plain_text: bool) -> str:
@@ -212,69 +435,6 @@ def _format_link(lt: LinkType, obj: Any | None, base_url: str, plain_text: bool)
     return f"[{label}]({url})"
 
 
-def _render_by_id(
-    text: str,
-    lt: LinkType,
-    pattern: re.Pattern[str],
-    base_url: str = "",
-    plain_text: bool = False,
-) -> str:
-    """Render [[type:id:N]] or [[type:N]] links by batch PK lookup."""
-    matches = list(pattern.finditer(text))
-    if not matches:
-        return text
-
-    model = lt.get_model()
-    ids = [int(m.group(1)) for m in matches]
-    qs = model.objects.filter(pk__in=ids)
-    if lt.select_related:
-        qs = qs.select_related(*lt.select_related)
-    by_id = {obj.pk: obj for obj in qs}
-
-    result = text
-    for match in reversed(matches):
-        obj_id = int(match.group(1))
-        obj = by_id.get(obj_id)
-        replacement = _format_link(lt, obj, base_url, plain_text)
-        result = result[: match.start()] + replacement + result[match.end() :]
-    return result
-
-
-def _render_by_slug(
-    text: str,
-    lt: LinkType,
-    pattern: re.Pattern[str],
-    base_url: str = "",
-    plain_text: bool = False,
-) -> str:
-    """Render [[type:slug]] links by batch slug lookup (defense-in-depth)."""
-    matches = list(pattern.finditer(text))
-    if not matches:
-        return text
-
-    model = lt.get_model()
-    raw_values = [m.group(1) for m in matches]
-
-    if lt.slug_field is None:
-        raise ValueError(f"LinkType '{lt.name}' is not slug-based")
-    by_key: dict[str, Any]
-    if lt.authoring_lookup:
-        by_key = lt.authoring_lookup(model, raw_values)
-    else:
-        qs = model.objects.filter(**{f"{lt.slug_field}__in": raw_values})
-        if lt.select_related:
-            qs = qs.select_related(*lt.select_related)
-        by_key = {getattr(obj, lt.slug_field): obj for obj in qs}
-
-    result = text
-    for match in reversed(matches):
-        key = match.group(1)
-        obj = by_key.get(key)
-        replacement = _format_link(lt, obj, base_url, plain_text)
-        result = result[: match.start()] + replacement + result[match.end() :]
-    return result
-
-
 # ---------------------------------------------------------------------------
 # Authoring ↔ Storage conversion
 # ---------------------------------------------------------------------------
@@ -291,51 +451,31 @@ def convert_authoring_to_storage(content: str) -> str:
     if not content:
         return content
 
+    links = [link for link in _scan_links(content) if link.key is not None]
+    if not links:
+        return content
+
+    by_key = {
+        name: _lookup_keys(_registry[name], keys) for name, keys in _group_keys(links).items()
+    }
     errors: list[str] = []
-    for lt in get_enabled_slug_types():
-        pats = get_patterns(lt)
-        content = _convert_to_storage(content, lt, pats["authoring"], errors)
 
+    def _replace(link: _Link) -> str:
+        if link.key is None:
+            # Only authoring-format links were kept; leave anything else as written
+            return content[link.start : link.end]
+        obj = by_key[link.lt.name].get(link.key)
+        if obj:
+            return f"[[{link.lt.name}:id:{obj.pk}]]"
+        errors.append(f"{link.lt.name.title()} not found: [[{link.lt.name}:{link.key}]]")
+        return content[link.start : link.end]
+
+    content = _replace_links(content, links, _replace)
     if errors:
         raise ValidationError(errors)
     return content
 
 
-def _convert_to_storage(
-    content: str,
-    lt: LinkType,
-    pattern: re.Pattern[str],
-    errors: list[str],
-) -> str:
-    """Convert [[type:slug]] to [[type:id:N]] for one link type."""
-    matches = list(pattern.finditer(content))
-    if not matches:
-        return content
-
-    model = lt.get_model()
-    raw_values = [m.group(1) for m in matches]
-
-    if lt.slug_field is None:
-        raise ValueError(f"LinkType '{lt.name}' is not slug-based")
-    by_key: dict[str, Any]
-    if lt.authoring_lookup:
-        by_key = lt.authoring_lookup(model, raw_values)
-    else:
-        qs = model.objects.filter(**{f"{lt.slug_field}__in": raw_values})
-        by_key = {getattr(obj, lt.slug_field): obj for obj in qs}
-
-    result = content
-    for match in reversed(matches):
-        key = match.group(1)
-        obj = by_key.get(key)
-        if obj:
-            result = result[: match.start()] + f"[[{lt.name}:id:{obj.pk}]]" + result[match.end() :]
-        else:
-            errors.append(f"{lt.name.title()} not found: [[{lt.name}:{key}]]")
-            result = result[: match.start()] + match.group(0) + result[match.end() :]
-    return result
-
-
 def convert_storage_to_authoring(content: str) -> str:
     """Convert storage format links to authoring format for editing.
 
@@ -344,42 +484,30 @@ def convert_storage_to_authoring(content: str) -> str:
     if not content:
         return content
 
-    for lt in get_enabled_slug_types():
-        pats = get_patterns(lt)
-        content = _convert_to_authoring(content, lt, pats["storage"])
-    return content
-
-
-def _convert_to_authoring(
-    content: str,
-    lt: LinkType,
-    pattern: re.Pattern[str],
-) -> str:
-    """Convert [[type:id:N]] to [[type:slug]] for one link type."""
-    if lt.slug_field is None:
-        raise ValueError(f"LinkType '{lt.name}' is not slug-based")
-    matches = list(pattern.finditer(content))
-    if not matches:
+    links = [
+        link
+        for link in _scan_links(content)
+        if link.lt.slug_field is not None and link.pk is not None
+    ]
+    if not links:
         return content
 
-    model = lt.get_model()
-    ids = [int(m.group(1)) for m in matches]
-    by_id = {obj.pk: obj for obj in model.objects.filter(pk__in=ids)}
+    by_pk = {
+        name: {obj.pk: obj for obj in _registry[name].get_model().objects.filter(pk__in=pks)}
+        for name, pks in _group_pks(links).items()
+    }
 
-    result = content
-    for match in reversed(matches):
-        obj_id = int(match.group(1))
-        obj = by_id.get(obj_id)
-        if obj:
-            if lt.get_authoring_key:
-                key = lt.get_authoring_key(obj)
-            else:
-                key = getattr(obj, lt.slug_field)
-            result = result[: match.start()] + f"[[{lt.name}:{key}]]" + result[match.end() :]
-        else:
-            # Keep storage format for broken links (target deleted)
-            result = result[: match.start()] + match.group(0) + result[match.end() :]
-    return result
+    def _replace(link: _Link) -> str:
+        lt = link.lt
+        obj = by_pk[lt.name].get(link.pk)
+        if obj is None or lt.slug_field is None:
+            # Keep storage format for broken links (target deleted); only
+            # slug-based types' links were kept, so the second can't happen
+            return content[link.start : link.end]
+        key = lt.get_authoring_key(obj) if lt.get_authoring_key else getattr(obj, lt.slug_field)
+        return f"[[{lt.name}:{key}]]"
+
+    return _replace_links(content, links, _replace)
 
 
 # ---------------------------------------------------------------------------
@@ -403,15 +531,12 @@ def sync_references(source: models.Model, content: str) -> None:
 
     content = content or ""
 
-    # Parse all link IDs from content using registered patterns
-    links_by_model: dict[type[Any], set[int]] = {}
-    for lt in get_enabled_link_types():
-        pats = get_patterns(lt)
-        pattern = pats.get("storage") or pats.get("id")
-        if pattern is None:
-            continue
-        ids = {int(m.group(1)) for m in pattern.finditer(content)}
-        links_by_model[lt.get_model()] = ids
+    # Parse all link IDs from content in one scan; types with no links get an
+    # empty set so their stale references are cleaned up
+    pks_by_type = _group_pks(_scan_links(content))
+    links_by_model: dict[type[Any], set[int]] = {
+        lt.get_model(): pks_by_type.get(lt.name, set()) for lt in get_enabled_link_types()
+    }
 
     if not links_by_model:
         return
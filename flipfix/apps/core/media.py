@@ -9,6 +9,7 @@ Single source of truth for supported media extensions used by:
 
 from __future__ import annotations
 
+import mimetypes
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -23,6 +24,7 @@ class ImageFormat:
     extension: str
     quality: int | None = None  # Lossy formats only; None = lossless
     optimize: bool = False  # Pillow optimize flag (JPEG/PNG only)
+    speed: int | None = None  # Encoder speed, 0-10 (AVIF only); None = Pillow default
 
 
 # Image formats browsers can display natively.  These are preserved on resize, not converted to JPEG.
@@ -31,7 +33,7 @@ WEB_NATIVE_FORMATS: dict[str, ImageFormat] = {
     "JPEG": ImageFormat(content_type="image/jpeg", extension="jpg", quality=85, optimize=True),
     "PNG": ImageFormat(content_type="image/png", extension="png", optimize=True),
     "WEBP": ImageFormat(content_type="image/webp", extension="webp", quality=80),
-    "AVIF": ImageFormat(content_type="image/avif", extension="avif", quality=63),
+    "AVIF": ImageFormat(content_type="image/avif", extension="avif", quality=63, speed=8),
 }
 
 # Supported media extensions
@@ -60,6 +62,16 @@ MEDIA_ACCEPT_ATTR = ",".join(
 # File size limit
 MAX_MEDIA_FILE_SIZE_BYTES = 200 * 1024 * 1024  # 200MB
 
+# HLS adaptive streaming files written by the video worker: the master playlist
+# lists one playlist per rendition, each of which lists its segments
+HLS_MASTER_PLAYLIST = "master.m3u8"
+HLS_CONTENT_TYPES = {".m3u8": "application/vnd.apple.mpegurl", ".ts": "video/mp2t"}
+
+# Some systems' MIME tables map .ts to Qt translations or TypeScript, and
+# serve_media() and storage backends guess content types with mimetypes
+for _suffix, _content_type in HLS_CONTENT_TYPES.items():
+    mimetypes.add_type(_content_type, _suffix)
+
 
 def is_video_file(uploaded_file: UploadedFile) -> bool:
     """Check if an uploaded file is a video based on content type and extension.
@@ -1,7 +1,14 @@
 """Media upload orchestration.
 
-Bridges media configuration (``media.py``) and background transcoding
+Bridges media configuration (``media.py``) and background processing
 (``transcoding.py``) so that callers don't need to know about both.
+
+Uploads are deduplicated by content: once a media record's files are
+final, ``share_media_files()`` records them as a ``MediaBlob`` keyed by the
+hash of the uploaded bytes, and a later identical upload gets a record that
+reuses those files (``reuse_stored_media()``) instead of storing, resizing
+or transcoding them again.  ``release_shared_files()`` keeps shared files
+until the last record using them is deleted.
 """
 
 from __future__ import annotations
@@ -10,11 +17,18 @@ from collections.abc import Sequence
 from functools import partial
 from typing import Any
 
+from django.conf import settings
+from django.core.files import File
 from django.core.files.uploadedfile import UploadedFile
 from django.db import transaction
+from django.db.models import F
+from django.db.models.fields.files import FieldFile
 
+from flipfix.apps.core.image_processing import ImageVariant
 from flipfix.apps.core.media import is_video_file
-from flipfix.apps.core.transcoding import enqueue_transcode
+from flipfix.apps.core.models import MediaBlob
+from flipfix.apps.core.transcoding import enqueue_photo_processing, enqueue_transcode
+from flipfix.apps.core.upload_handlers import content_hash_of
 
 
 def attach_media_files(
@@ -23,7 +37,13 @@ def attach_media_files(
     parent: object,
     media_model: type[Any],
 ) -> list[Any]:
-    """Create media records for uploaded files and enqueue video transcoding.
+    """Create media records for uploaded files and enqueue background processing.
+
+    Videos are always transcoded on the worker.  Photos are resized here
+    unless ``settings.PHOTO_PROCESSING_ASYNC`` is set, in which case the
+    original is stored as-is and the resize is queued like a transcode.
+    Files identical to an earlier, fully processed upload reuse its stored
+    files and aren't processed at all.
 
     ``media_model`` must be a concrete ``AbstractMedia`` subclass
     (e.g. ``LogEntryMedia``).  The type is ``Any`` because django-stubs
@@ -32,21 +52,198 @@ def attach_media_files(
     Must be called inside a transaction (e.g. a view decorated with
     ``@transaction.atomic``) so that ``on_commit`` callbacks fire correctly.
     """
+    defer_photos = settings.PHOTO_PROCESSING_ASYNC
     created: list[Any] = []
     for media_file in media_files:
         is_video = is_video_file(media_file)
+        is_queued = is_video or defer_photos
+        media_type = media_model.MediaType.VIDEO if is_video else media_model.MediaType.PHOTO
+        content_hash = content_hash_of(media_file)
+
+        # Web uploads are transcoded, so only reuse videos that were too
+        # (Discord videos are stored untranscoded)
+        reused = reuse_stored_media(
+            media_model, parent, content_hash, media_type, require_ready=is_video
+        )
+        if reused is not None:
+            created.append(reused)
+            continue
 
-        media = media_model.objects.create(
+        media = media_model(
             **{media_model.parent_field_name: parent},
-            media_type=media_model.MediaType.VIDEO if is_video else media_model.MediaType.PHOTO,
+            media_type=media_type,
             file=media_file,
-            transcode_status=media_model.TranscodeStatus.PENDING if is_video else "",
+            transcode_status=media_model.TranscodeStatus.PENDING if is_queued else "",
+            content_hash=content_hash,
         )
+        media.save(force_insert=True, process_photo=not is_queued)
 
         if is_video:
             transaction.on_commit(
                 partial(enqueue_transcode, media_id=media.id, model_name=media_model.__name__)
             )
+        elif is_queued:
+            transaction.on_commit(
+                partial(
+                    enqueue_photo_processing, media_id=media.id, model_name=media_model.__name__
+                )
+            )
+        else:
+            share_media_files(media)
 
         created.append(media)
     return created
+
+
+def reuse_stored_media(
+    media_model: type[Any],
+    parent: object,
+    content_hash: str,
+    media_type: str,
+    *,
+    require_ready: bool = False,
+) -> Any | None:
+    """Create a media record that shares the stored files of an identical earlier upload.
+
+    Args:
+        media_model: Concrete ``AbstractMedia`` subclass of the new record
+        parent: The record the media is attached to
+        content_hash: Hash of the uploaded bytes, from ``content_hash_of()``
+        media_type: Photo or video; a blob of the other type is never reused
+        require_ready: Only reuse files that finished background processing
+            (i.e. transcoded videos, not Discord originals)
+
+    Returns:
+        The new record, or None if there are no files to reuse.
+    """
+    with transaction.atomic():
+        blobs = MediaBlob.objects.select_for_update().filter(
+            content_hash=content_hash, media_type=media_type
+        )
+        if require_ready:
+            blobs = blobs.filter(transcode_status=media_model.TranscodeStatus.READY)
+        blob = blobs.first()
+        if blob is None:
+            return None
+
+        media = media_model(
+            **{media_model.parent_field_name: parent},
+            **_shared_values(blob),
+            content_hash=content_hash,
+            blob=blob,
+        )
+        media.save(force_insert=True, process_photo=False)
+        MediaBlob.objects.filter(pk=blob.pk).update(ref_count=F("ref_count") + 1)
+    return media
+
+
+def share_media_files(media: Any) -> None:
+    """Record a media record's final files as the blob for its content hash.
+
+    Call once the files won't change again: after a photo is resized or a
+    video transcoded.  If another record already holds the blob (an
+    identical upload processed at the same time), this one keeps its own
+    files unshared.
+    """
+    if not media.content_hash or media.blob_id is not None:
+        return
+    with transaction.atomic():
+        blob, created = MediaBlob.objects.get_or_create(
+            content_hash=media.content_hash, defaults=_shared_values(media)
+        )
+        if created:
+            media.blob = blob
+            media.save(update_fields=["blob"], process_photo=False)
+
+
+def save_transcoded_files(
+    media: Any,
+    video_file: File,
+    poster_file: File | None,
+    hls_files: Sequence[File] = (),
+) -> None:
+    """Store a video's transcoded file, poster and any HLS files, and mark it ready.
+
+    The original upload is deleted once the transaction commits.  Used by
+    both ways the worker returns its output: the web service's upload API
+    and, on shared storage, the worker itself (see ``StorageTransfer``).
+    """
+    original_file_name = media.file.name if media.file else None
+
+    with transaction.atomic():
+        if media.file:
+            media.file = None
+
+        media.transcoded_file = video_file
+        if poster_file:
+            media.poster_file = poster_file
+        if hls_files:
+            media.store_hls(hls_files)
+        media.transcode_status = type(media).TranscodeStatus.READY
+        media.save()
+        share_media_files(media)
+
+    # Delete original file only after transaction commits successfully
+    if original_file_name:
+        storage = media.transcoded_file.storage
+        transaction.on_commit(partial(storage.delete, name=original_file_name))
+
+
+def save_photo_derivatives(
+    media: Any,
+    photo_file: File | None,
+    thumbnail_file: File,
+    variants: Sequence[ImageVariant],
+) -> None:
+    """Store a photo's web-size image, thumbnail and variants, and mark it ready.
+
+    ``photo_file`` is None when the upload was already small enough to keep.
+    A replaced original is deleted once the transaction commits.  Like
+    ``save_transcoded_files()``, used by the upload API and ``StorageTransfer``.
+    """
+    original_file_name = media.file.name if photo_file and media.file else None
+
+    with transaction.atomic():
+        if photo_file:
+            media.file = photo_file
+        media.thumbnail_file = thumbnail_file
+        media.store_variants(variants)
+        media.transcode_status = type(media).TranscodeStatus.READY
+        # The files are already processed; don't resize them again
+        media.save(process_photo=False)
+        share_media_files(media)
+
+    # Delete original file only after transaction commits successfully
+    if original_file_name and original_file_name != media.file.name:
+        storage = media.file.storage
+        transaction.on_commit(partial(storage.delete, name=original_file_name))
+
+
+def release_shared_files(media: Any) -> bool:
+    """Drop a media record's reference to its shared files, before deleting the record.
+
+    Returns:
+        True if other media records still use the files, which must then be
+        kept; False if the caller should delete them.
+    """
+    if media.blob_id is None:
+        return False
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(pk=media.blob_id).first()
+        if blob is None:
+            return False
+        if blob.ref_count > 1:
+            blob.ref_count -= 1
+            blob.save(update_fields=["ref_count"])
+            return True
+        blob.delete()
+        return False
+
+
+def _shared_values(source: Any) -> dict[str, Any]:
+    """Return the ``MediaBlob.SHARED_FIELDS`` of a media record or blob, files as names."""
+    values = {}
+    for field_name in MediaBlob.SHARED_FIELDS:
+        value = getattr(source, field_name)
+        values[field_name] = (value.name or "") if isinstance(value, FieldFile) else value
+    return values
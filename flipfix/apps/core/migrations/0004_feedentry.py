@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_populate_site_settings'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FeedEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('entry_type', models.CharField(max_length=50)),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('machine_id', models.PositiveBigIntegerField(blank=True, null=True)),
+                ('occurred_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name_plural': 'feed entries',
+                'indexes': [models.Index(fields=['occurred_at', 'entry_type', 'object_id'], name='feedentry_global_order_idx'), models.Index(fields=['machine_id', 'occurred_at', 'entry_type', 'object_id'], name='feedentry_machine_order_idx')],
+                'constraints': [models.UniqueConstraint(fields=('entry_type', 'object_id'), name='feedentry_unique_type_object')],
+            },
+        ),
+    ]
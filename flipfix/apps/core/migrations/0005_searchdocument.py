@@ -0,0 +1,97 @@
+# Generated by Django 5.2.11 on 2026-10-16 20:28
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+# PostgreSQL: GIN index over the weighted tsvector column
+POSTGRES_FORWARD = [
+    "CREATE INDEX searchdocument_vector_gin ON core_searchdocument USING gin (vector)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS searchdocument_vector_gin",
+]
+
+# SQLite: external-content FTS5 table, kept in sync with core_searchdocument
+# by triggers (see https://sqlite.org/fts5.html#external_content_tables).
+# snippet_text is only there for snippet() to excerpt; searches don't match it.
+SQLITE_FORWARD = [
+    """
+    CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        text, linked_text, snippet_text,
+        content='core_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_insert AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, text, linked_text, snippet_text)
+        VALUES (new.id, new.text, new.linked_text, new.snippet_text);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_delete AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(
+            core_searchdocument_fts, rowid, text, linked_text, snippet_text
+        )
+        VALUES ('delete', old.id, old.text, old.linked_text, old.snippet_text);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_update AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(
+            core_searchdocument_fts, rowid, text, linked_text, snippet_text
+        )
+        VALUES ('delete', old.id, old.text, old.linked_text, old.snippet_text);
+        INSERT INTO core_searchdocument_fts(rowid, text, linked_text, snippet_text)
+        VALUES (new.id, new.text, new.linked_text, new.snippet_text);
+    END
+    """,
+]
+SQLITE_REVERSE = [
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_update",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_delete",
+    "DROP TRIGGER IF EXISTS core_searchdocument_fts_insert",
+    "DROP TABLE IF EXISTS core_searchdocument_fts",
+]
+
+
+def _run(schema_editor, statements_by_vendor):
+    for statement in statements_by_vendor.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(statement)
+
+
+def create_fulltext_index(apps, schema_editor):
+    """Create the database-specific full-text index for SearchDocument."""
+    _run(schema_editor, {"postgresql": POSTGRES_FORWARD, "sqlite": SQLITE_FORWARD})
+
+
+def drop_fulltext_index(apps, schema_editor):
+    _run(schema_editor, {"postgresql": POSTGRES_REVERSE, "sqlite": SQLITE_REVERSE})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0004_feedentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveBigIntegerField()),
+                ('text', models.TextField(blank=True, default='')),
+                ('linked_text', models.TextField(blank=True, default='')),
+                ('snippet_text', models.TextField(blank=True, default='')),
+                ('vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='contenttypes.contenttype')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('content_type', 'object_id'), name='searchdocument_unique_record')],
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
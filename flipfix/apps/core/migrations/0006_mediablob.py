@@ -0,0 +1,30 @@
+# Generated by Django 5.2.11 on 2026-10-16 21:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_searchdocument'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('media_type', models.CharField(choices=[('photo', 'Photo'), ('video', 'Video')], max_length=20)),
+                ('file', models.FileField(blank=True, upload_to='')),
+                ('thumbnail_file', models.FileField(blank=True, upload_to='')),
+                ('transcoded_file', models.FileField(blank=True, upload_to='')),
+                ('poster_file', models.FileField(blank=True, upload_to='')),
+                ('variants', models.JSONField(blank=True, default=list)),
+                ('transcode_status', models.CharField(blank=True, choices=[('pending', 'Pending'), ('processing', 'Processing'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=20)),
+                ('duration', models.IntegerField(blank=True, null=True)),
+                ('ref_count', models.PositiveIntegerField(default=1)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+    ]
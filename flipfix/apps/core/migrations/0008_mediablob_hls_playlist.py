@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='hls_playlist',
+            field=models.FileField(blank=True, upload_to=''),
+        ),
+    ]
@@ -10,9 +10,21 @@ from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
 from django.http import JsonResponse
 from django.template.loader import render_to_string
-
-from flipfix.apps.core.markdown_links import save_inline_markdown_field
-from flipfix.apps.core.media_upload import attach_media_files
+from django.urls import reverse
+
+from flipfix.apps.core.chunked_upload import (
+    discard_chunked_upload,
+    finish_chunked_upload,
+    start_chunked_upload,
+)
+from flipfix.apps.core.derived_images import delete_derived_images
+from flipfix.apps.core.markdown_links import (
+    link_resolution,
+    prefetch_links,
+    save_inline_markdown_field,
+)
+from flipfix.apps.core.media_upload import attach_media_files, release_shared_files
+from flipfix.apps.core.models import ChunkedUpload
 
 if TYPE_CHECKING:
     from django.contrib.auth.models import AbstractUser
@@ -107,7 +119,9 @@ class MediaUploadMixin:
     Mixin for views that handle media upload and delete actions.
 
     Provides handle_upload_media() and handle_delete_media() methods
-    that can be called from a view's post() method.
+    that can be called from a view's post() method, plus
+    handle_start_chunked_upload() and handle_finish_chunked_upload() for
+    large files sent in resumable chunks (see core/chunked_upload.py).
 
     Subclasses must implement:
         - get_media_model(): Return the media model class (e.g., LogEntryMedia)
@@ -151,8 +165,80 @@ class MediaUploadMixin:
             parent=parent,
             media_model=media_model,
         )
-        media = created[0]
+        return self._uploaded_media_response(created[0])
+
+    def handle_start_chunked_upload(self, request: HttpRequest) -> JsonResponse:
+        """
+        Start a resumable upload, whose chunks are then PUT to ChunkedUploadView.
+
+        Expects:
+            - request.POST["filename"]: Name of the file being uploaded
+            - request.POST["size"]: Its size in bytes
+            - request.POST["content_type"]: Its MIME type, if the browser knows it
+
+        Returns:
+            JsonResponse with upload_id, upload_url and chunk_size, or error
+        """
+        try:
+            upload = start_chunked_upload(
+                user=request.user,
+                media_model=self.get_media_model(),
+                parent=self.get_media_parent(),
+                filename=request.POST.get("filename", ""),
+                size=request.POST.get("size", ""),
+                content_type=request.POST.get("content_type", ""),
+            )
+        except ValidationError as e:
+            return JsonResponse({"success": False, "error": "; ".join(e.messages)}, status=400)
+
+        return JsonResponse(
+            {
+                "success": True,
+                "upload_id": str(upload.id),
+                "upload_url": reverse("api-chunked-upload", kwargs={"upload_id": upload.id}),
+                "chunk_size": settings.CHUNKED_UPLOAD_CHUNK_SIZE,
+            }
+        )
+
+    def handle_finish_chunked_upload(self, request: HttpRequest) -> JsonResponse:
+        """
+        Attach the file of a completed chunked upload, once all of it has arrived.
+
+        Expects:
+            - request.POST["upload_id"]: ID from handle_start_chunked_upload()
+
+        Returns:
+            JsonResponse with media details (as handle_upload_media()) or error
+        """
+        media_model = self.get_media_model()
+        parent = self.get_media_parent()
+        try:
+            upload = ChunkedUpload.objects.get(
+                id=request.POST.get("upload_id", ""),
+                created_by_id=request.user.pk,
+                media_model_name=media_model.__name__,
+                parent_id=parent.pk,
+            )
+        except (ChunkedUpload.DoesNotExist, ValidationError):
+            return JsonResponse({"success": False, "error": "Upload not found"}, status=404)
 
+        try:
+            uploaded_file = finish_chunked_upload(upload)
+        except ValidationError as e:
+            return JsonResponse({"success": False, "error": "; ".join(e.messages)}, status=400)
+
+        try:
+            created = attach_media_files(
+                media_files=[uploaded_file],
+                parent=parent,
+                media_model=media_model,
+            )
+        finally:
+            uploaded_file.close()
+            discard_chunked_upload(upload)
+        return self._uploaded_media_response(created[0])
+
+    def _uploaded_media_response(self, media: Any) -> JsonResponse:
         return JsonResponse(
             {
                 "success": True,
@@ -189,14 +275,18 @@ class MediaUploadMixin:
             filter_kwargs = {"id": media_id, parent_field_name: parent}
             media = media_model.objects.get(**filter_kwargs)
 
-            # Delete associated files
-            if media.transcoded_file:
-                media.transcoded_file.delete(save=False)
-            if media.poster_file:
-                media.poster_file.delete(save=False)
-            if media.thumbnail_file:
-                media.thumbnail_file.delete(save=False)
-            media.file.delete()
+            # Delete associated files, unless identical uploads still share them
+            if not release_shared_files(media):
+                if media.transcoded_file:
+                    media.transcoded_file.delete(save=False)
+                if media.poster_file:
+                    media.poster_file.delete(save=False)
+                if media.thumbnail_file:
+                    media.thumbnail_file.delete(save=False)
+                media.delete_variant_files()
+                media.delete_hls_files()
+                media.file.delete()
+            delete_derived_images(media)
             media.delete()
 
             return JsonResponse({"success": True})
@@ -261,11 +351,14 @@ class InfiniteScrollMixin:
         - get_item_context(item): Return context dict for each item (default: {"entry": item})
         - page_size: Items per page (default: settings.LIST_PAGE_SIZE)
         - page_param: Query param for page number (default: "page")
+        - markdown_fields: Item fields rendered as markdown; their [[type:ref]]
+          links are resolved in one batch for the whole page
     """
 
     item_template: str
     page_size: int = settings.LIST_PAGE_SIZE
     page_param: str = "page"
+    markdown_fields: tuple[str, ...] = ()
     request: HttpRequest  # Provided by View
 
     def get_queryset(self) -> QuerySet:
@@ -281,11 +374,14 @@ class InfiniteScrollMixin:
         queryset = self.get_queryset()
         paginator = Paginator(queryset, self.page_size)
         page_obj = paginator.get_page(request.GET.get(self.page_param))
+        items = list(page_obj.object_list)
 
-        items_html = "".join(
-            render_to_string(self.item_template, self.get_item_context(item), request=request)
-            for item in page_obj.object_list
-        )
+        with link_resolution():
+            prefetch_links(getattr(item, f) for item in items for f in self.markdown_fields)
+            items_html = "".join(
+                render_to_string(self.item_template, self.get_item_context(item), request=request)
+                for item in items
+            )
 
         return JsonResponse(
             {
@@ -1,18 +1,29 @@
 from __future__ import annotations
 
 import logging
+import posixpath
+import uuid
+from collections.abc import Sequence
+from functools import partial
 from typing import TYPE_CHECKING, Any
 
+from django.conf import settings
 from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.contrib.postgres.search import SearchVectorField
+from django.core.files import File
+from django.db import models, transaction
 from django.db.models import Q
 from django.urls import reverse
 
 from flipfix.apps.core.image_processing import (
+    MAX_IMAGE_DIMENSION,
     THUMB_IMAGE_DIMENSION,
+    ImageVariant,
     resize_image_file,
+    resize_image_with_variants,
 )
+from flipfix.apps.core.media import HLS_MASTER_PLAYLIST, WEB_NATIVE_FORMATS
 
 if TYPE_CHECKING:
     from typing import ClassVar
@@ -31,14 +42,14 @@ class TimeStampedMixin(models.Model):
 
 
 class SearchableQuerySetMixin:
-    """Mixin that DRYs up the strip → empty-guard → filter → distinct pattern.
+    """Mixin that DRYs up the strip → empty-guard → filter pattern.
 
     Every search method in the project follows the same boilerplate::
 
         query = (query or "").strip()
         if not query:
             return self
-        return self.filter(...).distinct()
+        return self.filter(...)
 
     This mixin extracts that into two helpers so each search method
     only contains the domain-specific Q logic::
@@ -47,8 +58,17 @@ class SearchableQuerySetMixin:
             query = self._clean_query(query)
             return self._apply_search(
                 query,
-                self._build_core_q(query) | Q(machine__name__icontains=query),
+                self._build_core_q(query),
+                unindexed_q=Q(machine__name__icontains=query),
             )
+
+    The filtering itself is delegated to the backend selected by
+    ``settings.SEARCH_BACKEND`` (see core/search.py).  *q* must cover the
+    same fields as the model's registered search document, so the
+    full-text backend can match the stored document in its place.
+
+    *q* must not join to-many relations (they would duplicate rows);
+    wrap those predicates in a correlated ``Exists()`` subquery instead.
     """
 
     @staticmethod
@@ -56,18 +76,135 @@ class SearchableQuerySetMixin:
         """Normalize a search query: coerce None and strip whitespace."""
         return (query or "").strip()
 
-    def _apply_search(self, query: str, q: Q) -> models.QuerySet:
+    def _apply_search(
+        self, query: str, q: Q, *, linked: bool = True, unindexed_q: Q | None = None
+    ) -> models.QuerySet:
         """Apply standard search normalization and filtering.
 
-        Returns self unchanged for empty/blank queries. Otherwise
-        filters by *q* and returns distinct results.
+        Returns self unchanged for empty/blank queries. Otherwise filters
+        via the configured search backend.  *linked* is False for scoped
+        searches whose *q* omits linked records' fields; *unindexed_q*
+        holds predicates outside the search document (e.g. machine name)
+        that are always evaluated directly.
 
         Callers must pass the already-cleaned query (via ``_clean_query``)
         so that the Q objects use the stripped value.
         """
+        from flipfix.apps.core.search import get_search_backend
+
         if not query:
             return self  # type: ignore[return-value]
-        return self.filter(q).distinct()  # type: ignore[attr-defined]
+        return get_search_backend().search(
+            self,  # type: ignore[arg-type]
+            query,
+            q,
+            linked=linked,
+            unindexed_q=unindexed_q,
+        )
+
+    def with_search_snippets(self, query: str = "") -> models.QuerySet:
+        """Annotate each record with a database-computed ``search_snippet``.
+
+        The snippet is a short excerpt of the record's body as plain text
+        (``ts_headline()`` on PostgreSQL, FTS5 ``snippet()`` on SQLite) with
+        the matched words marked; render it with the ``search_snippet``
+        template filter.  None when there's nothing to excerpt, e.g. under
+        the icontains backend.  Doesn't filter: chain after a search method.
+        """
+        from flipfix.apps.core.search import get_search_backend
+
+        query = self._clean_query(query)
+        if not query:
+            return self  # type: ignore[return-value]
+        return get_search_backend().annotate_snippets(self, query)  # type: ignore[arg-type]
+
+    def search_with_highlights(self, query: str = "") -> models.QuerySet:
+        """``search()`` plus the ``search_snippet`` annotation for each result."""
+        return self.search(query).with_search_snippets(query)  # type: ignore[attr-defined]
+
+
+# ---------------------------------------------------------------------------
+# Activity feed index
+# ---------------------------------------------------------------------------
+
+
+class FeedEntry(models.Model):
+    """Denormalized index row for one record in the unified activity feed.
+
+    One row per feed record (log entry, problem report, ...), kept in sync by
+    the post_save/post_delete hooks that ``register_feed_source()`` connects.
+    Lets ``get_feed_page()`` find a page with a single indexed range scan
+    across all entry types instead of one query per type.
+
+    ``machine_id`` is a plain integer rather than a ForeignKey so core stays
+    free of knowledge about the catalog app.  Rebuild with
+    ``manage.py rebuild_feed_index``.
+    """
+
+    entry_type = models.CharField(max_length=50)
+    object_id = models.PositiveBigIntegerField()
+    machine_id = models.PositiveBigIntegerField(null=True, blank=True)
+    occurred_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name_plural = "feed entries"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["entry_type", "object_id"], name="feedentry_unique_type_object"
+            ),
+        ]
+        indexes = [
+            # Global feed: newest first, ties broken like FeedCursor
+            models.Index(
+                fields=["occurred_at", "entry_type", "object_id"],
+                name="feedentry_global_order_idx",
+            ),
+            # Machine feed
+            models.Index(
+                fields=["machine_id", "occurred_at", "entry_type", "object_id"],
+                name="feedentry_machine_order_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.entry_type}:{self.object_id} @ {self.occurred_at:%Y-%m-%d %H:%M}"
+
+
+# ---------------------------------------------------------------------------
+# Full-text search documents
+# ---------------------------------------------------------------------------
+
+
+class SearchDocument(models.Model):
+    """Stored search text for one searchable record.
+
+    Built from the record's own fields (``text``) and its linked records'
+    fields (``linked_text``) by the builders registered in core/search.py,
+    and rebuilt incrementally on save.  ``snippet_text`` is the record's
+    body as plain text, which result snippets excerpt; it isn't searched.
+
+    On PostgreSQL ``vector`` holds the weighted tsvector (own text A, linked
+    text B) behind a GIN index.  On SQLite the ``core_searchdocument_fts``
+    FTS5 table indexes the text columns instead, and ``vector`` stays empty.
+    Rebuild with ``manage.py rebuild_search_index``.
+    """
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, related_name="+")
+    object_id = models.PositiveBigIntegerField()
+    text = models.TextField(blank=True, default="")
+    linked_text = models.TextField(blank=True, default="")
+    snippet_text = models.TextField(blank=True, default="")
+    vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["content_type", "object_id"], name="searchdocument_unique_record"
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.content_type.model}:{self.object_id}"
 
 
 # ---------------------------------------------------------------------------
@@ -130,18 +267,29 @@ class AbstractMedia(TimeStampedMixin):
         VIDEO = "video", "Video"
 
     class TranscodeStatus(models.TextChoices):
-        """Status of video transcoding for web playback."""
+        """Status of video transcoding, or photo resizing when done on the worker."""
 
         PENDING = "pending", "Pending"
         PROCESSING = "processing", "Processing"
         READY = "ready", "Ready"
         FAILED = "failed", "Failed"
 
+    class TranscodeMethod(models.TextChoices):
+        """How the worker produced a video's web-playable file."""
+
+        ENCODE = "encode", "Re-encoded"
+        REMUX = "remux", "Remuxed"
+
     media_type = models.CharField(max_length=20, choices=MediaType.choices)
     file = models.FileField()  # upload_to set by subclass
     thumbnail_file = models.FileField(blank=True, null=True)
     transcoded_file = models.FileField(blank=True, null=True)
     poster_file = models.ImageField(blank=True, null=True)
+    hls_playlist = models.FileField(
+        blank=True,
+        null=True,
+        help_text="HLS master playlist of a long video; its renditions and segments are beside it",
+    )
     transcode_status = models.CharField(
         max_length=20,
         choices=TranscodeStatus.choices,
@@ -149,7 +297,35 @@ class AbstractMedia(TimeStampedMixin):
         default=TranscodeStatus.PENDING,
     )
     duration = models.IntegerField(null=True, blank=True, help_text="Duration in seconds")
+    transcode_method = models.CharField(
+        max_length=20,
+        choices=TranscodeMethod.choices,
+        blank=True,
+        help_text="Whether the video was re-encoded or only remuxed (already web-playable)",
+    )
+    transcode_progress = models.PositiveSmallIntegerField(
+        null=True, blank=True, help_text="Percent of the video transcoded so far"
+    )
+    transcode_eta_seconds = models.PositiveIntegerField(
+        null=True, blank=True, help_text="Estimated seconds until the transcode finishes"
+    )
     display_order = models.PositiveIntegerField(null=True, blank=True)
+    variants = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Responsive photo variants: storage name, content type, width and height",
+    )
+    content_hash = models.CharField(
+        max_length=64, blank=True, db_index=True, help_text="BLAKE2b of the uploaded bytes"
+    )
+    blob = models.ForeignKey(
+        "core.MediaBlob",
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="+",
+        help_text="Shared stored files, when identical uploads reuse them",
+    )
 
     class Meta:
         abstract = True
@@ -160,9 +336,13 @@ class AbstractMedia(TimeStampedMixin):
         human_name = self.parent_field_name.replace("_", " ")
         return f"{self.get_media_type_display()} for {human_name} {parent_id}"
 
-    def save(self, *args, **kwargs):
-        """Process photo uploads: generate thumbnail and resize for web."""
-        if self.media_type == self.MediaType.PHOTO and self.file:
+    def save(self, *args, process_photo: bool = True, **kwargs):
+        """Process photo uploads: generate thumbnail, web-size image and variants.
+
+        Pass ``process_photo=False`` to store a fresh upload as-is, e.g. when
+        its derivatives are generated later by ``process_photo_job``.
+        """
+        if process_photo and self.media_type == self.MediaType.PHOTO and self.file:
             from django.core.files.uploadedfile import UploadedFile as DjangoUploadedFile
 
             is_fresh_upload = hasattr(self.file, "file") and isinstance(
@@ -171,22 +351,104 @@ class AbstractMedia(TimeStampedMixin):
             if is_fresh_upload:
                 try:
                     original = self.file
-                    # Generate thumbnail from original (before any JPEG compression)
-                    if not self.thumbnail_file:
-                        self.thumbnail_file = resize_image_file(
-                            original, max_dimension=THUMB_IMAGE_DIMENSION
+                    if self.thumbnail_file:
+                        # Convert to browser-friendly format and size
+                        self.file = resize_image_file(original)
+                    else:
+                        # Thumbnail, web-size image and responsive variants from
+                        # one decode of the original (before any JPEG compression)
+                        (self.file, self.thumbnail_file), variants = resize_image_with_variants(
+                            original,
+                            [MAX_IMAGE_DIMENSION, THUMB_IMAGE_DIMENSION],
+                            settings.PHOTO_VARIANT_SIZES,
+                            settings.PHOTO_VARIANT_FORMATS,
                         )
-                        # Seek back to start for the next resize
-                        try:
-                            original.seek(0)
-                        except (OSError, AttributeError):
-                            pass  # File doesn't support seeking, proceed anyway
-                    # Convert to browser-friendly format and size
-                    self.file = resize_image_file(original)
+                        self.store_variants(variants)
                 except Exception:  # pragma: no cover
                     logger.warning("Could not resize uploaded photo %s", self.file, exc_info=True)
         super().save(*args, **kwargs)
 
+    def store_variants(self, variants: Sequence[ImageVariant]) -> None:
+        """Save variant files next to the photo and record them in ``variants``.
+
+        Files of any previous variants are deleted once the transaction
+        commits.  The caller saves the model.
+        """
+        old_names = [variant["name"] for variant in self.variants]
+        storage = self.file.storage
+        self.variants = [
+            {
+                "name": storage.save(
+                    self.file.field.generate_filename(self, variant.file.name), variant.file
+                ),
+                "type": WEB_NATIVE_FORMATS[variant.format].content_type,
+                "width": variant.width,
+                "height": variant.height,
+            }
+            for variant in variants
+        ]
+        if old_names:
+            transaction.on_commit(partial(self._delete_variant_files, old_names))
+
+    def delete_variant_files(self) -> None:
+        """Delete the files of this photo's responsive variants."""
+        self._delete_variant_files([variant["name"] for variant in self.variants])
+
+    def _delete_variant_files(self, names: list[str]) -> None:
+        storage = self.file.storage
+        for name in names:
+            storage.delete(name)
+
+    def store_hls(self, files: Sequence[File]) -> None:
+        """Save a video's HLS files and record the master playlist in ``hls_playlist``.
+
+        The playlists refer to each other and to the segments by relative
+        name, so the files keep their names in a new directory of their own.
+        The caller saves the model.
+        """
+        storage = self.hls_playlist.storage
+        directory = self.transcoded_file.field.generate_filename(self, "hls")
+        names = {file.name: storage.save(f"{directory}/{file.name}", file) for file in files}
+        self.hls_playlist = names[HLS_MASTER_PLAYLIST]
+
+    def delete_hls_files(self) -> None:
+        """Delete this video's HLS playlists and segments."""
+        if not self.hls_playlist:
+            return
+        storage = self.hls_playlist.storage
+        directory = posixpath.dirname(self.hls_playlist.name)
+        _subdirectories, names = storage.listdir(directory)
+        for name in names:
+            storage.delete(f"{directory}/{name}")
+        storage.delete(directory)
+
+    @property
+    def is_photo_processing(self) -> bool:
+        """Whether this photo's derivatives are still queued or being generated.
+
+        Photos resized during upload have a thumbnail even though their
+        status keeps the field default, so only thumbnail-less ones count.
+        """
+        return (
+            self.media_type == self.MediaType.PHOTO
+            and not self.thumbnail_file
+            and self.transcode_status
+            in (self.TranscodeStatus.PENDING, self.TranscodeStatus.PROCESSING)
+        )
+
+    @property
+    def is_photo_failed(self) -> bool:
+        """Whether generating this photo's derivatives failed, leaving only the original.
+
+        The original may be a format browsers can't show (e.g. HEIC), so
+        it's shown as failed rather than displayed.
+        """
+        return (
+            self.media_type == self.MediaType.PHOTO
+            and not self.thumbnail_file
+            and self.transcode_status == self.TranscodeStatus.FAILED
+        )
+
     def get_admin_history_url(self) -> str:
         """Return URL to this media's Django admin change history."""
         return reverse(
@@ -199,6 +461,75 @@ class AbstractMedia(TimeStampedMixin):
         return getattr(self, self.parent_field_name)
 
 
+class MediaBlob(models.Model):
+    """
+    Stored, processed files shared by every media record with identical upload bytes.
+
+    Recorded once a media record's files are final (photo resized, video
+    transcoded).  Later uploads with the same content hash copy these file
+    names instead of storing, resizing and transcoding the bytes again;
+    ``ref_count`` counts the media records using them, and the files are
+    deleted with the last one.  See ``core/media_upload.py``.
+    """
+
+    SHARED_FIELDS = (
+        "media_type",
+        "file",
+        "thumbnail_file",
+        "transcoded_file",
+        "poster_file",
+        "hls_playlist",
+        "variants",
+        "transcode_status",
+        "duration",
+    )
+
+    content_hash = models.CharField(max_length=64, unique=True)
+    media_type = models.CharField(max_length=20, choices=AbstractMedia.MediaType.choices)
+    file = models.FileField(blank=True)
+    thumbnail_file = models.FileField(blank=True)
+    transcoded_file = models.FileField(blank=True)
+    poster_file = models.FileField(blank=True)
+    hls_playlist = models.FileField(blank=True)
+    variants = models.JSONField(default=list, blank=True)
+    transcode_status = models.CharField(
+        max_length=20, choices=AbstractMedia.TranscodeStatus.choices, blank=True
+    )
+    duration = models.IntegerField(null=True, blank=True)
+    ref_count = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.get_media_type_display()} blob {self.content_hash[:12]} ({self.ref_count} refs)"
+        )
+
+
+class ChunkedUpload(models.Model):
+    """
+    A resumable media upload in progress, sent in fixed-size chunks.
+
+    The bytes received so far are appended to a file on local disk, whose
+    size is the offset the next chunk must start at, so progress isn't
+    stored here.  Finishing the upload attaches the file to the parent
+    record like a one-shot upload.  See ``core/chunked_upload.py``.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="+"
+    )
+    media_model_name = models.CharField(max_length=50)
+    parent_id = models.PositiveBigIntegerField()
+    filename = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=100, blank=True)
+    size = models.PositiveBigIntegerField(help_text="Total size of the file in bytes")
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self) -> str:
+        return f"{self.filename} ({self.size} bytes) for {self.media_model_name} {self.parent_id}"
+
+
 # ---------------------------------------------------------------------------
 # Media model registry
 #
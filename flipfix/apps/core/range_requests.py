@@ -0,0 +1,122 @@
+"""HTTP Range requests for file downloads.
+
+``ranged_file_response()`` answers a ``Range: bytes=...`` request for a
+single range with a 206 of just those bytes, so a client whose download
+was interrupted can resume it rather than start over.  ``If-Range`` makes
+sure the bytes it already has belong to the same file.  Multiple ranges
+aren't supported; such requests get the whole file, as RFC 9110 allows.
+"""
+
+from __future__ import annotations
+
+import mimetypes
+import re
+from collections.abc import Callable, Iterator
+from typing import IO
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.http import content_disposition_header
+
+_BYTE_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class RangeNotSatisfiableError(Exception):
+    """Raised when a requested range starts past the end of the file."""
+
+
+def parse_byte_range(header: str, size: int) -> tuple[int, int] | None:
+    """Return the first and last byte positions (inclusive) of a single-range header.
+
+    Returns:
+        None if the header should be ignored: missing, malformed, not in
+        bytes, or asking for several ranges.
+
+    Raises:
+        RangeNotSatisfiableError: If the range doesn't overlap the file.
+    """
+    match = _BYTE_RANGE_RE.match(header.replace(" ", ""))
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        # Suffix range: the last N bytes
+        suffix_length = int(last)
+        if suffix_length == 0 or size == 0:
+            raise RangeNotSatisfiableError
+        return max(size - suffix_length, 0), size - 1
+
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiableError
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def ranged_file_response(
+    request,
+    open_file: Callable[[], IO[bytes]],
+    *,
+    size: int,
+    etag: str,
+    filename: str,
+    content_type: str | None = None,
+    chunk_size: int = 1024 * 1024,
+) -> HttpResponseBase:
+    """Return the file as an attachment, or the part of it that ``Range`` asks for.
+
+    Args:
+        request: The request, whose ``Range`` and ``If-Range`` headers are honored
+        open_file: Opens the file for reading; only called if bytes are sent
+        size: The file's size in bytes
+        etag: Quoted strong ETag of the file, which must change if it does
+        filename: Download filename
+        content_type: Defaults to a guess from ``filename``
+        chunk_size: Bytes read at a time for a partial response
+    """
+    byte_range = None
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (if_range is None or if_range == etag):
+        try:
+            byte_range = parse_byte_range(range_header, size)
+        except RangeNotSatisfiableError:
+            return HttpResponse(
+                status=416, headers={"Content-Range": f"bytes */{size}", "Accept-Ranges": "bytes"}
+            )
+
+    if byte_range is None:
+        response: HttpResponseBase = FileResponse(
+            open_file(), as_attachment=True, filename=filename, content_type=content_type
+        )
+    else:
+        start, end = byte_range
+        response = StreamingHttpResponse(
+            _read_range(open_file(), start, end - start + 1, chunk_size),
+            status=206,
+            content_type=content_type
+            or mimetypes.guess_type(filename)[0]
+            or "application/octet-stream",
+            headers={
+                "Content-Range": f"bytes {start}-{end}/{size}",
+                "Content-Length": str(end - start + 1),
+                "Content-Disposition": content_disposition_header(True, filename),
+            },
+        )
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    return response
+
+
+def _read_range(file: IO[bytes], start: int, length: int, chunk_size: int) -> Iterator[bytes]:
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(chunk_size, length))
+            if not chunk:
+                return
+            length -= len(chunk)
+            yield chunk
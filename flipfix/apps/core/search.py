@@ -0,0 +1,576 @@
+"""Pluggable search backends and stored search documents.
+
+``SearchableQuerySetMixin._apply_search()`` delegates to the backend chosen
+by ``settings.SEARCH_BACKEND``:
+
+- ``"icontains"``: the original behavior.  ORs ``icontains`` predicates
+  across the record, its to-one relations, and EXISTS subqueries over
+  its to-many relations.
+- ``"fulltext"``: matches against a stored ``SearchDocument`` per record.
+  On PostgreSQL that is a weighted ``tsvector`` column with a GIN index;
+  on SQLite (dev and PR environments) an FTS5 table kept in sync by
+  triggers.  Query words match as word prefixes; so that partial words
+  such as "orgar" still find what ``icontains`` would, the whole query is
+  also matched as a substring of the document.  Results are annotated
+  with ``search_rank`` (higher is more relevant; substring-only matches
+  rank 0).  Other databases fall back to ``icontains``.
+
+Each document has two sections: ``text`` (the record's own fields) and
+``linked_text`` (fields of linked records, e.g. a problem report's log
+entries).  Scoped searches that exclude linked records match ``text`` only.
+Predicates that aren't covered by a document, such as the machine name in
+global searches, are passed as ``unindexed_q`` and evaluated directly.
+
+Models opt in by registering a ``SearchDocumentType`` via AppConfig.ready(),
+which also connects the signals that keep their documents up to date.
+"""
+
+from __future__ import annotations
+
+import re
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+)
+from django.db import connection, models
+from django.db.models import (
+    Exists,
+    Expression,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Q,
+    QuerySet,
+    Subquery,
+    TextField,
+    Value,
+)
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+
+from flipfix.apps.core.markdown import render_markdown_text
+from flipfix.apps.core.models import SearchDocument
+
+# Split queries into words; matching is per-word prefix ("flip" finds "flipper")
+_TERM_RE = re.compile(r"\w+")
+
+# Highlight markers in search_snippet annotations.  Control characters rather
+# than HTML, so the snippet text can be escaped before the markers become
+# <mark> tags (see the search_snippet template filter).
+SNIPPET_START = "\x02"
+SNIPPET_END = "\x03"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_WORDS = 24
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+
+class SearchBackend(ABC):
+    """Filters a queryset down to the records matching a search query."""
+
+    @abstractmethod
+    def search(
+        self,
+        queryset: QuerySet[Any],
+        query: str,
+        q: Q,
+        *,
+        linked: bool,
+        unindexed_q: Q | None,
+    ) -> QuerySet[Any]:
+        """Return *queryset* filtered to records matching the cleaned *query*.
+
+        *q* is the equivalent ``icontains`` filter for the document fields;
+        *linked* says whether linked records' fields are part of this search.
+        """
+
+    def annotate_snippets(self, queryset: QuerySet[Any], query: str) -> QuerySet[Any]:
+        """Annotate *queryset* with ``search_snippet`` for the cleaned *query*.
+
+        The snippet is a short excerpt of the record's ``snippet_text`` (its
+        body as plain text; linked records have their own cards or links)
+        with matched words wrapped in SNIPPET_START/SNIPPET_END.  When the
+        match was elsewhere, e.g. a name or linked text, it's the start of
+        the body, unmarked.  It's None when the backend can't produce one.
+        """
+        return queryset.annotate(search_snippet=Value(None, output_field=TextField()))
+
+
+class IContainsSearchBackend(SearchBackend):
+    """Substring search via ``icontains`` predicates.
+
+    No ``.distinct()``: the search builders reach to-many relations through
+    EXISTS subqueries, so the filter never multiplies rows.
+    """
+
+    def search(self, queryset, query, q, *, linked, unindexed_q):
+        if unindexed_q is not None:
+            q = q | unindexed_q
+        return queryset.filter(q)
+
+
+class FullTextSearchBackend(SearchBackend):
+    """Word-prefix and substring search against stored SearchDocument rows, ranked."""
+
+    def search(self, queryset, query, q, *, linked, unindexed_q):
+        terms = [term.lower() for term in _TERM_RE.findall(query)]
+        if not terms:
+            # Nothing word-like to match (e.g. "#!"), so substring search is the only option
+            return _ICONTAINS.search(queryset, query, q, linked=linked, unindexed_q=unindexed_q)
+
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        matching = self._matching_documents(content_type, terms, linked)
+        substring = SearchDocument.objects.filter(content_type=content_type).filter(
+            self._substring_q(query, linked)
+        )
+        condition = Q(Exists(matching.filter(object_id=OuterRef("pk")))) | Q(
+            Exists(substring.filter(object_id=OuterRef("pk")))
+        )
+        if unindexed_q is not None:
+            condition |= unindexed_q
+        return queryset.filter(condition).annotate(
+            search_rank=self._rank(content_type, terms, linked)
+        )
+
+    def annotate_snippets(self, queryset, query):
+        terms = [term.lower() for term in _TERM_RE.findall(query)]
+        if not terms:
+            return super().annotate_snippets(queryset, query)
+        content_type = ContentType.objects.get_for_model(queryset.model)
+        return queryset.annotate(search_snippet=self._snippet(content_type, terms))
+
+    @staticmethod
+    def _substring_q(query: str, linked: bool) -> Q:
+        """Match *query* anywhere in the document, for partial words prefixes miss."""
+        q = Q(text__icontains=query)
+        if linked:
+            q |= Q(linked_text__icontains=query)
+        return q
+
+    @abstractmethod
+    def _matching_documents(
+        self, content_type: ContentType, terms: list[str], linked: bool
+    ) -> QuerySet[SearchDocument]:
+        """Return the documents of *content_type* that match every term."""
+
+    @abstractmethod
+    def _rank(self, content_type: ContentType, terms: list[str], linked: bool) -> Any:
+        """Return an expression ranking the outer record's document by relevance."""
+
+    @abstractmethod
+    def _snippet(self, content_type: ContentType, terms: list[str]) -> Any:
+        """Return an expression excerpting the outer record's ``snippet_text``."""
+
+
+class PostgresSearchBackend(FullTextSearchBackend):
+    """tsvector/GIN full-text search (``simple`` config: no stemming, names stay intact)."""
+
+    @staticmethod
+    def _tsquery(terms: list[str], weights: str = "") -> SearchQuery:
+        raw = " & ".join(f"{term}:*{weights}" for term in terms)
+        return SearchQuery(raw, search_type="raw", config="simple")
+
+    @staticmethod
+    def _weights(linked: bool) -> str:
+        # Weight A is the record's own text, B its linked records' text
+        return "AB" if linked else "A"
+
+    def _matching_documents(self, content_type, terms, linked):
+        return SearchDocument.objects.filter(
+            content_type=content_type, vector=self._tsquery(terms, self._weights(linked))
+        )
+
+    def _rank(self, content_type, terms, linked):
+        rank = (
+            SearchDocument.objects.filter(content_type=content_type, object_id=OuterRef("pk"))
+            .annotate(rank=SearchRank(F("vector"), self._tsquery(terms, self._weights(linked))))
+            .values("rank")[:1]
+        )
+        return Coalesce(Subquery(rank, output_field=FloatField()), Value(0.0))
+
+    def _snippet(self, content_type, terms):
+        # ts_headline() re-parses the text, which carries no weights, so the
+        # query must be unweighted here
+        headline = (
+            SearchDocument.objects.filter(content_type=content_type, object_id=OuterRef("pk"))
+            .annotate(
+                snippet=SearchHeadline(
+                    "snippet_text",
+                    self._tsquery(terms),
+                    config="simple",
+                    start_sel=SNIPPET_START,
+                    stop_sel=SNIPPET_END,
+                    max_words=SNIPPET_WORDS,
+                    min_words=SNIPPET_WORDS // 3,
+                    max_fragments=2,
+                    fragment_delimiter=f" {SNIPPET_ELLIPSIS} ",
+                )
+            )
+            .values("snippet")[:1]
+        )
+        return Subquery(headline, output_field=TextField())
+
+
+class _Fts5MatchingRowIds(Expression):
+    """Subquery selecting the SearchDocument ids whose FTS5 row matches."""
+
+    output_field = IntegerField()
+    template = "(SELECT rowid FROM core_searchdocument_fts WHERE core_searchdocument_fts MATCH %s)"
+
+    def __init__(self, match: str):
+        super().__init__()
+        self.match = match
+
+    def as_sql(self, compiler, connection):
+        return self.template, (self.match,)
+
+
+class _Fts5DocumentValue(Expression):
+    """Correlated FTS5 auxiliary function value for the outer record's document.
+
+    FTS5 auxiliary functions (bm25(), snippet()) are only valid inside a
+    MATCH query, so they're computed per row by a scalar subquery.  NULL
+    when the record's document doesn't match (e.g. a machine-name-only hit).
+    """
+
+    function = ""
+    function_params: tuple[Any, ...] = ()
+    template = (
+        "(SELECT %(function)s FROM core_searchdocument_fts"
+        " JOIN core_searchdocument ON core_searchdocument.id = core_searchdocument_fts.rowid"
+        " WHERE core_searchdocument_fts MATCH %%s AND core_searchdocument.content_type_id = %%s"
+        " AND core_searchdocument.object_id = %(pk)s)"
+    )
+
+    def __init__(self, match: str, content_type_id: int):
+        super().__init__()
+        self.match = match
+        self.content_type_id = content_type_id
+        self.pk = F("pk")
+
+    def get_source_expressions(self):
+        return [self.pk]
+
+    def set_source_expressions(self, exprs):
+        (self.pk,) = exprs
+
+    def as_sql(self, compiler, connection):
+        pk_sql, pk_params = compiler.compile(self.pk)
+        sql = self.template % {"function": self.function, "pk": pk_sql}
+        return sql, (*self.function_params, self.match, self.content_type_id, *pk_params)
+
+
+class _Fts5Rank(_Fts5DocumentValue):
+    """bm25() relevance, negated so higher is better.
+
+    Own text counts double; snippet text is a copy of part of it, so it doesn't count.
+    """
+
+    output_field = FloatField()
+    function = "-bm25(core_searchdocument_fts, 2.0, 1.0, 0.0)"
+
+
+class _Fts5Snippet(_Fts5DocumentValue):
+    """snippet() excerpt of the record's snippet text (column 2)."""
+
+    output_field = TextField()
+    function = "snippet(core_searchdocument_fts, 2, %s, %s, %s, %s)"
+    function_params = (SNIPPET_START, SNIPPET_END, SNIPPET_ELLIPSIS, SNIPPET_WORDS)
+
+
+class SqliteSearchBackend(FullTextSearchBackend):
+    """FTS5 full-text search over the external-content table created by migration."""
+
+    @staticmethod
+    def _match_expression(terms: list[str], linked: bool | None) -> str:
+        """Return the MATCH expression for *terms*.
+
+        Searches match the own text, plus the linked text when *linked*.
+        None matches every column, so that snippet() can mark matches in
+        ``snippet_text`` of a row that matched elsewhere.
+        """
+        # Terms are \w+ only, so quoting them cannot break out of the expression
+        expression = " AND ".join(f'"{term}"*' for term in terms)
+        if linked is None:
+            return expression
+        columns = "text linked_text" if linked else "text"
+        return f"{{{columns}}} : ({expression})"
+
+    def _matching_documents(self, content_type, terms, linked):
+        return SearchDocument.objects.filter(
+            content_type=content_type,
+            id__in=_Fts5MatchingRowIds(self._match_expression(terms, linked)),
+        )
+
+    def _rank(self, content_type, terms, linked):
+        return Coalesce(
+            _Fts5Rank(self._match_expression(terms, linked), content_type.pk), Value(0.0)
+        )
+
+    def _snippet(self, content_type, terms):
+        return _Fts5Snippet(self._match_expression(terms, linked=None), content_type.pk)
+
+
+_ICONTAINS = IContainsSearchBackend()
+_FULLTEXT_BACKENDS: dict[str, SearchBackend] = {
+    "postgresql": PostgresSearchBackend(),
+    "sqlite": SqliteSearchBackend(),
+}
+
+
+def get_search_backend() -> SearchBackend:
+    """Return the backend for ``settings.SEARCH_BACKEND`` and the current database."""
+    if settings.SEARCH_BACKEND == "fulltext":
+        return _FULLTEXT_BACKENDS.get(connection.vendor, _ICONTAINS)
+    return _ICONTAINS
+
+
+# ---------------------------------------------------------------------------
+# Search document registry
+#
+# To make a model searchable by the full-text backend:
+# 1. In the owning app's AppConfig.ready(), call register_search_document()
+# 2. Pass the model's search methods' ``linked``/``unindexed_q`` through
+#    SearchableQuerySetMixin._apply_search()
+# Documents are then kept current on save/delete/M2M change, and when a user
+# named in them is renamed.  Changes that bypass signals (bulk updates)
+# need rebuild_search_documents.
+# ---------------------------------------------------------------------------
+
+
+@dataclass(frozen=True)
+class SearchDocumentType:
+    """Describes how to build the stored search document for one model.
+
+    - model: the searchable model
+    - get_queryset: returns the queryset documents are built from, with
+      select_related/prefetch_related for everything the text callables read
+    - get_text: strings from the record's own fields
+    - get_linked_text: strings from linked records' fields
+    - linked_records: relation names (FK or reverse FK) whose documents embed
+      this record's text and must be rebuilt when it changes
+    - snippet_field: the markdown field whose plain text result snippets
+      excerpt (see ``render_markdown_text()``)
+    - person_lookups: lookups from the model to the users whose names
+      (``person_search_text()``) are in its text or linked text, so renaming
+      one of them rebuilds the document
+    """
+
+    model: type[models.Model]
+    get_queryset: Callable[[], QuerySet[Any]]
+    get_text: Callable[[Any], Iterable[str]]
+    get_linked_text: Callable[[Any], Iterable[str]]
+    linked_records: tuple[str, ...] = ()
+    snippet_field: str = ""
+    person_lookups: tuple[str, ...] = ()
+
+
+_search_document_registry: dict[type[models.Model], SearchDocumentType] = {}
+
+_INDEX_BATCH_SIZE = 500
+
+
+def register_search_document(doc_type: SearchDocumentType) -> None:
+    """Register a searchable model. Called from each app's AppConfig.ready()."""
+    model = doc_type.model
+    if model in _search_document_registry:
+        raise ValueError(f"Search document for '{model.__name__}' is already registered")
+    _search_document_registry[model] = doc_type
+
+    uid = f"search_document_{model._meta.label_lower}"
+    pre_save.connect(_remember_linked, sender=model, dispatch_uid=f"{uid}_pre_save")
+    post_save.connect(_index_saved, sender=model, dispatch_uid=f"{uid}_save")
+    pre_delete.connect(_remember_linked, sender=model, dispatch_uid=f"{uid}_pre_delete")
+    post_delete.connect(_unindex_deleted, sender=model, dispatch_uid=f"{uid}_delete")
+    for field in model._meta.many_to_many:
+        m2m_changed.connect(
+            _index_m2m_changed,
+            sender=field.remote_field.through,
+            dispatch_uid=f"{uid}_{field.name}_m2m",
+        )
+    if doc_type.person_lookups:
+        post_save.connect(
+            _index_renamed_person,
+            sender=get_user_model(),
+            dispatch_uid="search_document_person_renamed",
+        )
+
+
+def clear_search_document_registry() -> None:
+    """Reset registry state. For tests only."""
+    _search_document_registry.clear()
+
+
+PERSON_SEARCH_FIELDS = ("username", "first_name", "last_name")
+
+
+def person_search_text(user: Any) -> tuple[str, ...]:
+    """Return the searchable name parts of a user (username, first, last)."""
+    if user is None:
+        return ()
+    return tuple(getattr(user, field) for field in PERSON_SEARCH_FIELDS)
+
+
+def _join(parts: Iterable[str]) -> str:
+    return "\n".join(part for part in parts if part)
+
+
+def _linked_keys(doc_type: SearchDocumentType, instance: Any) -> set[tuple[Any, int]]:
+    """Return (model, pk) for every linked record whose document embeds *instance*."""
+    keys: set[tuple[Any, int]] = set()
+    if instance.pk is None:
+        return keys
+    for name in doc_type.linked_records:
+        field = instance._meta.get_field(name)
+        if field.concrete:
+            related_pk = getattr(instance, field.attname)
+            if related_pk is not None:
+                keys.add((field.related_model, related_pk))
+        else:
+            related = field.related_model._default_manager.filter(**{field.field.name: instance})
+            keys.update((field.related_model, pk) for pk in related.values_list("pk", flat=True))
+    return keys
+
+
+def update_search_documents(model: type[models.Model], pks: Iterable[int]) -> int:
+    """Rebuild the stored documents for the given records of a registered model.
+
+    Records that no longer exist are skipped.  Returns the number written.
+    """
+    doc_type = _search_document_registry[model]
+    content_type = ContentType.objects.get_for_model(model)
+    records = doc_type.get_queryset().filter(pk__in=list(pks))
+    documents = [
+        SearchDocument(
+            content_type=content_type,
+            object_id=record.pk,
+            text=_join(doc_type.get_text(record)),
+            linked_text=_join(doc_type.get_linked_text(record)),
+            snippet_text=_snippet_text(doc_type, record),
+        )
+        for record in records
+    ]
+    _write_documents(content_type, documents)
+    return len(documents)
+
+
+def _snippet_text(doc_type: SearchDocumentType, record: Any) -> str:
+    if not doc_type.snippet_field:
+        return ""
+    return render_markdown_text(getattr(record, doc_type.snippet_field) or "")
+
+
+def _write_documents(content_type: ContentType, documents: list[SearchDocument]) -> None:
+    if not documents:
+        return
+    SearchDocument.objects.bulk_create(
+        documents,
+        update_conflicts=True,
+        unique_fields=["content_type", "object_id"],
+        update_fields=["text", "linked_text", "snippet_text"],
+    )
+    if connection.vendor == "postgresql":
+        SearchDocument.objects.filter(
+            content_type=content_type, object_id__in=[doc.object_id for doc in documents]
+        ).update(
+            vector=SearchVector("text", weight="A", config="simple")
+            + SearchVector("linked_text", weight="B", config="simple")
+        )
+
+
+def _reindex_with_linked(model: type[models.Model], pks: Iterable[int], linked: set) -> None:
+    update_search_documents(model, pks)
+    for linked_model, linked_pk in linked:
+        if linked_model in _search_document_registry:
+            update_search_documents(linked_model, [linked_pk])
+
+
+def rebuild_search_documents() -> dict[str, int]:
+    """Rebuild every stored search document from the registered models.
+
+    Returns the number of documents written per model label.
+    """
+    counts: dict[str, int] = {}
+    for model, doc_type in _search_document_registry.items():
+        content_type = ContentType.objects.get_for_model(model)
+        SearchDocument.objects.filter(content_type=content_type).delete()
+        pks = list(doc_type.get_queryset().values_list("pk", flat=True))
+        written = 0
+        for start in range(0, len(pks), _INDEX_BATCH_SIZE):
+            written += update_search_documents(model, pks[start : start + _INDEX_BATCH_SIZE])
+        counts[model._meta.label] = written
+    return counts
+
+
+# -- Signal handlers ---------------------------------------------------------
+
+
+def _remember_linked(sender, instance, raw=False, **kwargs):
+    """Capture linked records before a save/delete can change or sever the links."""
+    if raw:
+        return
+    previous = sender._default_manager.filter(pk=instance.pk).first() if instance.pk else None
+    instance._search_linked_before = (
+        _linked_keys(_search_document_registry[sender], previous) if previous else set()
+    )
+
+
+def _index_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    linked = getattr(instance, "_search_linked_before", set())
+    linked |= _linked_keys(_search_document_registry[sender], instance)
+    _reindex_with_linked(sender, [instance.pk], linked)
+
+
+def _unindex_deleted(sender, instance, **kwargs):
+    content_type = ContentType.objects.get_for_model(sender)
+    SearchDocument.objects.filter(content_type=content_type, object_id=instance.pk).delete()
+    for linked_model, linked_pk in getattr(instance, "_search_linked_before", set()):
+        if linked_model in _search_document_registry:
+            update_search_documents(linked_model, [linked_pk])
+
+
+def _index_m2m_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        doc_type = _search_document_registry[type(instance)]
+        _reindex_with_linked(type(instance), [instance.pk], _linked_keys(doc_type, instance))
+    elif pk_set:
+        # e.g. maintainer.log_entries.add(...): *model* is the searchable side
+        doc_type = _search_document_registry[model]
+        for record in model._default_manager.filter(pk__in=pk_set):
+            _reindex_with_linked(model, [record.pk], _linked_keys(doc_type, record))
+
+
+def _index_renamed_person(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Rebuild the documents that name a user when the user is saved.
+
+    Saves limited to other fields, such as ``last_login`` on every login,
+    can't change any document and are skipped.
+    """
+    if raw or (update_fields is not None and not set(update_fields) & set(PERSON_SEARCH_FIELDS)):
+        return
+    for model, doc_type in _search_document_registry.items():
+        pks: set[int] = set()
+        for lookup in doc_type.person_lookups:
+            pks.update(
+                model._default_manager.filter(**{lookup: instance}).values_list("pk", flat=True)
+            )
+        if pks:
+            update_search_documents(model, pks)
@@ -0,0 +1,24 @@
+"""Lanes of the background task queue.
+
+Tasks declare a lane when they're queued, and each lane is its own
+django-q2 cluster (``settings.TASK_LANES``) with its own queue, worker
+count and ``qcluster`` process, so slow tasks can't hold up fast ones.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+
+FAST = "fast"
+"""Latency-sensitive tasks: webhook delivery, photo derivatives."""
+
+SLOW = "slow"
+"""Long CPU-bound tasks: video transcodes."""
+
+
+def lane_cluster(lane: str) -> str:
+    """Return the name of the django-q2 cluster (and queue) serving a lane.
+
+    Pass it as ``async_task(..., cluster=...)``.
+    """
+    return settings.TASK_LANES[lane]
@@ -1,9 +1,10 @@
-"""List/collection component tags: empty_state, child_list_search, stat_grid, timeline."""
+"""List/collection component tags: empty_state, child_list_search, stat_grid, timeline, search_snippet."""
 
 from django import template
-from django.utils.html import format_html
+from django.utils.html import escape, format_html
 from django.utils.safestring import mark_safe
 
+from flipfix.apps.core.search import SNIPPET_END, SNIPPET_START
 from flipfix.apps.core.templatetags.ui_tags import icon as icon_tag
 
 register = template.Library()
@@ -137,3 +138,18 @@ def timeline_entry(content, icon: str, variant="log"):
         icon_html,
         content,
     )
+
+
+@register.filter
+def search_snippet(snippet):
+    """Render a ``search_snippet`` annotation with its matches in ``<mark>`` tags.
+
+    The snippet text is escaped first; only the highlight markers become HTML.
+
+    Usage:
+        {{ entry.search_snippet|search_snippet }}
+    """
+    if not snippet:
+        return ""
+    html = escape(snippet).replace(SNIPPET_START, "<mark>").replace(SNIPPET_END, "</mark>")
+    return mark_safe(html)  # noqa: S308 - escaped above; only our markers become tags
@@ -1,4 +1,4 @@
-"""Video/media component tags: video_player, video_thumbnail."""
+"""Video/media component tags: video_player, video_thumbnail, responsive_photo."""
 
 from django import template
 
@@ -10,7 +10,9 @@ def video_player(media, model_name="LogEntryMedia"):
     """Render a video player with appropriate state handling.
 
     Handles three video states:
-    - READY: Transcoded video with poster (web UI uploads)
+    - READY: Transcoded video with poster (web UI uploads), preceded by the
+      HLS playlist for long videos so that browsers which can play it adapt
+      to the connection, and the rest fall back to the MP4
     - Empty string: Original file without transcoding (Discord uploads)
     - PROCESSING/PENDING: Show processing status with polling
     - FAILED: Show error message
@@ -49,3 +51,35 @@ def video_thumbnail(media, model_name="LogEntryMedia"):
         "media": media,
         "model_name": model_name,
     }
+
+
+@register.inclusion_tag("components/responsive_photo.html")
+def responsive_photo(media, alt="Photo", sizes="120px"):
+    """Render a photo as ``<picture>`` so browsers fetch the smallest adequate variant.
+
+    Each non-JPEG variant format (AVIF, WebP) becomes a ``<source>`` with a
+    width-descriptor ``srcset``; JPEG variants form the ``<img>`` fallback
+    ``srcset``.  Photos without variants render a plain ``<img>`` of the
+    thumbnail, or of the photo itself when there is no thumbnail.
+
+    Usage:
+        {% responsive_photo media alt="Log entry photo" sizes="120px" %}
+
+    Args:
+        media: Photo media object with file, thumbnail_file and variants fields
+        alt: Image alt text (default: "Photo")
+        sizes: The ``sizes`` attribute: the rendered width (default: grid thumbnail)
+    """
+    storage = media.file.storage
+    srcsets: dict[str, list[str]] = {}
+    for variant in sorted(media.variants, key=lambda v: v["width"]):
+        candidate = f"{storage.url(variant['name'])} {variant['width']}w"
+        srcsets.setdefault(variant["type"], []).append(candidate)
+    fallback = srcsets.pop("image/jpeg", [])
+    return {
+        "sources": [{"type": t, "srcset": ", ".join(c)} for t, c in srcsets.items()],
+        "src": (media.thumbnail_file or media.file).url,
+        "srcset": ", ".join(fallback),
+        "sizes": sizes,
+        "alt": alt,
+    }
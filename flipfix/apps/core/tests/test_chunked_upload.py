@@ -0,0 +1,179 @@
+"""Tests for resumable chunked media uploads."""
+
+import hashlib
+import shutil
+import tempfile
+from pathlib import Path
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+
+from flipfix.apps.core.models import ChunkedUpload
+from flipfix.apps.core.test_utils import (
+    SuppressRequestLogsMixin,
+    TemporaryMediaMixin,
+    TestDataMixin,
+    create_log_entry,
+    create_maintainer_user,
+    create_uploaded_image,
+)
+from flipfix.apps.maintenance.models import LogEntryMedia
+
+VIDEO_BYTES = b"0123456789" * 3
+
+
+@tag("views")
+@override_settings(CHUNKED_UPLOAD_CHUNK_SIZE=8)
+class ChunkedUploadTests(TemporaryMediaMixin, SuppressRequestLogsMixin, TestDataMixin, TestCase):
+    """Tests for starting, sending and finishing a chunked upload."""
+
+    def setUp(self):
+        super().setUp()
+        self.upload_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.upload_dir, ignore_errors=True)
+        override = override_settings(CHUNKED_UPLOAD_DIR=self.upload_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+        self.log_entry = create_log_entry(machine=self.machine, text="Test")
+        self.detail_url = reverse("log-detail", kwargs={"pk": self.log_entry.pk})
+        self.client.force_login(self.maintainer_user)
+
+    def _start(self, size=None, filename="clip.mp4", content_type="video/mp4"):
+        size = len(VIDEO_BYTES) if size is None else size
+        return self.client.post(
+            self.detail_url,
+            {
+                "action": "start_chunked_upload",
+                "filename": filename,
+                "size": str(size),
+                "content_type": content_type,
+            },
+        )
+
+    def _put(self, upload_url, data, offset, sha256=None):
+        return self.client.put(
+            f"{upload_url}?offset={offset}",
+            data,
+            content_type="application/octet-stream",
+            headers={"X-Chunk-SHA256": sha256 or hashlib.sha256(data).hexdigest()},
+        )
+
+    def _send_all(self, upload_url, content, chunk_size=8):
+        for offset in range(0, len(content), chunk_size):
+            response = self._put(upload_url, content[offset : offset + chunk_size], offset)
+            self.assertEqual(response.status_code, 200)
+
+    def _finish(self, upload_id):
+        return self.client.post(
+            self.detail_url, {"action": "finish_chunked_upload", "upload_id": upload_id}
+        )
+
+    @patch("flipfix.apps.core.media_upload.enqueue_transcode")
+    def test_chunks_are_assembled_and_attached(self, mock_enqueue):
+        """A finished upload becomes a media record and is transcoded as usual."""
+        session = self._start().json()
+        self.assertEqual(session["chunk_size"], 8)
+
+        self._send_all(session["upload_url"], VIDEO_BYTES)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._finish(session["upload_id"])
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["media_type"], "video")
+        self.assertEqual(data["transcode_status"], LogEntryMedia.TranscodeStatus.PENDING)
+        media = LogEntryMedia.objects.get(id=data["media_id"])
+        self.assertEqual(media.log_entry, self.log_entry)
+        with media.file.open("rb") as stored:
+            self.assertEqual(stored.read(), VIDEO_BYTES)
+        mock_enqueue.assert_called_once_with(media_id=media.id, model_name="LogEntryMedia")
+        self.assertFalse(ChunkedUpload.objects.exists())
+        self.assertEqual(list(Path(self.upload_dir).iterdir()), [])
+
+    def test_photo_is_processed_like_a_single_upload(self):
+        content = create_uploaded_image(size=(300, 200)).read()
+        session = self._start(len(content), "photo.jpg", "image/jpeg").json()
+
+        self._send_all(session["upload_url"], content, chunk_size=8)
+        data = self._finish(session["upload_id"]).json()
+
+        self.assertEqual(data["media_type"], "photo")
+        self.assertTrue(LogEntryMedia.objects.get(id=data["media_id"]).thumbnail_file)
+
+    def test_resumes_from_received_offset(self):
+        """After an interruption the server reports where to continue from."""
+        session = self._start().json()
+        self._put(session["upload_url"], VIDEO_BYTES[:8], 0)
+
+        status = self.client.get(session["upload_url"]).json()
+        self.assertEqual(status["offset"], 8)
+        self.assertEqual(status["size"], len(VIDEO_BYTES))
+
+        # A retried chunk that already arrived is refused with the real offset
+        response = self._put(session["upload_url"], VIDEO_BYTES[:8], 0)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["offset"], 8)
+
+    def test_rejects_oversized_chunk(self):
+        session = self._start().json()
+
+        response = self._put(session["upload_url"], VIDEO_BYTES[:9], 0)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(session["upload_url"]).json()["offset"], 0)
+
+    def test_chunk_checksum_mismatch_is_not_kept(self):
+        """A damaged chunk is cut off again, so the client resends it from the same offset."""
+        session = self._start().json()
+        self._put(session["upload_url"], VIDEO_BYTES[:8], 0)
+
+        response = self._put(
+            session["upload_url"],
+            VIDEO_BYTES[8:16],
+            8,
+            sha256=hashlib.sha256(b"something else").hexdigest(),
+        )
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["offset"], 8)
+        self.assertEqual(self.client.get(session["upload_url"]).json()["offset"], 8)
+        self.assertEqual(self._put(session["upload_url"], VIDEO_BYTES[8:16], 8).status_code, 200)
+
+    def test_chunk_without_checksum_is_refused(self):
+        session = self._start().json()
+
+        response = self.client.put(
+            f"{session['upload_url']}?offset=0",
+            VIDEO_BYTES[:8],
+            content_type="application/octet-stream",
+        )
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(self.client.get(session["upload_url"]).json()["offset"], 0)
+
+    def test_incomplete_upload_cannot_finish(self):
+        session = self._start().json()
+        self._put(session["upload_url"], VIDEO_BYTES[:8], 0)
+
+        response = self._finish(session["upload_id"])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("incomplete", response.json()["error"])
+        self.assertTrue(ChunkedUpload.objects.exists())
+
+    def test_rejects_too_large_and_unsupported_files(self):
+        self.assertEqual(self._start(size=201 * 1024 * 1024).status_code, 400)
+        self.assertEqual(
+            self._start(filename="notes.txt", content_type="text/plain").status_code, 400
+        )
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_other_users_cannot_send_chunks(self):
+        session = self._start().json()
+        self.client.force_login(create_maintainer_user(username="other"))
+
+        response = self._put(session["upload_url"], VIDEO_BYTES[:8], 0)
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,221 @@
+"""Tests for on-demand, stored photo derivatives."""
+
+import threading
+import time
+from io import BytesIO
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+from PIL import Image
+
+from flipfix.apps.core import derived_images
+from flipfix.apps.core.derived_images import (
+    DerivedImageSpec,
+    derived_image_name,
+    get_or_create_derived_image,
+    parse_spec,
+)
+from flipfix.apps.core.test_utils import (
+    TemporaryMediaMixin,
+    TestDataMixin,
+    create_log_entry,
+    create_uploaded_image,
+)
+from flipfix.apps.maintenance.models import LogEntryMedia
+
+DERIVED_SETTINGS = {
+    "DERIVED_IMAGE_SIZES": [320, 640],
+    "DERIVED_IMAGE_FORMATS": ["WEBP", "JPEG", "PNG"],
+    "DERIVED_IMAGE_QUALITIES": [50],
+    "PHOTO_VARIANT_SIZES": [],
+}
+
+
+@tag("unit")
+@override_settings(**DERIVED_SETTINGS)
+class ParseSpecTests(TestCase):
+    """Tests for parsing and whitelisting derivative specs."""
+
+    def test_parses_size_and_format(self):
+        self.assertEqual(parse_spec("640.webp"), DerivedImageSpec(640, "WEBP"))
+
+    def test_parses_quality(self):
+        spec = parse_spec("320-q50.jpg")
+
+        self.assertEqual(spec, DerivedImageSpec(320, "JPEG", 50))
+        self.assertEqual(str(spec), "320-q50.jpg")
+        self.assertEqual(spec.content_type, "image/jpeg")
+
+    def test_rejects_specs_outside_whitelist(self):
+        for spec in (
+            "1000.webp",  # Size not allowed
+            "640.avif",  # Format not allowed
+            "640-q90.webp",  # Quality not allowed
+            "640-q50.png",  # Quality of a lossless format
+            "0640.webp",  # Non-canonical
+            "640.jpeg",
+            "640.webp.exe",
+            "../640.webp",
+        ):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_spec(spec)
+
+
+@tag("models")
+@override_settings(**DERIVED_SETTINGS)
+class GetOrCreateDerivedImageTests(TemporaryMediaMixin, TestDataMixin, TestCase):
+    """Tests for generating and storing derivatives once."""
+
+    def setUp(self):
+        super().setUp()
+        log_entry = create_log_entry(machine=self.machine, text="Photo entry")
+        data = create_uploaded_image(size=(1600, 1200)).read()
+        self.media = LogEntryMedia.objects.create(
+            log_entry=log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=SimpleUploadedFile("photo.jpg", data, content_type="image/jpeg"),
+        )
+        self.storage = self.media.file.storage
+
+    def test_stores_derivative_of_requested_size_and_format(self):
+        name = get_or_create_derived_image(self.media, parse_spec("640.webp"))
+
+        self.assertEqual(name, derived_image_name(self.media, parse_spec("640.webp")))
+        self.assertTrue(name.startswith(f"derived/LogEntryMedia/{self.media.pk}/"))
+        with self.storage.open(name) as fh, Image.open(BytesIO(fh.read())) as image:
+            self.assertEqual((image.format, image.size), ("WEBP", (640, 480)))
+
+    def test_second_request_reuses_stored_file(self):
+        spec = parse_spec("320.webp")
+        get_or_create_derived_image(self.media, spec)
+
+        with patch.object(derived_images, "_encode_derivative") as encode:
+            get_or_create_derived_image(self.media, spec)
+
+        encode.assert_not_called()
+
+    def test_concurrent_first_requests_encode_once(self):
+        spec = parse_spec("640.jpg")
+        calls = []
+        encode = derived_images._encode_derivative
+
+        def slow_encode(media, spec):
+            calls.append(spec)
+            time.sleep(0.2)
+            return encode(media, spec)
+
+        names = []
+        with patch.object(derived_images, "_encode_derivative", side_effect=slow_encode):
+            threads = [
+                threading.Thread(
+                    target=lambda: names.append(get_or_create_derived_image(self.media, spec))
+                )
+                for _ in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(set(names)), 1)
+        self.assertEqual(len(names), 4)
+
+    def test_replaced_file_gets_fresh_derivative(self):
+        spec = parse_spec("320.webp")
+        first = get_or_create_derived_image(self.media, spec)
+
+        self.media.file = SimpleUploadedFile(
+            "new.jpg", create_uploaded_image(size=(800, 600)).read(), content_type="image/jpeg"
+        )
+        self.media.save(process_photo=False)
+
+        self.assertNotEqual(get_or_create_derived_image(self.media, spec), first)
+
+    def test_unreadable_photo_has_no_derivative(self):
+        self.media.file = SimpleUploadedFile("bad.jpg", b"nope", content_type="image/jpeg")
+        self.media.save(process_photo=False)
+
+        self.assertIsNone(get_or_create_derived_image(self.media, parse_spec("320.webp")))
+
+
+@tag("views")
+@override_settings(**DERIVED_SETTINGS)
+class DerivedImageViewTests(TemporaryMediaMixin, TestDataMixin, TestCase):
+    """Tests for the /media/derived/ endpoint."""
+
+    def setUp(self):
+        super().setUp()
+        self.log_entry = create_log_entry(machine=self.machine, text="Photo entry")
+        data = create_uploaded_image(size=(1600, 1200)).read()
+        self.media = LogEntryMedia.objects.create(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=SimpleUploadedFile("photo.jpg", data, content_type="image/jpeg"),
+        )
+
+    def _url(self, spec, model_name="LogEntryMedia", media_id=None):
+        return reverse(
+            "media-derived",
+            kwargs={
+                "model_name": model_name,
+                "media_id": media_id or self.media.pk,
+                "spec": spec,
+            },
+        )
+
+    def test_serves_derivative_with_immutable_caching(self):
+        response = self.client.get(self._url("640.webp"))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertTrue(response["ETag"])
+        with Image.open(BytesIO(b"".join(response.streaming_content))) as image:
+            self.assertEqual(image.size, (640, 480))
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self._url("320.webp"))["ETag"]
+
+        with patch.object(derived_images, "_encode_derivative") as encode:
+            response = self.client.get(self._url("320.webp"), HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertIn("immutable", response["Cache-Control"])
+        encode.assert_not_called()
+
+    def test_is_public_even_when_site_is_private(self):
+        """Like the original media files, derivatives need no login."""
+        self.assertEqual(self.client.get(self._url("320.jpg")).status_code, 200)
+
+    def test_not_found(self):
+        video = LogEntryMedia.objects.create(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.VIDEO,
+            file=SimpleUploadedFile("clip.mp4", b"video", content_type="video/mp4"),
+        )
+        for url in (
+            self._url("999.webp"),
+            self._url("320.webp", model_name="NopeMedia"),
+            self._url("320.webp", media_id=99999),
+            self._url("320.webp", media_id=video.pk),
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_deleting_media_deletes_derivatives(self):
+        self.client.get(self._url("320.webp"))
+        name = derived_image_name(self.media, parse_spec("320.webp"))
+        storage = self.media.file.storage
+        self.assertTrue(storage.exists(name))
+        self.client.force_login(self.maintainer_user)
+
+        response = self.client.post(
+            reverse("log-detail", kwargs={"pk": self.log_entry.pk}),
+            {"action": "delete_media", "media_id": self.media.pk},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(storage.exists(name))
@@ -0,0 +1,126 @@
+"""Tests for keyset (cursor) pagination of the unified activity feed."""
+
+from datetime import timedelta
+
+from django.test import TestCase, tag
+from django.urls import reverse
+from django.utils import timezone
+
+from flipfix.apps.core.feed import FeedCursor, get_feed_page, get_next_cursor
+from flipfix.apps.core.test_utils import (
+    TestDataMixin,
+    create_log_entry,
+    create_problem_report,
+)
+from flipfix.apps.parts.models import PartRequest
+
+
+@tag("models")
+class FeedCursorTests(TestCase):
+    """Tests for FeedCursor encoding."""
+
+    def test_round_trip(self):
+        """An encoded cursor decodes to the same position."""
+        cursor = FeedCursor(occurred_at=timezone.now(), entry_type="log", pk=42)
+        self.assertEqual(FeedCursor.decode(cursor.encode()), cursor)
+
+    def test_malformed_token_decodes_to_none(self):
+        """Garbage tokens are rejected rather than raising."""
+        for token in ("", None, "not-base64!", "Zm9v"):
+            with self.subTest(token=token):
+                self.assertIsNone(FeedCursor.decode(token))
+
+
+@tag("models")
+class FeedCursorPaginationTests(TestDataMixin, TestCase):
+    """Tests for walking the feed with get_feed_page(cursor=...)."""
+
+    def setUp(self):
+        super().setUp()
+        now = timezone.now()
+        # Several entry types share timestamps so tie-breaking is exercised
+        for i in range(4):
+            when = now - timedelta(hours=i)
+            create_log_entry(machine=self.machine, text=f"Log {i}", occurred_at=when)
+            create_problem_report(
+                machine=self.machine, description=f"Problem {i}", occurred_at=when
+            )
+            PartRequest.objects.create(machine=self.machine, text=f"Part {i}", occurred_at=when)
+
+    def _walk(self, **kwargs):
+        seen = []
+        cursor = None
+        while True:
+            items, has_next = get_feed_page(page_size=5, cursor=cursor, **kwargs)
+            seen.extend((entry.entry_type, entry.pk) for entry in items)
+            if not has_next:
+                return seen
+            cursor = get_next_cursor(items, has_next)
+
+    def test_cursor_walk_matches_offset_pages(self):
+        """Walking by cursor yields the same sequence as offset pagination."""
+        by_offset = []
+        for page_num in range(1, 4):
+            items, _ = get_feed_page(page_num=page_num, page_size=5)
+            by_offset.extend((entry.entry_type, entry.pk) for entry in items)
+
+        self.assertEqual(self._walk(), by_offset)
+
+    def test_cursor_walk_has_no_duplicates_or_gaps(self):
+        """Every entry appears exactly once across cursor pages."""
+        seen = self._walk(machine=self.machine)
+        self.assertEqual(len(seen), 12)
+        self.assertEqual(len(set(seen)), 12)
+
+    def test_invalid_cursor_falls_back_to_page_num(self):
+        """A malformed cursor is ignored and page_num is used instead."""
+        first, _ = get_feed_page(page_size=5)
+        items, _ = get_feed_page(page_size=5, cursor="garbage")
+        self.assertEqual([e.pk for e in items], [e.pk for e in first])
+
+    def test_next_cursor_empty_on_last_page(self):
+        """No cursor is issued when there are no further pages."""
+        items, has_next = get_feed_page(page_size=50)
+        self.assertFalse(has_next)
+        self.assertEqual(get_next_cursor(items, has_next), "")
+
+
+@tag("views")
+class FeedCursorPartialViewTests(TestDataMixin, TestCase):
+    """Tests for cursor handling in the infinite-scroll endpoints."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(12):
+            create_log_entry(machine=self.machine, text=f"Cursor entry {i}")
+        self.client.force_login(self.maintainer_user)
+
+    def test_first_page_embeds_cursor(self):
+        """The global feed page renders the next cursor for the client."""
+        response = self.client.get(reverse("home"))
+        self.assertContains(
+            response, f'data-next-cursor="{response.context["page_obj"].next_cursor}"'
+        )
+        self.assertTrue(response.context["page_obj"].next_cursor)
+
+    def test_global_partial_follows_cursor(self):
+        """The global partial view resumes after the given cursor."""
+        response = self.client.get(reverse("home"))
+        cursor = response.context["page_obj"].next_cursor
+
+        data = self.client.get(
+            reverse("global-activity-feed-entries"), {"page": 2, "cursor": cursor}
+        ).json()
+
+        self.assertFalse(data["has_next"])
+        self.assertIsNone(data["next_cursor"])
+        self.assertIn("Cursor entry 0", data["items"])
+        self.assertNotIn("Cursor entry 11", data["items"])
+
+    def test_machine_partial_returns_next_cursor(self):
+        """The machine feed partial view returns a cursor while more pages remain."""
+        url = reverse("machine-feed-entries", kwargs={"slug": self.machine.slug})
+        data = self.client.get(url).json()
+
+        self.assertTrue(data["has_next"])
+        self.assertIsNotNone(FeedCursor.decode(data["next_cursor"]))
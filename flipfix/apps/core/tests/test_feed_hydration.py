@@ -0,0 +1,41 @@
+"""Tests for two-phase (order, then hydrate) feed fetching."""
+
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+
+from flipfix.apps.core.feed import get_feed_page
+from flipfix.apps.core.test_utils import TestDataMixin, create_log_entry
+
+
+@tag("models")
+class FeedHydrationTests(TestDataMixin, TestCase):
+    """Only the visible page of a search is hydrated with prefetches."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(25):
+            create_log_entry(machine=self.machine, text=f"Coil swap {i}")
+
+    def _prefetched_media_ids(self, **kwargs):
+        with CaptureQueriesContext(connection) as ctx:
+            entries, has_next = get_feed_page(page_size=5, search_query="coil", **kwargs)
+        media_sql = [q["sql"] for q in ctx.captured_queries if "logentrymedia" in q["sql"]]
+        self.assertEqual(len(media_sql), 1)
+        in_list = media_sql[0].split(" IN (")[1].split(")")[0]
+        return entries, has_next, in_list.split(", ")
+
+    def test_search_prefetches_only_visible_entries(self):
+        """Media prefetch runs for the 5 page entries, not the whole fetch window."""
+        entries, has_next, media_ids = self._prefetched_media_ids(page_num=3)
+
+        self.assertEqual(len(entries), 5)
+        self.assertTrue(has_next)
+        self.assertEqual(sorted(media_ids), sorted(str(e.pk) for e in entries))
+
+    def test_machine_search_prefetches_only_visible_entries(self):
+        """Machine-scoped searches hydrate just the page too."""
+        entries, _, media_ids = self._prefetched_media_ids(machine=self.machine, page_num=2)
+
+        self.assertEqual(len(media_ids), 5)
+        self.assertEqual([e.text for e in entries][0], "Coil swap 19")
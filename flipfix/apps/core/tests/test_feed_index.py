@@ -0,0 +1,152 @@
+"""Tests for the denormalized FeedEntry activity index."""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, tag
+from django.urls import reverse
+from django.utils import timezone
+
+from flipfix.apps.core.feed import get_feed_page, rebuild_feed_index
+from flipfix.apps.core.models import FeedEntry
+from flipfix.apps.core.test_utils import (
+    TestDataMixin,
+    create_log_entry,
+    create_machine,
+    create_part_request,
+    create_part_request_update,
+    create_problem_report,
+)
+
+
+@tag("models")
+class FeedIndexSyncTests(TestDataMixin, TestCase):
+    """Tests that the post_save/post_delete hooks keep FeedEntry in sync."""
+
+    def _index_row(self, entry_type, obj):
+        return FeedEntry.objects.get(entry_type=entry_type, object_id=obj.pk)
+
+    def test_create_indexes_record(self):
+        """Creating a feed record writes its index row."""
+        log = create_log_entry(machine=self.machine)
+
+        row = self._index_row("log", log)
+        self.assertEqual(row.machine_id, self.machine.pk)
+        self.assertEqual(row.occurred_at, log.occurred_at)
+
+    def test_save_updates_occurred_at(self):
+        """Changing occurred_at moves the index row."""
+        problem = create_problem_report(machine=self.machine)
+        problem.occurred_at = timezone.now() - timedelta(days=3)
+        problem.save()
+
+        self.assertEqual(
+            self._index_row("problem_report", problem).occurred_at, problem.occurred_at
+        )
+
+    def test_delete_removes_row(self):
+        """Deleting a feed record removes its index row."""
+        log = create_log_entry(machine=self.machine)
+        log_pk = log.pk
+        log.delete()
+
+        self.assertFalse(FeedEntry.objects.filter(entry_type="log", object_id=log_pk).exists())
+
+    def test_part_update_follows_parent_machine(self):
+        """Moving a part request to another machine re-scopes its updates."""
+        part_request = create_part_request(machine=self.machine)
+        update = create_part_request_update(part_request=part_request)
+        other = create_machine(slug="other-machine")
+
+        part_request.machine = other
+        part_request.save()
+
+        self.assertEqual(self._index_row("part_request_update", update).machine_id, other.pk)
+
+    def test_problem_report_machine_move_reindexes_child_logs(self):
+        """Moving a problem report bulk-moves its logs and refreshes their index rows."""
+        problem = create_problem_report(machine=self.machine)
+        log = create_log_entry(machine=self.machine, problem_report=problem)
+        other = create_machine(slug="other-machine")
+
+        self.client.force_login(self.maintainer_user)
+        self.client.post(
+            reverse("problem-report-detail", kwargs={"pk": problem.pk}),
+            {"action": "update_machine", "machine_slug": other.slug},
+        )
+
+        self.assertEqual(self._index_row("log", log).machine_id, other.pk)
+
+
+@tag("models")
+class FeedIndexPageTests(TestDataMixin, TestCase):
+    """Tests for serving feed pages from the index."""
+
+    def test_page_comes_from_index(self):
+        """Unsearched pages only show records that have index rows."""
+        kept = create_log_entry(machine=self.machine, text="Indexed")
+        hidden = create_log_entry(machine=self.machine, text="Not indexed")
+        FeedEntry.objects.filter(entry_type="log", object_id=hidden.pk).delete()
+
+        entries, _ = get_feed_page(machine=self.machine)
+
+        self.assertEqual([e.pk for e in entries], [kept.pk])
+
+    def test_search_bypasses_index(self):
+        """Searches still query the source tables directly."""
+        log = create_log_entry(machine=self.machine, text="Searchable widget")
+        FeedEntry.objects.all().delete()
+
+        entries, _ = get_feed_page(machine=self.machine, search_query="widget")
+
+        self.assertEqual([e.pk for e in entries], [log.pk])
+
+    def test_hydrated_entries_are_tagged(self):
+        """Entries loaded via the index carry their source's template metadata."""
+        create_problem_report(machine=self.machine)
+
+        entries, _ = get_feed_page()
+
+        self.assertEqual(entries[0].entry_type, "problem_report")
+        self.assertTrue(entries[0].global_template)
+
+
+@tag("models")
+class RebuildFeedIndexTests(TestDataMixin, TestCase):
+    """Tests for rebuild_feed_index() and its management command."""
+
+    def test_rebuild_restores_missing_and_drops_stale_rows(self):
+        """Rebuild recreates every row from source records and removes orphans."""
+        log = create_log_entry(machine=self.machine)
+        create_part_request_update(part_request=create_part_request(machine=self.machine))
+        FeedEntry.objects.all().delete()
+        FeedEntry.objects.create(entry_type="gone", object_id=1, occurred_at=timezone.now())
+
+        counts = rebuild_feed_index()
+
+        self.assertEqual(counts["log"], 1)
+        self.assertEqual(counts["part_request_update"], 1)
+        self.assertFalse(FeedEntry.objects.filter(entry_type="gone").exists())
+        self.assertTrue(FeedEntry.objects.filter(entry_type="log", object_id=log.pk).exists())
+
+    def test_management_command(self):
+        """rebuild_feed_index command reports the rows written."""
+        create_log_entry(machine=self.machine)
+        out = StringIO()
+
+        call_command("rebuild_feed_index", stdout=out)
+
+        self.assertIn("log: 1 indexed", out.getvalue())
+
+    def test_management_command_if_empty(self):
+        """--if-empty backfills an empty index and leaves a populated one alone."""
+        log = create_log_entry(machine=self.machine)
+        FeedEntry.objects.all().delete()
+
+        call_command("rebuild_feed_index", "--if-empty", stdout=StringIO())
+        self.assertTrue(FeedEntry.objects.filter(entry_type="log", object_id=log.pk).exists())
+
+        out = StringIO()
+        call_command("rebuild_feed_index", "--if-empty", stdout=out)
+        self.assertIn("skipping", out.getvalue())
@@ -106,7 +106,7 @@ class GlobalFeedSearchTests(TestDataMixin, TestCase):
         self.client.force_login(self.maintainer_user)
         response = self.client.get(self.home_url, {"q": "flipper"})
 
-        self.assertContains(response, "Replaced flipper coil")
+        self.assertContains(response, "Replaced <mark>flipper</mark> coil")
         self.assertNotContains(response, "Display flickering")
 
     def test_search_finds_problem_by_description(self):
@@ -115,7 +115,7 @@ class GlobalFeedSearchTests(TestDataMixin, TestCase):
         response = self.client.get(self.home_url, {"q": "flickering"})
 
         self.assertNotContains(response, "Replaced flipper coil")
-        self.assertContains(response, "Display flickering")
+        self.assertContains(response, "Display <mark>flickering</mark>")
 
     def test_search_finds_entries_by_machine_name(self):
         """Global search should find entries by machine name."""
@@ -1,15 +1,21 @@
 """Tests for image processing utilities."""
 
-from io import BytesIO
+from io import BytesIO, StringIO
+from unittest.mock import patch
 
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
 from django.test import TestCase, tag
-from PIL import Image
+from PIL import Image, ImageOps
 
+from flipfix.apps.core import image_processing
 from flipfix.apps.core.image_processing import (
     MAX_IMAGE_DIMENSION,
     THUMB_IMAGE_DIMENSION,
+    describe_image_variant,
+    resize_image_derivatives,
     resize_image_file,
+    resize_image_with_variants,
 )
 
 
@@ -221,3 +227,182 @@ class ResizeImageFileTests(TestCase):
         self.assertIsInstance(result, InMemoryUploadedFile)
         self.assertIsNotNone(result.size)
         self.assertGreater(result.size, 0)
+
+
+@tag("unit")
+class ResizeImageDerivativesTests(TestCase):
+    """Tests for resize_image_derivatives (one decode, several sizes)."""
+
+    def _jpeg(self, width, height, name="photo.jpg", exif=None):
+        buffer = BytesIO()
+        image = Image.new("RGB", (width, height), color="blue")
+        image.save(buffer, format="JPEG", **({"exif": exif} if exif else {}))
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+    def _size(self, uploaded):
+        uploaded.seek(0)
+        with Image.open(uploaded) as image:
+            return image.size
+
+    def test_matches_resize_image_file(self):
+        """Each derivative has the size and format resize_image_file would produce."""
+        uploaded = self._jpeg(3000, 2000)
+
+        full, thumb = resize_image_derivatives(
+            uploaded, [MAX_IMAGE_DIMENSION, THUMB_IMAGE_DIMENSION]
+        )
+
+        self.assertEqual(self._size(full), self._size(resize_image_file(uploaded)))
+        self.assertEqual(
+            self._size(thumb),
+            self._size(resize_image_file(uploaded, max_dimension=THUMB_IMAGE_DIMENSION)),
+        )
+        self.assertEqual(self._size(thumb), (800, 533))
+        self.assertEqual(thumb.content_type, "image/jpeg")
+
+    def test_decodes_source_once(self):
+        uploaded = self._jpeg(3000, 2000)
+
+        with patch.object(image_processing.Image, "open", wraps=Image.open) as image_open:
+            resize_image_derivatives(uploaded, [MAX_IMAGE_DIMENSION, THUMB_IMAGE_DIMENSION])
+
+        image_open.assert_called_once()
+
+    def test_jpeg_decoded_at_reduced_scale(self):
+        """draft() decodes a JPEG at the smallest DCT scale covering the largest size."""
+        uploaded = self._jpeg(3200, 2400)
+
+        with patch.object(
+            image_processing.ImageOps, "exif_transpose", wraps=ImageOps.exif_transpose
+        ) as transpose:
+            (thumb,) = resize_image_derivatives(uploaded, [THUMB_IMAGE_DIMENSION])
+
+        self.assertEqual(transpose.call_args[0][0].size, (800, 600))
+        self.assertEqual(self._size(thumb), (800, 600))
+
+    def test_exif_rotation_applied_to_every_derivative(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Orientation: rotate 90° CW
+        uploaded = self._jpeg(4000, 2000, exif=exif.tobytes())
+
+        full, thumb = resize_image_derivatives(uploaded, [2000, 100])
+
+        self.assertEqual(self._size(full), (1000, 2000))
+        self.assertEqual(self._size(thumb), (50, 100))
+
+    def test_results_follow_requested_order(self):
+        uploaded = self._jpeg(1000, 500)
+
+        small, unresized, again = resize_image_derivatives(uploaded, [100, None, 100])
+
+        self.assertEqual(self._size(small), (100, 50))
+        self.assertEqual(self._size(unresized), (1000, 500))
+        self.assertIs(again, small)
+
+    def test_non_image_passes_through_for_every_size(self):
+        uploaded = SimpleUploadedFile("doc.pdf", b"%PDF-1.4", content_type="application/pdf")
+
+        self.assertEqual(resize_image_derivatives(uploaded, [800, None]), [uploaded, uploaded])
+
+
+@tag("unit")
+class ResizeImageWithVariantsTests(TestCase):
+    """Tests for resize_image_with_variants (derivatives plus responsive variants)."""
+
+    def _upload(self, width, height, format="JPEG", name="photo.jpg"):
+        content_type = f"image/{format.lower()}"
+        data = create_test_image(width, height, format=format)
+        return SimpleUploadedFile(name, data, content_type=content_type)
+
+    def test_every_size_in_every_format_from_one_decode(self):
+        uploaded = self._upload(3000, 2000)
+
+        with patch.object(image_processing.Image, "open", wraps=Image.open) as image_open:
+            (thumb,), variants = resize_image_with_variants(
+                uploaded, [THUMB_IMAGE_DIMENSION], [320, 1280], ["webp", "AVIF"]
+            )
+
+        image_open.assert_called_once()
+        with Image.open(thumb) as image:
+            self.assertEqual(image.size, (800, 533))
+        self.assertEqual(
+            [(v.format, v.width, v.height, v.file.name) for v in variants],
+            [
+                ("WEBP", 1280, 853, "photo-1280w.webp"),
+                ("AVIF", 1280, 853, "photo-1280w.avif"),
+                ("WEBP", 320, 213, "photo-320w.webp"),
+                ("AVIF", 320, 213, "photo-320w.avif"),
+            ],
+        )
+        for variant in variants:
+            variant.file.seek(0)
+            with Image.open(variant.file) as image:
+                self.assertEqual(
+                    (image.format, image.size), (variant.format, (variant.width, variant.height))
+                )
+
+    def test_sizes_beyond_image_collapse_to_its_own_size(self):
+        uploaded = self._upload(500, 400)
+
+        _derivatives, variants = resize_image_with_variants(
+            uploaded, [], [320, 640, 1280], ["WEBP"]
+        )
+
+        self.assertEqual([(v.width, v.height) for v in variants], [(500, 400), (320, 256)])
+
+    def test_transparent_image_skips_jpeg_and_keeps_alpha(self):
+        buffer = BytesIO()
+        Image.new("RGBA", (1000, 1000), (255, 0, 0, 128)).save(buffer, format="PNG")
+        uploaded = SimpleUploadedFile("logo.png", buffer.getvalue(), content_type="image/png")
+
+        _derivatives, variants = resize_image_with_variants(uploaded, [], [320], ["WEBP", "JPEG"])
+
+        self.assertEqual([v.format for v in variants], ["WEBP"])
+        with Image.open(variants[0].file) as image:
+            self.assertEqual(image.mode, "RGBA")
+
+    def test_formats_pillow_cannot_encode_are_skipped(self):
+        uploaded = self._upload(1000, 1000)
+
+        with patch.dict(image_processing.Image.SAVE):
+            del image_processing.Image.SAVE["AVIF"]
+            _derivatives, variants = resize_image_with_variants(
+                uploaded, [], [320], ["AVIF", "WEBP"]
+            )
+
+        self.assertEqual([v.format for v in variants], ["WEBP"])
+
+    def test_non_image_gets_no_variants(self):
+        uploaded = SimpleUploadedFile("doc.pdf", b"%PDF-1.4", content_type="application/pdf")
+
+        derivatives, variants = resize_image_with_variants(uploaded, [800], [320], ["WEBP"])
+
+        self.assertEqual((derivatives, variants), ([uploaded], []))
+
+    def test_describe_image_variant_reads_header(self):
+        uploaded = self._upload(640, 480, format="WEBP", name="photo-640w.webp")
+
+        variant = describe_image_variant(uploaded)
+
+        self.assertEqual((variant.format, variant.width, variant.height), ("WEBP", 640, 480))
+        self.assertEqual(uploaded.tell(), 0)
+
+    def test_describe_image_variant_rejects_non_images(self):
+        uploaded = SimpleUploadedFile("x.webp", b"nope", content_type="image/webp")
+
+        with self.assertRaises(ValueError):
+            describe_image_variant(uploaded)
+
+
+@tag("unit")
+class BenchmarkCommandTests(TestCase):
+    """Smoke test for the benchmark_image_processing command."""
+
+    def test_reports_each_strategy(self):
+        out = StringIO()
+
+        call_command("benchmark_image_processing", megapixels=0.5, repeat=1, stdout=out)
+
+        for strategy in ("decode per derivative", "single decode + draft"):
+            self.assertIn(strategy, out.getvalue())
+        self.assertIn("peak RSS", out.getvalue())
@@ -1,5 +1,8 @@
 """Tests for [[type:ref]] link rendering in markdown (non-page types)."""
 
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase, tag
 
 from flipfix.apps.catalog.models import MachineInstance, MachineModel
@@ -288,3 +291,57 @@ class PlainTextRenderingTests(TestCase):
 
         self.assertIn(f"Problem #{pr.pk}", result)
         self.assertNotIn("](/", result)
+
+
+@tag("views")
+class SinglePassRenderingTests(TestCase):
+    """Tests for rendering all link types with one scan of the text."""
+
+    def setUp(self):
+        model = MachineModel.objects.create(name="Test Model", slug="test-model")
+        self.machine = MachineInstance.objects.create(model=model, slug="blackout", name="Blackout")
+        self.problem = ProblemReport.objects.create(machine=self.machine, description="Stuck")
+
+    def test_mixed_and_repeated_links_render_in_place(self):
+        """Links of several types, repeated, keep their positions in the text."""
+        text = (
+            f"A [[machine:id:{self.machine.pk}]] B [[problem:{self.problem.pk}]] "
+            f"C [[machine:id:{self.machine.pk}]] D"
+        )
+
+        with self.assertNumQueries(2):  # one per link type
+            result = render_all_links(text, plain_text=True)
+
+        self.assertEqual(result, f"A Blackout B Problem #{self.problem.pk}: Stuck C Blackout D")
+
+    def test_rendered_labels_are_not_rescanned(self):
+        """Link syntax inside a rendered label is left as text."""
+        self.machine.name = f"Twin of [[problem:{self.problem.pk}]]"
+        self.machine.save()
+
+        result = render_all_links(f"[[machine:id:{self.machine.pk}]]", plain_text=True)
+
+        self.assertEqual(result, f"Twin of [[problem:{self.problem.pk}]]")
+
+    def test_malformed_refs_are_left_alone(self):
+        """Refs that don't fit the type's format aren't treated as links."""
+        text = f"[[problem:id:{self.problem.pk}]] [[machine:id:abc]] [[unknown:1]]"
+
+        with self.assertNumQueries(0):
+            self.assertEqual(render_all_links(text), text)
+
+
+@tag("views")
+class BenchmarkCommandTests(TestCase):
+    """Smoke test for the benchmark_markdown_links command."""
+
+    def test_reports_each_step(self):
+        """The command times rendering, conversion and reference syncing."""
+        model = MachineModel.objects.create(name="Test Model", slug="test-model")
+        MachineInstance.objects.create(model=model, slug="blackout", name="Blackout")
+        out = StringIO()
+
+        call_command("benchmark_markdown_links", size=5000, links=20, repeat=1, stdout=out)
+
+        for step in ("render_all_links", "convert_authoring_to_storage", "sync_references"):
+            self.assertIn(step, out.getvalue())
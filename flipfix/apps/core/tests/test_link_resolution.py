@@ -0,0 +1,105 @@
+"""Tests for request-scoped batch resolution of [[type:ref]] links."""
+
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from flipfix.apps.core.markdown import render_markdown_html
+from flipfix.apps.core.markdown_links import link_resolution, prefetch_links
+from flipfix.apps.core.test_utils import (
+    TestDataMixin,
+    create_log_entry,
+    create_machine,
+    create_problem_report,
+)
+
+
+def _table_queries(ctx, table):
+    return [q["sql"] for q in ctx.captured_queries if f'FROM "{table}"' in q["sql"]]
+
+
+@tag("views")
+class LinkResolverTests(TestDataMixin, TestCase):
+    """Tests for link_resolution() and prefetch_links()."""
+
+    def test_prefetched_texts_resolve_in_one_query_per_type(self):
+        """Rendering several queued texts looks up each link type once."""
+        machines = [create_machine(name=f"Machine {i}") for i in range(3)]
+        problem = create_problem_report(machine=self.machine, description="Stuck ball")
+        texts = [f"[[machine:id:{m.pk}]] and [[problem:{problem.pk}]]" for m in machines]
+
+        with CaptureQueriesContext(connection) as ctx, link_resolution():
+            prefetch_links(texts)
+            html = [render_markdown_html(text) for text in texts]
+
+        self.assertEqual(len(_table_queries(ctx, "catalog_machineinstance")), 1)
+        self.assertEqual(len(_table_queries(ctx, "maintenance_problemreport")), 1)
+        for machine, rendered in zip(machines, html, strict=True):
+            self.assertIn(machine.name, rendered)
+            self.assertIn("Stuck ball", rendered)
+
+    def test_repeated_links_reuse_resolved_targets(self):
+        """Without prefetching, a target already resolved in the block isn't looked up again."""
+        text = f"See [[machine:id:{self.machine.pk}]]"
+
+        with link_resolution():
+            render_markdown_html(text)
+            with self.assertNumQueries(0):
+                render_markdown_html(f"Also {text}")
+
+    def test_missing_targets_render_broken_once(self):
+        """Missing targets are remembered as missing, not re-queried."""
+        with link_resolution():
+            self.assertIn("broken link", render_markdown_html("[[log:99999]]"))
+            with self.assertNumQueries(0):
+                self.assertIn("broken link", render_markdown_html("Again [[log:99999]]"))
+
+    def test_prefetch_outside_block_is_noop(self):
+        """Without an active block, rendering looks up links per call as before."""
+        prefetch_links([f"[[machine:id:{self.machine.pk}]]"])
+
+        self.assertIn(self.machine.name, render_markdown_html(f"[[machine:id:{self.machine.pk}]]"))
+
+
+@tag("views")
+class PageLinkResolutionTests(TestDataMixin, TestCase):
+    """Tests that whole pages resolve links with one query per link type."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(5):
+            machine = create_machine(name=f"Linked Machine {i}")
+            problem = create_problem_report(machine=machine, description=f"Problem {i}")
+            create_log_entry(
+                machine=self.machine,
+                text=f"Swapped with [[machine:id:{machine.pk}]], see [[problem:{problem.pk}]]",
+            )
+
+    def test_global_feed_resolves_links_once_per_type(self):
+        """The global activity feed batches link lookups across all cards."""
+        self.client.force_login(self.maintainer_user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("home"))
+
+        self.assertContains(response, "Linked Machine 4")
+        link_sql = [
+            sql
+            for sql in _table_queries(ctx, "catalog_machineinstance")
+            if "Linked Machine" not in sql and " IN (" in sql
+        ]
+        self.assertEqual(len(link_sql), 1)
+
+    def test_infinite_scroll_resolves_links_once_per_type(self):
+        """InfiniteScrollMixin pages batch link lookups across items."""
+        self.client.force_login(self.maintainer_user)
+
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse("log-list-entries"))
+
+        self.assertIn("Linked Machine 4", response.json()["items"])
+        problem_sql = [
+            sql for sql in _table_queries(ctx, "maintenance_problemreport") if " IN (" in sql
+        ]
+        self.assertEqual(len(problem_sql), 1)
@@ -1,12 +1,18 @@
 """Tests for the render_markdown template filter."""
 
+from dataclasses import FrozenInstanceError
+from unittest.mock import patch
+
 from django.test import TestCase, tag
 
+from flipfix.apps.core import markdown
 from flipfix.apps.core.markdown import (
     _convert_task_list_items,
     fenced_code_ranges,
+    parse_markdown,
     render_markdown_html,
 )
+from flipfix.apps.core.test_utils import create_machine
 
 # Tests use the pipeline function directly; the template filter is a thin wrapper.
 render_markdown = render_markdown_html
@@ -395,3 +401,52 @@ class FencedCodeRangesTests(TestCase):
         self.assertEqual(len(ranges), 1)
         start, end = ranges[0]
         self.assertEqual(content[start:end], "```\ncode\n```")
+
+
+@tag("views")
+class ParsedMarkdownTests(TestCase):
+    """Tests for the shared parse behind fence checks and rendering."""
+
+    def setUp(self):
+        parse_markdown.cache_clear()
+
+    def _count_parses(self):
+        return patch.object(markdown._md, "parse", wraps=markdown._md.parse)
+
+    def test_in_fence(self):
+        content = "before\n```\ncode\n```\nafter\n~~~\nmore\n~~~\n"
+        parsed = parse_markdown(content)
+        self.assertFalse(parsed.in_fence(content.index("before")))
+        self.assertTrue(parsed.in_fence(content.index("code")))
+        self.assertFalse(parsed.in_fence(content.index("after")))
+        self.assertTrue(parsed.in_fence(content.index("more")))
+
+    def test_fence_check_and_render_share_one_parse(self):
+        content = "Some **bold** text\n```\ncode\n```\n"
+        with self._count_parses() as parse:
+            fenced_code_ranges(content)
+            html = render_markdown_html(content)
+        parse.assert_called_once()
+        self.assertIn("<strong>bold</strong>", html)
+
+    def test_render_parses_text_after_link_rendering(self):
+        """Text with links renders from its own parse of the rendered text."""
+        machine = create_machine()
+        content = f"See [[machine:id:{machine.pk}]]\n```\ncode\n```\n"
+        with self._count_parses() as parse:
+            fenced_code_ranges(content)
+            html = markdown._render_markdown_uncached(content)
+        self.assertEqual(parse.call_count, 2)
+        self.assertIn(machine.name, html)
+
+    def test_shared_parse_is_immutable(self):
+        parsed = parse_markdown("```\ncode\n```\n")
+        with self.assertRaises(FrozenInstanceError):
+            parsed.fence_ranges = ()  # type: ignore[misc]
+        with self.assertRaises(TypeError):
+            parsed.env["references"] = {}  # type: ignore[index]
+        self.assertIsInstance(parsed.tokens, tuple)
+
+    def test_render_matches_markdown_it(self):
+        content = "# Title\n\n- item\n\n```python\nx = 1\n```\n"
+        self.assertEqual(parse_markdown(content).render(), markdown._md.render(content))
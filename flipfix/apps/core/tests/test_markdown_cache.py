@@ -0,0 +1,135 @@
+"""Tests for the persisted rendered-markdown cache."""
+
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings, tag
+from django.utils import timezone
+
+from flipfix.apps.core import markdown
+from flipfix.apps.core.markdown import render_markdown_html
+from flipfix.apps.core.markdown_cache import get_store
+from flipfix.apps.core.markdown_links import sync_references
+from flipfix.apps.core.models import FeedEntry
+from flipfix.apps.core.test_utils import create_log_entry, create_machine
+from flipfix.apps.wiki.models import WikiPage, WikiPageTag
+
+LOCMEM_CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "markdown": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "markdown-cache-tests",
+    },
+}
+
+
+@tag("models")
+@override_settings(CACHES=LOCMEM_CACHES)
+class MarkdownCacheTests(TestCase):
+    """Tests for cache hits and link target invalidation."""
+
+    def setUp(self):
+        get_store().clear()
+        self.machine = create_machine(name="Gorgar")
+        self.source = create_log_entry(machine=self.machine)
+
+    def _link(self, text):
+        """Record the source's references, as every markdown save path does."""
+        sync_references(self.source, text)
+        return text
+
+    def _count_renders(self):
+        return patch.object(
+            markdown, "_render_markdown_uncached", wraps=markdown._render_markdown_uncached
+        )
+
+    def test_repeat_render_is_a_cache_hit(self):
+        """The second render of the same text skips the pipeline and link lookups."""
+        text = self._link(f"**Fixed** [[machine:id:{self.machine.pk}]]")
+        first = render_markdown_html(text)
+
+        with self._count_renders() as render, self.assertNumQueries(0):
+            second = render_markdown_html(text)
+
+        render.assert_not_called()
+        self.assertEqual(second, first)
+
+    def test_machine_rename_invalidates_linking_text(self):
+        """Renaming a linked machine re-renders text that links to it."""
+        text = self._link(f"See [[machine:id:{self.machine.pk}]]")
+        self.assertIn("Gorgar", render_markdown_html(text))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.machine.name = "Gorgar (Rebuilt)"
+            self.machine.save()
+
+        self.assertIn("Gorgar (Rebuilt)", render_markdown_html(text))
+
+    def test_deleted_target_renders_broken_link(self):
+        """Deleting a linked record re-renders it as a broken link."""
+        target = create_log_entry(machine=self.machine, text="Old log")
+        text = self._link(f"See [[log:{target.pk}]]")
+        render_markdown_html(text)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            target.delete()
+
+        self.assertIn("broken link", render_markdown_html(text))
+
+    def test_rename_invalidates_text_without_references(self):
+        """Text rendered without sync_references(), like the front page, still updates."""
+        text = f"Featured: [[machine:id:{self.machine.pk}]]"
+        self.assertIn("Gorgar", render_markdown_html(text))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.machine.name = "Gorgar (Rebuilt)"
+            self.machine.save()
+
+        self.assertIn("Gorgar (Rebuilt)", render_markdown_html(text))
+
+    def test_unrelated_renderings_stay_cached(self):
+        """Saving a target leaves renderings that don't link to it cached."""
+        other = create_machine(name="Paragon")
+        text = self._link(f"See [[machine:id:{other.pk}]]")
+        render_markdown_html(text)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.machine.name = "Renamed"
+            self.machine.save()
+
+        with self._count_renders() as render:
+            render_markdown_html(text)
+        render.assert_not_called()
+
+    def test_only_link_target_models_are_checked(self):
+        """Saving a model no link type points at doesn't run the invalidation receiver."""
+        with patch("flipfix.apps.core.markdown_links.get_all_link_types") as get_types:
+            FeedEntry.objects.update_or_create(
+                entry_type="log", object_id=self.source.pk, defaults={"occurred_at": timezone.now()}
+            )
+            get_types.assert_not_called()
+
+            self.machine.save()
+            get_types.assert_called()
+
+    def test_wiki_title_change_invalidates_page_links(self):
+        """Page labels come from WikiPage, so retitling invalidates its tags' links."""
+        page = WikiPage.objects.create(title="Coil Chart", slug="coil-chart")
+        page_tag = WikiPageTag.objects.create(page=page, tag="docs", slug="coil-chart")
+        text = self._link(f"See [[page:id:{page_tag.pk}]]")
+        self.assertIn("Coil Chart", render_markdown_html(text))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            page.title = "Coil Reference"
+            page.save()
+
+        self.assertIn("Coil Reference", render_markdown_html(text))
+
+    def test_authoring_format_links_bypass_cache(self):
+        """Unconverted [[machine:slug]] links always render fresh."""
+        text = f"See [[machine:{self.machine.slug}]]"
+        render_markdown_html(text)
+
+        with self._count_renders() as render:
+            render_markdown_html(text)
+
+        render.assert_called_once()
@@ -2,18 +2,24 @@
 
 from unittest.mock import patch
 
+from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, tag
+from django.template import Context, Template
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
 
 from flipfix.apps.core.media import ALLOWED_MEDIA_EXTENSIONS, ALLOWED_PHOTO_EXTENSIONS
 from flipfix.apps.core.media_upload import attach_media_files
+from flipfix.apps.core.models import MediaBlob
 from flipfix.apps.core.test_utils import (
+    SuppressRequestLogsMixin,
     TemporaryMediaMixin,
     TestDataMixin,
     create_log_entry,
     create_part_request,
     create_part_request_update,
     create_problem_report,
+    create_uploaded_image,
 )
 from flipfix.apps.maintenance.models import LogEntryMedia, ProblemReportMedia
 from flipfix.apps.parts.models import PartRequestMedia, PartRequestUpdateMedia
@@ -130,6 +136,373 @@ class AttachMediaFilesTests(TestDataMixin, TestCase):
         mock_enqueue.assert_called_once()
 
 
+@tag("models")
+@override_settings(PHOTO_PROCESSING_ASYNC=True)
+class AttachMediaFilesAsyncPhotoTests(TemporaryMediaMixin, TestDataMixin, TestCase):
+    """Tests for attach_media_files with photo processing queued on the worker."""
+
+    def setUp(self):
+        super().setUp()
+        self.log_entry = create_log_entry(machine=self.machine, text="Test")
+
+    def _upload(self, size=(3000, 2000)):
+        image = create_uploaded_image(name="big.jpg", size=size)
+        return SimpleUploadedFile("big.jpg", image.read(), content_type="image/jpeg")
+
+    @patch("flipfix.apps.core.media_upload.enqueue_photo_processing")
+    def test_stores_original_and_enqueues_processing(self, mock_enqueue):
+        """The original is stored unresized, without a thumbnail, and queued."""
+        upload = self._upload()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            (media,) = attach_media_files(
+                media_files=[upload], parent=self.log_entry, media_model=LogEntryMedia
+            )
+
+        media.refresh_from_db()
+        self.assertEqual(media.transcode_status, LogEntryMedia.TranscodeStatus.PENDING)
+        self.assertFalse(media.thumbnail_file)
+        self.assertEqual(media.file.size, upload.size)
+        self.assertTrue(media.is_photo_processing)
+        mock_enqueue.assert_called_once_with(media_id=media.id, model_name="LogEntryMedia")
+
+    @patch("flipfix.apps.core.media_upload.enqueue_photo_processing")
+    @patch("flipfix.apps.core.media_upload.enqueue_transcode")
+    def test_videos_still_transcode(self, mock_transcode, mock_photo):
+        video = SimpleUploadedFile("clip.mp4", b"fake video", content_type="video/mp4")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            attach_media_files(
+                media_files=[video], parent=self.log_entry, media_model=LogEntryMedia
+            )
+
+        mock_transcode.assert_called_once()
+        mock_photo.assert_not_called()
+
+    def test_synchronous_photo_is_not_processing(self):
+        """Photos resized on upload have a thumbnail, whatever their status default."""
+        media = LogEntryMedia.objects.create(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=self._upload(size=(100, 100)),
+        )
+
+        self.assertEqual(media.transcode_status, LogEntryMedia.TranscodeStatus.PENDING)
+        self.assertTrue(media.thumbnail_file)
+        self.assertFalse(media.is_photo_processing)
+
+
+@tag("models")
+class MediaDeduplicationTests(TemporaryMediaMixin, TestDataMixin, TestCase):
+    """Tests for identical uploads sharing one stored, processed copy."""
+
+    def setUp(self):
+        super().setUp()
+        self.image_bytes = create_uploaded_image(size=(200, 150)).read()
+        self.log_entry = create_log_entry(machine=self.machine, text="First")
+        self.other_entry = create_log_entry(machine=self.machine, text="Second")
+
+    def _attach(self, parent, content=None, name="photo.jpg", content_type="image/jpeg"):
+        upload = SimpleUploadedFile(name, content or self.image_bytes, content_type=content_type)
+        (media,) = attach_media_files(
+            media_files=[upload], parent=parent, media_model=LogEntryMedia
+        )
+        return media
+
+    def _delete(self, media):
+        self.client.force_login(self.maintainer_user)
+        url = reverse("log-detail", kwargs={"pk": media.log_entry.pk})
+        response = self.client.post(url, {"action": "delete_media", "media_id": media.id})
+        self.assertEqual(response.status_code, 200)
+
+    def test_identical_photo_reuses_stored_files(self):
+        """A second upload of the same bytes points at the first upload's files."""
+        first = self._attach(self.log_entry)
+        second = self._attach(self.other_entry)
+
+        self.assertNotEqual(first.pk, second.pk)
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(second.thumbnail_file.name, first.thumbnail_file.name)
+        self.assertEqual(second.variants, first.variants)
+        blob = MediaBlob.objects.get(content_hash=first.content_hash)
+        self.assertEqual(blob.ref_count, 2)
+        self.assertEqual(second.blob, blob)
+
+    def test_different_photos_are_stored_separately(self):
+        first = self._attach(self.log_entry)
+        other_bytes = create_uploaded_image(size=(150, 200)).read()
+        second = self._attach(self.other_entry, content=other_bytes)
+
+        self.assertNotEqual(second.content_hash, first.content_hash)
+        self.assertNotEqual(second.file.name, first.file.name)
+        self.assertEqual(MediaBlob.objects.count(), 2)
+
+    @patch("flipfix.apps.core.media_upload.enqueue_transcode")
+    def test_video_is_reused_only_once_transcoded(self, mock_enqueue):
+        """A pending video has no blob, so an identical upload is transcoded too."""
+        first = self._attach(self.log_entry, b"video", "clip.mp4", "video/mp4")
+        second = self._attach(self.other_entry, b"video", "clip.mp4", "video/mp4")
+
+        self.assertIsNone(first.blob_id)
+        self.assertNotEqual(second.file.name, first.file.name)
+        self.assertEqual(MediaBlob.objects.count(), 0)
+
+    def test_deleting_shared_media_keeps_files_until_last_reference(self):
+        first = self._attach(self.log_entry)
+        second = self._attach(self.other_entry)
+        file_name = first.file.name
+
+        self._delete(first)
+
+        self.assertTrue(default_storage.exists(file_name))
+        self.assertEqual(MediaBlob.objects.get().ref_count, 1)
+
+        self._delete(second)
+
+        self.assertFalse(default_storage.exists(file_name))
+        self.assertFalse(MediaBlob.objects.exists())
+
+
+@tag("views")
+class TranscodeStatusPhotoTests(TemporaryMediaMixin, TestDataMixin, TestCase):
+    """Tests for photo readiness in the transcode status API."""
+
+    def setUp(self):
+        super().setUp()
+        self.log_entry = create_log_entry(machine=self.machine, text="Test")
+        self.media = LogEntryMedia(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=SimpleUploadedFile("big.jpg", b"original", content_type="image/jpeg"),
+            transcode_status=LogEntryMedia.TranscodeStatus.PENDING,
+        )
+        self.media.save(process_photo=False)
+        self.client.force_login(self.maintainer_user)
+
+    def _status(self):
+        response = self.client.get(
+            reverse("api-transcoding-status"),
+            {"ids": str(self.media.id), "models": "LogEntryMedia"},
+        )
+        return response.json()[str(self.media.id)]
+
+    def test_queued_photo_reports_pending(self):
+        self.assertEqual(self._status(), {"status": "pending"})
+
+    def test_processed_photo_reports_urls(self):
+        self.media.thumbnail_file = SimpleUploadedFile(
+            "thumb.jpg", b"thumb", content_type="image/jpeg"
+        )
+        self.media.transcode_status = LogEntryMedia.TranscodeStatus.READY
+        self.media.save(process_photo=False)
+
+        status = self._status()
+
+        self.assertEqual(status["status"], "ready")
+        self.assertEqual(status["photo_url"], self.media.file.url)
+        self.assertEqual(status["thumbnail_url"], self.media.thumbnail_file.url)
+
+    def test_failed_photo_reports_failed(self):
+        """A failed photo isn't swapped for its original, which may not display (HEIC)."""
+        self.media.transcode_status = LogEntryMedia.TranscodeStatus.FAILED
+        self.media.save()
+
+        self.assertEqual(self._status(), {"status": "failed"})
+
+    def test_failed_photo_renders_failed_placeholder(self):
+        self.media.transcode_status = LogEntryMedia.TranscodeStatus.FAILED
+        self.media.save()
+
+        response = self.client.get(reverse("log-detail", args=[self.log_entry.pk]))
+
+        self.assertContains(response, "Photo processing failed.")
+        self.assertNotContains(response, self.media.file.url)
+
+    def test_pending_photo_renders_polling_placeholder(self):
+        response = self.client.get(reverse("log-detail", args=[self.log_entry.pk]))
+
+        self.assertContains(response, f'data-media-poll-id="{self.media.id}"')
+        self.assertContains(response, "Processing photo...")
+
+
+@tag("views")
+class TranscodeStatusVideoTests(
+    TemporaryMediaMixin, SuppressRequestLogsMixin, TestDataMixin, TestCase
+):
+    """Tests for video transcode progress in the status API."""
+
+    def setUp(self):
+        super().setUp()
+        self.log_entry = create_log_entry(machine=self.machine, text="Test")
+        self.media = LogEntryMedia.objects.create(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.VIDEO,
+            file=SimpleUploadedFile("clip.mp4", b"video", content_type="video/mp4"),
+            transcode_status=LogEntryMedia.TranscodeStatus.PROCESSING,
+            transcode_progress=42,
+            transcode_eta_seconds=35,
+        )
+        self.params = {"ids": str(self.media.id), "models": "LogEntryMedia"}
+        self.client.force_login(self.maintainer_user)
+
+    def test_processing_video_reports_progress(self):
+        response = self.client.get(reverse("api-transcoding-status"), self.params)
+
+        self.assertEqual(
+            response.json()[str(self.media.id)],
+            {"status": "processing", "progress": 42, "eta_seconds": 35},
+        )
+
+    def test_ready_video_with_hls_plays_it_before_the_mp4(self):
+        self.media.transcode_status = LogEntryMedia.TranscodeStatus.READY
+        self.media.transcoded_file = "log_entries/1/video.mp4"
+        self.media.hls_playlist = "log_entries/1/abc-hls/master.m3u8"
+        self.media.save()
+
+        response = self.client.get(reverse("api-transcoding-status"), self.params)
+        html = Template("{% load video_tags %}{% video_player media %}").render(
+            Context({"media": self.media})
+        )
+
+        status = response.json()[str(self.media.id)]
+        self.assertEqual(status["hls_url"], self.media.hls_playlist.url)
+        self.assertLess(html.index("application/vnd.apple.mpegurl"), html.index("video/mp4"))
+
+    def test_lookups_are_batched_per_model(self):
+        """However many items are polled, each media model is queried once."""
+        videos = [self.media] + [
+            LogEntryMedia.objects.create(
+                log_entry=self.log_entry,
+                media_type=LogEntryMedia.MediaType.VIDEO,
+                file=SimpleUploadedFile(f"clip{i}.mp4", b"video", content_type="video/mp4"),
+            )
+            for i in range(3)
+        ]
+        part_media = PartRequestMedia.objects.create(
+            part_request=create_part_request(machine=self.machine),
+            media_type=PartRequestMedia.MediaType.VIDEO,
+            file=SimpleUploadedFile("part.mp4", b"video", content_type="video/mp4"),
+        )
+        ids = [str(v.id) for v in videos] + [str(part_media.id), "999999"]
+        models = ["LogEntryMedia"] * 4 + ["PartRequestMedia", "LogEntryMedia"]
+
+        # Session, user and permissions, then one query per media model
+        with self.assertNumQueries(6):
+            response = self.client.get(
+                reverse("api-transcoding-status"),
+                {"ids": ",".join(ids), "models": ",".join(models)},
+            )
+
+        data = response.json()
+        self.assertEqual(len(data), 5)  # Part request media shares an ID with a log entry's
+        self.assertEqual(data["999999"]["message"], "Media not found")
+
+    def test_unchanged_poll_gets_not_modified(self):
+        url = reverse("api-transcoding-status")
+        first = self.client.get(url, self.params)
+        self.assertTrue(first["Last-Modified"])
+
+        unchanged = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.content, b"")
+
+        self.media.transcode_progress = 50
+        self.media.save()
+        changed = self.client.get(url, self.params, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertEqual(changed.json()[str(self.media.id)]["progress"], 50)
+
+
+@tag("models")
+@override_settings(PHOTO_VARIANT_SIZES=[320, 640], PHOTO_VARIANT_FORMATS=["AVIF", "WEBP", "JPEG"])
+class ResponsivePhotoVariantTests(TemporaryMediaMixin, TestDataMixin, TestCase):
+    """Tests for responsive variants made on save and the responsive_photo tag."""
+
+    def setUp(self):
+        super().setUp()
+        self.log_entry = create_log_entry(machine=self.machine, text="Photo entry")
+
+    def _photo(self, size=(1600, 1200)):
+        data = create_uploaded_image(size=size).read()
+        return LogEntryMedia.objects.create(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=SimpleUploadedFile("photo.jpg", data, content_type="image/jpeg"),
+        )
+
+    def _render(self, media):
+        template = Template("{% load video_tags %}{% responsive_photo media alt='Flipper' %}")
+        return template.render(Context({"media": media}))
+
+    def test_save_stores_variants_next_to_photo(self):
+        media = self._photo()
+
+        self.assertEqual(
+            [(v["type"], v["width"], v["height"]) for v in media.variants],
+            [
+                ("image/avif", 640, 480),
+                ("image/webp", 640, 480),
+                ("image/jpeg", 640, 480),
+                ("image/avif", 320, 240),
+                ("image/webp", 320, 240),
+                ("image/jpeg", 320, 240),
+            ],
+        )
+        storage = media.file.storage
+        for variant in media.variants:
+            self.assertTrue(storage.exists(variant["name"]))
+            self.assertTrue(variant["name"].startswith(f"log_entries/{self.log_entry.pk}/"))
+
+    def test_small_photo_is_not_upscaled(self):
+        media = self._photo(size=(400, 300))
+
+        self.assertEqual({v["width"] for v in media.variants}, {320, 400})
+
+    def test_no_jpeg_variant_duplicates_the_photo(self):
+        """The photo itself is the full-size JPEG, so no variant repeats it."""
+        media = self._photo(size=(400, 300))
+
+        self.assertEqual(
+            [(v["type"], v["width"]) for v in media.variants],
+            [
+                ("image/avif", 400),
+                ("image/webp", 400),
+                ("image/avif", 320),
+                ("image/webp", 320),
+                ("image/jpeg", 320),
+            ],
+        )
+
+    def test_tag_renders_picture_with_sources_and_fallback(self):
+        media = self._photo()
+        html = self._render(media)
+
+        self.assertIn("<picture>", html)
+        self.assertLess(html.index('type="image/avif"'), html.index('type="image/webp"'))
+        self.assertIn("-320w.webp 320w, ", html)
+        self.assertIn(f'src="{media.thumbnail_file.url}"', html)
+        self.assertRegex(html, r'<img [^>]*srcset="[^"]*-320w\.jpg 320w, [^"]*-640w\.jpg 640w"')
+        self.assertIn('sizes="120px"', html)
+        self.assertIn('alt="Flipper"', html)
+
+    @override_settings(PHOTO_VARIANT_SIZES=[])
+    def test_tag_without_variants_renders_plain_img(self):
+        media = self._photo()
+        html = self._render(media)
+
+        self.assertEqual(media.variants, [])
+        self.assertNotIn("<picture>", html)
+        self.assertIn(f'<img src="{media.thumbnail_file.url}" alt="Flipper">', html)
+
+    def test_media_grid_uses_variants(self):
+        self._photo()
+        self.client.force_login(self.maintainer_user)
+
+        response = self.client.get(reverse("log-detail", args=[self.log_entry.pk]))
+
+        self.assertContains(response, '<source type="image/webp"')
+
+
 @tag("models")
 class AbstractMediaStrTests(TemporaryMediaMixin, TestDataMixin, TestCase):
     """Tests for AbstractMedia.__str__ across all concrete subclasses."""
@@ -44,6 +44,15 @@ class ServeMediaViewTests(SuppressRequestLogsMixin, TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response["Content-Type"], "image/jpeg")
 
+    def test_serves_hls_segment_as_mpeg_ts(self):
+        """.ts is an HLS segment here, whatever the system's MIME table says."""
+        (self.media_root / "360p_000.ts").write_bytes(b"G")
+        with override_settings(MEDIA_ROOT=self.media_root):
+            response = self.client.get("/media/360p_000.ts")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "video/mp2t")
+
     def test_serves_file_with_cache_control_header(self):
         """Media files include immutable Cache-Control header for 1 year."""
         with override_settings(MEDIA_ROOT=self.media_root):
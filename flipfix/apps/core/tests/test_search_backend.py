@@ -0,0 +1,346 @@
+"""Tests for stored search documents and the pluggable search backends."""
+
+from io import StringIO
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import TestCase, override_settings, tag
+from django.urls import reverse
+
+from flipfix.apps.accounts.models import Maintainer
+from flipfix.apps.core.models import SearchDocument
+from flipfix.apps.core.search import (
+    SNIPPET_END,
+    SNIPPET_START,
+    FullTextSearchBackend,
+    IContainsSearchBackend,
+    SqliteSearchBackend,
+    get_search_backend,
+    rebuild_search_documents,
+)
+from flipfix.apps.core.templatetags.list_tags import search_snippet
+from flipfix.apps.core.test_utils import (
+    TestDataMixin,
+    create_log_entry,
+    create_machine,
+    create_maintainer_user,
+    create_part_request,
+    create_part_request_update,
+    create_problem_report,
+)
+from flipfix.apps.maintenance.models import LogEntry, ProblemReport
+from flipfix.apps.parts.models import PartRequest, PartRequestUpdate
+
+
+def _document(obj):
+    return SearchDocument.objects.get(
+        content_type=ContentType.objects.get_for_model(obj), object_id=obj.pk
+    )
+
+
+@tag("models")
+class SearchDocumentSyncTests(TestDataMixin, TestCase):
+    """Tests that saves, deletes, and M2M changes keep documents current."""
+
+    def test_create_builds_own_and_linked_text(self):
+        """A log entry's document holds its text and its problem report's text."""
+        problem = create_problem_report(machine=self.machine, description="Left flipper weak")
+        log = create_log_entry(machine=self.machine, text="Rebuilt coil", problem_report=problem)
+
+        document = _document(log)
+        self.assertIn("Rebuilt coil", document.text)
+        self.assertIn("Left flipper weak", document.linked_text)
+
+    def test_child_save_refreshes_parent(self):
+        """Adding a log entry updates its problem report's linked text."""
+        problem = create_problem_report(machine=self.machine)
+        create_log_entry(machine=self.machine, text="Replaced fuse", problem_report=problem)
+
+        self.assertIn("Replaced fuse", _document(problem).linked_text)
+
+    def test_moving_child_refreshes_old_parent(self):
+        """Reassigning a log entry drops its text from the old report's document."""
+        old = create_problem_report(machine=self.machine)
+        new = create_problem_report(machine=self.machine)
+        log = create_log_entry(machine=self.machine, text="Moved log", problem_report=old)
+
+        log.problem_report = new
+        log.save()
+
+        self.assertNotIn("Moved log", _document(old).linked_text)
+        self.assertIn("Moved log", _document(new).linked_text)
+
+    def test_maintainer_added_after_create(self):
+        """M2M changes to maintainers are picked up."""
+        self.maintainer_user.first_name = "Zebediah"
+        self.maintainer_user.save()
+        log = create_log_entry(machine=self.machine)
+
+        log.maintainers.add(self.maintainer)
+
+        self.assertIn("Zebediah", _document(log).text)
+
+    def test_renaming_user_refreshes_documents_naming_them(self):
+        """A user's new name is searchable in their records and linked records."""
+        problem = create_problem_report(machine=self.machine)
+        log = create_log_entry(machine=self.machine, problem_report=problem)
+        log.maintainers.add(self.maintainer)
+
+        self.maintainer_user.last_name = "Quimby"
+        self.maintainer_user.save()
+
+        self.assertIn("Quimby", _document(log).text)
+        self.assertIn("Quimby", _document(problem).linked_text)
+
+    def test_last_login_update_does_not_reindex(self):
+        log = create_log_entry(machine=self.machine)
+        log.maintainers.add(self.maintainer)
+
+        with self.assertNumQueries(1):
+            self.maintainer_user.save(update_fields=["last_login"])
+
+    def test_delete_removes_document_and_refreshes_parent(self):
+        """Deleting a record removes its document and its text from linked documents."""
+        part_request = create_part_request(machine=self.machine)
+        update = create_part_request_update(part_request=part_request, text="Ordered spare")
+        update_pk = update.pk
+
+        update.delete()
+
+        self.assertFalse(
+            SearchDocument.objects.filter(
+                content_type=ContentType.objects.get_for_model(update), object_id=update_pk
+            ).exists()
+        )
+        self.assertNotIn("Ordered spare", _document(part_request).linked_text)
+
+
+@tag("models")
+class FullTextSearchTests(TestDataMixin, TestCase):
+    """Tests for search semantics under the SQLite FTS5 backend."""
+
+    def test_test_settings_use_fulltext(self):
+        """The default backend on SQLite is FTS5."""
+        self.assertIsInstance(get_search_backend(), SqliteSearchBackend)
+
+    def test_backend_missing_a_hook_cannot_be_created(self):
+        """A backend that doesn't implement every hook fails when created, not when searching."""
+
+        class MatchOnlyBackend(FullTextSearchBackend):
+            def _matching_documents(self, content_type, terms, linked):
+                return SearchDocument.objects.none()
+
+        with self.assertRaises(TypeError):
+            MatchOnlyBackend()
+
+    def test_word_prefix_match(self):
+        """Each query word matches as a prefix of a document word."""
+        log = create_log_entry(machine=self.machine, text="Flipper coil replaced")
+        create_log_entry(machine=self.machine, text="Cleaned playfield")
+
+        self.assertEqual(list(LogEntry.objects.search("flip repl")), [log])
+
+    def test_partial_word_matches_as_substring(self):
+        """Mid-word fragments of machine or part names still match, ranked after word matches."""
+        log = create_log_entry(machine=self.machine, text="Gorgar speech board reseated")
+
+        results = LogEntry.objects.search("orgar")
+
+        self.assertEqual(list(results), [log])
+        self.assertEqual(results.get().search_rank, 0.0)
+        self.assertFalse(LogEntry.objects.search("orgar board missing").exists())
+
+    def test_all_words_required_across_sections(self):
+        """Words may match own and linked text, but all must match."""
+        problem = create_problem_report(machine=self.machine, description="Drop target stuck")
+        log = create_log_entry(machine=self.machine, text="Adjusted", problem_report=problem)
+
+        self.assertEqual(list(LogEntry.objects.search("adjusted target")), [log])
+        self.assertFalse(LogEntry.objects.search("adjusted missing").exists())
+
+    def test_scoped_search_ignores_linked_text(self):
+        """search_for_problem_report() matches only the log's own text."""
+        problem = create_problem_report(machine=self.machine, description="Ball stuck")
+        create_log_entry(machine=self.machine, text="Checked", problem_report=problem)
+
+        self.assertTrue(LogEntry.objects.search_for_machine("stuck").exists())
+        self.assertFalse(LogEntry.objects.search_for_problem_report("stuck").exists())
+
+    def test_machine_name_matches_as_substring(self):
+        """Machine names are matched directly, not through the document."""
+        machine = create_machine(name="Eight Ball Deluxe")
+        report = create_problem_report(machine=machine, description="Nothing relevant")
+
+        self.assertEqual(list(ProblemReport.objects.search("ball delu")), [report])
+
+    def test_results_ranked_by_relevance(self):
+        """Own-text matches outrank matches on linked records."""
+        linked_only = create_part_request(machine=self.machine, text="Rubber rings")
+        create_part_request_update(part_request=linked_only, text="Ordered from Marco")
+        own = create_part_request(machine=self.machine, text="Marco order for posts")
+
+        results = PartRequest.objects.search("marco").order_by("-search_rank")
+
+        self.assertEqual(list(results), [own, linked_only])
+
+    def test_query_without_words_falls_back_to_icontains(self):
+        """Punctuation-only queries still match by substring."""
+        log = create_log_entry(machine=self.machine, text="Score reel ++ fixed")
+
+        self.assertEqual(list(LogEntry.objects.search("++")), [log])
+
+
+@tag("models")
+@override_settings(SEARCH_BACKEND="icontains")
+class IContainsSearchTests(TestDataMixin, TestCase):
+    """Tests for the substring fallback backend."""
+
+    def test_backend_selected_by_setting(self):
+        """SEARCH_BACKEND=icontains selects the substring backend."""
+        self.assertIsInstance(get_search_backend(), IContainsSearchBackend)
+
+    def test_substring_match(self):
+        """Mid-word substrings match."""
+        log = create_log_entry(machine=self.machine, text="Flipper coil replaced")
+
+        self.assertEqual(list(LogEntry.objects.search("lipp")), [log])
+
+
+@tag("models")
+class SearchHighlightTests(TestDataMixin, TestCase):
+    """Tests for search_with_highlights() and the search_snippet filter."""
+
+    def test_snippet_marks_matched_words(self):
+        """Each result gets a database-computed excerpt with matches marked."""
+        create_log_entry(machine=self.machine, text="Replaced the left flipper coil today")
+
+        (log,) = LogEntry.objects.search_with_highlights("flip")
+
+        self.assertIn(f"{SNIPPET_START}flipper{SNIPPET_END}", log.search_snippet)
+
+    def test_snippet_is_rendered_body_only(self):
+        """Snippets show the body as it reads, without markdown, link tokens or names."""
+        create_problem_report(
+            machine=self.machine,
+            description=f"Replaced **flipper** coil, see [[machine:id:{self.machine.pk}]]",
+            reported_by_user=self.maintainer_user,
+        )
+
+        (report,) = ProblemReport.objects.search_with_highlights("flipper")
+
+        self.assertIn(f"{SNIPPET_START}flipper{SNIPPET_END} coil", report.search_snippet)
+        self.assertIn(self.machine.short_display_name, report.search_snippet)
+        self.assertNotIn("**", report.search_snippet)
+        self.assertNotIn("[[", report.search_snippet)
+        self.assertNotIn(self.maintainer_user.username, report.search_snippet)
+        self.assertNotIn(ProblemReport.Status.OPEN, report.search_snippet)
+
+    def test_linked_match_excerpts_own_text(self):
+        """A match on a linked record still excerpts the record's own text."""
+        part_request = create_part_request(machine=self.machine, text="Rubber rings")
+        create_part_request_update(part_request=part_request, text="Shipped by Marco")
+
+        (result,) = PartRequest.objects.search_with_highlights("marco")
+
+        self.assertIn("Rubber rings", result.search_snippet)
+        self.assertNotIn(SNIPPET_START, result.search_snippet)
+
+    @override_settings(SEARCH_BACKEND="icontains")
+    def test_icontains_backend_has_no_snippet(self):
+        """Without a full-text backend, snippets are None and cards show full text."""
+        create_log_entry(machine=self.machine, text="Flipper coil")
+
+        (log,) = LogEntry.objects.search_with_highlights("flip")
+
+        self.assertIsNone(log.search_snippet)
+
+    def test_filter_escapes_text_and_marks_matches(self):
+        """The search_snippet filter escapes HTML and renders only the markers as tags."""
+        html = search_snippet(f"<b>{SNIPPET_START}coil{SNIPPET_END}</b>")
+
+        self.assertEqual(html, "&lt;b&gt;<mark>coil</mark>&lt;/b&gt;")
+
+    def test_global_feed_search_renders_snippets(self):
+        """Searched feed cards show the highlighted excerpt."""
+        create_log_entry(machine=self.machine, text="Adjusted the slingshot switch")
+        self.client.force_login(self.maintainer_user)
+
+        response = self.client.get(reverse("home"), {"q": "slingshot"})
+
+        self.assertContains(response, "<mark>slingshot</mark>")
+
+
+@tag("models")
+class SearchQueryPlanTests(TestDataMixin, TestCase):
+    """Regression tests: search reaches to-many relations via EXISTS, never DISTINCT."""
+
+    SEARCHES = [
+        (ProblemReport, ("search", "search_for_machine")),
+        (LogEntry, ("search", "search_for_machine", "search_for_problem_report")),
+        (PartRequest, ("search", "search_for_machine")),
+        (PartRequestUpdate, ("search", "search_for_machine", "search_for_part_request")),
+    ]
+
+    def test_no_distinct_in_generated_sql(self):
+        """No search method, under either backend, emits SELECT DISTINCT."""
+        for backend in ("icontains", "fulltext"):
+            for model, methods in self.SEARCHES:
+                for method in methods:
+                    with (
+                        self.subTest(backend=backend, model=model.__name__, method=method),
+                        override_settings(SEARCH_BACKEND=backend),
+                    ):
+                        sql = str(getattr(model.objects, method)("coil").query)
+                        self.assertNotIn("DISTINCT", sql.upper())
+
+    @override_settings(SEARCH_BACKEND="icontains")
+    def test_many_matching_children_return_parent_once(self):
+        """A parent with several matching children and maintainers appears once."""
+        problem = create_problem_report(machine=self.machine, description="Coil problem")
+        other = create_maintainer_user(first_name="Coil")
+        for text in ("Coil one", "Coil two"):
+            log = create_log_entry(machine=self.machine, text=text, problem_report=problem)
+            log.maintainers.add(self.maintainer, Maintainer.objects.get(user=other))
+        part_request = create_part_request(machine=self.machine, text="Coil")
+        create_part_request_update(part_request=part_request, text="Coil ordered")
+        create_part_request_update(part_request=part_request, text="Coil shipped")
+
+        self.assertEqual(list(ProblemReport.objects.search("coil")), [problem])
+        self.assertEqual(LogEntry.objects.search_for_machine("coil").count(), 2)
+        self.assertEqual(list(PartRequest.objects.search("coil")), [part_request])
+
+
+@tag("models")
+class RebuildSearchDocumentsTests(TestDataMixin, TestCase):
+    """Tests for rebuild_search_documents() and its management command."""
+
+    def test_rebuild_restores_documents(self):
+        """Rebuild recreates documents from the source records."""
+        log = create_log_entry(machine=self.machine, text="Restored text")
+        SearchDocument.objects.all().delete()
+
+        counts = rebuild_search_documents()
+
+        self.assertEqual(counts["maintenance.LogEntry"], 1)
+        self.assertEqual(list(LogEntry.objects.search("restored")), [log])
+
+    def test_management_command(self):
+        """rebuild_search_index command reports the documents written."""
+        create_log_entry(machine=self.machine)
+        out = StringIO()
+
+        call_command("rebuild_search_index", stdout=out)
+
+        self.assertIn("maintenance.LogEntry: 1 indexed", out.getvalue())
+
+    def test_management_command_if_empty(self):
+        """--if-empty backfills missing documents and leaves existing ones alone."""
+        log = create_log_entry(machine=self.machine, text="Backfilled text")
+        SearchDocument.objects.all().delete()
+
+        call_command("rebuild_search_index", "--if-empty", stdout=StringIO())
+        self.assertEqual(list(LogEntry.objects.search("backfilled")), [log])
+
+        out = StringIO()
+        call_command("rebuild_search_index", "--if-empty", stdout=out)
+        self.assertIn("skipping", out.getvalue())
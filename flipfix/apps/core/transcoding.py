@@ -4,17 +4,36 @@ from __future__ import annotations
 
 import json
 import logging
+import mimetypes
 import os
+import shutil
 import subprocess
+import tarfile
 import tempfile
 import time
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import AbstractContextManager, ExitStack, contextmanager, nullcontext
+from dataclasses import dataclass
 from pathlib import Path
 
 import requests
 from decouple import config
+from django.conf import settings
+from django.core.files import File
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.utils import timezone
 from django_q.tasks import async_task
 
+from flipfix.apps.core.image_processing import (
+    MAX_IMAGE_DIMENSION,
+    THUMB_IMAGE_DIMENSION,
+    describe_image_variant,
+    resize_image_with_variants,
+)
+from flipfix.apps.core.media import HLS_CONTENT_TYPES, HLS_MASTER_PLAYLIST
 from flipfix.apps.core.models import get_media_model
+from flipfix.apps.core.task_lanes import FAST, SLOW, lane_cluster
 from flipfix.logging import bind_log_context, current_log_context, reset_log_context
 
 logger = logging.getLogger(__name__)
@@ -27,15 +46,99 @@ class TransferError(Exception):
 # Worker service settings for HTTP transfer
 DJANGO_WEB_SERVICE_URL = config("DJANGO_WEB_SERVICE_URL", default=None)
 TRANSCODING_UPLOAD_TOKEN = config("TRANSCODING_UPLOAD_TOKEN", default=None)
+# How the video worker gets sources and returns outputs: "http" through the web
+# service's API, or "storage" straight from media storage shared with it
+TRANSCODE_TRANSFER = config("TRANSCODE_TRANSFER", default="http")
 
 # FFmpeg encoding settings
 MAX_VIDEO_DIMENSION = 2400  # Maximum width/height to prevent huge output files
 # Allowlist of trusted binaries for subprocess calls
 TRUSTED_BINARIES = frozenset({"ffmpeg", "ffprobe"})
 VIDEO_CRF_QUALITY = "23"  # CRF quality (18-28 range, lower = better quality)
-VIDEO_PRESET = "medium"  # Encoding speed preset (slower = better compression)
 AUDIO_BITRATE = "128k"  # Audio bitrate
 POSTER_WIDTH = 320  # Thumbnail width in pixels
+POSTER_MAX_SEEK_SECONDS = 5.0  # Poster frame is taken 10% in, but no later than this
+# Threads per ffmpeg process; 0 lets ffmpeg decide (about one per CPU core)
+FFMPEG_THREADS = config("FFMPEG_THREADS", default=0, cast=int)
+# Encoding speed preset by source duration (slower = better compression), so
+# short clips compress well and long ones finish inside the task timeout
+VIDEO_PRESETS_BY_DURATION = ((60, "medium"), (300, "fast"))  # (max seconds, preset)
+VIDEO_PRESET_LONG = "veryfast"  # Longer than any of the above
+VIDEO_PRESET_UNKNOWN = "fast"  # When ffprobe couldn't read the duration
+TRANSCODE_PROGRESS_INTERVAL_SECONDS = 3.0  # Minimum time between progress saves
+# Videos at least this long also get HLS renditions, so players can start at a
+# low bitrate and adapt to the connection; 0 turns HLS off
+TRANSCODE_HLS_MIN_SECONDS = config("TRANSCODE_HLS_MIN_SECONDS", default=0, cast=int)
+# (height, video bits/s, audio bits/s, H.264 level); "height" is the short side,
+# so portrait videos get the same renditions, and renditions larger than the
+# source are skipped.  Levels allow 60fps, and are declared in the master playlist
+HLS_RENDITIONS = (
+    (360, 800_000, 96_000, 31),
+    (720, 2_800_000, 128_000, 32),
+    (1080, 5_000_000, 128_000, 42),
+)
+# RFC 6381 codec strings: H.264 Main (profile 0x4d, constraint_set1 as x264 sets
+# it) at a rendition's level, and AAC-LC
+HLS_VIDEO_CODEC = "avc1.4d40{level:02x}"
+HLS_AUDIO_CODEC = "mp4a.40.2"
+HLS_SEGMENT_SECONDS = 6
+SOURCE_COPY_BUFFER_SIZE = 1024 * 1024  # Bytes per read when copying a source out of storage
+# Bytes per read when downloading a source over HTTP
+TRANSCODE_DOWNLOAD_CHUNK_SIZE = config(
+    "TRANSCODE_DOWNLOAD_CHUNK_SIZE", default=1024 * 1024, cast=int
+)
+
+# Sources already in this form play in every browser, so they're only remuxed
+# (streams copied into a faststart MP4) instead of re-encoded
+REMUX_CONTAINERS = frozenset({"mov", "mp4"})  # Any of ffprobe's format_name aliases
+REMUX_VIDEO_PROFILES = frozenset({"Baseline", "Constrained Baseline", "Main", "High"})
+
+
+@dataclass(frozen=True)
+class VideoProbe:
+    """What ffprobe reports about a source video; None where it couldn't tell."""
+
+    duration_seconds: int | None = None
+    container: str | None = None  # ffprobe format_name, e.g. "mov,mp4,m4a,3gp,3g2,mj2"
+    video_codec: str | None = None
+    video_profile: str | None = None
+    pixel_format: str | None = None
+    width: int | None = None
+    height: int | None = None
+    rotation: int = 0  # Degrees the player turns the video, from its display matrix
+    audio_codec: str | None = None  # None when there's no audio stream
+
+    def display_size(self) -> tuple[int, int] | None:
+        """Return (width, height) the right way up, as ffmpeg outputs it, if known."""
+        if not self.width or not self.height:
+            return None
+        if self.rotation % 180:
+            return self.height, self.width
+        return self.width, self.height
+
+    def remux_blocker(self) -> str | None:
+        """Return why the video must be re-encoded, or None if remuxing is enough."""
+        if not REMUX_CONTAINERS.intersection((self.container or "").split(",")):
+            return f"container {self.container}"
+        if self.video_codec != "h264":
+            return f"video codec {self.video_codec}"
+        if self.video_profile not in REMUX_VIDEO_PROFILES:
+            return f"H.264 profile {self.video_profile}"
+        if self.pixel_format != "yuv420p":
+            return f"pixel format {self.pixel_format}"
+        if not self.width or not self.height:
+            return "unknown dimensions"
+        if max(self.width, self.height) > MAX_VIDEO_DIMENSION:
+            return f"dimensions {self.width}x{self.height}"
+        if self.audio_codec not in (None, "aac"):
+            return f"audio codec {self.audio_codec}"
+        return None
+
+
+# (filename, content, content type), as posted by requests
+UploadPart = tuple[str, bytes, str]
+# (form field, part) pairs; a list rather than a dict so a field can repeat
+UploadParts = list[tuple[str, UploadPart]]
 
 
 def _get_transcoding_config(
@@ -73,7 +176,7 @@ def _get_transcoding_config(
 
 def enqueue_transcode(media_id: int, model_name: str, *, async_runner=async_task) -> None:
     """
-    Enqueue a video transcoding job.
+    Enqueue a video transcoding job on the slow task lane.
 
     Args:
         media_id: ID of the media record
@@ -85,6 +188,7 @@ def enqueue_transcode(media_id: int, model_name: str, *, async_runner=async_task
         model_name,
         current_log_context(),
         timeout=600,
+        cluster=lane_cluster(SLOW),
     )
 
 
@@ -97,14 +201,23 @@ def transcode_video_job(
     probe=None,
     run_ffmpeg=None,
     upload=None,
+    transfer: MediaTransfer | None = None,
 ) -> None:
-    """Transcode video to H.264/AAC MP4, extract poster, upload to web service."""
+    """Transcode video to H.264/AAC MP4, extract poster, return both to the web service.
+
+    Sources that are already H.264/AAC within ``MAX_VIDEO_DIMENSION`` (most
+    phone videos) are remuxed into a faststart MP4 without re-encoding.
+    The path taken is recorded in the media's ``transcode_method``.  Videos
+    of ``TRANSCODE_HLS_MIN_SECONDS`` or more also get HLS renditions, in
+    the same ffmpeg run.
+
+    Files are moved by the ``MediaTransfer`` that ``TRANSCODE_TRANSFER``
+    selects; ``download`` and ``upload`` replace the HTTP transfer's.
+    """
     token = bind_log_context(**log_context) if log_context else None
 
-    download_fn = download or _download_source_file
-    probe_fn = probe or _probe_duration_seconds
+    probe_fn = probe or _probe_video
     run_ffmpeg_fn = run_ffmpeg or _run_ffmpeg
-    upload_fn = upload or _upload_transcoded_files
 
     try:
         media_model = get_media_model(model_name)
@@ -117,88 +230,83 @@ def transcode_video_job(
         logger.info("Transcode skipped for non-video media %s", media_id)
         return
 
-    # Validate HTTP transfer configuration
+    # Validate transfer configuration
     try:
-        web_service_url, upload_token = _get_transcoding_config()
+        transfer = transfer or _configured_transfer(download=download, upload=upload)
     except ValueError as e:
         logger.error("Transcode job %s aborted: %s", media_id, str(e))
         media.transcode_status = media_model.TranscodeStatus.FAILED
         media.save(update_fields=["transcode_status", "updated_at"])
         raise
 
-    logger.info("Transcoding video %s (%s) for HTTP transfer to web service", media_id, model_name)
+    logger.info("Transcoding video %s (%s) with %s transfer", media_id, model_name, transfer.name)
 
     media.transcode_status = media_model.TranscodeStatus.PROCESSING
-    media.save(update_fields=["transcode_status", "updated_at"])
+    media.transcode_progress = None
+    media.transcode_eta_seconds = None
+    media.save(
+        update_fields=[
+            "transcode_status",
+            "transcode_progress",
+            "transcode_eta_seconds",
+            "updated_at",
+        ]
+    )
 
-    tmp_source = None
     tmp_video = None
     tmp_poster = None
+    hls_dir = None
 
     try:
-        # Download source file from web service
-        tmp_source = download_fn(media_id, model_name, web_service_url, upload_token)
-        input_path = Path(tmp_source)
-
-        duration_seconds = probe_fn(input_path)
-        if duration_seconds is not None:
-            media.duration = duration_seconds
-            media.save(update_fields=["duration", "updated_at"])
-
-        tmp_video = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
-        run_ffmpeg_fn(
-            [
-                "ffmpeg",
-                "-i",
-                str(input_path),
-                "-vf",
-                f"scale=min(iw\\,{MAX_VIDEO_DIMENSION}):min(ih\\,{MAX_VIDEO_DIMENSION}):force_original_aspect_ratio=decrease",
-                "-c:v",
-                "libx264",
-                "-pix_fmt",
-                "yuv420p",
-                "-profile:v",
-                "main",
-                "-crf",
-                VIDEO_CRF_QUALITY,
-                "-preset",
-                VIDEO_PRESET,
-                "-c:a",
-                "aac",
-                "-b:a",
-                AUDIO_BITRATE,
-                "-movflags",
-                "+faststart",
-                "-y",
-                tmp_video.name,
-            ]
-        )
-
-        tmp_poster = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
-        run_ffmpeg_fn(
-            [
-                "ffmpeg",
-                "-i",
-                str(input_path),
-                "-vf",
-                f"thumbnail,scale={POSTER_WIDTH}:-2",
-                "-frames:v",
-                "1",
-                "-y",
-                tmp_poster.name,
-            ]
-        )
-
-        # Upload transcoded files to web service via HTTP
-        upload_fn(
+        with transfer.source(media, model_name) as input_path:
+            probed = probe_fn(input_path)
+            remux_blocker = probed.remux_blocker()
+            method = (
+                media_model.TranscodeMethod.ENCODE
+                if remux_blocker
+                else media_model.TranscodeMethod.REMUX
+            )
+            if probed.duration_seconds is not None:
+                media.duration = probed.duration_seconds
+            media.transcode_method = method
+            media.save(update_fields=["duration", "transcode_method", "updated_at"])
+
+            tmp_video = tempfile.NamedTemporaryFile(suffix=".mp4", delete=False)
+            tmp_poster = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
+            renditions = _hls_renditions(probed)
+            if renditions:
+                hls_dir = Path(tempfile.mkdtemp(prefix="hls-"))
+            command = _transcode_command(
+                input_path, probed, tmp_video.name, tmp_poster.name, hls_dir, renditions
+            )
+            started = time.monotonic()
+            if probed.duration_seconds:
+                progress = TranscodeProgress(media, probed.duration_seconds)
+                run_ffmpeg_fn(command, on_progress=progress)
+                progress.save(100, 0)
+            else:
+                run_ffmpeg_fn(command)
+            elapsed = time.monotonic() - started
+            if hls_dir:
+                _write_hls_master_playlist(hls_dir, probed, renditions)
+        logger.info(
+            "Video %s (%s) %s in %.1fs (%ss long): %s",
             media_id,
-            tmp_video.name,
-            tmp_poster.name,
-            web_service_url,
-            upload_token,
-            model_name=model_name,
+            model_name,
+            "re-encoded" if remux_blocker else "remuxed",
+            elapsed,
+            probed.duration_seconds,
+            remux_blocker or "already H.264/AAC",
+            extra={
+                "transcode_method": method.value,
+                "transcode_seconds": round(elapsed, 1),
+                "video_duration_seconds": probed.duration_seconds,
+                "hls_renditions": [rendition[0] for rendition in renditions],
+            },
         )
-        logger.info("Successfully uploaded transcoded video %s (%s)", media_id, model_name)
+
+        transfer.store_video(media, model_name, tmp_video.name, tmp_poster.name, hls_dir)
+        logger.info("Successfully stored transcoded video %s (%s)", media_id, model_name)
 
     except Exception as exc:
         logger.error(
@@ -208,24 +316,617 @@ def transcode_video_job(
         media.save(update_fields=["transcode_status", "updated_at"])
         raise
     finally:
-        # Clean up temp files (tmp_source is a path string, others are file objects)
-        if tmp_source and os.path.exists(tmp_source):
-            try:
-                os.unlink(tmp_source)
-            except OSError:
-                logger.warning("Could not delete temp file %s", tmp_source)
-
+        # Clean up temp files (the transfer cleans up any copy of the source)
         for tmp in (tmp_video, tmp_poster):
             if tmp and os.path.exists(tmp.name):
                 try:
                     os.unlink(tmp.name)
                 except OSError:
                     logger.warning("Could not delete temp file %s", tmp.name)
+        if hls_dir:
+            shutil.rmtree(hls_dir, ignore_errors=True)
 
         if token:
             reset_log_context(token)
 
 
+class MediaTransfer(ABC):
+    """How the worker reads a source file and returns its outputs, for videos and photos."""
+
+    name = ""
+
+    @abstractmethod
+    def source(self, media, model_name: str) -> AbstractContextManager[Path]:
+        """Return a context manager giving a local path to the media's source file."""
+
+    @abstractmethod
+    def store_video(
+        self,
+        media,
+        model_name: str,
+        video_path: str,
+        poster_path: str,
+        hls_dir: Path | None = None,
+    ) -> None:
+        """Attach a transcoded video, poster and any HLS files to the media, and mark it ready."""
+
+    @abstractmethod
+    def store_photo(self, media, model_name: str, derivatives: UploadParts) -> None:
+        """Attach the parts from ``_make_photo_derivatives()`` to the media, and mark it ready."""
+
+
+class HttpTransfer(MediaTransfer):
+    """Downloads the source from the web service's API and uploads the outputs to it.
+
+    For a worker that doesn't share the web service's media storage.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        web_service_url: str,
+        upload_token: str,
+        *,
+        download=None,
+        upload=None,
+        upload_photo=None,
+    ):
+        self.web_service_url = web_service_url
+        self.upload_token = upload_token
+        self.download_fn = download or _download_source_file
+        self.upload_fn = upload or _upload_transcoded_files
+        self.upload_photo_fn = upload_photo or _upload_photo_derivatives
+
+    @contextmanager
+    def source(self, media, model_name: str) -> Iterator[Path]:
+        tmp_source = self.download_fn(media.id, model_name, self.web_service_url, self.upload_token)
+        try:
+            yield Path(tmp_source)
+        finally:
+            if os.path.exists(tmp_source):
+                try:
+                    os.unlink(tmp_source)
+                except OSError:
+                    logger.warning("Could not delete temp file %s", tmp_source)
+
+    def store_video(
+        self,
+        media,
+        model_name: str,
+        video_path: str,
+        poster_path: str,
+        hls_dir: Path | None = None,
+    ) -> None:
+        self.upload_fn(
+            media.id,
+            video_path,
+            poster_path,
+            self.web_service_url,
+            self.upload_token,
+            model_name=model_name,
+            hls_dir=hls_dir,
+        )
+
+    def store_photo(self, media, model_name: str, derivatives: UploadParts) -> None:
+        self.upload_photo_fn(
+            media.id,
+            derivatives,
+            self.web_service_url,
+            self.upload_token,
+            model_name=model_name,
+        )
+
+
+class StorageTransfer(MediaTransfer):
+    """Reads the source and writes the outputs through media storage shared with the web service.
+
+    For a worker on the web service's volume, or using the same S3-compatible
+    bucket.  A source on local disk is read in place, and outputs on local
+    disk are moved into place rather than copied.
+    """
+
+    name = "storage"
+
+    @contextmanager
+    def source(self, media, model_name: str) -> Iterator[Path]:
+        try:
+            local_path = media.file.path
+        except NotImplementedError:  # Remote storage, e.g. S3
+            local_path = None
+        if local_path:
+            yield Path(local_path)
+            return
+
+        tmp = tempfile.NamedTemporaryFile(suffix=Path(media.file.name).suffix, delete=False)
+        try:
+            with tmp, media.file.open("rb") as stored:
+                shutil.copyfileobj(stored, tmp, SOURCE_COPY_BUFFER_SIZE)
+            yield Path(tmp.name)
+        finally:
+            os.unlink(tmp.name)
+
+    def store_video(
+        self,
+        media,
+        model_name: str,
+        video_path: str,
+        poster_path: str,
+        hls_dir: Path | None = None,
+    ) -> None:
+        from flipfix.apps.core.media_upload import save_transcoded_files
+
+        with ExitStack() as stack:
+            video_file = stack.enter_context(_FinishedFile(video_path, "video.mp4"))
+            poster_file = stack.enter_context(_FinishedFile(poster_path, "poster.jpg"))
+            hls_files = [
+                stack.enter_context(_FinishedFile(str(path), path.name))
+                for path in _hls_files(hls_dir)
+            ]
+            save_transcoded_files(media, video_file, poster_file, hls_files)
+
+    def store_photo(self, media, model_name: str, derivatives: UploadParts) -> None:
+        from flipfix.apps.core.media_upload import save_photo_derivatives
+
+        files = [(field, SimpleUploadedFile(*part)) for field, part in derivatives]
+        by_field = dict(files)
+        variants = [describe_image_variant(file) for field, file in files if field == "variants"]
+        save_photo_derivatives(media, by_field.get("file"), by_field["thumbnail_file"], variants)
+
+
+class _FinishedFile(File):
+    """An output file of the worker, which file system storage moves into place instead of copying.
+
+    Like Django's ``TemporaryUploadedFile`` it exposes ``temporary_file_path()``.
+    """
+
+    def __init__(self, path: str, name: str):
+        super().__init__(open(path, "rb"), name=name)
+        self.path = path
+
+    def temporary_file_path(self) -> str:
+        return self.path
+
+
+def _configured_transfer(*, download=None, upload=None, upload_photo=None) -> MediaTransfer:
+    """Return the transfer that ``TRANSCODE_TRANSFER`` selects.
+
+    Raises:
+        ValueError: If it's unknown, or the HTTP transfer isn't configured.
+    """
+    if TRANSCODE_TRANSFER == StorageTransfer.name:
+        return StorageTransfer()
+    if TRANSCODE_TRANSFER != HttpTransfer.name:
+        raise ValueError(f"Unknown TRANSCODE_TRANSFER: {TRANSCODE_TRANSFER!r}")
+    web_service_url, upload_token = _get_transcoding_config()
+    return HttpTransfer(
+        web_service_url,
+        upload_token,
+        download=download,
+        upload=upload,
+        upload_photo=upload_photo,
+    )
+
+
+class TranscodeProgress:
+    """Progress callback for ``_run_ffmpeg()`` that records a transcode's progress on its media row.
+
+    Percent done and estimated seconds left are saved at most every
+    ``TRANSCODE_PROGRESS_INTERVAL_SECONDS``, with a queryset update so that
+    they don't add history records.
+    """
+
+    def __init__(self, media, duration_seconds: int):
+        self.media = media
+        self.duration_seconds = duration_seconds
+        self.started = time.monotonic()
+        self.last_saved = self.started
+
+    def __call__(self, output_seconds: float) -> None:
+        now = time.monotonic()
+        if now - self.last_saved < TRANSCODE_PROGRESS_INTERVAL_SECONDS:
+            return
+        fraction = min(output_seconds / self.duration_seconds, 1.0)
+        if fraction <= 0:
+            return
+        eta_seconds = (now - self.started) * (1 - fraction) / fraction
+        # 100% is saved once the output is complete, not when the last frame is read
+        self.save(min(int(fraction * 100), 99), round(eta_seconds))
+        self.last_saved = now
+
+    def save(self, percent: int, eta_seconds: int) -> None:
+        type(self.media).objects.filter(pk=self.media.pk).update(
+            transcode_progress=percent,
+            transcode_eta_seconds=eta_seconds,
+            updated_at=timezone.now(),
+        )
+
+
+def _transcode_command(
+    input_path: Path,
+    probed: VideoProbe,
+    video_path: str,
+    poster_path: str,
+    hls_dir: Path | None = None,
+    renditions: Sequence[tuple[int, int, int, int]] = (),
+) -> list[str]:
+    """ffmpeg arguments to write the web video, its poster and any HLS renditions in a single pass.
+
+    The source is opened twice: once from the start for the video, and once
+    with an input-side seek (which jumps to the nearest keyframe instead of
+    decoding everything before it) for the poster frame.  Renditions are
+    scaled from one decode of the first input.
+
+    ``-threads`` applies to whichever input or output follows it, so it's
+    repeated for each decoder and encoder (see ``_thread_args()``).
+    """
+    threads = _thread_args()
+    video_args = _remux_args() if probed.remux_blocker() is None else _encode_args(probed)
+    hls_args = _hls_args(probed, hls_dir, renditions) if hls_dir and renditions else []
+    return [
+        "ffmpeg",
+        "-y",
+        *_filter_thread_args(),
+        *threads,
+        "-i",
+        str(input_path),
+        *threads,
+        "-ss",
+        f"{_poster_seek_seconds(probed):.2f}",
+        "-i",
+        str(input_path),
+        *hls_args,
+        *video_args,
+        *threads,
+        "-movflags",
+        "+faststart",
+        video_path,
+        *threads,
+        "-map",
+        "1:v:0",
+        "-vf",
+        f"scale={POSTER_WIDTH}:-2",
+        "-frames:v",
+        "1",
+        poster_path,
+    ]
+
+
+def _thread_args() -> list[str]:
+    """The ``-threads`` option for one input or output, capping it at FFMPEG_THREADS if set."""
+    return ["-threads", str(FFMPEG_THREADS)] if FFMPEG_THREADS > 0 else []
+
+
+def _filter_thread_args() -> list[str]:
+    """Global options capping the threads of the scaling filters at FFMPEG_THREADS if set."""
+    if FFMPEG_THREADS <= 0:
+        return []
+    return ["-filter_threads", str(FFMPEG_THREADS), "-filter_complex_threads", str(FFMPEG_THREADS)]
+
+
+def _encode_args(probed: VideoProbe) -> list[str]:
+    """Output arguments to re-encode a video as H.264/AAC, scaled down to MAX_VIDEO_DIMENSION."""
+    return [
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-vf",
+        f"scale=min(iw\\,{MAX_VIDEO_DIMENSION}):min(ih\\,{MAX_VIDEO_DIMENSION}):force_original_aspect_ratio=decrease",
+        "-c:v",
+        "libx264",
+        "-pix_fmt",
+        "yuv420p",
+        "-profile:v",
+        "main",
+        "-crf",
+        VIDEO_CRF_QUALITY,
+        "-preset",
+        _video_preset(probed.duration_seconds),
+        "-c:a",
+        "aac",
+        "-b:a",
+        AUDIO_BITRATE,
+    ]
+
+
+def _remux_args() -> list[str]:
+    """Output arguments to copy a video's first video and audio streams unchanged.
+
+    Other streams (e.g. phones' metadata tracks) are dropped, since MP4
+    can't always carry them.
+    """
+    return ["-map", "0:v:0", "-map", "0:a:0?", "-c", "copy"]
+
+
+def _video_preset(duration_seconds: int | None) -> str:
+    """Return the x264 preset for a source of this length (see VIDEO_PRESETS_BY_DURATION)."""
+    if duration_seconds is None:
+        return VIDEO_PRESET_UNKNOWN
+    for max_seconds, preset in VIDEO_PRESETS_BY_DURATION:
+        if duration_seconds <= max_seconds:
+            return preset
+    return VIDEO_PRESET_LONG
+
+
+def _hls_renditions(probed: VideoProbe) -> list[tuple[int, int, int, int]]:
+    """Return the HLS_RENDITIONS to make of a video, or none if it doesn't get HLS.
+
+    Only videos of at least ``TRANSCODE_HLS_MIN_SECONDS`` with known
+    dimensions do, and only if the source is big enough for two renditions
+    (with one there'd be nothing to adapt between).
+    """
+    if not TRANSCODE_HLS_MIN_SECONDS or not probed.width or not probed.height:
+        return []
+    if (probed.duration_seconds or 0) < TRANSCODE_HLS_MIN_SECONDS:
+        return []
+    short_side = min(probed.width, probed.height)
+    renditions = [r for r in HLS_RENDITIONS if r[0] <= short_side]
+    return renditions if len(renditions) > 1 else []
+
+
+def _hls_args(
+    probed: VideoProbe, hls_dir: Path, renditions: Sequence[tuple[int, int, int, int]]
+) -> list[str]:
+    """ffmpeg arguments to write one HLS rendition (playlist and segments) per height.
+
+    Keyframes are forced at segment boundaries so that every rendition's
+    segments line up and players can switch between them at any segment.
+    """
+    splits = "".join(f"[hls{i}]" for i in range(len(renditions)))
+    filters = [f"[0:v:0]split={len(renditions)}{splits}"]
+    args = []
+    for i, (height, video_bitrate, audio_bitrate, level) in enumerate(renditions):
+        # Scale the short side to the rendition height, whichever way up the video is
+        filters.append(
+            f"[hls{i}]scale=w='if(gte(iw,ih),-2,{height})':h='if(gte(iw,ih),{height},-2)'"
+            f"[hls{i}out]"
+        )
+        args += [
+            "-map",
+            f"[hls{i}out]",
+            "-map",
+            "0:a:0?",
+            "-c:v",
+            "libx264",
+            "-pix_fmt",
+            "yuv420p",
+            "-profile:v",
+            "main",
+            "-level:v",
+            f"{level / 10:.1f}",
+            "-preset",
+            _video_preset(probed.duration_seconds),
+            "-b:v",
+            str(video_bitrate),
+            "-maxrate",
+            str(video_bitrate),
+            "-bufsize",
+            str(video_bitrate * 2),
+            "-force_key_frames",
+            f"expr:gte(t,n_forced*{HLS_SEGMENT_SECONDS})",
+            "-c:a",
+            "aac",
+            "-b:a",
+            str(audio_bitrate),
+            *_thread_args(),
+            "-f",
+            "hls",
+            "-hls_time",
+            str(HLS_SEGMENT_SECONDS),
+            "-hls_playlist_type",
+            "vod",
+            "-hls_segment_filename",
+            str(hls_dir / f"{height}p_%03d.ts"),
+            str(hls_dir / f"{height}p.m3u8"),
+        ]
+    return ["-filter_complex", ";".join(filters), *args]
+
+
+def _hls_resolution(probed: VideoProbe, height: int) -> tuple[int, int]:
+    """Return a rendition's (width, height), as ``_hls_args()`` scales it.
+
+    The short side becomes *height*; the long side keeps the aspect ratio,
+    rounded to an even number like ffmpeg's ``scale=-2``.
+    """
+    width, source_height = probed.display_size() or (height, height)
+    short, long = sorted((width, source_height))
+    scaled = (long * height + short) // (2 * short) * 2
+    return (scaled, height) if width >= source_height else (height, scaled)
+
+
+def _write_hls_master_playlist(
+    hls_dir: Path, probed: VideoProbe, renditions: Sequence[tuple[int, int, int, int]]
+) -> None:
+    """Write the master playlist that lists each rendition's playlist, smallest first.
+
+    Each entry declares its bandwidth, resolution and codecs, so players can
+    pick a rendition without fetching it.
+    """
+    lines = ["#EXTM3U", "#EXT-X-VERSION:3"]
+    for height, video_bitrate, audio_bitrate, level in renditions:
+        codecs = [HLS_VIDEO_CODEC.format(level=level)]
+        if probed.audio_codec:
+            codecs.append(HLS_AUDIO_CODEC)
+        width, scaled_height = _hls_resolution(probed, height)
+        lines.append(
+            f"#EXT-X-STREAM-INF:BANDWIDTH={video_bitrate + audio_bitrate},"
+            f'RESOLUTION={width}x{scaled_height},CODECS="{",".join(codecs)}"'
+        )
+        lines.append(f"{height}p.m3u8")
+    (hls_dir / HLS_MASTER_PLAYLIST).write_text("\n".join(lines) + "\n")
+
+
+def _hls_files(hls_dir: Path | None) -> list[Path]:
+    """Return the playlists and segments in a directory of HLS output."""
+    if hls_dir is None:
+        return []
+    return sorted(path for path in hls_dir.iterdir() if path.suffix in HLS_CONTENT_TYPES)
+
+
+def _write_hls_archive(hls_dir: Path | None) -> Path | None:
+    """Bundle the playlists and segments in a directory of HLS output into a temp tar file.
+
+    A long video has hundreds of segments, more than the file parts Django
+    accepts in one request (``DATA_UPLOAD_MAX_NUMBER_FILES``), so they're
+    uploaded as one.  Segments are already compressed, so the tar isn't.
+
+    Returns:
+        The tar file's path, which the caller deletes, or None if there's no HLS output.
+    """
+    paths = _hls_files(hls_dir)
+    if not paths:
+        return None
+    with tempfile.NamedTemporaryFile(suffix=".tar", delete=False) as tmp:
+        with tarfile.open(fileobj=tmp, mode="w") as archive:
+            for path in paths:
+                archive.add(path, arcname=path.name, recursive=False)
+    return Path(tmp.name)
+
+
+def _poster_seek_seconds(probed: VideoProbe) -> float:
+    """Return where in the source to take the poster frame, past any fade-in."""
+    if not probed.duration_seconds:
+        return 0.0
+    return min(probed.duration_seconds / 10, POSTER_MAX_SEEK_SECONDS)
+
+
+def enqueue_photo_processing(media_id: int, model_name: str, *, async_runner=async_task) -> None:
+    """
+    Enqueue generation of a photo's thumbnail and web-size image on the fast task lane.
+
+    Args:
+        media_id: ID of the media record
+        model_name: Name of the media model class (e.g., "LogEntryMedia", "PartRequestMedia")
+    """
+    async_runner(
+        process_photo_job,
+        media_id,
+        model_name,
+        current_log_context(),
+        timeout=120,
+        cluster=lane_cluster(FAST),
+    )
+
+
+def process_photo_job(
+    media_id: int,
+    model_name: str,
+    log_context: dict | None = None,
+    *,
+    download=None,
+    upload=None,
+    transfer: MediaTransfer | None = None,
+) -> None:
+    """Resize an uploaded photo to its thumbnail, web-size image and variants, and store them.
+
+    Files are moved by the ``MediaTransfer`` that ``TRANSCODE_TRANSFER``
+    selects, as for videos; ``download`` and ``upload`` replace the HTTP
+    transfer's.
+    """
+    token = bind_log_context(**log_context) if log_context else None
+    try:
+        _process_photo(media_id, model_name, download, upload, transfer)
+    finally:
+        if token:
+            reset_log_context(token)
+
+
+def _process_photo(
+    media_id: int, model_name: str, download, upload, transfer: MediaTransfer | None
+) -> None:
+    try:
+        media_model = get_media_model(model_name)
+        media = media_model.objects.get(id=media_id)
+    except Exception:
+        logger.error("Photo job %s (%s) aborted: media not found", media_id, model_name)
+        return
+
+    if media.media_type != media_model.MediaType.PHOTO:
+        logger.info("Photo processing skipped for non-photo media %s", media_id)
+        return
+    if media.transcode_status == media_model.TranscodeStatus.READY:
+        logger.info("Photo processing skipped for already processed media %s", media_id)
+        return
+
+    try:
+        transfer = transfer or _configured_transfer(download=download, upload_photo=upload)
+    except ValueError as e:
+        logger.error("Photo job %s aborted: %s", media_id, str(e))
+        media.transcode_status = media_model.TranscodeStatus.FAILED
+        media.save(update_fields=["transcode_status", "updated_at"])
+        raise
+
+    media.transcode_status = media_model.TranscodeStatus.PROCESSING
+    media.transcode_progress = None
+    media.transcode_eta_seconds = None
+    media.save(
+        update_fields=[
+            "transcode_status",
+            "transcode_progress",
+            "transcode_eta_seconds",
+            "updated_at",
+        ]
+    )
+
+    try:
+        with transfer.source(media, model_name) as source_path:
+            derivatives = _make_photo_derivatives(source_path)
+        transfer.store_photo(media, model_name, derivatives)
+        logger.info("Successfully stored photo derivatives %s (%s)", media_id, model_name)
+    except Exception as exc:
+        logger.error(
+            "Failed to process photo %s (%s): %s", media_id, model_name, exc, exc_info=True
+        )
+        media.transcode_status = media_model.TranscodeStatus.FAILED
+        media.save(update_fields=["transcode_status", "updated_at"])
+        raise
+
+
+def _make_photo_derivatives(source_path: Path) -> UploadParts:
+    """
+    Resize a downloaded photo the same way ``AbstractMedia.save()`` does.
+
+    Returns:
+        Upload parts: ``thumbnail_file`` always; ``file`` only when the
+        original needed resizing or converting (an unchanged original stays
+        where it is on the web service); and one ``variants`` part per
+        responsive variant.
+    """
+    parts: UploadParts = []
+    with open(source_path, "rb") as fh:
+        original = File(fh, name=source_path.name)
+        fields = ("thumbnail_file", "file")
+        derivatives, variants = resize_image_with_variants(
+            original,  # type: ignore[arg-type]
+            [THUMB_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION],
+            settings.PHOTO_VARIANT_SIZES,
+            settings.PHOTO_VARIANT_FORMATS,
+        )
+        for field_name, resized in zip(fields, derivatives, strict=True):
+            if resized is original:
+                if field_name == "file":
+                    continue
+                content_type = mimetypes.guess_type(source_path.name)[0]
+            else:
+                content_type = resized.content_type
+            resized.seek(0)
+            part = (
+                Path(resized.name or source_path.name).name,
+                resized.read(),
+                content_type or "application/octet-stream",
+            )
+            parts.append((field_name, part))
+        for variant in variants:
+            part = (
+                Path(variant.file.name or source_path.name).name,
+                variant.file.read(),
+                variant.file.content_type or "application/octet-stream",
+            )
+            parts.append(("variants", part))
+    return parts
+
+
 def _sleep_with_backoff(attempt: int, max_retries: int, error_detail: str) -> None:
     """
     Sleep with exponential backoff, or raise if retries exhausted.
@@ -257,6 +958,9 @@ def _download_source_file(
     """
     Download source video from web service to temp file.
 
+    If the connection drops partway through, the next attempt asks for just
+    the rest of the file, as long as it hasn't changed in the meantime.
+
     Args:
         media_id: ID of media record
         model_name: Name of the media model class
@@ -274,71 +978,98 @@ def _download_source_file(
         f"{web_service_url.rstrip('/')}/api/transcoding/download/{model_name}/{media_id}/"
     )
     headers = {"Authorization": f"Bearer {upload_token}"}
+    tmp_path = None
+    etag = None
+    received = 0
 
-    for attempt in range(1, max_retries + 1):
-        try:
-            logger.info(
-                "Downloading source file for media %s from %s (attempt %d/%d)",
-                media_id,
-                download_url,
-                attempt,
-                max_retries,
-            )
-
-            response = requests.get(download_url, headers=headers, stream=True, timeout=300)
-
-            if response.status_code == 200:
-                # Get file extension from Content-Disposition or default to .mp4
-                content_disp = response.headers.get("Content-Disposition", "")
-                if "filename=" in content_disp:
-                    filename = content_disp.split("filename=")[-1].strip('"')
-                    ext = Path(filename).suffix or ".mp4"
-                else:
-                    ext = ".mp4"
-
-                # Stream to temp file
-                tmp = tempfile.NamedTemporaryFile(suffix=ext, delete=False)
-                try:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        tmp.write(chunk)
-                    tmp.close()
+    try:
+        for attempt in range(1, max_retries + 1):
+            try:
+                logger.info(
+                    "Downloading source file for media %s from %s (attempt %d/%d)",
+                    media_id,
+                    download_url,
+                    attempt,
+                    max_retries,
+                )
+
+                request_headers = dict(headers)
+                if received and etag:
+                    # Pick up where the last attempt was cut off; If-Range makes
+                    # the server send the whole file instead if it has changed
+                    request_headers["Range"] = f"bytes={received}-"
+                    request_headers["If-Range"] = etag
+
+                response = requests.get(
+                    download_url, headers=request_headers, stream=True, timeout=300
+                )
+
+                resumed = response.status_code == 206 and response.headers.get(
+                    "Content-Range", ""
+                ).startswith(f"bytes {received}-")
+                if response.status_code == 200 or resumed:
+                    if tmp_path is None:
+                        tmp_path = _temp_download_path(response)
+                    if not resumed:
+                        received = 0
+                        etag = response.headers.get("ETag")
+
+                    with open(tmp_path, "ab" if resumed else "wb") as tmp:
+                        for chunk in response.iter_content(
+                            chunk_size=TRANSCODE_DOWNLOAD_CHUNK_SIZE
+                        ):
+                            tmp.write(chunk)
+                            received += len(chunk)
                     logger.info(
                         "Downloaded source file for media %s to %s",
                         media_id,
-                        tmp.name,
+                        tmp_path,
                     )
-                    return tmp.name
-                except Exception:
-                    tmp.close()
-                    if os.path.exists(tmp.name):
-                        os.unlink(tmp.name)
-                    raise
-
-            # Log error and retry if not successful
-            logger.warning(
-                "Download attempt %d/%d failed for media %s: HTTP %d - %s",
-                attempt,
-                max_retries,
-                media_id,
-                response.status_code,
-                response.text[:200] if response.text else "(no body)",
-            )
-            _sleep_with_backoff(attempt, max_retries, f"HTTP {response.status_code}")
-
-        except requests.exceptions.RequestException as e:
-            logger.warning(
-                "Download attempt %d/%d failed for media %s: %s",
-                attempt,
-                max_retries,
-                media_id,
-                str(e),
-            )
-            _sleep_with_backoff(attempt, max_retries, str(e))
+                    return tmp_path
+
+                # Log error and retry if not successful
+                logger.warning(
+                    "Download attempt %d/%d failed for media %s: HTTP %d - %s",
+                    attempt,
+                    max_retries,
+                    media_id,
+                    response.status_code,
+                    response.text[:200] if response.text else "(no body)",
+                )
+                _sleep_with_backoff(attempt, max_retries, f"HTTP {response.status_code}")
+
+            except requests.exceptions.RequestException as e:
+                logger.warning(
+                    "Download attempt %d/%d failed for media %s after %d bytes: %s",
+                    attempt,
+                    max_retries,
+                    media_id,
+                    received,
+                    str(e),
+                )
+                _sleep_with_backoff(attempt, max_retries, str(e))
+    except BaseException:
+        if tmp_path and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
 
     # Should not reach here due to _sleep_with_backoff raising
     raise TransferError(f"Download failed after {max_retries} attempts")
 
 
+def _temp_download_path(response) -> str:
+    """Create an empty temp file for a download, named with the source's extension."""
+    # Get file extension from Content-Disposition or default to .mp4
+    content_disp = response.headers.get("Content-Disposition", "")
+    if "filename=" in content_disp:
+        filename = content_disp.split("filename=")[-1].strip('"')
+        ext = Path(filename).suffix or ".mp4"
+    else:
+        ext = ".mp4"
+    with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
+        return tmp.name
+
+
 def _upload_transcoded_files(
     media_id: int,
     video_path: str,
@@ -347,9 +1078,10 @@ def _upload_transcoded_files(
     upload_token: str,
     max_retries: int = 3,
     model_name: str = "LogEntryMedia",
+    hls_dir: Path | None = None,
 ) -> None:
     """
-    Upload transcoded video and poster to Django web service via HTTP.
+    Upload transcoded video, poster and any HLS files to Django web service via HTTP.
 
     Implements retry logic with exponential backoff.
 
@@ -361,29 +1093,103 @@ def _upload_transcoded_files(
         upload_token: Bearer token for authentication
         max_retries: Maximum number of upload attempts (default: 3)
         model_name: Name of the media model class (default: LogEntryMedia)
+        hls_dir: Directory of HLS playlists and segments to upload too, as one tar file
 
     Raises:
         Exception: If upload fails after all retries
     """
-    upload_url = f"{web_service_url.rstrip('/')}/api/transcoding/upload/{model_name}/{media_id}/"
+    hls_archive = _write_hls_archive(hls_dir)
+
+    @contextmanager
+    def open_files():
+        with ExitStack() as stack:
+            files = [
+                (
+                    "video_file",
+                    ("video.mp4", stack.enter_context(open(video_path, "rb")), "video/mp4"),
+                ),
+                (
+                    "poster_file",
+                    ("poster.jpg", stack.enter_context(open(poster_path, "rb")), "image/jpeg"),
+                ),
+            ]
+            if hls_archive:
+                archive_file = stack.enter_context(open(hls_archive, "rb"))
+                files.append(("hls_archive", ("hls.tar", archive_file, "application/x-tar")))
+            yield files
+
+    try:
+        _post_files_with_retries(
+            f"{web_service_url.rstrip('/')}/api/transcoding/upload/{model_name}/{media_id}/",
+            open_files,
+            media_id,
+            upload_token,
+            max_retries,
+            description="transcoded files",
+        )
+    finally:
+        if hls_archive:
+            hls_archive.unlink(missing_ok=True)
+
+
+def _upload_photo_derivatives(
+    media_id: int,
+    derivatives: UploadParts,
+    web_service_url: str,
+    upload_token: str,
+    max_retries: int = 3,
+    model_name: str = "LogEntryMedia",
+) -> None:
+    """
+    Upload a photo's resized files to Django web service via HTTP.
+
+    Implements retry logic with exponential backoff.
+
+    Args:
+        media_id: ID of media record
+        derivatives: Upload parts from _make_photo_derivatives()
+        web_service_url: Base URL of web service
+        upload_token: Bearer token for authentication
+        max_retries: Maximum number of upload attempts (default: 3)
+        model_name: Name of the media model class (default: LogEntryMedia)
+
+    Raises:
+        Exception: If upload fails after all retries
+    """
+    _post_files_with_retries(
+        f"{web_service_url.rstrip('/')}/api/transcoding/photo-upload/{model_name}/{media_id}/",
+        lambda: nullcontext(derivatives),
+        media_id,
+        upload_token,
+        max_retries,
+        description="photo derivatives",
+    )
+
+
+def _post_files_with_retries(
+    upload_url: str,
+    open_files: Callable[[], AbstractContextManager[dict | UploadParts]],
+    media_id: int,
+    upload_token: str,
+    max_retries: int,
+    *,
+    description: str,
+) -> None:
+    """POST multipart files to the web service, retrying with exponential backoff."""
     headers = {"Authorization": f"Bearer {upload_token}"}
 
     for attempt in range(1, max_retries + 1):
         try:
             logger.info(
-                "Uploading transcoded files for media %s to %s (attempt %d/%d)",
+                "Uploading %s for media %s to %s (attempt %d/%d)",
+                description,
                 media_id,
                 upload_url,
                 attempt,
                 max_retries,
             )
 
-            with open(video_path, "rb") as video_file, open(poster_path, "rb") as poster_file:
-                files = {
-                    "video_file": ("video.mp4", video_file, "video/mp4"),
-                    "poster_file": ("poster.jpg", poster_file, "image/jpeg"),
-                }
-
+            with open_files() as files:
                 response = requests.post(upload_url, files=files, headers=headers, timeout=300)
 
             if response.status_code == 200:
@@ -413,8 +1219,11 @@ def _upload_transcoded_files(
             _sleep_with_backoff(attempt, max_retries, str(e))
 
 
-def _probe_duration_seconds(input_path: Path) -> int | None:
-    """Return duration in whole seconds using ffprobe."""
+def _probe_video(input_path: Path) -> VideoProbe:
+    """Return the container, first video and audio streams, and duration, using ffprobe.
+
+    Anything ffprobe can't report is None, which means the video is re-encoded.
+    """
     cmd = [
         "ffprobe",
         "-v",
@@ -422,33 +1231,72 @@ def _probe_duration_seconds(input_path: Path) -> int | None:
         "-print_format",
         "json",
         "-show_entries",
-        "format=duration",
+        "format=duration,format_name"
+        ":stream=codec_type,codec_name,profile,pix_fmt,width,height"
+        ":stream_side_data=rotation:stream_tags=rotate",
         str(input_path),
     ]
     if cmd[0] not in TRUSTED_BINARIES:
-        return None
+        return VideoProbe()
     try:
         result = subprocess.run(cmd, capture_output=True, text=True, check=True)
         payload = json.loads(result.stdout or "{}")
-        duration = payload.get("format", {}).get("duration")
-        if duration is None:
-            return None
-        return int(float(duration))
-    except (subprocess.CalledProcessError, json.JSONDecodeError, ValueError, OSError):
-        return None
+    except (subprocess.CalledProcessError, json.JSONDecodeError, OSError):
+        return VideoProbe()
+    return _parse_probe(payload)
 
 
-def _run_ffmpeg(cmd: list[str]) -> None:
-    """Run ffmpeg/ffprobe with basic logging."""
+def _parse_probe(payload: dict) -> VideoProbe:
+    """Build a VideoProbe from ffprobe's JSON output."""
+    fmt = payload.get("format", {})
+    streams = payload.get("streams", [])
+    video: dict = next((st for st in streams if st.get("codec_type") == "video"), {})
+    audio: dict = next((st for st in streams if st.get("codec_type") == "audio"), {})
+    try:
+        duration_seconds = int(float(fmt["duration"])) if fmt.get("duration") else None
+    except (TypeError, ValueError):
+        duration_seconds = None
+    # Newer ffmpeg reports rotation as display matrix side data, older as a tag
+    rotations = [sd["rotation"] for sd in video.get("side_data_list", []) if "rotation" in sd]
+    try:
+        rotation = int(rotations[0] if rotations else video.get("tags", {}).get("rotate", 0))
+    except (TypeError, ValueError):
+        rotation = 0
+    return VideoProbe(
+        duration_seconds=duration_seconds,
+        container=fmt.get("format_name"),
+        video_codec=video.get("codec_name"),
+        video_profile=video.get("profile"),
+        pixel_format=video.get("pix_fmt"),
+        width=video.get("width"),
+        height=video.get("height"),
+        rotation=rotation,
+        audio_codec=audio.get("codec_name"),
+    )
+
+
+def _run_ffmpeg(cmd: list[str], on_progress: Callable[[float], None] | None = None) -> None:
+    """Run ffmpeg/ffprobe with basic logging.
+
+    With ``on_progress``, ffmpeg reports its progress on stdout
+    (``-progress pipe:1``), and the callback is called with the seconds of
+    output written so far each time it does (about twice a second).
+    """
     if cmd[0] not in TRUSTED_BINARIES:
         raise ValueError(f"Untrusted binary: {cmd[0]}")
+    if on_progress is not None:
+        cmd = [cmd[0], "-progress", "pipe:1", "-nostats", *cmd[1:]]
     logger.info("Running command: %s", " ".join(cmd))
     try:
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
-        if result.stdout:
-            logger.debug("FFmpeg stdout: %s", result.stdout)
-        if result.stderr:
-            logger.debug("FFmpeg stderr: %s", result.stderr)
+        if on_progress is None:
+            result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+            stdout, stderr = result.stdout, result.stderr
+        else:
+            stdout, stderr = "", _run_with_progress(cmd, on_progress)
+        if stdout:
+            logger.debug("FFmpeg stdout: %s", stdout)
+        if stderr:
+            logger.debug("FFmpeg stderr: %s", stderr)
     except subprocess.CalledProcessError as e:
         logger.error("FFmpeg command failed with exit code %d", e.returncode)
         if e.stdout:
@@ -456,3 +1304,36 @@ def _run_ffmpeg(cmd: list[str]) -> None:
         if e.stderr:
             logger.error("FFmpeg stderr: %s", e.stderr)
         raise
+
+
+def _run_with_progress(cmd: list[str], on_progress: Callable[[float], None]) -> str:
+    """Run ffmpeg, passing each ``out_time_us`` it reports to ``on_progress``.
+
+    stderr goes to a temporary file rather than a pipe, so that a chatty
+    ffmpeg can't block on it while stdout is being read.
+
+    Returns:
+        ffmpeg's stderr output.
+
+    Raises:
+        subprocess.CalledProcessError: If ffmpeg exits with an error.
+    """
+    with tempfile.TemporaryFile(mode="w+") as stderr_file:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True)
+        try:
+            assert process.stdout is not None
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                if key == "out_time_us" and value.isdigit():  # "N/A" until output starts
+                    on_progress(int(value) / 1_000_000)
+            returncode = process.wait()
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+        stderr_file.seek(0)
+        stderr = stderr_file.read()
+
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd, stderr=stderr)
+    return stderr
@@ -0,0 +1,68 @@
+"""Upload handlers that hash file content while the upload streams in.
+
+Installed via ``settings.FILE_UPLOAD_HANDLERS`` in place of Django's
+defaults.  Each uploaded file gets a ``content_hash`` attribute (BLAKE2b,
+hex) computed from the chunks as they arrive, so identical uploads can be
+recognised without reading the file a second time.  See
+``content_hash_of()`` for files that didn't come through a request.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from django.core.files.uploadhandler import (
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
+)
+
+CONTENT_HASH_DIGEST_SIZE = 32
+"""BLAKE2b digest size in bytes; hex digests are twice as long."""
+
+
+def new_content_hasher() -> Any:
+    return hashlib.blake2b(digest_size=CONTENT_HASH_DIGEST_SIZE)
+
+
+class _HashingUploadHandlerMixin:
+    """Hash the chunks this handler stores; chunks passed on are hashed by the next handler."""
+
+    def new_file(self, *args, **kwargs):
+        # Before super(): MemoryFileUploadHandler stops later handlers by raising
+        self._hasher = new_content_hasher()
+        super().new_file(*args, **kwargs)  # type: ignore[misc]
+
+    def receive_data_chunk(self, raw_data, start):
+        remaining = super().receive_data_chunk(raw_data, start)  # type: ignore[misc]
+        if remaining is None:  # Stored by this handler
+            self._hasher.update(raw_data)
+        return remaining
+
+    def file_complete(self, file_size):
+        uploaded = super().file_complete(file_size)  # type: ignore[misc]
+        if uploaded is not None:
+            uploaded.content_hash = self._hasher.hexdigest()
+        return uploaded
+
+
+class HashingMemoryFileUploadHandler(_HashingUploadHandlerMixin, MemoryFileUploadHandler):
+    """``MemoryFileUploadHandler`` that sets ``content_hash`` on small uploads."""
+
+
+class HashingTemporaryFileUploadHandler(_HashingUploadHandlerMixin, TemporaryFileUploadHandler):
+    """``TemporaryFileUploadHandler`` that sets ``content_hash`` on large uploads."""
+
+
+def content_hash_of(uploaded_file: Any) -> str:
+    """Return the file's content hash, from the upload handler or by reading it in chunks."""
+    content_hash = getattr(uploaded_file, "content_hash", None)
+    if content_hash:
+        return content_hash
+
+    hasher = new_content_hasher()
+    uploaded_file.seek(0)
+    for chunk in uploaded_file.chunks():
+        hasher.update(chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
@@ -0,0 +1,61 @@
+"""On-demand photo derivatives: resized and re-encoded on first request."""
+
+import hashlib
+
+from django.http import FileResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response
+from django.views import View
+
+from flipfix.apps.core.derived_images import (
+    derived_image_name,
+    get_or_create_derived_image,
+    parse_spec,
+)
+from flipfix.apps.core.models import get_media_model
+
+# Derived image names include a digest of the source file, so they're immutable
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class DerivedImageView(View):
+    """
+    Serve a photo derivative, generating and storing it on first request.
+
+    GET /media/derived/<model_name>/<media_id>/<spec>/
+
+    The spec is ``<longest side>.<ext>`` or ``<longest side>-q<quality>.<ext>``,
+    e.g. ``640.webp`` or ``640-q50.avif``, whitelisted by the
+    ``DERIVED_IMAGE_*`` settings.  Unknown specs, media and non-photos are
+    404s.  Responses carry an ETag and year-long immutable caching;
+    ``If-None-Match`` revalidation gets a 304 without touching storage.
+    """
+
+    def get(self, request, model_name: str, media_id: int, spec: str):
+        try:
+            parsed = parse_spec(spec)
+            media_model = get_media_model(model_name)
+        except ValueError as e:
+            raise Http404(str(e)) from None
+
+        media = get_object_or_404(media_model, pk=media_id, media_type=media_model.MediaType.PHOTO)
+        if not media.file:
+            raise Http404("Media has no file")
+
+        name = derived_image_name(media, parsed)
+        etag = f'"{hashlib.sha256(name.encode()).hexdigest()[:32]}"'
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            not_modified["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+            return not_modified
+
+        stored_name = get_or_create_derived_image(media, parsed)
+        if stored_name is None:
+            raise Http404("Derivative not available for this photo")
+
+        response = FileResponse(
+            media.file.storage.open(stored_name, "rb"), content_type=parsed.content_type
+        )
+        response["ETag"] = etag
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+        return response
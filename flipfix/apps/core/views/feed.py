@@ -5,7 +5,7 @@ from django.template.loader import render_to_string
 from django.views import View
 from django.views.generic import TemplateView
 
-from flipfix.apps.core.feed import PageCursor, get_feed_page
+from flipfix.apps.core.feed import PageCursor, get_feed_page, get_next_cursor
 from flipfix.apps.core.forms import SearchForm
 from flipfix.apps.maintenance.models import ProblemReport
 from flipfix.apps.parts.models import PartRequest
@@ -41,7 +41,11 @@ class GlobalActivityFeedView(TemplateView):
         context.update(
             {
                 "entries": entries,
-                "page_obj": PageCursor(has_next=has_next, page_num=1),
+                "page_obj": PageCursor(
+                    has_next=has_next,
+                    page_num=1,
+                    next_cursor=get_next_cursor(entries, has_next),
+                ),
                 "search_form": SearchForm(initial={"q": search_query}),
                 "stats": stats,
             }
@@ -63,6 +67,7 @@ class GlobalActivityFeedPartialView(View):
         page_items, has_next = get_feed_page(
             page_num=page_num,
             search_query=search_query,
+            cursor=request.GET.get("cursor"),
         )
 
         items_html = "".join(
@@ -79,5 +84,6 @@ class GlobalActivityFeedPartialView(View):
                 "items": items_html,
                 "has_next": has_next,
                 "next_page": page_num + 1 if has_next else None,
+                "next_cursor": get_next_cursor(page_items, has_next) or None,
             }
         )
@@ -1,9 +1,14 @@
-"""Video transcoding status API."""
+"""Video transcoding and photo processing status API."""
+
+import hashlib
+from collections import defaultdict
+from datetime import datetime
 
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import ObjectDoesNotExist
 from django.http import JsonResponse
+from django.utils.cache import get_conditional_response
 from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from django.views import View
 
 from flipfix.apps.core.models import get_media_model
@@ -12,10 +17,13 @@ from flipfix.apps.core.models import get_media_model
 @method_decorator(login_required, name="dispatch")
 class TranscodeStatusView(View):
     """
-    API endpoint for polling video transcode status.
+    API endpoint for polling video transcode and photo processing status.
 
     Accepts comma-separated media IDs and model names, returns status for each.
-    Used by video_transcode_poll.js to update UI when transcoding completes.
+    Used by video_transcode_poll.js to update UI when transcoding completes,
+    or when a photo's thumbnail and web-size image have been generated on
+    the worker.  A photo whose processing failed is reported failed, as on
+    page load, since its original may not display (e.g. HEIC).
 
     Query params:
         ids: comma-separated media IDs (e.g., "1,2,3")
@@ -24,56 +32,151 @@ class TranscodeStatusView(View):
     Response:
         {
             "1": {"status": "ready", "video_url": "...", "poster_url": "..."},
-            "2": {"status": "processing"},
-            "3": {"status": "failed"}
+            "2": {"status": "processing", "progress": 42, "eta_seconds": 35},
+            "3": {"status": "failed"},
+            "4": {"status": "ready", "photo_url": "...", "thumbnail_url": "..."}
         }
+
+    ``progress`` (percent) and ``eta_seconds`` are only included for a video
+    whose transcode has reported its progress, and ``hls_url`` for a ready
+    video with HLS renditions.
+
+    Media is fetched with one query per model.  Responses carry an ETag and
+    Last-Modified from the newest ``updated_at``, and must be revalidated,
+    so a poll with nothing new gets a 304 without a body.
     """
 
+    # What _build_status_result() reads
+    STATUS_FIELDS = (
+        "id",
+        "media_type",
+        "file",
+        "thumbnail_file",
+        "transcoded_file",
+        "poster_file",
+        "hls_playlist",
+        "transcode_status",
+        "transcode_progress",
+        "transcode_eta_seconds",
+        "updated_at",
+    )
+
     def get(self, request):
+        try:
+            requested = self._requested_media(request)
+        except ValueError as e:
+            return JsonResponse({"error": str(e)}, status=400)
+
+        statuses, last_modified = self._lookup_statuses(requested)
+        etag = self._etag(requested, statuses, last_modified)
+        last_modified_timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified_timestamp
+        )
+        if response is None:
+            response = JsonResponse(statuses)
+        response["ETag"] = etag
+        if last_modified_timestamp is not None:
+            response["Last-Modified"] = http_date(last_modified_timestamp)
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def _requested_media(self, request) -> list[tuple[str, str]]:
+        """Return the (media ID, model name) pairs of the ``ids`` and ``models`` params.
+
+        Raises:
+            ValueError: If the params' lengths differ.
+        """
         ids_param = request.GET.get("ids", "")
         models_param = request.GET.get("models", "")
-
         if not ids_param or not models_param:
-            response = JsonResponse({})
-            response["Cache-Control"] = "no-store"
-            return response
+            return []
 
         ids = [i.strip() for i in ids_param.split(",") if i.strip()]
         model_names = [m.strip() for m in models_param.split(",") if m.strip()]
 
         if len(ids) != len(model_names):
-            return JsonResponse({"error": "ids and models must have same length"}, status=400)
-
-        results = {}
-        for media_id, model_name in zip(ids, model_names, strict=True):
-            result = self._get_media_status(media_id, model_name)
-            results[media_id] = result
-
-        response = JsonResponse(results)
-        response["Cache-Control"] = "no-store"
-        return response
-
-    def _get_media_status(self, media_id: str, model_name: str) -> dict:
-        """Get transcode status for a single media item."""
-        try:
-            media_model = get_media_model(model_name)
-        except ValueError:
-            return {"status": "failed", "message": "Unknown media type"}
-
-        try:
-            media = media_model.objects.get(id=media_id)
-            return self._build_status_result(media, media_model)
-        except (ValueError, TypeError):
-            return {"status": "failed", "message": "Invalid media ID"}
-        except ObjectDoesNotExist:
-            return {"status": "failed", "message": "Media not found"}
+            raise ValueError("ids and models must have same length")
+        return list(zip(ids, model_names, strict=True))
+
+    def _lookup_statuses(
+        self, requested: list[tuple[str, str]]
+    ) -> tuple[dict[str, dict], datetime | None]:
+        """Get the status of each requested media item, and when the newest one last changed.
+
+        Returns:
+            The statuses keyed by media ID, and the latest ``updated_at`` of
+            the media found (None if none was).
+        """
+        ids_by_model: dict[str, set[int]] = defaultdict(set)
+        for media_id, model_name in requested:
+            if media_id.isdigit():
+                ids_by_model[model_name].add(int(media_id))
+
+        found = {}
+        unknown_models = set()
+        for model_name, ids in ids_by_model.items():
+            try:
+                media_model = get_media_model(model_name)
+            except ValueError:
+                unknown_models.add(model_name)
+                continue
+            media_items = (
+                media_model.objects.filter(id__in=ids).only(*self.STATUS_FIELDS).order_by()
+            )
+            for media in media_items:
+                found[(media.id, model_name)] = media
+
+        statuses = {}
+        for media_id, model_name in requested:
+            if model_name in unknown_models:
+                statuses[media_id] = {"status": "failed", "message": "Unknown media type"}
+            elif not media_id.isdigit():
+                statuses[media_id] = {"status": "failed", "message": "Invalid media ID"}
+            elif (media := found.get((int(media_id), model_name))) is None:
+                statuses[media_id] = {"status": "failed", "message": "Media not found"}
+            else:
+                statuses[media_id] = self._build_status_result(media, type(media))
+
+        last_modified = max((media.updated_at for media in found.values()), default=None)
+        return statuses, last_modified
+
+    def _etag(
+        self,
+        requested: list[tuple[str, str]],
+        statuses: dict[str, dict],
+        last_modified: datetime | None,
+    ) -> str:
+        """Return an ETag that changes when any requested item is saved, appears or disappears."""
+        found = sorted(media_id for media_id, status in statuses.items() if "message" not in status)
+        key = repr((requested, found, last_modified.isoformat() if last_modified else None))
+        return f'"{hashlib.sha256(key.encode()).hexdigest()[:32]}"'
 
     def _build_status_result(self, media, media_model) -> dict:
         """Build status result dict for a media item."""
+        if media.media_type == media_model.MediaType.PHOTO:
+            if media.is_photo_processing or media.is_photo_failed:
+                return {"status": media.transcode_status}
+            photo_url = media.file.url if media.file else None
+            return {
+                "status": media_model.TranscodeStatus.READY,
+                "photo_url": photo_url,
+                "thumbnail_url": media.thumbnail_file.url if media.thumbnail_file else photo_url,
+            }
+
         result = {"status": media.transcode_status}
+        if (
+            media.transcode_status == media_model.TranscodeStatus.PROCESSING
+            and media.transcode_progress is not None
+        ):
+            result["progress"] = media.transcode_progress
+            result["eta_seconds"] = media.transcode_eta_seconds
         if media.transcode_status == media_model.TranscodeStatus.READY:
             if media.transcoded_file:
                 result["video_url"] = media.transcoded_file.url
             if media.poster_file:
                 result["poster_url"] = media.poster_file.url
+            if media.hls_playlist:
+                result["hls_url"] = media.hls_playlist.url
         return result
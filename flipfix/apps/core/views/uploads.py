@@ -0,0 +1,71 @@
+"""Chunks of resumable media uploads."""
+
+from django.core.exceptions import ValidationError
+from django.http import JsonResponse
+from django.views import View
+
+from flipfix.apps.core.chunked_upload import (
+    ChunkChecksumError,
+    ChunkOffsetError,
+    received_bytes,
+    write_chunk,
+)
+from flipfix.apps.core.models import ChunkedUpload
+
+
+class ChunkedUploadView(View):
+    """
+    API endpoint for the chunks of a resumable media upload.
+
+    GET /api/uploads/<upload_id>/
+        Returns {"offset": <bytes received>, "size": <total>}, where an
+        interrupted client resumes.
+
+    PUT /api/uploads/<upload_id>/?offset=<n>
+        Appends the raw request body, which must start at the current
+        offset and match the hex SHA-256 in the X-Chunk-SHA256 header.
+        Returns the new offset, a 409 with the current one if the chunk
+        doesn't start there, or a 422 if it was cut short or doesn't match
+        its checksum and should be sent again.
+
+    Sessions are started and finished with the ``start_chunked_upload`` and
+    ``finish_chunked_upload`` actions of the record's detail page (see
+    ``MediaUploadMixin``), and only their creator can send chunks.
+    """
+
+    def get(self, request, upload_id):
+        upload = self._get_upload(request, upload_id)
+        if upload is None:
+            return JsonResponse({"success": False, "error": "Upload not found"}, status=404)
+        return JsonResponse(
+            {"success": True, "offset": received_bytes(upload), "size": upload.size}
+        )
+
+    def put(self, request, upload_id):
+        upload = self._get_upload(request, upload_id)
+        if upload is None:
+            return JsonResponse({"success": False, "error": "Upload not found"}, status=404)
+
+        try:
+            offset = int(request.GET["offset"])
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (KeyError, ValueError):
+            return JsonResponse({"success": False, "error": "Invalid offset"}, status=400)
+        if offset < 0 or length <= 0:
+            return JsonResponse({"success": False, "error": "Empty chunk"}, status=400)
+
+        try:
+            new_offset = write_chunk(
+                upload, request, offset, length, request.headers.get("X-Chunk-SHA256", "")
+            )
+        except ChunkOffsetError as e:
+            return JsonResponse({"success": False, "error": str(e), "offset": e.offset}, status=409)
+        except ChunkChecksumError as e:
+            return JsonResponse({"success": False, "error": str(e), "offset": e.offset}, status=422)
+        except ValidationError as e:
+            return JsonResponse({"success": False, "error": "; ".join(e.messages)}, status=400)
+
+        return JsonResponse({"success": True, "offset": new_offset, "size": upload.size})
+
+    def _get_upload(self, request, upload_id) -> ChunkedUpload | None:
+        return ChunkedUpload.objects.filter(id=upload_id, created_by=request.user).first()
@@ -2,7 +2,8 @@
 
 from django.contrib import admin
 
-from .models import DiscordUserLink
+from .models import DiscordUserLink, WebhookOutbox
+from .tasks import replay_webhook_events
 
 
 @admin.register(DiscordUserLink)
@@ -38,3 +39,40 @@ class DiscordUserLinkAdmin(admin.ModelAdmin):
         ("Linked Maintainer", {"fields": ("maintainer",)}),
         ("Timestamps", {"fields": ("created_at", "updated_at"), "classes": ("collapse",)}),
     )
+
+
+@admin.register(WebhookOutbox)
+class WebhookOutboxAdmin(admin.ModelAdmin):
+    """Webhook deliveries, to see what's pending or failed and send it again."""
+
+    list_display = (
+        "idempotency_key",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "last_error",
+        "created_at",
+    )
+    list_filter = ("status", "handler_name")
+    search_fields = ("idempotency_key",)
+    actions = ("replay",)
+    readonly_fields = (
+        "idempotency_key",
+        "handler_name",
+        "object_id",
+        "status",
+        "attempts",
+        "next_attempt_at",
+        "last_error",
+        "log_context",
+        "created_at",
+        "delivered_at",
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="Deliver selected webhooks again")
+    def replay(self, request, queryset):
+        count = replay_webhook_events(queryset)
+        self.message_user(request, f"Queued {count} webhook(s) for delivery.")
@@ -0,0 +1,37 @@
+"""Data migration to drain the webhook outbox every minute."""
+
+from django.conf import settings
+from django.db import migrations
+
+DRAIN_FUNC = "flipfix.apps.discord.tasks.drain_webhook_outbox"
+
+
+def create_drain_schedule(apps, schema_editor):
+    """Schedule the outbox drain on the fast task lane, to retry failed deliveries."""
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.get_or_create(
+        func=DRAIN_FUNC,
+        defaults={
+            "name": "Drain Discord webhook outbox",
+            "schedule_type": "I",  # Schedule.MINUTES
+            "minutes": 1,
+            "repeats": -1,
+            "cluster": settings.TASK_LANES["fast"],
+        },
+    )
+
+
+def delete_drain_schedule(apps, schema_editor):
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.filter(func=DRAIN_FUNC).delete()
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("discord", "0007_add_webhook_outbox"),
+        ("django_q", "0018_task_success_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_drain_schedule, delete_drain_schedule),
+    ]
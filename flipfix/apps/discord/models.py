@@ -2,6 +2,7 @@
 
 from django.db import models
 from django.db.models import Model
+from django.utils import timezone
 
 from flipfix.apps.core.models import TimeStampedMixin
 
@@ -122,3 +123,43 @@ class DiscordMessageMapping(models.Model):
 
         content_type = ContentType.objects.get_for_model(model_class)
         return cls.objects.filter(content_type=content_type, object_id=object_id).exists()
+
+
+class WebhookOutbox(models.Model):
+    """A Discord webhook event waiting to be, or already, delivered.
+
+    Written in the same transaction as the record it announces, so an event
+    is queued if and only if the record is committed.  The worker drains
+    due events and retries failures with backoff (see ``tasks.py``).  The
+    idempotency key names the event (e.g. "log_entry_created:42"), so one
+    event is queued only once however many times its signal fires.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Pending"
+        DELIVERED = "delivered", "Delivered"
+        SKIPPED = "skipped", "Skipped"
+        FAILED = "failed", "Failed"
+
+    idempotency_key = models.CharField(max_length=100, unique=True)
+    handler_name = models.CharField(max_length=50)
+    object_id = models.PositiveIntegerField()
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    log_context = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Discord webhook delivery"
+        verbose_name_plural = "Discord webhook deliveries"
+        indexes = [
+            # For the drain's due-event lookup
+            models.Index(fields=["status", "next_attempt_at"]),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.idempotency_key} ({self.get_status_display()})"
@@ -1,15 +1,27 @@
-"""Webhook delivery tasks using Django Q."""
+"""Webhook delivery tasks using Django Q.
+
+Events go through a transactional outbox: ``dispatch_webhook()`` writes a
+``WebhookOutbox`` row in the transaction that saves the record, and
+``drain_webhook_outbox()`` on the worker delivers due rows, retrying
+failures with exponential backoff and waiting out Discord's rate limits.
+The drain is queued whenever events are committed, and also runs every
+minute (a django-q schedule) to pick up retries and anything missed.
+"""
 
 from __future__ import annotations
 
 import logging
 from dataclasses import dataclass
+from datetime import timedelta
 from typing import TYPE_CHECKING
 
 import requests
+from django.db import transaction
+from django.utils import timezone
 from django_q.tasks import async_task
 
-from flipfix.apps.discord.models import DiscordMessageMapping
+from flipfix.apps.core.task_lanes import FAST, lane_cluster
+from flipfix.apps.discord.models import DiscordMessageMapping, WebhookOutbox
 from flipfix.logging import bind_log_context, current_log_context, reset_log_context
 
 if TYPE_CHECKING:
@@ -19,6 +31,15 @@ if TYPE_CHECKING:
 
 logger = logging.getLogger(__name__)
 
+WEBHOOK_MAX_ATTEMPTS = 8  # Failed for good after this many errors
+WEBHOOK_RETRY_BASE_SECONDS = 30  # Backoff after the first error; doubles each time
+WEBHOOK_RETRY_MAX_SECONDS = 60 * 60
+WEBHOOK_DRAIN_BATCH_SIZE = 50  # Events per drain run; the rest wait for the next
+# How long a drain has an event to itself while delivering it.  Well over the
+# request timeout; an event whose drain died is retried once it runs out.
+WEBHOOK_DELIVERY_LEASE = timedelta(minutes=2)
+WEBHOOK_OUTBOX_RETENTION = timedelta(days=30)  # How long delivered events are kept
+
 
 @dataclass(frozen=True)
 class WebhookDeliveryResult:
@@ -26,17 +47,20 @@ class WebhookDeliveryResult:
 
     status: str  # "success", "error", "skipped"
     reason: str | None = None  # Why skipped or errored
-    status_code: int | None = None  # HTTP status code on success
+    status_code: int | None = None  # HTTP status code, if Discord answered
+    retryable: bool = False  # Whether the error may go away (network, 5xx, 429)
+    retry_after: float | None = None  # Seconds Discord asked us to wait (429)
 
 
 def dispatch_webhook(handler_name: str, object_id: int) -> None:
-    """Queue a webhook delivery task for the given event.
+    """Queue a webhook delivery for the given event in the outbox.
 
-    This function is called synchronously from signal handlers and
-    enqueues the actual webhook delivery to run asynchronously.
+    Called from signal handlers, inside the transaction that saved the
+    record, so the event is only kept if the record is.  A drain is queued
+    once the transaction commits.
 
     Checks if webhooks are enabled before queueing to avoid filling
-    the task queue when webhooks are disabled.
+    the outbox when webhooks are disabled.
     """
     from constance import config
 
@@ -50,28 +74,132 @@ def dispatch_webhook(handler_name: str, object_id: int) -> None:
         logger.warning("discord_unknown_webhook_handler", extra={"handler_name": handler_name})
         return
 
-    # Skip creation webhooks for Discord-originated records (avoids echo).
-    # Only suppress *_created events - future update events should still post.
-    if handler.event_type.endswith("_created"):
-        model_class = handler.get_model_class()
-        if DiscordMessageMapping.has_mapping_for(model_class, object_id):
-            return
+    WebhookOutbox.objects.get_or_create(
+        idempotency_key=f"{handler.event_type}:{object_id}",
+        defaults={
+            "handler_name": handler_name,
+            "object_id": object_id,
+            "log_context": current_log_context(),
+        },
+    )
+    transaction.on_commit(queue_webhook_drain)
+
 
+def queue_webhook_drain() -> None:
+    """Queue a run of ``drain_webhook_outbox()`` on the fast task lane."""
     async_task(
-        "flipfix.apps.discord.tasks.deliver_webhook",
-        handler_name,
-        object_id,
-        current_log_context(),
-        timeout=60,
+        "flipfix.apps.discord.tasks.drain_webhook_outbox",
+        timeout=60 * 5,
+        cluster=lane_cluster(FAST),
+    )
+
+
+def drain_webhook_outbox() -> int:
+    """Deliver the outbox events that are due, oldest first.
+
+    Each event is claimed before it's delivered, so concurrent drains never
+    send the same one, and no row lock is held during the HTTP request.
+    Stops early when Discord rate-limits us, since the rest would be
+    refused too.
+
+    Returns:
+        The number of delivery attempts made.
+    """
+    attempted = 0
+    while attempted < WEBHOOK_DRAIN_BATCH_SIZE:
+        event = _claim_due_event()
+        if event is None:
+            break
+        result = deliver_webhook(event.handler_name, event.object_id, event.log_context)
+        _record_attempt(event, result)
+        attempted += 1
+        if result.retry_after is not None:
+            break
+
+    WebhookOutbox.objects.filter(
+        status=WebhookOutbox.Status.DELIVERED,
+        delivered_at__lt=timezone.now() - WEBHOOK_OUTBOX_RETENTION,
+    ).delete()
+    return attempted
+
+
+def _claim_due_event() -> WebhookOutbox | None:
+    """Lease the next due event to this drain, or return None if none is due.
+
+    The lease moves the event's ``next_attempt_at`` past the delivery
+    (``WEBHOOK_DELIVERY_LEASE``) and is committed straight away, so other
+    drains skip the event until its attempt is recorded.
+    """
+    with transaction.atomic():
+        event = (
+            WebhookOutbox.objects.select_for_update(skip_locked=True)
+            .filter(status=WebhookOutbox.Status.PENDING, next_attempt_at__lte=timezone.now())
+            .order_by("next_attempt_at", "pk")
+            .first()
+        )
+        if event is not None:
+            event.next_attempt_at = timezone.now() + WEBHOOK_DELIVERY_LEASE
+            event.save(update_fields=["next_attempt_at"])
+    return event
+
+
+def _record_attempt(event: WebhookOutbox, result: WebhookDeliveryResult) -> None:
+    """Save the outcome of a delivery attempt, scheduling a retry if it may succeed later."""
+    now = timezone.now()
+    event.attempts += 1
+    event.last_error = result.reason or ""
+    if result.status == "success":
+        event.status = WebhookOutbox.Status.DELIVERED
+        event.delivered_at = now
+    elif result.status == "skipped":
+        event.status = WebhookOutbox.Status.SKIPPED
+    elif result.retry_after is not None:
+        # Rate limited: not a failure, so it doesn't use up an attempt
+        event.attempts -= 1
+        event.next_attempt_at = now + timedelta(seconds=result.retry_after)
+    elif result.retryable and event.attempts < WEBHOOK_MAX_ATTEMPTS:
+        delay = min(
+            WEBHOOK_RETRY_BASE_SECONDS * 2 ** (event.attempts - 1), WEBHOOK_RETRY_MAX_SECONDS
+        )
+        event.next_attempt_at = now + timedelta(seconds=delay)
+    else:
+        event.status = WebhookOutbox.Status.FAILED
+        logger.warning(
+            "discord_webhook_delivery_abandoned",
+            extra={
+                "idempotency_key": event.idempotency_key,
+                "attempts": event.attempts,
+                "error": event.last_error,
+            },
+        )
+    event.save(
+        update_fields=["attempts", "last_error", "status", "delivered_at", "next_attempt_at"]
     )
 
 
+def replay_webhook_events(events) -> int:
+    """Queue outbox events to be delivered again from scratch, e.g. after fixing the URL.
+
+    Returns:
+        The number of events queued.
+    """
+    count = events.update(
+        status=WebhookOutbox.Status.PENDING,
+        attempts=0,
+        next_attempt_at=timezone.now(),
+        last_error="",
+        delivered_at=None,
+    )
+    transaction.on_commit(queue_webhook_drain)
+    return count
+
+
 def deliver_webhook(
     handler_name: str, object_id: int, log_context: dict | None = None
 ) -> WebhookDeliveryResult:
-    """Deliver webhook for a given event to the configured Discord webhook URL.
+    """Make one attempt to deliver a webhook event to the configured Discord webhook URL.
 
-    This runs asynchronously via Django Q.
+    Called by ``drain_webhook_outbox()``, which handles retries.
     """
     from constance import config
 
@@ -94,6 +222,15 @@ def deliver_webhook(
         if not handler:
             return WebhookDeliveryResult(status="error", reason=f"Unknown handler: {handler_name}")
 
+        # Skip creation webhooks for Discord-originated records (avoids echo).
+        # Only suppress *_created events - future update events should still post.
+        # Checked now rather than when queued, because the bot records the
+        # mapping after the record, in the same transaction.
+        if handler.event_type.endswith("_created"):
+            model_class = handler.get_model_class()
+            if DiscordMessageMapping.has_mapping_for(model_class, object_id):
+                return WebhookDeliveryResult(status="skipped", reason="created from Discord")
+
         # Fetch the object with optimized queries
         obj = handler.get_object(object_id)
         if obj is None:
@@ -129,7 +266,36 @@ def _deliver_to_url(
             "discord_webhook_delivery_failed",
             extra={"error": str(e)},
         )
-        return WebhookDeliveryResult(status="error", reason=str(e))
+        status_code = e.response.status_code if e.response is not None else None
+        return WebhookDeliveryResult(
+            status="error",
+            reason=str(e),
+            status_code=status_code,
+            # Network errors and server errors may pass; other 4xx won't
+            retryable=status_code is None or status_code == 429 or status_code >= 500,
+            retry_after=_retry_after_seconds(e.response) if status_code == 429 else None,
+        )
+
+
+def _retry_after_seconds(response: requests.Response) -> float:
+    """Return how long a rate-limited (429) response asks us to wait, in seconds.
+
+    Discord sends it in the ``Retry-After`` header and as ``retry_after`` in
+    the JSON body; without either, wait a second.
+    """
+    for value in (response.headers.get("Retry-After"), _json_retry_after(response)):
+        try:
+            return max(float(value), 0.0)
+        except (TypeError, ValueError):
+            continue
+    return 1.0
+
+
+def _json_retry_after(response: requests.Response):
+    try:
+        return response.json().get("retry_after")
+    except ValueError:
+        return None
 
 
 def send_test_webhook(event_type: str) -> dict:
@@ -1,13 +1,25 @@
 """Tests for webhook delivery logic."""
 
+import json
+from datetime import timedelta
 from unittest.mock import MagicMock, patch
 
 import requests
 from constance.test import override_config
 from django.test import TestCase, tag
+from django.utils import timezone
 
 from flipfix.apps.core.test_utils import create_machine, create_problem_report
-from flipfix.apps.discord.tasks import deliver_webhook
+from flipfix.apps.discord.models import WebhookOutbox
+from flipfix.apps.discord.tasks import (
+    WEBHOOK_DELIVERY_LEASE,
+    WEBHOOK_MAX_ATTEMPTS,
+    WEBHOOK_RETRY_BASE_SECONDS,
+    deliver_webhook,
+    dispatch_webhook,
+    drain_webhook_outbox,
+    replay_webhook_events,
+)
 
 
 @tag("tasks")
@@ -71,3 +83,182 @@ class WebhookDeliveryTests(TestCase):
 
         self.assertEqual(result.status, "error")
         self.assertIn("Connection error", result.reason)
+
+
+def http_error(status_code, headers=None, body=None):
+    """Return a RequestException as raised by raise_for_status() for a response."""
+    response = requests.Response()
+    response.status_code = status_code
+    response.headers.update(headers or {})
+    response._content = json.dumps(body).encode() if body is not None else b""
+    return requests.HTTPError(f"{status_code} Error", response=response)
+
+
+@tag("tasks")
+@override_config(
+    DISCORD_WEBHOOK_URL="https://discord.com/api/webhooks/123/abc",
+    DISCORD_WEBHOOKS_ENABLED=True,
+)
+@patch("flipfix.apps.discord.tasks.requests.post")
+@patch("flipfix.apps.discord.tasks.async_task")
+class WebhookOutboxDrainTests(TestCase):
+    """Tests for draining the webhook outbox."""
+
+    def setUp(self):
+        self.machine = create_machine()
+        self.report = create_problem_report(machine=self.machine)
+        self.event = WebhookOutbox.objects.get(handler_name="problem_report")
+
+    def drain(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            drain_webhook_outbox()
+        self.event.refresh_from_db()
+
+    def test_delivers_pending_events(self, mock_async, mock_post):
+        mock_post.return_value = MagicMock(status_code=204)
+
+        self.drain()
+
+        mock_post.assert_called_once()
+        self.assertEqual(self.event.status, WebhookOutbox.Status.DELIVERED)
+        self.assertEqual(self.event.attempts, 1)
+        self.assertIsNotNone(self.event.delivered_at)
+
+    def test_event_is_claimed_before_delivery(self, mock_async, mock_post):
+        """While one drain is sending an event, it isn't due for any other."""
+        due_while_sending = []
+
+        def post(*args, **kwargs):
+            due_while_sending.append(
+                WebhookOutbox.objects.filter(next_attempt_at__lte=timezone.now()).exists()
+            )
+            return MagicMock(status_code=204)
+
+        mock_post.side_effect = post
+
+        self.drain()
+
+        self.assertEqual(due_while_sending, [False])
+        self.assertEqual(self.event.status, WebhookOutbox.Status.DELIVERED)
+
+    def test_event_of_a_dead_drain_is_retried_when_its_lease_runs_out(self, mock_async, mock_post):
+        mock_post.side_effect = SystemExit  # The worker dies mid-delivery
+        with self.assertRaises(SystemExit):
+            self.drain()
+        self.event.refresh_from_db()
+        self.assertEqual(self.event.status, WebhookOutbox.Status.PENDING)
+        self.assertAlmostEqual(
+            (self.event.next_attempt_at - timezone.now()).total_seconds(),
+            WEBHOOK_DELIVERY_LEASE.total_seconds(),
+            delta=5,
+        )
+
+        mock_post.side_effect = None
+        mock_post.return_value = MagicMock(status_code=204)
+        WebhookOutbox.objects.update(next_attempt_at=timezone.now())
+        self.drain()
+
+        self.assertEqual(self.event.status, WebhookOutbox.Status.DELIVERED)
+
+    def test_same_event_is_queued_once(self, mock_async, mock_post):
+        dispatch_webhook("problem_report", self.report.pk)
+
+        self.assertEqual(WebhookOutbox.objects.count(), 1)
+
+    def test_retries_server_errors_with_backoff(self, mock_async, mock_post):
+        mock_post.side_effect = http_error(502)
+
+        with self.assertLogs("flipfix.apps.discord.tasks", level="WARNING"):
+            self.drain()
+        first_retry = self.event.next_attempt_at
+        self.assertEqual(self.event.status, WebhookOutbox.Status.PENDING)
+        self.assertIn("502", self.event.last_error)
+        self.assertAlmostEqual(
+            (first_retry - timezone.now()).total_seconds(), WEBHOOK_RETRY_BASE_SECONDS, delta=5
+        )
+
+        # Not due yet, so the next drain leaves it alone
+        self.drain()
+        self.assertEqual(mock_post.call_count, 1)
+
+        WebhookOutbox.objects.update(next_attempt_at=timezone.now())
+        with self.assertLogs("flipfix.apps.discord.tasks", level="WARNING"):
+            self.drain()
+        self.assertEqual(self.event.attempts, 2)
+        self.assertAlmostEqual(
+            (self.event.next_attempt_at - timezone.now()).total_seconds(),
+            WEBHOOK_RETRY_BASE_SECONDS * 2,
+            delta=5,
+        )
+
+    def test_fails_after_max_attempts(self, mock_async, mock_post):
+        mock_post.side_effect = requests.ConnectionError("Connection refused")
+        WebhookOutbox.objects.update(attempts=WEBHOOK_MAX_ATTEMPTS - 1)
+
+        with self.assertLogs("flipfix.apps.discord.tasks", level="WARNING") as logs:
+            self.drain()
+
+        self.assertEqual(self.event.status, WebhookOutbox.Status.FAILED)
+        self.assertIn("discord_webhook_delivery_abandoned", logs.output[-1])
+
+    def test_client_errors_fail_without_retry(self, mock_async, mock_post):
+        mock_post.side_effect = http_error(404)
+
+        with self.assertLogs("flipfix.apps.discord.tasks", level="WARNING"):
+            self.drain()
+
+        self.assertEqual(self.event.status, WebhookOutbox.Status.FAILED)
+        self.assertEqual(self.event.attempts, 1)
+
+    def test_rate_limit_waits_retry_after_and_stops_drain(self, mock_async, mock_post):
+        later_report = create_problem_report(machine=self.machine)
+        mock_post.side_effect = http_error(429, headers={"Retry-After": "120"})
+
+        with self.assertLogs("flipfix.apps.discord.tasks", level="WARNING"):
+            self.drain()
+
+        mock_post.assert_called_once()
+        self.assertEqual(self.event.status, WebhookOutbox.Status.PENDING)
+        self.assertEqual(self.event.attempts, 0)
+        self.assertAlmostEqual(
+            (self.event.next_attempt_at - timezone.now()).total_seconds(), 120, delta=5
+        )
+        later = WebhookOutbox.objects.get(object_id=later_report.pk)
+        self.assertEqual(later.status, WebhookOutbox.Status.PENDING)
+
+    def test_rate_limit_reads_retry_after_from_body(self, mock_async, mock_post):
+        mock_post.side_effect = http_error(429, body={"retry_after": 2.5})
+
+        with self.assertLogs("flipfix.apps.discord.tasks", level="WARNING"):
+            self.drain()
+
+        self.assertAlmostEqual(
+            (self.event.next_attempt_at - timezone.now()).total_seconds(), 2.5, delta=2
+        )
+
+    def test_replay_queues_failed_event_again(self, mock_async, mock_post):
+        WebhookOutbox.objects.update(
+            status=WebhookOutbox.Status.FAILED, attempts=WEBHOOK_MAX_ATTEMPTS, last_error="404"
+        )
+        mock_post.return_value = MagicMock(status_code=204)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            replay_webhook_events(WebhookOutbox.objects.all())
+        mock_async.assert_called_with(
+            "flipfix.apps.discord.tasks.drain_webhook_outbox", timeout=300, cluster="flipfix_worker"
+        )
+        self.drain()
+
+        self.assertEqual(self.event.status, WebhookOutbox.Status.DELIVERED)
+        self.assertEqual(self.event.attempts, 1)
+        self.assertEqual(self.event.last_error, "")
+
+    def test_purges_old_delivered_events(self, mock_async, mock_post):
+        WebhookOutbox.objects.update(
+            status=WebhookOutbox.Status.DELIVERED,
+            delivered_at=timezone.now() - timedelta(days=31),
+        )
+
+        drain_webhook_outbox()
+
+        self.assertFalse(WebhookOutbox.objects.exists())
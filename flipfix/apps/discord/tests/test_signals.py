@@ -3,6 +3,7 @@
 from unittest.mock import patch
 
 from constance.test import override_config
+from django.db import transaction
 from django.test import TestCase, tag
 
 from flipfix.apps.accounts.models import Maintainer
@@ -14,10 +15,18 @@ from flipfix.apps.core.test_utils import (
     create_part_request_update,
     create_problem_report,
 )
-from flipfix.apps.discord.models import DiscordMessageMapping
+from flipfix.apps.discord.models import DiscordMessageMapping, WebhookOutbox
+from flipfix.apps.discord.tasks import deliver_webhook
 from flipfix.apps.maintenance.models import ProblemReport
 
 
+def queued_ids(handler_name):
+    """Return the ids of the objects with webhooks queued for a handler."""
+    return list(
+        WebhookOutbox.objects.filter(handler_name=handler_name).values_list("object_id", flat=True)
+    )
+
+
 @tag("tasks")
 @override_config(DISCORD_WEBHOOKS_ENABLED=True, DISCORD_WEBHOOK_URL="https://test.webhook")
 class WebhookSignalTests(TestCase):
@@ -28,36 +37,56 @@ class WebhookSignalTests(TestCase):
 
     @patch("flipfix.apps.discord.tasks.async_task")
     def test_signal_fires_on_problem_report_created(self, mock_async):
-        """Signal fires when a problem report is created."""
-        # All webhook signals use transaction.on_commit
+        """Signal queues a webhook when a problem report is created."""
         with self.captureOnCommitCallbacks(execute=True):
             report = ProblemReport.objects.create(
                 machine=self.machine,
                 description="Test problem",
             )
 
+        event = WebhookOutbox.objects.get(handler_name="problem_report")
+        self.assertEqual(event.object_id, report.pk)
+        self.assertEqual(event.idempotency_key, f"problem_report_created:{report.pk}")
+        self.assertEqual(event.status, WebhookOutbox.Status.PENDING)
+        # The drain is queued once the transaction commits
         mock_async.assert_called()
-        call_args = mock_async.call_args
-        self.assertEqual(call_args[0][1], "problem_report")
-        self.assertEqual(call_args[0][2], report.pk)
+        self.assertEqual(
+            mock_async.call_args[0][0], "flipfix.apps.discord.tasks.drain_webhook_outbox"
+        )
 
     @patch("flipfix.apps.discord.tasks.async_task")
     def test_signal_fires_on_log_entry_created(self, mock_async):
-        """Signal fires when a log entry is created."""
+        """Signal queues a webhook when a log entry is created."""
         maintainer_user = create_maintainer_user()
 
-        # Log entry signal uses transaction.on_commit, so we need to capture and execute
         with self.captureOnCommitCallbacks(execute=True):
             log_entry = create_log_entry(machine=self.machine, created_by=maintainer_user)
 
-        # Find the log_entry call
-        calls = [c for c in mock_async.call_args_list if c[0][1] == "log_entry"]
-        self.assertEqual(len(calls), 1)
-        self.assertEqual(calls[0][0][2], log_entry.pk)
+        self.assertEqual(queued_ids("log_entry"), [log_entry.pk])
+
+    @patch("flipfix.apps.discord.tasks.async_task")
+    def test_rolled_back_record_queues_nothing(self, mock_async):
+        """The outbox row is written in the record's transaction, so it rolls back with it."""
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    create_problem_report(machine=self.machine)
+                    raise RuntimeError("Abort")
+            except RuntimeError:
+                pass
+
+        self.assertFalse(WebhookOutbox.objects.exists())
+
+    @override_config(DISCORD_WEBHOOKS_ENABLED=False)
+    def test_nothing_queued_when_webhooks_disabled(self):
+        create_problem_report(machine=self.machine)
+
+        self.assertFalse(WebhookOutbox.objects.exists())
 
 
 @tag("tasks")
 @override_config(DISCORD_WEBHOOKS_ENABLED=True, DISCORD_WEBHOOK_URL="https://test.webhook")
+@patch("flipfix.apps.discord.tasks.async_task")
 class PartRequestWebhookSignalTests(TestCase):
     """Tests for part request webhook signal triggers."""
 
@@ -66,117 +95,88 @@ class PartRequestWebhookSignalTests(TestCase):
         self.maintainer = Maintainer.objects.get(user=self.maintainer_user)
         self.machine = create_machine()
 
-    @patch("flipfix.apps.discord.tasks.async_task")
     def test_signal_fires_on_part_request_created(self, mock_async):
-        """Signal fires when a part request is created."""
-        # All webhook signals use transaction.on_commit
-        with self.captureOnCommitCallbacks(execute=True):
-            part_request = create_part_request(
-                requested_by=self.maintainer,
-                machine=self.machine,
-            )
+        """Signal queues a webhook when a part request is created."""
+        part_request = create_part_request(
+            requested_by=self.maintainer,
+            machine=self.machine,
+        )
 
-        # Find the part_request call
-        calls = [c for c in mock_async.call_args_list if c[0][1] == "part_request"]
-        self.assertEqual(len(calls), 1)
-        self.assertEqual(calls[0][0][2], part_request.pk)
+        self.assertEqual(queued_ids("part_request"), [part_request.pk])
 
-    @patch("flipfix.apps.discord.tasks.async_task")
     def test_signal_fires_on_part_request_update_created(self, mock_async):
-        """Signal fires when a part request update is created."""
-        with self.captureOnCommitCallbacks(execute=True):
-            part_request = create_part_request(requested_by=self.maintainer)
-        mock_async.reset_mock()
+        """Signal queues a webhook when a part request update is created."""
+        part_request = create_part_request(requested_by=self.maintainer)
 
-        # All webhook signals use transaction.on_commit
-        with self.captureOnCommitCallbacks(execute=True):
-            update = create_part_request_update(
-                part_request=part_request,
-                posted_by=self.maintainer,
-                text="Update text",
-            )
+        update = create_part_request_update(
+            part_request=part_request,
+            posted_by=self.maintainer,
+            text="Update text",
+        )
 
-        # Find the part_request_update call
-        calls = [c for c in mock_async.call_args_list if c[0][1] == "part_request_update"]
-        self.assertEqual(len(calls), 1)
-        self.assertEqual(calls[0][0][2], update.pk)
+        self.assertEqual(queued_ids("part_request_update"), [update.pk])
 
-    @patch("flipfix.apps.discord.tasks.async_task")
     def test_signal_fires_on_status_change_via_update(self, mock_async):
         """Status change via update only fires update_created (not a separate status event)."""
         from flipfix.apps.parts.models import PartRequest
 
-        with self.captureOnCommitCallbacks(execute=True):
-            part_request = create_part_request(requested_by=self.maintainer)
-        mock_async.reset_mock()
+        part_request = create_part_request(requested_by=self.maintainer)
 
-        # All webhook signals use transaction.on_commit
-        with self.captureOnCommitCallbacks(execute=True):
-            create_part_request_update(
-                part_request=part_request,
-                posted_by=self.maintainer,
-                text="Ordered it",
-                new_status=PartRequest.Status.ORDERED,
-            )
+        create_part_request_update(
+            part_request=part_request,
+            posted_by=self.maintainer,
+            text="Ordered it",
+            new_status=PartRequest.Status.ORDERED,
+        )
 
         # Should only fire part_request_update (status info is included in the update message)
-        handler_names = [c[0][1] for c in mock_async.call_args_list]
+        handler_names = set(WebhookOutbox.objects.values_list("handler_name", flat=True))
         self.assertIn("part_request_update", handler_names)
         self.assertNotIn("part_request_status_changed", handler_names)
 
 
 @tag("tasks")
 @override_config(DISCORD_WEBHOOKS_ENABLED=True, DISCORD_WEBHOOK_URL="https://test.webhook")
+@patch("flipfix.apps.discord.tasks.requests.post")
+@patch("flipfix.apps.discord.tasks.async_task")
 class DiscordOriginatedRecordTests(TestCase):
-    """Tests that webhooks are NOT dispatched for Discord-originated records.
+    """Tests that webhooks are NOT posted for Discord-originated records.
 
     When the Discord bot creates a record in Flipfix, we don't want to
-    post it back to Discord via webhook (that would be redundant).
+    post it back to Discord via webhook (that would be redundant).  The bot
+    marks the record in the same transaction that creates it, so the check
+    happens at delivery time.
     """
 
     def setUp(self):
         self.machine = create_machine()
 
-    @patch("flipfix.apps.discord.tasks.async_task")
-    def test_signal_skips_discord_originated_problem_report(self, mock_async):
+    def assert_not_posted(self, handler_name, obj, mock_post):
+        result = deliver_webhook(handler_name, obj.pk)
+
+        self.assertEqual(result.status, "skipped")
+        self.assertIn("created from Discord", result.reason)
+        mock_post.assert_not_called()
+
+    def test_skips_discord_originated_problem_report(self, mock_async, mock_post):
         """No webhook when ProblemReport was created from Discord."""
-        with self.captureOnCommitCallbacks(execute=True):
-            report = create_problem_report(machine=self.machine)
-            # Mark as Discord-originated BEFORE transaction commits
-            DiscordMessageMapping.mark_processed("discord_msg_123", report)
+        report = create_problem_report(machine=self.machine)
+        DiscordMessageMapping.mark_processed("discord_msg_123", report)
 
-        # Should NOT have fired problem_report webhook
-        calls = [c for c in mock_async.call_args_list if c[0][1] == "problem_report"]
-        self.assertEqual(len(calls), 0, "Webhook should not fire for Discord-originated record")
+        self.assert_not_posted("problem_report", report, mock_post)
 
-    @patch("flipfix.apps.discord.tasks.async_task")
-    def test_signal_skips_discord_originated_log_entry(self, mock_async):
+    def test_skips_discord_originated_log_entry(self, mock_async, mock_post):
         """No webhook when LogEntry was created from Discord."""
         maintainer_user = create_maintainer_user()
+        log_entry = create_log_entry(machine=self.machine, created_by=maintainer_user)
+        DiscordMessageMapping.mark_processed("discord_msg_456", log_entry)
 
-        with self.captureOnCommitCallbacks(execute=True):
-            log_entry = create_log_entry(machine=self.machine, created_by=maintainer_user)
-            # Mark as Discord-originated BEFORE transaction commits
-            DiscordMessageMapping.mark_processed("discord_msg_456", log_entry)
-
-        # Should NOT have fired log_entry webhook
-        calls = [c for c in mock_async.call_args_list if c[0][1] == "log_entry"]
-        self.assertEqual(len(calls), 0, "Webhook should not fire for Discord-originated record")
+        self.assert_not_posted("log_entry", log_entry, mock_post)
 
-    @patch("flipfix.apps.discord.tasks.async_task")
-    def test_signal_skips_discord_originated_part_request(self, mock_async):
+    def test_skips_discord_originated_part_request(self, mock_async, mock_post):
         """No webhook when PartRequest was created from Discord."""
-        maintainer_user = create_maintainer_user()
-        maintainer = Maintainer.objects.get(user=maintainer_user)
-
-        with self.captureOnCommitCallbacks(execute=True):
-            part_request = create_part_request(
-                requested_by=maintainer,
-                machine=self.machine,
-            )
-            # Mark as Discord-originated BEFORE transaction commits
-            DiscordMessageMapping.mark_processed("discord_msg_789", part_request)
+        maintainer = Maintainer.objects.get(user=create_maintainer_user())
+        part_request = create_part_request(requested_by=maintainer, machine=self.machine)
+        DiscordMessageMapping.mark_processed("discord_msg_789", part_request)
 
-        # Should NOT have fired part_request webhook
-        calls = [c for c in mock_async.call_args_list if c[0][1] == "part_request"]
-        self.assertEqual(len(calls), 0, "Webhook should not fire for Discord-originated record")
+        self.assert_not_posted("part_request", part_request, mock_post)
@@ -13,10 +13,8 @@ from __future__ import annotations
 import importlib
 import logging
 import pkgutil
-from functools import partial
 from typing import Any
 
-from django.db import transaction
 from django.db.models.signals import post_save
 
 logger = logging.getLogger(__name__)
@@ -118,13 +116,8 @@ def _make_signal_handler(handler: WebhookHandler):
         if handler.should_notify(instance, created):
             from flipfix.apps.discord.tasks import dispatch_webhook
 
-            transaction.on_commit(
-                partial(
-                    dispatch_webhook,
-                    handler_name=handler.name,
-                    object_id=instance.pk,
-                )
-            )
+            # Queued in the record's own transaction, so both or neither are saved
+            dispatch_webhook(handler_name=handler.name, object_id=instance.pk)
 
     return signal_handler
 
@@ -98,7 +98,7 @@ class LogEntryAdmin(SimpleHistoryAdmin):
 @admin.register(LogEntryMedia)
 class LogEntryMediaAdmin(SimpleHistoryAdmin):
     list_display = ("log_entry", "media_type", "transcode_status", "created_at")
-    list_filter = ("media_type", "transcode_status")
+    list_filter = ("media_type", "transcode_status", "transcode_method")
     search_fields = (
         "log_entry__machine__name",
         "log_entry__machine__model__name",
@@ -111,7 +111,7 @@ class LogEntryMediaAdmin(SimpleHistoryAdmin):
 @admin.register(ProblemReportMedia)
 class ProblemReportMediaAdmin(SimpleHistoryAdmin):
     list_display = ("problem_report", "media_type", "transcode_status", "created_at")
-    list_filter = ("media_type", "transcode_status")
+    list_filter = ("media_type", "transcode_status", "transcode_method")
     search_fields = (
         "problem_report__machine__name",
         "problem_report__machine__model__name",
@@ -28,6 +28,7 @@ class MaintenanceConfig(AppConfig):
         self._register_feed_sources()
         self._register_link_types()
         self._register_media_models()
+        self._register_search_documents()
 
     @staticmethod
     def _register_feed_sources():
@@ -60,6 +61,7 @@ class MaintenanceConfig(AppConfig):
                 global_select_related=("machine", "machine__model"),
                 machine_template="maintenance/partials/log_entry.html",
                 global_template="maintenance/partials/global_log_entry.html",
+                markdown_fields=("text",),
             )
         )
         register_feed_source(
@@ -70,6 +72,59 @@ class MaintenanceConfig(AppConfig):
                 global_select_related=("machine", "machine__model"),
                 machine_template="maintenance/partials/problem_report_entry.html",
                 global_template="maintenance/partials/global_problem_report_entry.html",
+                markdown_fields=("description",),
+            )
+        )
+
+    @staticmethod
+    def _register_search_documents():
+        from flipfix.apps.core.search import (
+            SearchDocumentType,
+            person_search_text,
+            register_search_document,
+        )
+
+        from .models import LogEntry, ProblemReport
+
+        def _report_text(report):
+            return (
+                report.description,
+                report.reported_by_name,
+                *person_search_text(report.reported_by_user),
+            )
+
+        def _log_text(log):
+            names = [person_search_text(m.user) for m in log.maintainers.all()]
+            return (log.text, log.maintainer_names, *(part for name in names for part in name))
+
+        register_search_document(
+            SearchDocumentType(
+                model=ProblemReport,
+                get_queryset=lambda: ProblemReport.objects.select_related(
+                    "reported_by_user"
+                ).prefetch_related("log_entries__maintainers__user"),
+                get_text=lambda report: (*_report_text(report), report.status, report.priority),
+                get_linked_text=lambda report: (
+                    part for log in report.log_entries.all() for part in _log_text(log)
+                ),
+                linked_records=("log_entries",),
+                snippet_field="description",
+                person_lookups=("reported_by_user", "log_entries__maintainers__user"),
+            )
+        )
+        register_search_document(
+            SearchDocumentType(
+                model=LogEntry,
+                get_queryset=lambda: LogEntry.objects.select_related(
+                    "problem_report__reported_by_user"
+                ).prefetch_related("maintainers__user"),
+                get_text=_log_text,
+                get_linked_text=lambda log: (
+                    _report_text(log.problem_report) if log.problem_report else ()
+                ),
+                linked_records=("problem_report",),
+                snippet_field="text",
+                person_lookups=("maintainers__user", "problem_report__reported_by_user"),
             )
         )
 
@@ -4,12 +4,17 @@ from __future__ import annotations
 
 from datetime import timedelta
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django_q.models import Failure, OrmQ, Success
 
+from flipfix.apps.core.task_lanes import FAST, SLOW
 from flipfix.apps.maintenance.models import LogEntryMedia
 
+# How long a task may wait in each lane's queue before it's reported as stuck
+LANE_MAX_WAIT_SECONDS = {FAST: 120, SLOW: 600}
+
 
 class Command(BaseCommand):
     help = "Check django-q2 worker health and queue status"
@@ -40,22 +45,31 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS("✓ No recent failures"))
 
     def _queue_status(self):
-        queued = OrmQ.objects.count()
-        if queued:
-            self.stdout.write(f"Tasks in queue: {queued}")
-            oldest = OrmQ.objects.order_by("lock").first()
-            if oldest and oldest.lock:
-                age = (timezone.now() - oldest.lock).total_seconds()
-                if age > 600:
-                    self.stdout.write(
-                        self.style.ERROR(
-                            f"✗ Oldest queued task is {age / 60:.1f} minutes old - worker may be stuck!"
-                        )
-                    )
-                else:
-                    self.stdout.write(f"Oldest queued task: {age:.0f}s old")
+        for lane, cluster in settings.TASK_LANES.items():
+            self._lane_status(lane, cluster)
+
+    def _lane_status(self, lane: str, cluster: str):
+        # A queued task's lock is when it was queued, until a worker takes it
+        # and moves the lock past its timeout
+        now = timezone.now()
+        tasks = OrmQ.objects.filter(key=cluster)
+        running = tasks.filter(lock__gt=now).count()
+        waiting = tasks.filter(lock__lte=now)
+        depth = waiting.count()
+        if not depth:
+            self.stdout.write(
+                self.style.SUCCESS(f"✓ {lane} lane: queue is empty ({running} running)")
+            )
+            return
+
+        oldest = waiting.order_by("lock").first()
+        age = (now - oldest.lock).total_seconds() if oldest else 0
+        message = f"{lane} lane: {depth} queued, {running} running, oldest waiting {age:.0f}s"
+        max_wait = LANE_MAX_WAIT_SECONDS.get(lane, 600)
+        if age > max_wait:
+            self.stdout.write(self.style.ERROR(f"✗ {message} - worker may be stuck!"))
         else:
-            self.stdout.write(self.style.SUCCESS("✓ Queue is empty"))
+            self.stdout.write(message)
 
     def _stuck_videos(self):
         stuck_videos = LogEntryMedia.objects.filter(
@@ -64,7 +78,7 @@ class Command(BaseCommand):
                 LogEntryMedia.TranscodeStatus.PENDING,
                 LogEntryMedia.TranscodeStatus.PROCESSING,
             ],
-            created__lt=timezone.now() - timedelta(minutes=15),
+            created_at__lt=timezone.now() - timedelta(minutes=15),
         ).count()
         if stuck_videos:
             self.stdout.write(
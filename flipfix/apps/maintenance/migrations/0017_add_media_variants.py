@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-16 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0016_historicalproblemreport_priority_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicallogentrymedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+        migrations.AddField(
+            model_name='historicalproblemreportmedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+        migrations.AddField(
+            model_name='logentrymedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+        migrations.AddField(
+            model_name='problemreportmedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+    ]
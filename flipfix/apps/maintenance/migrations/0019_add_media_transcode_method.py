@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0018_add_media_content_hash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicallogentrymedia',
+            name='transcode_method',
+            field=models.CharField(blank=True, choices=[('encode', 'Re-encoded'), ('remux', 'Remuxed')], help_text='Whether the video was re-encoded or only remuxed (already web-playable)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='historicalproblemreportmedia',
+            name='transcode_method',
+            field=models.CharField(blank=True, choices=[('encode', 'Re-encoded'), ('remux', 'Remuxed')], help_text='Whether the video was re-encoded or only remuxed (already web-playable)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='logentrymedia',
+            name='transcode_method',
+            field=models.CharField(blank=True, choices=[('encode', 'Re-encoded'), ('remux', 'Remuxed')], help_text='Whether the video was re-encoded or only remuxed (already web-playable)', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='problemreportmedia',
+            name='transcode_method',
+            field=models.CharField(blank=True, choices=[('encode', 'Re-encoded'), ('remux', 'Remuxed')], help_text='Whether the video was re-encoded or only remuxed (already web-playable)', max_length=20),
+        ),
+    ]
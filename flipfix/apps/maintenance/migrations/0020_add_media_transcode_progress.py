@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0019_add_media_transcode_method'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicallogentrymedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicallogentrymedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalproblemreportmedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalproblemreportmedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+        migrations.AddField(
+            model_name='logentrymedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='logentrymedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+        migrations.AddField(
+            model_name='problemreportmedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='problemreportmedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+    ]
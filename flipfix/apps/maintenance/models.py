@@ -7,7 +7,7 @@ from uuid import uuid4
 from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import models
-from django.db.models import Case, Count, IntegerField, Prefetch, Q, Value, When
+from django.db.models import Case, Count, Exists, IntegerField, OuterRef, Prefetch, Q, Value, When
 from django.urls import reverse
 from django.utils import timezone
 from simple_history.models import HistoricalRecords
@@ -17,6 +17,23 @@ from flipfix.apps.catalog.models import MachineInstance
 from flipfix.apps.core.models import AbstractMedia, SearchableQuerySetMixin, TimeStampedMixin
 
 
+def _maintainer_name_exists(query: str) -> Exists:
+    """EXISTS subquery: a maintainer of the outer log entry matches by name.
+
+    Log entries have many maintainers, so a join would repeat the log entry
+    once per maintainer; a correlated subquery keeps search results unique
+    without ``.distinct()``.
+    """
+    return Exists(
+        Maintainer.objects.filter(
+            Q(user__username__icontains=query)
+            | Q(user__first_name__icontains=query)
+            | Q(user__last_name__icontains=query),
+            log_entries=OuterRef("pk"),
+        )
+    )
+
+
 class ProblemReportQuerySet(SearchableQuerySetMixin, models.QuerySet):
     """Custom queryset for ProblemReport with common filters."""
 
@@ -48,14 +65,18 @@ class ProblemReportQuerySet(SearchableQuerySetMixin, models.QuerySet):
     def _build_log_entry_q(self, query: str) -> Q:
         """Build Q object for searching linked log entry fields.
 
-        Matches log entry text and maintainer names.
+        Matches log entry text and maintainer names, as an EXISTS subquery
+        so reports with several matching log entries appear once.
         """
-        return (
-            Q(log_entries__text__icontains=query)
-            | Q(log_entries__maintainers__user__username__icontains=query)
-            | Q(log_entries__maintainers__user__first_name__icontains=query)
-            | Q(log_entries__maintainers__user__last_name__icontains=query)
-            | Q(log_entries__maintainer_names__icontains=query)
+        return Q(
+            Exists(
+                LogEntry.objects.filter(
+                    Q(text__icontains=query)
+                    | Q(maintainer_names__icontains=query)
+                    | _maintainer_name_exists(query),
+                    problem_report=OuterRef("pk"),
+                )
+            )
         )
 
     @staticmethod
@@ -122,7 +143,8 @@ class ProblemReportQuerySet(SearchableQuerySetMixin, models.QuerySet):
         Global search across multiple fields.
 
         Searches: description, machine name, reporter name/username,
-        and linked log entry text/maintainers.
+        and linked log entry text/maintainers.  Machine names aren't part
+        of the stored search document, so they're matched directly.
 
         Returns unfiltered queryset if query is empty/whitespace.
         Caller is responsible for ordering.
@@ -130,10 +152,9 @@ class ProblemReportQuerySet(SearchableQuerySetMixin, models.QuerySet):
         query = self._clean_query(query)
         return self._apply_search(
             query,
-            self._build_report_fields_q(query)
-            | Q(machine__model__name__icontains=query)
-            | Q(machine__name__icontains=query)
-            | self._build_log_entry_q(query),
+            self._build_report_fields_q(query) | self._build_log_entry_q(query),
+            unindexed_q=Q(machine__model__name__icontains=query)
+            | Q(machine__name__icontains=query),
         )
 
     def search_for_machine(self, query: str = ""):
@@ -267,14 +288,12 @@ class LogEntryQuerySet(SearchableQuerySetMixin, models.QuerySet):
         This is the core search pattern shared across all log entry search
         contexts. It matches:
         - Log entry text
-        - Maintainer usernames, first names, last names (via FK)
+        - Maintainer usernames, first names, last names (via M2M, as EXISTS)
         - Free-text maintainer_names field
         """
         return (
             Q(text__icontains=query)
-            | Q(maintainers__user__username__icontains=query)
-            | Q(maintainers__user__first_name__icontains=query)
-            | Q(maintainers__user__last_name__icontains=query)
+            | _maintainer_name_exists(query)
             | Q(maintainer_names__icontains=query)
         )
 
@@ -296,7 +315,8 @@ class LogEntryQuerySet(SearchableQuerySetMixin, models.QuerySet):
         Global search across multiple fields.
 
         Searches: text, machine name, maintainer names/usernames,
-        and linked problem report description.
+        and linked problem report description/reporter.  Machine names
+        aren't part of the stored search document, so they're matched directly.
 
         Returns unfiltered queryset if query is empty/whitespace.
         Caller is responsible for ordering.
@@ -304,10 +324,9 @@ class LogEntryQuerySet(SearchableQuerySetMixin, models.QuerySet):
         query = self._clean_query(query)
         return self._apply_search(
             query,
-            self._build_text_and_maintainer_q(query)
-            | Q(machine__model__name__icontains=query)
-            | Q(machine__name__icontains=query)
-            | Q(problem_report__description__icontains=query),
+            self._build_text_and_maintainer_q(query) | self._build_problem_report_q(query),
+            unindexed_q=Q(machine__model__name__icontains=query)
+            | Q(machine__name__icontains=query),
         )
 
     def search_for_machine(self, query: str = ""):
@@ -341,6 +360,7 @@ class LogEntryQuerySet(SearchableQuerySetMixin, models.QuerySet):
         return self._apply_search(
             query,
             self._build_text_and_maintainer_q(query),
+            linked=False,
         )
 
 
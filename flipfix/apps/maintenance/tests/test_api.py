@@ -1,6 +1,9 @@
 """Tests for maintenance app API endpoints."""
 
+import hashlib
+import io
 import secrets
+import tarfile
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase, override_settings, tag
@@ -15,11 +18,23 @@ from flipfix.apps.core.test_utils import (
     create_log_entry,
     create_maintainer_user,
     create_shared_terminal,
+    create_uploaded_image,
     create_user,
 )
 from flipfix.apps.maintenance.models import LogEntryMedia
 
 
+def hls_archive(files: dict[str, bytes]) -> SimpleUploadedFile:
+    """Return a tar of HLS files as the worker uploads them."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        for name, content in files.items():
+            member = tarfile.TarInfo(name)
+            member.size = len(content)
+            archive.addfile(member, io.BytesIO(content))
+    return SimpleUploadedFile("hls.tar", buffer.getvalue(), content_type="application/x-tar")
+
+
 @tag("views")
 class MaintainerAutocompleteViewTests(SuppressRequestLogsMixin, TestCase):
     """Tests for the maintainer autocomplete API endpoint."""
@@ -250,6 +265,79 @@ class ReceiveTranscodedMediaViewTests(
         self.assertTrue(self.media.transcoded_file)
         self.assertFalse(self.media.poster_file)
 
+    def _post_hls(self, archive):
+        video_file = SimpleUploadedFile("video.mp4", b"video", content_type="video/mp4")
+        with override_settings(TRANSCODING_UPLOAD_TOKEN=self.test_token):
+            return self.client.post(
+                self._build_upload_url(),
+                {"video_file": video_file, "hls_archive": archive},
+                **self._auth_headers(),
+            )
+
+    def test_hls_files_are_stored_together(self):
+        """HLS playlists and segments keep their names, so relative references still work."""
+        response = self._post_hls(
+            hls_archive(
+                {
+                    "master.m3u8": b"#EXTM3U\n360p.m3u8\n",
+                    "360p.m3u8": b"#EXTM3U\n360p_000.ts\n",
+                    "360p_000.ts": b"segment",
+                }
+            )
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.media.refresh_from_db()
+        self.assertEqual(response.json()["hls_url"], self.media.hls_playlist.url)
+        playlist_name = self.media.hls_playlist.name
+        self.assertTrue(playlist_name.endswith("/master.m3u8"))
+        directory = playlist_name.rsplit("/", 1)[0]
+        storage = self.media.hls_playlist.storage
+        self.assertEqual(
+            sorted(storage.listdir(directory)[1]), ["360p.m3u8", "360p_000.ts", "master.m3u8"]
+        )
+        with storage.open(f"{directory}/360p_000.ts") as segment:
+            self.assertEqual(segment.read(), b"segment")
+
+        self.media.delete_hls_files()
+        self.assertFalse(storage.exists(directory))
+
+    def test_long_video_hls_fits_in_one_request(self):
+        """Ten minutes in three renditions is far more files than DATA_UPLOAD_MAX_NUMBER_FILES."""
+        files = {"master.m3u8": b"#EXTM3U\n"}
+        for height in (360, 720, 1080):
+            files[f"{height}p.m3u8"] = b"#EXTM3U\n"
+            files.update({f"{height}p_{i:03d}.ts": b"segment" for i in range(100)})
+
+        response = self._post_hls(hls_archive(files))
+
+        self.assertEqual(response.status_code, 200)
+        self.media.refresh_from_db()
+        directory = self.media.hls_playlist.name.rsplit("/", 1)[0]
+        self.assertEqual(len(self.media.hls_playlist.storage.listdir(directory)[1]), 304)
+
+    def test_rejects_hls_without_master_playlist(self):
+        response = self._post_hls(hls_archive({"360p_000.ts": b"segment"}))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Missing HLS master.m3u8", response.json()["error"])
+        self.media.refresh_from_db()
+        self.assertFalse(self.media.hls_playlist)
+
+    def test_rejects_hls_archive_with_paths(self):
+        response = self._post_hls(
+            hls_archive({"master.m3u8": b"#EXTM3U\n", "../360p_000.ts": b"segment"})
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid HLS file name", response.json()["error"])
+
+    def test_rejects_hls_archive_that_isnt_a_tar(self):
+        response = self._post_hls(SimpleUploadedFile("hls.tar", b"not a tar file"))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("Invalid HLS archive", response.json()["error"])
+
     def test_server_not_configured_for_uploads(self):
         """If TRANSCODING_UPLOAD_TOKEN is not set, should return 500."""
         with override_settings(TRANSCODING_UPLOAD_TOKEN=None):
@@ -260,6 +348,125 @@ class ReceiveTranscodedMediaViewTests(
         self.assertIn("Server not configured", response.json()["error"])
 
 
+@tag("views")
+class ReceivePhotoDerivativesViewTests(
+    TemporaryMediaMixin, SuppressRequestLogsMixin, TestDataMixin, TestCase
+):
+    """Tests for the HTTP API endpoint that receives resized photos from worker service."""
+
+    def setUp(self):
+        super().setUp()
+        self.log_entry = create_log_entry(machine=self.machine, text="Test log entry")
+        self.media = LogEntryMedia(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=SimpleUploadedFile("original.heic", b"fake heic", content_type="image/heic"),
+            transcode_status=LogEntryMedia.TranscodeStatus.PROCESSING,
+        )
+        self.media.save(process_photo=False)
+        self.test_token = secrets.token_hex(16)
+
+    def _post(self, files, media_id=None):
+        url = reverse(
+            "api-transcoding-photo-upload",
+            kwargs={"model_name": "LogEntryMedia", "media_id": media_id or self.media.id},
+        )
+        with override_settings(TRANSCODING_UPLOAD_TOKEN=self.test_token):
+            return self.client.post(url, files, HTTP_AUTHORIZATION=f"Bearer {self.test_token}")
+
+    def _image(self, name):
+        return SimpleUploadedFile(name, MINIMAL_PNG, content_type="image/png")
+
+    def test_rejects_invalid_token(self):
+        with override_settings(TRANSCODING_UPLOAD_TOKEN=self.test_token):
+            response = self.client.post(
+                reverse(
+                    "api-transcoding-photo-upload",
+                    kwargs={"model_name": "LogEntryMedia", "media_id": self.media.id},
+                ),
+                {"thumbnail_file": self._image("thumb.png")},
+                HTTP_AUTHORIZATION="Bearer wrong",
+            )
+        self.assertEqual(response.status_code, 403)
+
+    def test_requires_thumbnail_file(self):
+        response = self._post({"file": self._image("photo.png")})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("thumbnail_file", response.json()["error"])
+
+    def test_validates_photo_file_type(self):
+        response = self._post(
+            {
+                "thumbnail_file": self._image("thumb.png"),
+                "file": SimpleUploadedFile("x.mp4", b"video", content_type="video/mp4"),
+            }
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_rejects_video_media(self):
+        self.media.media_type = LogEntryMedia.MediaType.VIDEO
+        self.media.save()
+        response = self._post({"thumbnail_file": self._image("thumb.png")})
+        self.assertEqual(response.status_code, 400)
+
+    def test_replaces_original_and_marks_ready(self):
+        """The resized photo replaces the original, which is deleted after commit."""
+        original_name = self.media.file.name
+        storage = self.media.file.storage
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post(
+                {"file": self._image("photo.png"), "thumbnail_file": self._image("thumb.png")}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.READY)
+        self.assertTrue(self.media.thumbnail_file)
+        self.assertNotEqual(self.media.file.name, original_name)
+        self.assertFalse(storage.exists(original_name))
+        self.assertFalse(self.media.is_photo_processing)
+
+    def test_thumbnail_only_keeps_original(self):
+        """Without a resized photo (original already web-ready) the original stays."""
+        original_name = self.media.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._post({"thumbnail_file": self._image("thumb.png")})
+
+        self.assertEqual(response.status_code, 200)
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.file.name, original_name)
+        self.assertTrue(self.media.file.storage.exists(original_name))
+        self.assertTrue(self.media.thumbnail_file)
+
+    def test_stores_variants_in_manifest(self):
+        """Variant uploads are saved and described from their image headers."""
+        response = self._post(
+            {
+                "thumbnail_file": self._image("thumb.png"),
+                "variants": [self._image("photo-1w.png"), self._image("photo-1w-b.png")],
+            }
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.media.refresh_from_db()
+        self.assertEqual(len(self.media.variants), 2)
+        variant = self.media.variants[0]
+        self.assertEqual(
+            (variant["type"], variant["width"], variant["height"]), ("image/png", 1, 1)
+        )
+        self.assertTrue(self.media.file.storage.exists(variant["name"]))
+
+    def test_rejects_unreadable_variant(self):
+        bogus = SimpleUploadedFile("photo-320w.webp", b"not an image", content_type="image/webp")
+
+        response = self._post({"thumbnail_file": self._image("thumb.png"), "variants": [bogus]})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("variant", response.json()["error"])
+
+
 @tag("views")
 class ServeSourceMediaViewTests(
     TemporaryMediaMixin, SuppressRequestLogsMixin, TestDataMixin, TestCase
@@ -338,6 +545,67 @@ class ServeSourceMediaViewTests(
         self.assertIn("attachment", response["Content-Disposition"])
         self.assertEqual(b"".join(response.streaming_content), b"fake video content")
 
+    def test_range_request_returns_partial_content(self):
+        """A Range header gets a 206 with just those bytes, for resuming."""
+        with override_settings(TRANSCODING_UPLOAD_TOKEN=self.test_token):
+            full = self.client.get(self._build_download_url(), **self._auth_headers())
+            response = self.client.get(
+                self._build_download_url(),
+                HTTP_RANGE="bytes=5-",
+                HTTP_IF_RANGE=full["ETag"],
+                **self._auth_headers(),
+            )
+
+        self.assertEqual(full["Accept-Ranges"], "bytes")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response["Content-Range"], "bytes 5-17/18")
+        self.assertEqual(response["Content-Length"], "13")
+        self.assertEqual(b"".join(response.streaming_content), b"video content")
+
+    def test_range_with_stale_if_range_returns_whole_file(self):
+        with override_settings(TRANSCODING_UPLOAD_TOKEN=self.test_token):
+            response = self.client.get(
+                self._build_download_url(),
+                HTTP_RANGE="bytes=5-",
+                HTTP_IF_RANGE='"some-other-version"',
+                **self._auth_headers(),
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b"".join(response.streaming_content), b"fake video content")
+
+    def test_range_past_end_is_not_satisfiable(self):
+        with override_settings(TRANSCODING_UPLOAD_TOKEN=self.test_token):
+            response = self.client.get(
+                self._build_download_url(), HTTP_RANGE="bytes=18-", **self._auth_headers()
+            )
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */18")
+
+    def test_offloads_to_nginx(self):
+        """With X-Accel-Redirect offload, nginx is told which file to send."""
+        with override_settings(
+            TRANSCODING_UPLOAD_TOKEN=self.test_token,
+            SOURCE_MEDIA_OFFLOAD="x-accel-redirect",
+            SOURCE_MEDIA_ACCEL_PREFIX="/protected-media/",
+        ):
+            response = self.client.get(self._build_download_url(), **self._auth_headers())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.media.file.name}")
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertIn("attachment", response["Content-Disposition"])
+        self.assertEqual(response.content, b"")
+
+    def test_offloads_to_sendfile(self):
+        with override_settings(
+            TRANSCODING_UPLOAD_TOKEN=self.test_token, SOURCE_MEDIA_OFFLOAD="x-sendfile"
+        ):
+            response = self.client.get(self._build_download_url(), **self._auth_headers())
+
+        self.assertEqual(response["X-Sendfile"], self.media.file.path)
+
     def test_rejects_media_without_file(self):
         """Request for media without a source file should be rejected."""
         self.media.file.delete()
@@ -392,6 +660,28 @@ class DeleteMediaTests(TemporaryMediaMixin, TestDataMixin, TestCase):
         self.assertFalse(storage.exists(file_name))
         self.assertFalse(storage.exists(thumb_name))
 
+    @override_settings(PHOTO_VARIANT_SIZES=[320], PHOTO_VARIANT_FORMATS=["WEBP", "JPEG"])
+    def test_deletes_variant_files(self):
+        """Deleting a photo also removes its responsive variants."""
+        photo = LogEntryMedia.objects.create(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=SimpleUploadedFile(
+                "big.jpg", create_uploaded_image(size=(1000, 750)).read(), content_type="image/jpeg"
+            ),
+        )
+        variant_names = [variant["name"] for variant in photo.variants]
+        self.assertEqual(len(variant_names), 2)
+
+        response = self.client.post(
+            self.delete_url, {"action": "delete_media", "media_id": photo.id}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        storage = photo.file.storage
+        for name in variant_names:
+            self.assertFalse(storage.exists(name))
+
     def test_deletes_all_video_files(self):
         """Deleting video media removes everything associated with the video: the original, transcoded, poster, and DB record."""
         # Create video with all associated files
@@ -558,6 +848,24 @@ class ReceiveMediaViewTests(TemporaryMediaMixin, SuppressRequestLogsMixin, TestD
         self.assertEqual(response.status_code, 500)
         self.assertIn("Server not configured", response.json()["error"])
 
+    def test_reposted_photo_reuses_stored_copy(self):
+        """The same attachment posted twice is stored once, hashed as it streams in."""
+        media_ids = []
+        with override_settings(TRANSCODING_UPLOAD_TOKEN=self.test_token):
+            for _ in range(2):
+                photo_file = SimpleUploadedFile("photo.png", MINIMAL_PNG, content_type="image/png")
+                response = self.client.post(
+                    self._build_upload_url(), {"file": photo_file}, **self._auth_headers()
+                )
+                self.assertEqual(response.status_code, 200)
+                media_ids.append(response.json()["media_id"])
+
+        first, second = LogEntryMedia.objects.filter(id__in=media_ids).order_by("id")
+        self.assertEqual(second.file.name, first.file.name)
+        self.assertEqual(second.blob_id, first.blob_id)
+        expected_hash = hashlib.blake2b(MINIMAL_PNG, digest_size=32).hexdigest()
+        self.assertEqual(first.content_hash, expected_hash)
+
     def test_accepts_file_with_supported_extension_but_generic_content_type(self):
         """Files with supported extensions are accepted even with generic content type.
 
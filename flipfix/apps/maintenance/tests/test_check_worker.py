@@ -0,0 +1,43 @@
+"""Tests for the check_worker management command."""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, tag
+from django.utils import timezone
+from django_q.models import OrmQ
+
+
+@tag("unit")
+class CheckWorkerLaneTests(TestCase):
+    """Tests for the per-lane queue report."""
+
+    def _queue(self, cluster, age_seconds=0, running=False):
+        now = timezone.now()
+        lock = now + timedelta(seconds=600) if running else now - timedelta(seconds=age_seconds)
+        OrmQ.objects.create(key=cluster, payload="task", lock=lock)
+
+    def _check(self):
+        out = StringIO()
+        call_command("check_worker", stdout=out)
+        return out.getvalue()
+
+    def test_reports_each_lane(self):
+        self._queue("flipfix_transcode", running=True)
+        self._queue("flipfix_transcode", age_seconds=30)
+
+        output = self._check()
+
+        self.assertIn("fast lane: queue is empty (0 running)", output)
+        self.assertIn("slow lane: 1 queued, 1 running, oldest waiting 30s", output)
+
+    def test_flags_task_waiting_past_its_lane_limit(self):
+        """A webhook waiting a few minutes is stuck; a transcode isn't."""
+        self._queue("flipfix_worker", age_seconds=300)
+        self._queue("flipfix_transcode", age_seconds=300)
+
+        output = self._check()
+
+        self.assertIn("✗ fast lane: 1 queued, 0 running, oldest waiting 300s", output)
+        self.assertNotIn("✗ slow lane", output)
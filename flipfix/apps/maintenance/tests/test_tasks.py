@@ -1,20 +1,45 @@
 """Tests for maintenance background tasks."""
 
 import logging
+import os
 import secrets
+import shutil
 import subprocess
+import tarfile
 import tempfile
+from dataclasses import replace
+from io import BytesIO
+from pathlib import Path
 from unittest.mock import Mock, patch
 
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, tag
-
-from flipfix.apps.core.test_utils import TemporaryMediaMixin, create_machine
+from django.test import TestCase, override_settings, tag
+
+from flipfix.apps.core.test_utils import (
+    TemporaryMediaMixin,
+    create_machine,
+    create_uploaded_image,
+)
+from flipfix.apps.core.transcoding import VideoProbe
 from flipfix.apps.maintenance.models import LogEntry, LogEntryMedia
 
 # Generate tokens dynamically to avoid triggering secret scanners
 TEST_TOKEN = secrets.token_hex(16)
 
+# A typical phone video: already web-playable, so remuxed
+PHONE_VIDEO = VideoProbe(
+    duration_seconds=120,
+    container="mov,mp4,m4a,3gp,3g2,mj2",
+    video_codec="h264",
+    video_profile="High",
+    pixel_format="yuv420p",
+    width=1920,
+    height=1080,
+    audio_codec="aac",
+)
+# Needs re-encoding
+HEVC_VIDEO = replace(PHONE_VIDEO, video_codec="hevc", video_profile="Main")
+
 
 @tag("tasks")
 class GetTranscodingConfigTests(TestCase):
@@ -223,6 +248,45 @@ class UploadTranscodedFilesTests(TestCase):
         self.assertEqual(mock_post.call_count, 2)
         mock_sleep.assert_called_once_with(2)
 
+    @patch("flipfix.apps.core.transcoding.requests.post")
+    def test_upload_includes_hls_files_as_one_archive(self, mock_post):
+        """Every segment of a long video goes in one part, however many there are."""
+        from flipfix.apps.core.transcoding import _upload_transcoded_files
+
+        hls_dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, hls_dir)
+        names = ["master.m3u8"]
+        for height in (360, 720, 1080):
+            names += [f"{height}p.m3u8", *(f"{height}p_{i:03d}.ts" for i in range(100))]
+        for name in names:
+            (hls_dir / name).write_bytes(b"hls")
+        sent = []
+        archive_paths = []
+
+        def post(url, files, **kwargs):
+            sent.extend((field, part[0], part[2]) for field, part in files)
+            archive_file = files[-1][1][1]
+            archive_paths.append(Path(archive_file.name))
+            with tarfile.open(fileobj=archive_file) as archive:
+                sent.append(sorted(archive.getnames()))
+            return Mock(status_code=200, json=Mock(return_value={}))
+
+        mock_post.side_effect = post
+
+        _upload_transcoded_files(
+            media_id=123,
+            video_path=self.video_file.name,
+            poster_path=self.poster_file.name,
+            web_service_url="https://example.com",
+            upload_token=TEST_TOKEN,
+            hls_dir=hls_dir,
+        )
+
+        self.assertEqual(sent[2], ("hls_archive", "hls.tar", "application/x-tar"))
+        self.assertEqual(sent[3], sorted(names))
+        self.assertEqual(len(sent), 4)
+        self.assertFalse(archive_paths[0].exists())  # The temp tar is deleted after uploading
+
     @patch("flipfix.apps.core.transcoding.time.sleep")
     @patch("flipfix.apps.core.transcoding.requests.post")
     def test_upload_raises_after_max_retries(self, mock_post, mock_sleep):
@@ -330,6 +394,84 @@ class DownloadSourceFileTests(TestCase):
         self.assertEqual(mock_get.call_count, 3)
         self.assertEqual(mock_sleep.call_count, 2)
 
+    @patch("flipfix.apps.core.transcoding.time.sleep")
+    @patch("flipfix.apps.core.transcoding.requests.get")
+    def test_download_resumes_after_interruption(self, mock_get, mock_sleep):
+        """A retry after a dropped connection asks only for the missing bytes."""
+        import os
+
+        import requests as req
+
+        from flipfix.apps.core.transcoding import _download_source_file
+
+        def interrupted_content(chunk_size):
+            yield b"video "
+            raise req.exceptions.ChunkedEncodingError("Connection broken")
+
+        first_response = Mock()
+        first_response.status_code = 200
+        first_response.headers = {"ETag": '"abc"'}
+        first_response.iter_content.side_effect = interrupted_content
+
+        rest_response = Mock()
+        rest_response.status_code = 206
+        rest_response.headers = {"Content-Range": "bytes 6-12/13"}
+        rest_response.iter_content.return_value = [b"content"]
+
+        mock_get.side_effect = [first_response, rest_response]
+
+        result = _download_source_file(
+            media_id=123,
+            model_name="LogEntryMedia",
+            web_service_url="https://example.com",
+            upload_token=TEST_TOKEN,
+        )
+
+        try:
+            with open(result, "rb") as f:
+                self.assertEqual(f.read(), b"video content")
+        finally:
+            if os.path.exists(result):
+                os.unlink(result)
+
+        self.assertNotIn("Range", mock_get.call_args_list[0][1]["headers"])
+        retry_headers = mock_get.call_args_list[1][1]["headers"]
+        self.assertEqual(retry_headers["Range"], "bytes=6-")
+        self.assertEqual(retry_headers["If-Range"], '"abc"')
+
+    @patch("flipfix.apps.core.transcoding.time.sleep")
+    @patch("flipfix.apps.core.transcoding.requests.get")
+    def test_download_removes_partial_file_after_final_failure(self, mock_get, mock_sleep):
+        import requests as req
+
+        from flipfix.apps.core.transcoding import TransferError, _download_source_file
+
+        def interrupted_content(chunk_size):
+            yield b"video "
+            raise req.exceptions.ChunkedEncodingError("Connection broken")
+
+        response = Mock()
+        response.status_code = 200
+        response.headers = {}
+        response.iter_content.side_effect = interrupted_content
+        mock_get.return_value = response
+
+        download_dir = tempfile.mkdtemp()
+        self.addCleanup(os.rmdir, download_dir)
+        with (
+            patch.object(tempfile, "tempdir", download_dir),
+            self.assertRaises(TransferError),
+        ):
+            _download_source_file(
+                media_id=123,
+                model_name="LogEntryMedia",
+                web_service_url="https://example.com",
+                upload_token=TEST_TOKEN,
+                max_retries=2,
+            )
+
+        self.assertEqual(os.listdir(download_dir), [])
+
     @patch("flipfix.apps.core.transcoding.time.sleep")
     @patch("flipfix.apps.core.transcoding.requests.get")
     def test_download_retries_on_connection_error(self, mock_get, mock_sleep):
@@ -433,7 +575,7 @@ class TranscodeVideoJobTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase)
         from flipfix.apps.core.transcoding import transcode_video_job
 
         download = Mock(return_value=f"{tempfile.gettempdir()}/source.mp4")
-        probe = Mock(return_value=120)
+        probe = Mock(return_value=HEVC_VIDEO)
         run_ffmpeg = Mock()
         upload = Mock()
 
@@ -483,7 +625,7 @@ class TranscodeVideoJobTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase)
         from flipfix.apps.core.transcoding import transcode_video_job
 
         download = Mock(return_value=f"{tempfile.gettempdir()}/source.mp4")
-        probe = Mock(return_value=120)
+        probe = Mock(return_value=HEVC_VIDEO)
         run_ffmpeg = Mock()
         upload = Mock()
 
@@ -505,7 +647,7 @@ class TranscodeVideoJobTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase)
         probe.assert_called_once()
 
         # FFmpeg called twice: once for video transcode, once for poster
-        self.assertEqual(run_ffmpeg.call_count, 2)
+        self.assertEqual(run_ffmpeg.call_count, 1)
 
         # Upload called with media_id and temp file paths
         upload.assert_called_once()
@@ -527,13 +669,13 @@ class TranscodeVideoJobTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase)
 
         statuses_during_run = []
 
-        def capture_status_on_ffmpeg(*args):
+        def capture_status_on_ffmpeg(*args, **kwargs):
             # Read status from DB during ffmpeg run
             self.media.refresh_from_db()
             statuses_during_run.append(self.media.transcode_status)
 
         download = Mock(return_value=f"{tempfile.gettempdir()}/source.mp4")
-        probe = Mock(return_value=120)
+        probe = Mock(return_value=HEVC_VIDEO)
         run_ffmpeg = Mock(side_effect=capture_status_on_ffmpeg)
         upload = Mock()
 
@@ -550,6 +692,373 @@ class TranscodeVideoJobTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase)
         self.assertEqual(statuses_during_run[0], LogEntryMedia.TranscodeStatus.PROCESSING)
 
 
+@tag("tasks")
+@patch("flipfix.apps.core.transcoding.TRANSCODING_UPLOAD_TOKEN", TEST_TOKEN)
+@patch("flipfix.apps.core.transcoding.DJANGO_WEB_SERVICE_URL", "https://example.com")
+class TranscodeMethodTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase):
+    """Tests for remuxing web-playable sources instead of re-encoding them."""
+
+    def _transcode(self, probed):
+        from flipfix.apps.core.transcoding import transcode_video_job
+
+        run_ffmpeg = Mock()
+        transcode_video_job(
+            self.media.id,
+            "LogEntryMedia",
+            download=Mock(return_value=f"{tempfile.gettempdir()}/source.mp4"),
+            probe=Mock(return_value=probed),
+            run_ffmpeg=run_ffmpeg,
+            upload=Mock(),
+        )
+        self.media.refresh_from_db()
+        return run_ffmpeg.call_args_list[0][0][0]
+
+    def test_compatible_source_is_remuxed(self):
+        cmd = self._transcode(PHONE_VIDEO)
+
+        self.assertIn("copy", cmd)
+        self.assertIn("+faststart", cmd)
+        self.assertNotIn("libx264", cmd)
+        self.assertEqual(self.media.transcode_method, LogEntryMedia.TranscodeMethod.REMUX)
+
+    def test_incompatible_source_is_reencoded(self):
+        cmd = self._transcode(HEVC_VIDEO)
+
+        self.assertIn("libx264", cmd)
+        self.assertEqual(self.media.transcode_method, LogEntryMedia.TranscodeMethod.ENCODE)
+
+    def test_unknown_source_is_reencoded(self):
+        """When ffprobe can't read the source, the safe path is a full encode."""
+        cmd = self._transcode(VideoProbe())
+
+        self.assertIn("libx264", cmd)
+        self.assertIsNone(self.media.duration)
+
+    def test_video_and_poster_come_from_one_ffmpeg_run(self):
+        """The poster is a second output of the same run, seeked to its frame on input."""
+        cmd = self._transcode(PHONE_VIDEO)
+
+        self.assertEqual(cmd.count("-i"), 2)
+        self.assertEqual(cmd[cmd.index("-ss") + 1], "5.00")  # 10% of 120s, capped at 5s
+        self.assertTrue(cmd[-1].endswith(".jpg"))
+        self.assertTrue(cmd[cmd.index("+faststart") + 1].endswith(".mp4"))
+
+    def test_preset_follows_source_duration(self):
+        for duration, preset in ((30, "medium"), (240, "fast"), (1800, "veryfast"), (None, "fast")):
+            with self.subTest(duration=duration):
+                cmd = self._transcode(replace(HEVC_VIDEO, duration_seconds=duration))
+                self.assertEqual(cmd[cmd.index("-preset") + 1], preset)
+
+    @patch("flipfix.apps.core.transcoding.FFMPEG_THREADS", 2)
+    def test_thread_count_is_configurable(self):
+        """-threads is per input and output, so it's given before each one, not once globally."""
+        cmd = self._transcode(HEVC_VIDEO)
+
+        inputs = [i + 1 for i, arg in enumerate(cmd) if arg == "-i"]
+        outputs = [cmd.index("+faststart") + 1, len(cmd) - 1]
+        thread_options = [i for i, arg in enumerate(cmd) if arg == "-threads"]
+        self.assertEqual(len(thread_options), len(inputs) + len(outputs))
+        self.assertTrue(all(cmd[i + 1] == "2" for i in thread_options))
+        # Each input and output file has its own -threads between it and the previous file
+        files = sorted(inputs + outputs)
+        for previous, current in zip([0, *files], files, strict=False):
+            with self.subTest(file=cmd[current]):
+                self.assertTrue(any(previous < i < current for i in thread_options))
+        self.assertEqual(cmd[cmd.index("-filter_complex_threads") + 1], "2")
+
+    def test_threads_are_not_capped_by_default(self):
+        cmd = self._transcode(HEVC_VIDEO)
+
+        self.assertNotIn("-threads", cmd)
+        self.assertNotIn("-filter_threads", cmd)
+
+
+@tag("tasks")
+@patch("flipfix.apps.core.transcoding.TRANSCODE_HLS_MIN_SECONDS", 60)
+@patch("flipfix.apps.core.transcoding.TRANSCODING_UPLOAD_TOKEN", TEST_TOKEN)
+@patch("flipfix.apps.core.transcoding.DJANGO_WEB_SERVICE_URL", "https://example.com")
+class HlsRenditionTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase):
+    """Tests for adaptive HLS renditions of long videos."""
+
+    def _transcode(self, probed, run_ffmpeg=None):
+        from flipfix.apps.core.transcoding import transcode_video_job
+
+        run_ffmpeg = run_ffmpeg or Mock()
+        transcode_video_job(
+            self.media.id,
+            "LogEntryMedia",
+            download=Mock(return_value=f"{tempfile.gettempdir()}/source.mp4"),
+            probe=Mock(return_value=probed),
+            run_ffmpeg=run_ffmpeg,
+            upload=Mock(),
+        )
+        return run_ffmpeg.call_args_list[0][0][0] if isinstance(run_ffmpeg, Mock) else None
+
+    def _playlists(self, cmd):
+        return [Path(arg).name for arg in cmd if arg.endswith(".m3u8")]
+
+    def test_long_video_gets_renditions_up_to_its_size(self):
+        """The renditions are extra outputs of the same run as the MP4."""
+        cmd = self._transcode(PHONE_VIDEO)
+
+        self.assertEqual(self._playlists(cmd), ["360p.m3u8", "720p.m3u8", "1080p.m3u8"])
+        self.assertIn("+faststart", cmd)
+        self.assertIn("split=3[hls0][hls1][hls2]", cmd[cmd.index("-filter_complex") + 1])
+
+    @patch("flipfix.apps.core.transcoding.FFMPEG_THREADS", 2)
+    def test_each_rendition_encoder_has_capped_threads(self):
+        cmd = self._transcode(PHONE_VIDEO)
+
+        playlists = [i for i, arg in enumerate(cmd) if arg.endswith(".m3u8")]
+        for previous, current in zip(
+            [cmd.index("-filter_complex"), *playlists], playlists, strict=False
+        ):
+            with self.subTest(output=Path(cmd[current]).name):
+                self.assertEqual(cmd[previous:current].count("-threads"), 1)
+
+    def test_portrait_video_gets_the_same_renditions(self):
+        cmd = self._transcode(replace(PHONE_VIDEO, width=720, height=1280))
+
+        self.assertEqual(self._playlists(cmd), ["360p.m3u8", "720p.m3u8"])
+
+    def test_short_or_small_video_gets_only_mp4(self):
+        for probed in (
+            replace(PHONE_VIDEO, duration_seconds=30),
+            replace(PHONE_VIDEO, width=640, height=480),  # Too small for two renditions
+            replace(PHONE_VIDEO, width=None, height=None),
+        ):
+            with self.subTest(probed=probed):
+                cmd = self._transcode(probed)
+                self.assertNotIn("-filter_complex", cmd)
+                self.assertEqual(self._playlists(cmd), [])
+
+    def test_rendition_resolution_follows_display_orientation(self):
+        """Resolutions match ffmpeg's scaling of the upright video, even sides included."""
+        from flipfix.apps.core.transcoding import _hls_resolution
+
+        cases = [
+            (PHONE_VIDEO, 360, (640, 360)),
+            (replace(PHONE_VIDEO, width=720, height=1280), 360, (360, 640)),
+            (replace(PHONE_VIDEO, rotation=-90), 720, (720, 1280)),
+            (replace(PHONE_VIDEO, width=1440, height=1080), 360, (480, 360)),
+            (replace(PHONE_VIDEO, width=1918, height=1080), 360, (640, 360)),
+        ]
+        for probed, height, expected in cases:
+            with self.subTest(probed=probed, height=height):
+                self.assertEqual(_hls_resolution(probed, height), expected)
+
+    def test_renditions_pin_the_declared_level(self):
+        cmd = self._transcode(PHONE_VIDEO)
+
+        levels = [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-level:v"]
+        self.assertEqual(levels, ["3.1", "3.2", "4.2"])
+
+    @patch("flipfix.apps.core.transcoding.TRANSCODE_TRANSFER", "storage")
+    def test_renditions_are_stored_with_a_master_playlist(self):
+        def fake_ffmpeg(cmd, on_progress=None):
+            for i, arg in enumerate(cmd):
+                if arg.endswith(".m3u8"):
+                    Path(arg).write_text("#EXTM3U\n")
+                    Path(cmd[i - 1].replace("%03d", "000")).write_bytes(b"segment")
+            with open(cmd[cmd.index("+faststart") + 1], "wb") as video:
+                video.write(b"video")
+            Path(cmd[-1]).write_bytes(b"poster")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._transcode(replace(PHONE_VIDEO, width=1280, height=720), run_ffmpeg=fake_ffmpeg)
+
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.READY)
+        with self.media.hls_playlist.open("rb") as master:
+            self.assertEqual(
+                master.read().decode().splitlines(),
+                [
+                    "#EXTM3U",
+                    "#EXT-X-VERSION:3",
+                    "#EXT-X-STREAM-INF:BANDWIDTH=896000,RESOLUTION=640x360,"
+                    'CODECS="avc1.4d401f,mp4a.40.2"',
+                    "360p.m3u8",
+                    "#EXT-X-STREAM-INF:BANDWIDTH=2928000,RESOLUTION=1280x720,"
+                    'CODECS="avc1.4d4020,mp4a.40.2"',
+                    "720p.m3u8",
+                ],
+            )
+        directory = self.media.hls_playlist.name.rsplit("/", 1)[0]
+        self.assertEqual(
+            sorted(self.media.hls_playlist.storage.listdir(directory)[1]),
+            ["360p.m3u8", "360p_000.ts", "720p.m3u8", "720p_000.ts", "master.m3u8"],
+        )
+
+
+@tag("tasks")
+@patch("flipfix.apps.core.transcoding.TRANSCODE_TRANSFER", "storage")
+class StorageTransferTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase):
+    """Tests for transcoding straight from and to shared media storage."""
+
+    def _fake_ffmpeg(self, cmd, on_progress=None):
+        video_path = cmd[cmd.index("+faststart") + 1]
+        with open(video_path, "wb") as video, open(cmd[-1], "wb") as poster:
+            video.write(b"transcoded video")
+            poster.write(b"poster")
+
+    def test_transcodes_without_web_service(self):
+        """No HTTP settings are needed: the source is read in place and outputs stored directly."""
+        from flipfix.apps.core.transcoding import transcode_video_job
+
+        source_name = self.media.file.name
+        probe = Mock(return_value=HEVC_VIDEO)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            transcode_video_job(
+                self.media.id, "LogEntryMedia", probe=probe, run_ffmpeg=self._fake_ffmpeg
+            )
+
+        probe.assert_called_once_with(Path(self.media.file.path))
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.READY)
+        with self.media.transcoded_file.open("rb") as video:
+            self.assertEqual(video.read(), b"transcoded video")
+        self.assertTrue(self.media.poster_file)
+        self.assertFalse(self.media.file)
+        self.assertFalse(self.media.transcoded_file.storage.exists(source_name))
+
+    def test_unknown_transfer_fails_job(self):
+        from flipfix.apps.core.transcoding import transcode_video_job
+
+        with (
+            patch("flipfix.apps.core.transcoding.TRANSCODE_TRANSFER", "carrier-pigeon"),
+            self.assertRaises(ValueError),
+        ):
+            transcode_video_job(self.media.id, "LogEntryMedia", run_ffmpeg=Mock())
+
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.FAILED)
+
+
+@tag("tasks")
+class TranscodeProgressTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase):
+    """Tests for recording a running transcode's progress on the media row."""
+
+    @patch("flipfix.apps.core.transcoding.TRANSCODING_UPLOAD_TOKEN", TEST_TOKEN)
+    @patch("flipfix.apps.core.transcoding.DJANGO_WEB_SERVICE_URL", "https://example.com")
+    def test_transcode_reports_progress_and_finishes_at_100(self):
+        from flipfix.apps.core.transcoding import TranscodeProgress, transcode_video_job
+
+        run_ffmpeg = Mock()
+        transcode_video_job(
+            self.media.id,
+            "LogEntryMedia",
+            download=Mock(return_value=f"{tempfile.gettempdir()}/source.mp4"),
+            probe=Mock(return_value=HEVC_VIDEO),
+            run_ffmpeg=run_ffmpeg,
+            upload=Mock(),
+        )
+
+        self.assertIsInstance(run_ffmpeg.call_args.kwargs["on_progress"], TranscodeProgress)
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_progress, 100)
+        self.assertEqual(self.media.transcode_eta_seconds, 0)
+
+    @patch("flipfix.apps.core.transcoding.time.monotonic", side_effect=[0, 1, 10])
+    def test_progress_saves_are_throttled(self, _monotonic):
+        from flipfix.apps.core.transcoding import TranscodeProgress
+
+        progress = TranscodeProgress(self.media, duration_seconds=120)
+        progress(3.0)  # 1s in: too soon after starting to save
+        self.media.refresh_from_db()
+        self.assertIsNone(self.media.transcode_progress)
+
+        progress(30.0)  # 10s in, a quarter done
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_progress, 25)
+        self.assertEqual(self.media.transcode_eta_seconds, 30)
+
+    @patch("flipfix.apps.core.transcoding.subprocess.Popen")
+    def test_run_ffmpeg_parses_progress_output(self, mock_popen):
+        from flipfix.apps.core.transcoding import _run_ffmpeg
+
+        process = mock_popen.return_value
+        process.stdout = iter(["frame=1\n", "out_time_us=N/A\n", "out_time_us=1500000\n"])
+        process.wait.return_value = 0
+        process.poll.return_value = 0
+        on_progress = Mock()
+
+        _run_ffmpeg(["ffmpeg", "-i", "in.mov", "out.mp4"], on_progress=on_progress)
+
+        on_progress.assert_called_once_with(1.5)
+        self.assertEqual(mock_popen.call_args[0][0][:3], ["ffmpeg", "-progress", "pipe:1"])
+
+    @patch("flipfix.apps.core.transcoding.subprocess.Popen")
+    def test_run_ffmpeg_raises_when_ffmpeg_fails(self, mock_popen):
+        from flipfix.apps.core.transcoding import _run_ffmpeg
+
+        process = mock_popen.return_value
+        process.stdout = iter([])
+        process.wait.return_value = 1
+        process.poll.return_value = 1
+
+        with self.assertRaises(subprocess.CalledProcessError):
+            _run_ffmpeg(["ffmpeg", "-i", "in.mov", "out.mp4"], on_progress=Mock())
+
+
+@tag("unit")
+class VideoProbeTests(TestCase):
+    """Tests for deciding whether a probed video can be remuxed."""
+
+    def test_phone_video_can_be_remuxed(self):
+        self.assertIsNone(PHONE_VIDEO.remux_blocker())
+        self.assertIsNone(replace(PHONE_VIDEO, audio_codec=None).remux_blocker())
+
+    def test_blockers(self):
+        for changes in (
+            {"container": "matroska,webm"},
+            {"video_codec": "hevc"},
+            {"video_profile": "High 10"},
+            {"pixel_format": "yuv422p"},
+            {"width": 3840, "height": 2160},
+            {"width": None},
+            {"audio_codec": "opus"},
+        ):
+            with self.subTest(changes=changes):
+                self.assertIsNotNone(replace(PHONE_VIDEO, **changes).remux_blocker())
+
+    def test_parses_ffprobe_output(self):
+        from flipfix.apps.core.transcoding import _parse_probe
+
+        probed = _parse_probe(
+            {
+                "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "120.48"},
+                "streams": [
+                    {"codec_type": "data", "codec_name": "none"},
+                    {
+                        "codec_type": "video",
+                        "codec_name": "h264",
+                        "profile": "High",
+                        "pix_fmt": "yuv420p",
+                        "width": 1920,
+                        "height": 1080,
+                    },
+                    {"codec_type": "audio", "codec_name": "aac", "profile": "LC"},
+                ],
+            }
+        )
+
+        self.assertEqual(probed, PHONE_VIDEO)
+
+    def test_parses_rotation(self):
+        """Rotation comes from the display matrix, or the older rotate tag."""
+        from flipfix.apps.core.transcoding import _parse_probe
+
+        for video, expected in (
+            ({"side_data_list": [{"side_data_type": "Display Matrix", "rotation": -90}]}, -90),
+            ({"tags": {"rotate": "90"}}, 90),
+            ({}, 0),
+        ):
+            with self.subTest(video=video):
+                probed = _parse_probe({"streams": [{"codec_type": "video", **video}]})
+                self.assertEqual(probed.rotation, expected)
+
+
 @tag("tasks")
 class TranscodeVideoErrorHandlingTests(VideoMediaTestMixin, TemporaryMediaMixin, TestCase):
     """Tests for transcode error handling."""
@@ -561,7 +1070,7 @@ class TranscodeVideoErrorHandlingTests(VideoMediaTestMixin, TemporaryMediaMixin,
         from flipfix.apps.core.transcoding import transcode_video_job
 
         download = Mock(return_value=f"{tempfile.gettempdir()}/source.mp4")
-        probe = Mock(return_value=120)
+        probe = Mock(return_value=HEVC_VIDEO)
         upload = Mock()
         run_ffmpeg = Mock()
         # Simulate ffmpeg failing with non-zero exit code
@@ -594,7 +1103,7 @@ class TranscodeVideoErrorHandlingTests(VideoMediaTestMixin, TemporaryMediaMixin,
         from flipfix.apps.core.transcoding import transcode_video_job
 
         download = Mock(side_effect=RuntimeError("Download failed after 3 attempts"))
-        probe = Mock(return_value=120)
+        probe = Mock(return_value=HEVC_VIDEO)
         upload = Mock()
         run_ffmpeg = Mock()
 
@@ -622,7 +1131,7 @@ class TranscodeVideoErrorHandlingTests(VideoMediaTestMixin, TemporaryMediaMixin,
         from flipfix.apps.core.transcoding import transcode_video_job
 
         download = Mock(return_value=f"{tempfile.gettempdir()}/source.mp4")
-        probe = Mock(return_value=120)
+        probe = Mock(return_value=HEVC_VIDEO)
         run_ffmpeg = Mock()
         upload = Mock(side_effect=RuntimeError("Upload failed after 3 attempts"))
 
@@ -640,7 +1149,7 @@ class TranscodeVideoErrorHandlingTests(VideoMediaTestMixin, TemporaryMediaMixin,
         self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.FAILED)
         download.assert_called_once()
         probe.assert_called_once()
-        self.assertEqual(run_ffmpeg.call_count, 2)
+        self.assertEqual(run_ffmpeg.call_count, 1)
         upload.assert_called_once()
 
 
@@ -660,3 +1169,178 @@ class EnqueueTranscodeTests(TemporaryMediaMixin, TestCase):
         self.assertEqual(call_args[0][1], 123)  # media_id argument
         self.assertEqual(call_args[0][2], "LogEntryMedia")  # model_name argument
         self.assertEqual(call_args[1]["timeout"], 600)  # timeout kwarg
+        self.assertEqual(call_args[1]["cluster"], "flipfix_transcode")  # slow lane
+
+
+@tag("tasks")
+class ProcessPhotoJobTests(TemporaryMediaMixin, TestCase):
+    """Tests for process_photo_job task."""
+
+    def setUp(self):
+        super().setUp()
+        logging.disable(logging.CRITICAL)
+        self.addCleanup(logging.disable, logging.NOTSET)
+        self.log_entry = LogEntry.objects.create(machine=create_machine(), text="Photo entry")
+        self.media = LogEntryMedia(
+            log_entry=self.log_entry,
+            media_type=LogEntryMedia.MediaType.PHOTO,
+            file=SimpleUploadedFile("big.jpg", b"original", content_type="image/jpeg"),
+            transcode_status=LogEntryMedia.TranscodeStatus.PENDING,
+        )
+        self.media.save(process_photo=False)
+
+    def _source(self, size=(3000, 2000)):
+        """Write a real JPEG of the given size to a temp file, as the download step would."""
+        tmp = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
+        tmp.write(create_uploaded_image(size=size).read())
+        tmp.close()
+        return tmp.name
+
+    @patch("flipfix.apps.core.transcoding.TRANSCODING_UPLOAD_TOKEN", TEST_TOKEN)
+    @patch("flipfix.apps.core.transcoding.DJANGO_WEB_SERVICE_URL", "https://example.com")
+    @override_settings(PHOTO_VARIANT_SIZES=[320, 640], PHOTO_VARIANT_FORMATS=["WEBP"])
+    def test_uploads_thumbnail_and_resized_photo(self):
+        """Large photos get a thumbnail, web-size image and variants; the temp file is removed."""
+        from PIL import Image
+
+        from flipfix.apps.core.image_processing import (
+            MAX_IMAGE_DIMENSION,
+            THUMB_IMAGE_DIMENSION,
+        )
+        from flipfix.apps.core.transcoding import process_photo_job
+
+        source = self._source()
+        upload = Mock()
+
+        process_photo_job(
+            self.media.id, "LogEntryMedia", download=Mock(return_value=source), upload=upload
+        )
+
+        upload.assert_called_once()
+        parts = upload.call_args[0][1]
+        self.assertEqual(
+            [field for field, _part in parts], ["thumbnail_file", "file", "variants", "variants"]
+        )
+        derivatives = dict(parts)
+        for field, limit in (
+            ("file", MAX_IMAGE_DIMENSION),
+            ("thumbnail_file", THUMB_IMAGE_DIMENSION),
+        ):
+            _name, content, content_type = derivatives[field]
+            self.assertEqual(content_type, "image/jpeg")
+            with Image.open(BytesIO(content)) as image:
+                self.assertEqual(max(image.size), limit)
+        variant_names = [part[0] for field, part in parts if field == "variants"]
+        self.assertEqual(
+            [name.rsplit("-", 1)[1] for name in variant_names], ["640w.webp", "320w.webp"]
+        )
+        self.assertFalse(os.path.exists(source))
+
+        # Status stays PROCESSING until the upload endpoint sets READY
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.PROCESSING)
+
+    @patch("flipfix.apps.core.transcoding.TRANSCODING_UPLOAD_TOKEN", TEST_TOKEN)
+    @patch("flipfix.apps.core.transcoding.DJANGO_WEB_SERVICE_URL", "https://example.com")
+    def test_unreadable_photo_keeps_original(self):
+        """An original Pillow can't read stays in place and doubles as the thumbnail."""
+        from flipfix.apps.core.transcoding import process_photo_job
+
+        tmp = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
+        tmp.write(b"not really a jpeg")
+        tmp.close()
+        upload = Mock()
+
+        process_photo_job(
+            self.media.id, "LogEntryMedia", download=Mock(return_value=tmp.name), upload=upload
+        )
+
+        parts = upload.call_args[0][1]
+        self.assertEqual([field for field, _part in parts], ["thumbnail_file"])
+        self.assertEqual(parts[0][1][1:], (b"not really a jpeg", "image/jpeg"))
+
+    @patch("flipfix.apps.core.transcoding.TRANSCODING_UPLOAD_TOKEN", TEST_TOKEN)
+    @patch("flipfix.apps.core.transcoding.DJANGO_WEB_SERVICE_URL", "https://example.com")
+    def test_sets_failed_status_when_upload_errors(self):
+        from flipfix.apps.core.transcoding import process_photo_job
+
+        upload = Mock(side_effect=RuntimeError("upload failed"))
+        with self.assertRaises(RuntimeError):
+            process_photo_job(
+                self.media.id,
+                "LogEntryMedia",
+                download=Mock(return_value=self._source()),
+                upload=upload,
+            )
+
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.FAILED)
+
+    @patch("flipfix.apps.core.transcoding.TRANSCODE_TRANSFER", "storage")
+    @override_settings(PHOTO_VARIANT_SIZES=[320], PHOTO_VARIANT_FORMATS=["WEBP"])
+    def test_storage_transfer_processes_without_web_service(self):
+        """On shared storage the worker reads the original in place and stores the results."""
+        from flipfix.apps.core.transcoding import process_photo_job
+
+        self.media.file = SimpleUploadedFile(
+            "big.jpg", create_uploaded_image(size=(3000, 2000)).read(), content_type="image/jpeg"
+        )
+        self.media.save(process_photo=False)
+        source_name = self.media.file.name
+
+        with self.captureOnCommitCallbacks(execute=True):
+            process_photo_job(self.media.id, "LogEntryMedia")
+
+        self.media.refresh_from_db()
+        self.assertEqual(self.media.transcode_status, LogEntryMedia.TranscodeStatus.READY)
+        self.assertTrue(self.media.thumbnail_file)
+        self.assertNotEqual(self.media.file.name, source_name)
+        self.assertFalse(self.media.file.storage.exists(source_name))
+        self.assertEqual(
+            [(variant["type"], variant["width"]) for variant in self.media.variants],
+            [("image/webp", 320)],
+        )
+
+    def test_skips_video_media(self):
+        from flipfix.apps.core.transcoding import process_photo_job
+
+        self.media.media_type = LogEntryMedia.MediaType.VIDEO
+        self.media.save()
+        download = Mock()
+
+        process_photo_job(self.media.id, "LogEntryMedia", download=download)
+
+        download.assert_not_called()
+
+    def test_enqueue_photo_processing_invokes_async_task(self):
+        from flipfix.apps.core.transcoding import enqueue_photo_processing, process_photo_job
+
+        async_runner = Mock()
+        enqueue_photo_processing(123, "LogEntryMedia", async_runner=async_runner)
+
+        call_args = async_runner.call_args
+        self.assertIs(call_args[0][0], process_photo_job)
+        self.assertEqual(call_args[0][1:3], (123, "LogEntryMedia"))
+        self.assertEqual(call_args[1]["cluster"], "flipfix_worker")  # fast lane
+
+
+@tag("tasks")
+class UploadPhotoDerivativesTests(TestCase):
+    """Tests for _upload_photo_derivatives helper."""
+
+    @patch("flipfix.apps.core.transcoding.requests.post")
+    def test_posts_parts_to_photo_upload_endpoint(self, mock_post):
+        from flipfix.apps.core.transcoding import _upload_photo_derivatives
+
+        mock_post.return_value = Mock(status_code=200, json=Mock(return_value={}))
+        parts = {"thumbnail_file": ("thumb.jpg", b"jpeg", "image/jpeg")}
+
+        _upload_photo_derivatives(
+            7, parts, "https://example.com/", TEST_TOKEN, model_name="PartRequestMedia"
+        )
+
+        url = mock_post.call_args[0][0]
+        self.assertEqual(
+            url, "https://example.com/api/transcoding/photo-upload/PartRequestMedia/7/"
+        )
+        self.assertEqual(mock_post.call_args[1]["files"], parts)
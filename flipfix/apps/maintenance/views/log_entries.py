@@ -291,6 +291,7 @@ class LogListPartialView(InfiniteScrollMixin, View):
     """AJAX endpoint for infinite scrolling in the global log list."""
 
     item_template = "maintenance/partials/global_log_entry.html"
+    markdown_fields = ("text",)
 
     def get_queryset(self):
         search_query = self.request.GET.get("q", "").strip()
@@ -326,6 +327,8 @@ class LogEntryDetailView(InlineTextEditMixin, MediaUploadMixin, DetailView):
             "update_text": self.handle_update_text,
             "update_occurred_at": self._handle_update_occurred_at,
             "upload_media": self.handle_upload_media,
+            "start_chunked_upload": self.handle_start_chunked_upload,
+            "finish_chunked_upload": self.handle_finish_chunked_upload,
             "delete_media": self.handle_delete_media,
             "update_maintainers": self._handle_update_maintainers,
             "update_problem_report": self._handle_update_problem_report,
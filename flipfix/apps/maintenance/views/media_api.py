@@ -15,7 +15,9 @@ from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
 from flipfix.apps.core.media import ALLOWED_MEDIA_EXTENSIONS, is_video_file
+from flipfix.apps.core.media_upload import reuse_stored_media, share_media_files
 from flipfix.apps.core.models import AbstractMedia, get_media_model
+from flipfix.apps.core.upload_handlers import content_hash_of
 
 from .transcoding import _json_api_view, _validate_transcoding_auth
 
@@ -90,6 +92,7 @@ class ReceiveMediaView(View):
     The endpoint determines media type from the file's Content-Type header.
     Videos are stored as-is (no transcoding) since Discord already transcodes.
     Photos are processed (resize, thumbnail) by the model's save() method.
+    A file identical to an earlier upload reuses its stored copy.
     """
 
     @_json_api_view
@@ -127,7 +130,12 @@ class ReceiveMediaView(View):
             "transcode_status": "",
         }
 
-        media = media_model.objects.create(**create_kwargs)
+        # Discord reposts the same attachment: reuse the stored copy if there is one
+        content_hash = content_hash_of(uploaded_file)
+        media = reuse_stored_media(media_model, parent, content_hash, create_kwargs["media_type"])
+        if media is None:
+            media = media_model.objects.create(**create_kwargs, content_hash=content_hash)
+            share_media_files(media)
 
         logger.info(
             "media_api_upload_success",
@@ -27,6 +27,7 @@ from flipfix.apps.core.attribution import (
 )
 from flipfix.apps.core.columns import build_location_columns
 from flipfix.apps.core.datetime import apply_and_validate_timezone
+from flipfix.apps.core.feed import reindex_feed_entries
 from flipfix.apps.core.forms import SearchForm
 from flipfix.apps.core.ip import get_real_ip
 from flipfix.apps.core.markdown_links import sync_references
@@ -79,6 +80,7 @@ class ProblemReportLogEntriesPartialView(InfiniteScrollMixin, View):
     """AJAX endpoint for infinite scrolling log entries on a problem report detail page."""
 
     item_template = "maintenance/partials/problem_report_log_entry.html"
+    markdown_fields = ("text",)
 
     def get_queryset(self):
         problem_report = get_object_or_404(ProblemReport, pk=self.kwargs["pk"])
@@ -269,6 +271,8 @@ class ProblemReportDetailView(InlineTextEditMixin, MediaUploadMixin, DetailView)
             "update_priority": self._handle_update_priority,
             "update_status": self._handle_update_status,
             "upload_media": self.handle_upload_media,
+            "start_chunked_upload": self.handle_start_chunked_upload,
+            "finish_chunked_upload": self.handle_finish_chunked_upload,
             "delete_media": self.handle_delete_media,
             "toggle_status": self._handle_toggle_status,
         }
@@ -302,9 +306,10 @@ class ProblemReportDetailView(InlineTextEditMixin, MediaUploadMixin, DetailView)
         with transaction.atomic():
             self.object.machine = new_machine
             self.object.save(update_fields=["machine", "updated_at"])
-            child_log_count = LogEntry.objects.filter(problem_report=self.object).update(
-                machine=new_machine
-            )
+            child_logs = LogEntry.objects.filter(problem_report=self.object)
+            child_log_count = child_logs.update(machine=new_machine)
+            # Bulk update skips post_save, so refresh the feed index by hand
+            reindex_feed_entries("log", child_logs)
 
         old_machine_link = format_html(
             '<a href="{}">{}</a>',
@@ -1,23 +1,37 @@
-"""Video transcoding worker API endpoints."""
+"""Worker API endpoints for video transcoding and photo processing."""
 
 from __future__ import annotations
 
+import hashlib
 import logging
+import mimetypes
+import re
+import tarfile
+from contextlib import ExitStack
 from functools import partial, wraps
+from urllib.parse import quote
 
 from django.conf import settings
-from django.core.exceptions import ValidationError
-from django.db import transaction
-from django.http import FileResponse, Http404, JsonResponse
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.files import File
+from django.http import Http404, HttpResponse, JsonResponse
 from django.utils.crypto import constant_time_compare
 from django.utils.decorators import method_decorator
+from django.utils.http import content_disposition_header
 from django.views import View
 from django.views.decorators.csrf import csrf_exempt
 
+from flipfix.apps.core.image_processing import ImageVariant, describe_image_variant
+from flipfix.apps.core.media import HLS_MASTER_PLAYLIST
+from flipfix.apps.core.media_upload import save_photo_derivatives, save_transcoded_files
 from flipfix.apps.core.models import AbstractMedia, get_media_model
+from flipfix.apps.core.range_requests import ranged_file_response
 
 logger = logging.getLogger(__name__)
 
+# A playlist or segment name as the worker writes them, e.g. "720p_004.ts"
+_HLS_FILE_NAME_RE = re.compile(r"^[\w-]+\.(m3u8|ts)$")
+
 
 class _AuthenticationError(Exception):
     """Raised when API authentication fails."""
@@ -79,7 +93,7 @@ def _validate_transcoding_auth(request) -> None:
         raise _AuthenticationError("Invalid authentication token", status=403)
 
 
-def _get_media_record(model_name: str, media_id: int) -> tuple[type, AbstractMedia]:
+def _get_media_record(model_name: str, media_id: int) -> tuple[type[AbstractMedia], AbstractMedia]:
     """
     Look up a media record by model name and ID.
 
@@ -120,6 +134,51 @@ def _validate_upload_files(video_file, poster_file) -> None:
             raise ValidationError(f"Invalid poster file type: {poster_content_type}")
 
 
+def _open_hls_archive(hls_archive, stack: ExitStack) -> list[File]:
+    """
+    Return the HLS playlists and segments in an uploaded tar file, read straight from it.
+
+    The archive is closed when ``stack`` is.
+
+    Raises:
+        ValidationError: If the archive isn't a tar of plain files.
+    """
+    if not hls_archive:
+        return []
+    try:
+        archive = stack.enter_context(tarfile.open(fileobj=hls_archive, mode="r:"))
+        members = archive.getmembers()
+    except tarfile.TarError as e:
+        raise ValidationError("Invalid HLS archive") from e
+
+    hls_files = []
+    for member in members:
+        extracted = archive.extractfile(member) if member.isfile() else None
+        if extracted is None:
+            raise ValidationError(f"Invalid HLS file: {member.name}")
+        hls_file = File(extracted, name=member.name)
+        hls_file.size = member.size
+        hls_files.append(hls_file)
+    return hls_files
+
+
+def _validate_hls_files(hls_files) -> None:
+    """
+    Validate uploaded HLS playlists and segments.
+
+    Raises:
+        ValidationError: If a file name isn't a plain playlist or segment
+            name, or the master playlist is missing.
+    """
+    if not hls_files:
+        return
+    for hls_file in hls_files:
+        if not _HLS_FILE_NAME_RE.match(hls_file.name):
+            raise ValidationError(f"Invalid HLS file name: {hls_file.name}")
+    if HLS_MASTER_PLAYLIST not in {hls_file.name for hls_file in hls_files}:
+        raise ValidationError(f"Missing HLS {HLS_MASTER_PLAYLIST}")
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class ReceiveTranscodedMediaView(View):
     """
@@ -130,6 +189,10 @@ class ReceiveTranscodedMediaView(View):
     Expects multipart/form-data with:
     - video_file: transcoded video file
     - poster_file: generated poster image
+    - hls_archive (optional): uncompressed tar of the HLS master playlist,
+      rendition playlists and segments, named as the playlists refer to
+      them.  One part rather than one per file, since a long video has more
+      segments than DATA_UPLOAD_MAX_NUMBER_FILES allows.
     - Authorization header: Bearer <token>
     """
 
@@ -141,28 +204,21 @@ class ReceiveTranscodedMediaView(View):
         poster_file = request.FILES.get("poster_file")
         _validate_upload_files(video_file, poster_file)
 
-        media_model, media = _get_media_record(model_name, media_id)
-
-        return self._save_transcoded_files(media, media_model, video_file, poster_file)
-
-    def _save_transcoded_files(self, media, media_model, video_file, poster_file) -> JsonResponse:
-        """Save transcoded video and poster files to the media record."""
-        original_file_name = media.file.name if media.file else None
+        with ExitStack() as stack:
+            hls_files = _open_hls_archive(request.FILES.get("hls_archive"), stack)
+            _validate_hls_files(hls_files)
 
-        with transaction.atomic():
-            if media.file:
-                media.file = None
+            media_model, media = _get_media_record(model_name, media_id)
 
-            media.transcoded_file = video_file
-            if poster_file:
-                media.poster_file = poster_file
-            media.transcode_status = media_model.TranscodeStatus.READY
-            media.save()
+            return self._save_transcoded_files(
+                media, media_model, video_file, poster_file, hls_files
+            )
 
-        # Delete original file only after transaction commits successfully
-        if original_file_name:
-            storage = media.transcoded_file.storage
-            transaction.on_commit(partial(storage.delete, name=original_file_name))
+    def _save_transcoded_files(
+        self, media, media_model, video_file, poster_file, hls_files
+    ) -> JsonResponse:
+        """Save transcoded video, poster and HLS files to the media record."""
+        save_transcoded_files(media, video_file, poster_file, hls_files)
 
         return JsonResponse(
             {
@@ -171,6 +227,81 @@ class ReceiveTranscodedMediaView(View):
                 "media_id": media.id,
                 "transcoded_url": media.transcoded_file.url,
                 "poster_url": media.poster_file.url if media.poster_file else None,
+                "hls_url": media.hls_playlist.url if media.hls_playlist else None,
+            }
+        )
+
+
+def _validate_photo_files(photo_file, thumbnail_file, variant_files=()) -> list[ImageVariant]:
+    """
+    Validate uploaded photo derivative files.
+
+    Returns:
+        The responsive variants, identified from their image headers.
+
+    Raises:
+        ValidationError: If the thumbnail is missing or any file isn't an image.
+    """
+    if not thumbnail_file:
+        raise ValidationError("Missing thumbnail_file")
+
+    uploads = [("thumbnail", thumbnail_file), ("photo", photo_file)]
+    uploads.extend(("variant", variant_file) for variant_file in variant_files)
+    for label, uploaded in uploads:
+        if not uploaded:
+            continue
+        content_type = (getattr(uploaded, "content_type", "") or "").lower()
+        if not content_type.startswith("image/"):
+            raise ValidationError(f"Invalid {label} file type: {content_type}")
+
+    try:
+        return [describe_image_variant(variant_file) for variant_file in variant_files]
+    except ValueError as e:
+        raise ValidationError(f"Invalid variant file: {e}") from None
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ReceivePhotoDerivativesView(View):
+    """
+    API endpoint for worker service to upload resized photo files.
+
+    POST /api/transcoding/photo-upload/<model_name>/<media_id>/
+
+    Expects multipart/form-data with:
+    - thumbnail_file: thumbnail image
+    - file: web-size image (optional; omitted when the original is already web-ready)
+    - variants: responsive variant images (optional, repeated)
+    - Authorization header: Bearer <token>
+    """
+
+    @_json_api_view
+    def post(self, request, model_name: str, media_id: int):
+        _validate_transcoding_auth(request)
+
+        photo_file = request.FILES.get("file")
+        thumbnail_file = request.FILES.get("thumbnail_file")
+        variant_files = request.FILES.getlist("variants")
+        variants = _validate_photo_files(photo_file, thumbnail_file, variant_files)
+
+        media_model, media = _get_media_record(model_name, media_id)
+        if media.media_type != media_model.MediaType.PHOTO:
+            raise ValidationError("Media is not a photo")
+
+        return self._save_photo_files(media, media_model, photo_file, thumbnail_file, variants)
+
+    def _save_photo_files(
+        self, media, media_model, photo_file, thumbnail_file, variants
+    ) -> JsonResponse:
+        """Save the resized photo, thumbnail and variants to the media record."""
+        save_photo_derivatives(media, photo_file, thumbnail_file, variants)
+
+        return JsonResponse(
+            {
+                "success": True,
+                "message": "Photo derivatives uploaded successfully",
+                "media_id": media.id,
+                "photo_url": media.file.url,
+                "thumbnail_url": media.thumbnail_file.url,
             }
         )
 
@@ -178,12 +309,15 @@ class ReceiveTranscodedMediaView(View):
 @method_decorator(csrf_exempt, name="dispatch")
 class ServeSourceMediaView(View):
     """
-    API endpoint for worker service to download source video files.
+    API endpoint for worker service to download source video and photo files.
 
     GET /api/transcoding/download/<model_name>/<media_id>/
     Authorization: Bearer <token>
 
-    Returns the source file as a streaming response.
+    Returns the source file as a streaming response.  A ``Range`` header
+    gets a 206 of just that part, so the worker can resume a download that
+    was cut off.  With ``settings.SOURCE_MEDIA_OFFLOAD`` set, the front-end
+    server sends the file (and handles ranges) instead.
     """
 
     @_json_api_view
@@ -194,8 +328,54 @@ class ServeSourceMediaView(View):
         if not media.file:
             raise Http404("Media has no source file")
 
-        return FileResponse(
-            media.file.open("rb"),
-            as_attachment=True,
-            filename=media.file.name.split("/")[-1],
+        filename = media.file.name.split("/")[-1]
+        offloaded = _offloaded_response(media.file, filename)
+        if offloaded is not None:
+            return offloaded
+
+        return ranged_file_response(
+            request,
+            partial(media.file.open, "rb"),
+            size=media.file.size,
+            etag=_source_etag(media.file),
+            filename=filename,
         )
+
+
+def _source_etag(file) -> str:
+    """Return a strong ETag for a source file, from its storage name and size."""
+    digest = hashlib.sha256(f"{file.name}:{file.size}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+def _offloaded_response(file, filename: str) -> HttpResponse | None:
+    """
+    Return a response asking the front-end server to send the file, if configured.
+
+    Returns None when offloading is off, or when the file isn't on local disk
+    for ``x-sendfile``, so the caller streams it from Django.
+
+    Raises:
+        ImproperlyConfigured: If SOURCE_MEDIA_OFFLOAD is an unknown mode.
+    """
+    mode = settings.SOURCE_MEDIA_OFFLOAD.lower()
+    if not mode:
+        return None
+    if mode == "x-accel-redirect":
+        prefix = settings.SOURCE_MEDIA_ACCEL_PREFIX.rstrip("/")
+        header, value = "X-Accel-Redirect", f"{prefix}/{quote(file.name)}"
+    elif mode == "x-sendfile":
+        try:
+            header, value = "X-Sendfile", file.path
+        except NotImplementedError:
+            return None
+    else:
+        raise ImproperlyConfigured(
+            f"Unknown SOURCE_MEDIA_OFFLOAD {settings.SOURCE_MEDIA_OFFLOAD!r}; "
+            "expected x-accel-redirect or x-sendfile"
+        )
+
+    return HttpResponse(
+        content_type=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        headers={header: value, "Content-Disposition": content_disposition_header(True, filename)},
+    )
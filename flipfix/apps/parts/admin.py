@@ -57,7 +57,7 @@ class PartRequestMediaAdmin(SimpleHistoryAdmin):
     """Admin for part request media."""
 
     list_display = ["id", "part_request", "media_type", "transcode_status", "created_at"]
-    list_filter = ["media_type", "transcode_status"]
+    list_filter = ["media_type", "transcode_status", "transcode_method"]
     search_fields = ["part_request__text"]
     readonly_fields = ["created_at", "updated_at", "transcode_status"]
     ordering = ["-created_at"]
@@ -99,7 +99,7 @@ class PartRequestUpdateMediaAdmin(SimpleHistoryAdmin):
     """Admin for part request update media."""
 
     list_display = ["id", "update", "media_type", "transcode_status", "created_at"]
-    list_filter = ["media_type", "transcode_status"]
+    list_filter = ["media_type", "transcode_status", "transcode_method"]
     search_fields = ["update__text"]
     readonly_fields = ["created_at", "updated_at", "transcode_status"]
     ordering = ["-created_at"]
@@ -20,6 +20,7 @@ class PartsConfig(AppConfig):
         self._register_feed_sources()
         self._register_link_types()
         self._register_media_models()
+        self._register_search_documents()
 
     @staticmethod
     def _register_feed_sources():
@@ -52,6 +53,7 @@ class PartsConfig(AppConfig):
                 global_select_related=("machine", "machine__model"),
                 machine_template="parts/partials/part_request_activity_entry.html",
                 global_template="parts/partials/part_list_entry.html",
+                markdown_fields=("text",),
             )
         )
         register_feed_source(
@@ -62,6 +64,7 @@ class PartsConfig(AppConfig):
                 global_select_related=("part_request__machine",),
                 machine_template="parts/partials/part_update_activity_entry.html",
                 global_template="parts/partials/part_update_activity_entry.html",
+                markdown_fields=("text",),
             )
         )
 
@@ -138,3 +141,54 @@ class PartsConfig(AppConfig):
 
         register_media_model(PartRequestMedia)
         register_media_model(PartRequestUpdateMedia)
+
+    @staticmethod
+    def _register_search_documents():
+        from flipfix.apps.core.search import (
+            SearchDocumentType,
+            person_search_text,
+            register_search_document,
+        )
+
+        from .models import PartRequest, PartRequestUpdate
+
+        def _request_text(part_request):
+            requester = part_request.requested_by.user if part_request.requested_by else None
+            return (
+                part_request.text,
+                part_request.requested_by_name,
+                *person_search_text(requester),
+            )
+
+        def _update_text(update):
+            poster = update.posted_by.user if update.posted_by else None
+            return (update.text, update.posted_by_name, *person_search_text(poster))
+
+        register_search_document(
+            SearchDocumentType(
+                model=PartRequest,
+                get_queryset=lambda: PartRequest.objects.select_related(
+                    "requested_by__user"
+                ).prefetch_related("updates__posted_by__user"),
+                get_text=lambda part_request: (*_request_text(part_request), part_request.status),
+                get_linked_text=lambda part_request: (
+                    part for update in part_request.updates.all() for part in _update_text(update)
+                ),
+                linked_records=("updates",),
+                snippet_field="text",
+                person_lookups=("requested_by__user", "updates__posted_by__user"),
+            )
+        )
+        register_search_document(
+            SearchDocumentType(
+                model=PartRequestUpdate,
+                get_queryset=lambda: PartRequestUpdate.objects.select_related(
+                    "posted_by__user", "part_request__requested_by__user"
+                ),
+                get_text=_update_text,
+                get_linked_text=lambda update: _request_text(update.part_request),
+                linked_records=("part_request",),
+                snippet_field="text",
+                person_lookups=("posted_by__user", "part_request__requested_by__user"),
+            )
+        )
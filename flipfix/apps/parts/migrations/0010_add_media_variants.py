@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-16 21:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0009_historicalpartrequest_historicalpartrequestupdate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalpartrequestmedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestupdatemedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+        migrations.AddField(
+            model_name='partrequestmedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+        migrations.AddField(
+            model_name='partrequestupdatemedia',
+            name='variants',
+            field=models.JSONField(blank=True, default=list, help_text='Responsive photo variants: storage name, content type, width and height'),
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.11 on 2026-10-16 21:23
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_mediablob'),
+        ('parts', '0010_add_media_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalpartrequestmedia',
+            name='blob',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Shared stored files, when identical uploads reuse them', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.mediablob'),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestmedia',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='BLAKE2b of the uploaded bytes', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestupdatemedia',
+            name='blob',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Shared stored files, when identical uploads reuse them', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.mediablob'),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestupdatemedia',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='BLAKE2b of the uploaded bytes', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='partrequestmedia',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Shared stored files, when identical uploads reuse them', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.mediablob'),
+        ),
+        migrations.AddField(
+            model_name='partrequestmedia',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='BLAKE2b of the uploaded bytes', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='partrequestupdatemedia',
+            name='blob',
+            field=models.ForeignKey(blank=True, help_text='Shared stored files, when identical uploads reuse them', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.mediablob'),
+        ),
+        migrations.AddField(
+            model_name='partrequestupdatemedia',
+            name='content_hash',
+            field=models.CharField(blank=True, db_index=True, help_text='BLAKE2b of the uploaded bytes', max_length=64),
+        ),
+    ]
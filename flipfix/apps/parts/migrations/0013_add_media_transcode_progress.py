@@ -0,0 +1,53 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0012_add_media_transcode_method'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalpartrequestmedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestmedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestupdatemedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestupdatemedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+        migrations.AddField(
+            model_name='partrequestmedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='partrequestmedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+        migrations.AddField(
+            model_name='partrequestupdatemedia',
+            name='transcode_eta_seconds',
+            field=models.PositiveIntegerField(blank=True, help_text='Estimated seconds until the transcode finishes', null=True),
+        ),
+        migrations.AddField(
+            model_name='partrequestupdatemedia',
+            name='transcode_progress',
+            field=models.PositiveSmallIntegerField(blank=True, help_text='Percent of the video transcoded so far', null=True),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.11 on 2026-10-16 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('parts', '0013_add_media_transcode_progress'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='historicalpartrequestmedia',
+            name='hls_playlist',
+            field=models.TextField(blank=True, help_text='HLS master playlist of a long video; its renditions and segments are beside it', max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalpartrequestupdatemedia',
+            name='hls_playlist',
+            field=models.TextField(blank=True, help_text='HLS master playlist of a long video; its renditions and segments are beside it', max_length=100, null=True),
+        ),
+        migrations.AddField(
+            model_name='partrequestmedia',
+            name='hls_playlist',
+            field=models.FileField(blank=True, help_text='HLS master playlist of a long video; its renditions and segments are beside it', null=True, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='partrequestupdatemedia',
+            name='hls_playlist',
+            field=models.FileField(blank=True, help_text='HLS master playlist of a long video; its renditions and segments are beside it', null=True, upload_to=''),
+        ),
+    ]
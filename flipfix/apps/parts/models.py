@@ -37,13 +37,22 @@ class PartRequestQuerySet(SearchableQuerySetMixin, models.QuerySet):
         )
 
     def _build_update_q(self, query: str):
-        """Build Q object for searching linked updates."""
-        return (
-            models.Q(updates__text__icontains=query)
-            | models.Q(updates__posted_by__user__username__icontains=query)
-            | models.Q(updates__posted_by__user__first_name__icontains=query)
-            | models.Q(updates__posted_by__user__last_name__icontains=query)
-            | models.Q(updates__posted_by_name__icontains=query)
+        """Build Q object for searching linked updates.
+
+        An EXISTS subquery rather than a join, so requests with several
+        matching updates appear once.
+        """
+        return models.Q(
+            models.Exists(
+                PartRequestUpdate.objects.filter(
+                    models.Q(text__icontains=query)
+                    | models.Q(posted_by__user__username__icontains=query)
+                    | models.Q(posted_by__user__first_name__icontains=query)
+                    | models.Q(posted_by__user__last_name__icontains=query)
+                    | models.Q(posted_by_name__icontains=query),
+                    part_request=models.OuterRef("pk"),
+                )
+            )
         )
 
     def search(self, query: str = ""):
@@ -51,7 +60,8 @@ class PartRequestQuerySet(SearchableQuerySetMixin, models.QuerySet):
         Global search across multiple fields.
 
         Searches: text, status, machine name, requester name/username,
-        and linked update text/poster names.
+        and linked update text/poster names.  Machine names aren't part of
+        the stored search document, so they're matched directly.
 
         Returns unfiltered queryset if query is empty/whitespace.
         Caller is responsible for ordering.
@@ -59,10 +69,9 @@ class PartRequestQuerySet(SearchableQuerySetMixin, models.QuerySet):
         query = self._clean_query(query)
         return self._apply_search(
             query,
-            self._build_text_and_requester_q(query)
-            | models.Q(machine__model__name__icontains=query)
-            | models.Q(machine__name__icontains=query)
-            | self._build_update_q(query),
+            self._build_text_and_requester_q(query) | self._build_update_q(query),
+            unindexed_q=models.Q(machine__model__name__icontains=query)
+            | models.Q(machine__name__icontains=query),
         )
 
     def search_for_machine(self, query: str = ""):
@@ -242,6 +251,7 @@ class PartRequestUpdateQuerySet(SearchableQuerySetMixin, models.QuerySet):
         return self._apply_search(
             query,
             self._build_text_and_poster_q(query),
+            linked=False,
         )
 
     def search(self, query: str = ""):
@@ -259,7 +269,8 @@ class PartRequestUpdateQuerySet(SearchableQuerySetMixin, models.QuerySet):
         )
         return self._apply_search(
             query,
-            self._build_text_and_poster_q(query) | self._build_part_request_q(query) | machine_q,
+            self._build_text_and_poster_q(query) | self._build_part_request_q(query),
+            unindexed_q=machine_q,
         )
 
 
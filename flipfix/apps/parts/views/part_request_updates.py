@@ -154,6 +154,8 @@ class PartRequestUpdateDetailView(InlineTextEditMixin, MediaUploadMixin, DetailV
         action_handlers = {
             "update_text": self.handle_update_text,
             "upload_media": self.handle_upload_media,
+            "start_chunked_upload": self.handle_start_chunked_upload,
+            "finish_chunked_upload": self.handle_finish_chunked_upload,
             "delete_media": self.handle_delete_media,
         }
 
@@ -106,6 +106,7 @@ class PartRequestListPartialView(InfiniteScrollMixin, View):
     """AJAX endpoint for infinite scrolling in the part request list."""
 
     item_template = "parts/partials/part_list_entry.html"
+    markdown_fields = ("text",)
 
     def get_queryset(self):
         search_query = self.request.GET.get("q", "").strip()
@@ -243,6 +244,8 @@ class PartRequestDetailView(InlineTextEditMixin, MediaUploadMixin, DetailView):
         action_handlers = {
             "update_text": self.handle_update_text,
             "upload_media": self.handle_upload_media,
+            "start_chunked_upload": self.handle_start_chunked_upload,
+            "finish_chunked_upload": self.handle_finish_chunked_upload,
             "delete_media": self.handle_delete_media,
         }
 
@@ -313,6 +316,7 @@ class PartRequestUpdatesPartialView(InfiniteScrollMixin, View):
     """AJAX endpoint for infinite scrolling updates on a part request detail page."""
 
     item_template = "parts/partials/part_update_entry.html"
+    markdown_fields = ("text",)
 
     def get_queryset(self):
         part_request = get_object_or_404(PartRequest, pk=self.kwargs["pk"])
@@ -35,7 +35,7 @@ from dataclasses import dataclass, field
 from django.urls import reverse
 from django.utils.html import format_html
 
-from flipfix.apps.core.markdown import fenced_code_ranges
+from flipfix.apps.core.markdown import ParsedMarkdown, parse_markdown
 from flipfix.apps.maintenance.models import ProblemReport
 
 logger = logging.getLogger(__name__)
@@ -48,6 +48,11 @@ _TEMPLATE_START_RE = re.compile(r'<!--\s*template:start\s+name="(?P<name>[^"]+)"
 _TEMPLATE_END_RE = re.compile(r'<!--\s*template:end\s+name="(?P<name>[^"]+)"\s*-->')
 _TEMPLATE_ACTION_RE = re.compile(r"<!--\s*template:action\s+(?P<attrs>[^>]*?)\s*-->")
 _TEMPLATE_ANY_RE = re.compile(r"<!--\s*template:(?P<kind>\w+)")
+# Start/end and action markers in one pattern, so rendering rewrites all
+# markers in a single pass; ``attrs`` is None for start/end markers
+_TEMPLATE_MARKER_RE = re.compile(
+    r'<!--\s*template:(?:start|end)\s+name="[^"]+"\s*-->|' + _TEMPLATE_ACTION_RE.pattern
+)
 _ATTR_RE = re.compile(r'(?P<key>\w+)="(?P<value>[^"]*)"')
 
 _VALID_MARKER_KINDS = {"start", "end", "action"}
@@ -68,17 +73,13 @@ _VALID_PRIORITIES = {v for v, _ in ProblemReport.Priority.maintainer_settable()}
 # ---------------------------------------------------------------------------
 
 
-def _in_fence(pos: int, ranges: list[tuple[int, int]]) -> bool:
-    return any(start <= pos < end for start, end in ranges)
-
-
 def _outside_fences(
-    matches: Iterable[re.Match[str]], ranges: list[tuple[int, int]]
+    matches: Iterable[re.Match[str]], parsed: ParsedMarkdown
 ) -> list[re.Match[str]]:
     """Filter finditer results to exclude matches inside fenced code blocks."""
-    if not ranges:
+    if not parsed.fence_ranges:
         return list(matches)
-    return [m for m in matches if not _in_fence(m.start(), ranges)]
+    return [m for m in matches if not parsed.in_fence(m.start())]
 
 
 def _fence_aware_sub(
@@ -88,15 +89,15 @@ def _fence_aware_sub(
 ) -> str:
     """Like regex.sub() but skip matches inside fenced code blocks.
 
-    Computes fence ranges from *content* so positions are always correct,
-    even after prior substitutions have shifted offsets.
+    Fence positions come from the shared parse of *content*, so callers
+    should make all their substitutions in one call on the original text.
     """
-    ranges = fenced_code_ranges(content)
-    if not ranges:
+    parsed = parse_markdown(content)
+    if not parsed.fence_ranges:
         return regex.sub(repl, content)
 
     def wrapper(match: re.Match[str]) -> str:
-        if _in_fence(match.start(), ranges):
+        if parsed.in_fence(match.start()):
             return match.group()
         return repl(match) if callable(repl) else repl
 
@@ -241,9 +242,9 @@ def _validate_markers(content: str) -> MarkerValidation:
     Checks matching names, nesting, and duplicates.  Does **not** validate
     action attributes — those are checked per-marker in the callers.
     """
-    fence_ranges = fenced_code_ranges(content)
-    starts = _outside_fences(_TEMPLATE_START_RE.finditer(content), fence_ranges)
-    ends = _outside_fences(_TEMPLATE_END_RE.finditer(content), fence_ranges)
+    parsed = parse_markdown(content)
+    starts = _outside_fences(_TEMPLATE_START_RE.finditer(content), parsed)
+    ends = _outside_fences(_TEMPLATE_END_RE.finditer(content), parsed)
 
     if not starts and not ends:
         return MarkerValidation(content_blocks=[], errors=[])
@@ -322,9 +323,9 @@ def validate_template_syntax(content: str) -> list[str]:
     """
     # Check for typos like "template:starts" or "template:star" first —
     # these are likely the root cause of any structural failures downstream.
-    fence_ranges = fenced_code_ranges(content)
+    parsed = parse_markdown(content)
     unrecognized = sorted(
-        {m.group("kind") for m in _outside_fences(_TEMPLATE_ANY_RE.finditer(content), fence_ranges)}
+        {m.group("kind") for m in _outside_fences(_TEMPLATE_ANY_RE.finditer(content), parsed)}
         - _VALID_MARKER_KINDS
     )
     if unrecognized:
@@ -347,7 +348,7 @@ def validate_template_syntax(content: str) -> list[str]:
     matched_names = {b.name for b in validation.content_blocks}
     reported_names: set[str] = set()
 
-    for match in _outside_fences(_TEMPLATE_ACTION_RE.finditer(content), fence_ranges):
+    for match in _outside_fences(_TEMPLATE_ACTION_RE.finditer(content), parsed):
         attrs = _parse_attrs(match.group("attrs"))
         name = attrs.get("name", "(unnamed)")
 
@@ -399,14 +400,13 @@ def prepare_for_rendering(content: str) -> tuple[str, dict[str, ActionBlock]]:
 
     blocks_by_name: dict[str, ContentBlock] = {b.name: b for b in validation.content_blocks}
 
-    # Strip start/end markers (content between is preserved)
-    result = _fence_aware_sub(_TEMPLATE_START_RE, "", content)
-    result = _fence_aware_sub(_TEMPLATE_END_RE, "", result)
-
-    # Replace action markers with tokens (buttons only)
+    # Strip start/end markers (content between is preserved) and replace
+    # action markers with tokens (buttons only), in one pass
     token_map: dict[str, ActionBlock] = {}
 
-    def _replace_action(match: re.Match) -> str:
+    def _replace_marker(match: re.Match) -> str:
+        if match.group("attrs") is None:
+            return ""  # template:start / template:end
         attrs = _parse_attrs(match.group("attrs"))
         name = attrs.get("name", "")
 
@@ -433,7 +433,7 @@ def prepare_for_rendering(content: str) -> tuple[str, dict[str, ActionBlock]]:
         token_map[token] = _make_action_block(attrs, cb.content)
         return token
 
-    result = _fence_aware_sub(_TEMPLATE_ACTION_RE, _replace_action, result)
+    result = _fence_aware_sub(_TEMPLATE_MARKER_RE, _replace_marker, content)
 
     return result, token_map
 
@@ -520,8 +520,8 @@ def extract_template_content(content: str, template_name: str) -> ActionBlock |
         return None
 
     # Find first action marker with matching name (outside code fences)
-    fence_ranges = fenced_code_ranges(content)
-    for match in _outside_fences(_TEMPLATE_ACTION_RE.finditer(content), fence_ranges):
+    parsed = parse_markdown(content)
+    for match in _outside_fences(_TEMPLATE_ACTION_RE.finditer(content), parsed):
         attrs = _parse_attrs(match.group("attrs"))
         if attrs.get("name") != template_name:
             continue
@@ -562,11 +562,11 @@ def _parse_option_blocks(content: str) -> list[ActionBlock]:
         return []
 
     blocks_by_name = {b.name: b for b in validation.content_blocks}
-    fence_ranges = fenced_code_ranges(content)
+    parsed = parse_markdown(content)
     seen_names: set[str] = set()
     result: list[ActionBlock] = []
 
-    for match in _outside_fences(_TEMPLATE_ACTION_RE.finditer(content), fence_ranges):
+    for match in _outside_fences(_TEMPLATE_ACTION_RE.finditer(content), parsed):
         attrs = _parse_attrs(match.group("attrs"))
         name = attrs.get("name", "")
 
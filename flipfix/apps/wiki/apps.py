@@ -69,5 +69,6 @@ class WikiConfig(AppConfig):
                 autocomplete_select_related=("page",),
                 autocomplete_serialize=_serialize_wiki_page,
                 sort_order=10,
+                label_dependencies=(("wiki.WikiPage", "page"),),
             )
         )
@@ -1,8 +1,12 @@
 """Tests for wiki template blocks: parsing, rendering, and pre-fill flow."""
 
+from unittest.mock import patch
+
 from django.test import TestCase, tag
 from django.urls import reverse
 
+from flipfix.apps.core import markdown
+from flipfix.apps.core.markdown import parse_markdown
 from flipfix.apps.core.test_utils import (
     SuppressRequestLogsMixin,
     TestDataMixin,
@@ -848,6 +852,50 @@ class WikiContentRenderingTests(SuppressRequestLogsMixin, TestDataMixin, TestCas
         self.assertIn("content", html)
 
 
+@tag("views")
+class ParseOnceTests(SuppressRequestLogsMixin, TestDataMixin, TestCase):
+    """Wiki validation and rendering share one markdown parse per distinct text."""
+
+    def setUp(self):
+        super().setUp()
+        parse_markdown.cache_clear()
+
+    def _count_parses(self):
+        return patch.object(markdown._md, "parse", wraps=markdown._md.parse)
+
+    def test_validation_parses_once(self):
+        content = _make_template("intake") + "```\n<!-- template:start -->\n```\n"
+        with self._count_parses() as parse:
+            validate_template_syntax(content)
+            prepare_for_rendering(content)
+            extract_template_content(content, "intake")
+        parse.assert_called_once()
+
+    def test_page_without_markers_parses_once(self):
+        page = WikiPage.objects.create(title="Plain", slug="plain", content="Just **bold**.")
+        WikiPageTag.objects.create(page=page, tag="docs", slug="plain")
+        self.client.force_login(self.maintainer_user)
+
+        with self._count_parses() as parse:
+            response = self.client.get(reverse("wiki-page-detail", args=["docs/plain"]))
+
+        self.assertContains(response, "<strong>bold</strong>")
+        parse.assert_called_once()
+
+    def test_page_with_markers_parses_source_and_output_once_each(self):
+        page = WikiPage.objects.create(
+            title="Intake", slug="intake", content=_make_template("intake")
+        )
+        WikiPageTag.objects.create(page=page, tag="docs", slug="intake")
+        self.client.force_login(self.maintainer_user)
+
+        with self._count_parses() as parse:
+            response = self.client.get(reverse("wiki-page-detail", args=["docs/intake"]))
+
+        self.assertContains(response, "wiki-template-action")
+        self.assertEqual(parse.call_count, 2)
+
+
 # ---------------------------------------------------------------------------
 # wiki_tags template library
 # ---------------------------------------------------------------------------
@@ -9,6 +9,7 @@ from django.core.exceptions import PermissionDenied
 from django.http import HttpRequest, HttpResponse
 
 from flipfix.apps.core.ip import get_real_ip
+from flipfix.apps.core.markdown_links import link_resolution
 from flipfix.apps.core.mixins import can_access_maintainer_portal
 from flipfix.logging import bind_log_context, reset_log_context
 
@@ -47,6 +48,20 @@ class RequestContextMiddleware:
         return response
 
 
+class LinkResolutionMiddleware:
+    """Resolve ``[[type:ref]]`` links in batches across everything a request renders.
+
+    See ``link_resolution()`` in core/markdown_links.py.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with link_resolution():
+            return self.get_response(request)
+
+
 class MaintainerAccessMiddleware:
     """Require maintainer portal permission unless login-not-required or maintainer-not-required.
 
@@ -50,6 +50,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.LoginRequiredMiddleware",
     "flipfix.middleware.MaintainerAccessMiddleware",
     "flipfix.middleware.RequestContextMiddleware",
+    "flipfix.middleware.LinkResolutionMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
     "simple_history.middleware.HistoryRequestMiddleware",
@@ -90,11 +91,21 @@ AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.NumericPasswordValidator"},
 ]
 
+# Background task lanes (see core/task_lanes.py).  Each lane is a django-q2
+# cluster with its own queue and workers, so a long video transcode never
+# delays the webhooks and photo derivatives queued behind it.  The fast lane
+# is the default cluster; the others are ALT_CLUSTERS, and run_task_lanes
+# starts a qcluster process for each.
+TASK_LANES = {
+    "fast": "flipfix_worker",  # Webhook delivery, photo derivatives
+    "slow": "flipfix_transcode",  # Video transcodes
+}
+
 # django-q2 configuration (DB-backed queue)
 Q_CLUSTER = {
-    "name": "flipfix_worker",
+    "name": TASK_LANES["fast"],
     "orm": "default",
-    "workers": 1,
+    "workers": config("TASK_FAST_LANE_WORKERS", default=2, cast=int),
     "timeout": 600,
     "retry": 660,
     "save_limit": 50,
@@ -103,6 +114,11 @@ Q_CLUSTER = {
     "bulk": 1,
     "catch_up": False,
     "max_attempts": 1,
+    "ALT_CLUSTERS": {
+        TASK_LANES["slow"]: {
+            "workers": config("TASK_SLOW_LANE_WORKERS", default=1, cast=int),
+        },
+    },
 }
 
 LANGUAGE_CODE = "en-us"
@@ -117,6 +133,20 @@ STATICFILES_DIRS = [REPO_ROOT / "flipfix/static"]
 MEDIA_URL = "/media/"
 MEDIA_ROOT = REPO_ROOT / "media"
 
+# Django's upload handlers, but hashing each file as it streams in so identical
+# uploads share one stored, processed copy (see core/upload_handlers.py)
+FILE_UPLOAD_HANDLERS = [
+    "flipfix.apps.core.upload_handlers.HashingMemoryFileUploadHandler",
+    "flipfix.apps.core.upload_handlers.HashingTemporaryFileUploadHandler",
+]
+
+# Resumable chunked uploads (see core/chunked_upload.py): where partial files are
+# kept (outside MEDIA_ROOT, so they're never served), the chunk size clients
+# send, and how long an abandoned upload is kept before it's deleted
+CHUNKED_UPLOAD_DIR = config("CHUNKED_UPLOAD_DIR", default=str(REPO_ROOT / "uploads"))
+CHUNKED_UPLOAD_CHUNK_SIZE = config("CHUNKED_UPLOAD_CHUNK_SIZE", default=8 * 1024 * 1024, cast=int)
+CHUNKED_UPLOAD_EXPIRY_HOURS = config("CHUNKED_UPLOAD_EXPIRY_HOURS", default=24, cast=int)
+
 # Whitenoise serves files from this directory at the site root (e.g. robots.txt)
 WHITENOISE_ROOT = REPO_ROOT / "public"
 
@@ -131,6 +161,29 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 # Pagination size, used by infinite scrolling
 LIST_PAGE_SIZE = 10
 
+# Search backend: "fulltext" (PostgreSQL tsvector / SQLite FTS5 against stored
+# search documents, ranked) or "icontains" (substring match across joins)
+SEARCH_BACKEND = config("SEARCH_BACKEND", default="fulltext")
+
+# Caches. "markdown" holds rendered markdown HTML (see core/markdown_cache.py).
+# It's off by default. Invalidation must reach every web process and the
+# worker, so enable it with a shared backend: Redis or memcached (set
+# MARKDOWN_CACHE_LOCATION to the server), or
+# django.core.cache.backends.db.DatabaseCache, whose table
+# "manage.py createcachetable" creates on deploy.
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    "markdown": {
+        "BACKEND": config(
+            "MARKDOWN_CACHE_BACKEND", default="django.core.cache.backends.dummy.DummyCache"
+        ),
+        "LOCATION": config("MARKDOWN_CACHE_LOCATION", default="core_markdown_cache"),
+        "TIMEOUT": 60 * 60 * 24 * 30,
+        "OPTIONS": {"MAX_ENTRIES": 50_000},
+    },
+}
+MARKDOWN_CACHE_ALIAS = "markdown"
+
 # Rate limiting for public problem reports
 RATE_LIMIT_REPORTS_PER_IP = config("RATE_LIMIT_REPORTS_PER_IP", default=5, cast=int)
 RATE_LIMIT_WINDOW_MINUTES = config("RATE_LIMIT_WINDOW_MINUTES", default=10, cast=int)
@@ -138,6 +191,37 @@ RATE_LIMIT_WINDOW_MINUTES = config("RATE_LIMIT_WINDOW_MINUTES", default=10, cast
 # Transcoding upload authentication token (shared between web and worker services)
 TRANSCODING_UPLOAD_TOKEN = config("TRANSCODING_UPLOAD_TOKEN", default=None)
 
+# How the source download API (ServeSourceMediaView) sends files: "" streams them
+# from Django; "x-accel-redirect" hands the request to nginx's internal location at
+# SOURCE_MEDIA_ACCEL_PREFIX (mapped to MEDIA_ROOT); "x-sendfile" hands Apache or
+# lighttpd the file's path.  Offloading frees the web server thread at once.
+SOURCE_MEDIA_OFFLOAD = config("SOURCE_MEDIA_OFFLOAD", default="")
+SOURCE_MEDIA_ACCEL_PREFIX = config("SOURCE_MEDIA_ACCEL_PREFIX", default="/protected-media/")
+
+# Photo uploads: False resizes them inside the upload request; True stores the
+# original immediately and queues the thumbnail and web-size derivatives on the
+# worker, with the same pending/ready lifecycle as video transcodes
+PHOTO_PROCESSING_ASYNC = config("PHOTO_PROCESSING_ASYNC", default=False, cast=bool)
+
+# Responsive photo variants for <picture>/srcset: longest-side sizes in pixels,
+# and formats best-first (JPEG is the <img> fallback; formats Pillow can't encode
+# are skipped).  Leave either empty to store only the web-size image and thumbnail.
+# Each size costs one encode per format, so sizes default to none when photos
+# are processed inside the upload request
+PHOTO_VARIANT_SIZES = config(
+    "PHOTO_VARIANT_SIZES",
+    default="320,640,1280,2400" if PHOTO_PROCESSING_ASYNC else "",
+    cast=Csv(int),
+)
+PHOTO_VARIANT_FORMATS = config("PHOTO_VARIANT_FORMATS", default="AVIF,WEBP,JPEG", cast=Csv())
+
+# On-demand derived images at /media/derived/<model>/<id>/<spec>/, e.g. "640.webp"
+# or "640-q50.avif": the allowed longest-side sizes, formats and qualities.  Each
+# is generated on first request and kept in storage under derived/
+DERIVED_IMAGE_SIZES = config("DERIVED_IMAGE_SIZES", default="320,640,800,1280,2400", cast=Csv(int))
+DERIVED_IMAGE_FORMATS = config("DERIVED_IMAGE_FORMATS", default="AVIF,WEBP,JPEG", cast=Csv())
+DERIVED_IMAGE_QUALITIES = config("DERIVED_IMAGE_QUALITIES", default="50,75", cast=Csv(int))
+
 # Logging levels (env-overridable)
 # Log level of this application's code: flipfix.* loggers
 APP_LOG_LEVEL = config("APP_LOG_LEVEL", default="INFO").upper()
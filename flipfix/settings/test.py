@@ -25,3 +25,7 @@ Q_CLUSTER["log_level"] = "WARNING"  # type: ignore[name-defined]  # noqa: F405
 # Tests verify behavior through assertions, not log inspection
 LOGGING["loggers"]["flipfix"]["level"] = "CRITICAL"  # type: ignore[index]  # noqa: F405
 LOGGING["loggers"]["flipfix.apps.discord"]["level"] = "CRITICAL"  # type: ignore[index]  # noqa: F405
+
+# Rendered-markdown cache off, so tests see fresh renderings and query counts
+# measure the ORM; core/tests/test_markdown_cache.py turns it on
+CACHES["markdown"] = {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}  # noqa: F405
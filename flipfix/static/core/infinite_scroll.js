@@ -11,6 +11,8 @@ document.addEventListener('DOMContentLoaded', () => {
   if (!fetchUrl) return;
 
   let nextPage = Number(pagination.dataset.nextPage || '0');
+  // Keyset feeds hand back an opaque cursor; page numbers remain the fallback
+  let nextCursor = pagination.dataset.nextCursor || '';
   let isLoading = false;
 
   const observer = new IntersectionObserver(
@@ -37,6 +39,9 @@ document.addEventListener('DOMContentLoaded', () => {
 
     const params = new URLSearchParams(window.location.search);
     params.set('page', nextPage);
+    if (nextCursor) {
+      params.set('cursor', nextCursor);
+    }
     fetch(`${fetchUrl}?${params.toString()}`, {
       headers: { 'X-Requested-With': 'XMLHttpRequest' },
       credentials: 'same-origin',
@@ -57,6 +62,7 @@ document.addEventListener('DOMContentLoaded', () => {
         }
         if (data.has_next) {
           nextPage = data.next_page;
+          nextCursor = data.next_cursor || '';
         } else {
           nextPage = 0;
           observer.unobserve(sentinel);
@@ -5,7 +5,7 @@
  * Requires core.js (for getCsrfToken).
  *
  * Events:
- * - Dispatches 'media:uploaded' on document when video uploads complete (for polling)
+ * - Dispatches 'media:uploaded' on document when uploads need status polling (videos, queued photos)
  * - Listens for 'media:ready' to re-attach delete handlers after transcoding
  *
  * Expected DOM structure (from media_card_editable.html partial):
@@ -22,12 +22,23 @@
  *   </div>
  *
  * Alt text for uploaded images is read from data-alt-text on the card.
- * Model name for video polling is read from data-model-name on the card.
+ * Model name for status polling is read from data-model-name on the card.
+ *
+ * Files larger than CHUNKED_UPLOAD_THRESHOLD are sent as a resumable chunked
+ * upload (start_chunked_upload, PUT chunks, finish_chunked_upload), so a
+ * dropped connection resumes where it stopped instead of starting over.
  */
 
 (function () {
   'use strict';
 
+  /** Files above this size (bytes) are uploaded in resumable chunks. */
+  const CHUNKED_UPLOAD_THRESHOLD = 8 * 1024 * 1024;
+
+  /** Times a failed chunk is retried, waiting RETRY_DELAY_MS longer each time. */
+  const CHUNK_RETRIES = 5;
+  const RETRY_DELAY_MS = 2000;
+
   /**
    * Get required card elements or null if missing.
    * @param {HTMLElement} card - The media card element
@@ -69,7 +80,7 @@
     const { altText, modelName } = config;
     const total = files.length;
     let completed = 0;
-    let hasVideo = false;
+    let needsPolling = false;
 
     const noMediaMessage = container.querySelector('[data-no-media-message]');
     if (noMediaMessage) noMediaMessage.remove();
@@ -85,18 +96,18 @@
         uploadButton.textContent = `Uploading ${completed + 1} of ${total}...`;
       }
 
-      if (result && result.media_type === 'video') {
-        hasVideo = true;
+      if (result && (result.media_type === 'video' || result.transcode_status === 'pending')) {
+        needsPolling = true;
       }
     }
 
     uploadButton.disabled = false;
     uploadButton.textContent = 'Upload More';
 
-    if (hasVideo) {
+    if (needsPolling) {
       document.dispatchEvent(
         new CustomEvent('media:uploaded', {
-          detail: { hasVideo: true },
+          detail: { needsPolling: true },
         })
       );
     }
@@ -154,18 +165,11 @@
    * @returns {Object|null} Response data on success, null on failure
    */
   async function uploadFile(file, container, uploadButton, altText, modelName) {
-    const formData = new FormData();
-    formData.append('action', 'upload_media');
-    formData.append('media_file', file);
-    formData.append('csrfmiddlewaretoken', getCsrfToken());
-
     try {
-      const response = await fetch(window.location.href, {
-        method: 'POST',
-        body: formData,
-      });
-
-      const data = await response.json();
+      const data =
+        file.size > CHUNKED_UPLOAD_THRESHOLD && window.crypto && window.crypto.subtle
+          ? await uploadFileInChunks(file)
+          : await postAction('upload_media', { media_file: file });
       if (data.success) {
         const mediaItem = createMediaElement(data, altText, modelName);
         container.appendChild(mediaItem);
@@ -182,6 +186,93 @@
     }
   }
 
+  /**
+   * POST an action to the current page.
+   * @param {string} action - Action name, as dispatched by the view's post()
+   * @param {Object} fields - Other form fields (strings or Files)
+   * @returns {Promise<Object>} Parsed JSON response
+   */
+  async function postAction(action, fields) {
+    const formData = new FormData();
+    formData.append('action', action);
+    for (const [name, value] of Object.entries(fields)) {
+      formData.append(name, value);
+    }
+    formData.append('csrfmiddlewaretoken', getCsrfToken());
+
+    const response = await fetch(window.location.href, {
+      method: 'POST',
+      body: formData,
+    });
+    return response.json();
+  }
+
+  /**
+   * Upload a large file as a resumable chunked upload.
+   *
+   * Each chunk is PUT at the offset the server has received up to, with its
+   * SHA-256 so the server can check it arrived intact.  Only one chunk is
+   * read into memory at a time.  When a chunk fails, the server is asked
+   * for its offset and sending resumes from there, after a growing delay.
+   * @param {File} file - The file to upload
+   * @returns {Promise<Object>} Response data of the finishing action
+   */
+  async function uploadFileInChunks(file) {
+    const session = await postAction('start_chunked_upload', {
+      filename: file.name,
+      size: String(file.size),
+      content_type: file.type,
+    });
+    if (!session.success) return session;
+
+    let offset = 0;
+    let failures = 0;
+    while (offset < file.size) {
+      try {
+        const chunk = await file.slice(offset, offset + session.chunk_size).arrayBuffer();
+        const response = await fetch(`${session.upload_url}?offset=${offset}`, {
+          method: 'PUT',
+          headers: { 'X-CSRFToken': getCsrfToken(), 'X-Chunk-SHA256': await sha256Hex(chunk) },
+          body: chunk,
+        });
+        const data = await response.json();
+        if (response.ok || response.status === 409) {
+          offset = data.offset;
+          failures = 0;
+          continue;
+        }
+        // 422: the chunk arrived damaged; retry it like a dropped connection
+        if (response.status < 500 && response.status !== 422) return data;
+      } catch (error) {
+        console.warn('Chunk upload interrupted:', error);
+      }
+
+      failures++;
+      if (failures > CHUNK_RETRIES) {
+        return { success: false, error: 'Upload interrupted' };
+      }
+      await new Promise((resolve) => setTimeout(resolve, RETRY_DELAY_MS * failures));
+      try {
+        const status = await fetch(session.upload_url).then((r) => r.json());
+        if (status.success) offset = status.offset;
+      } catch (error) {
+        // Still offline; retry the same chunk
+      }
+    }
+
+    return postAction('finish_chunked_upload', { upload_id: session.upload_id });
+  }
+
+  /**
+   * Hex-encoded SHA-256 of some bytes.
+   * @param {ArrayBuffer} bytes - The bytes to hash
+   * @returns {Promise<string>} Lowercase hex digest
+   */
+  async function sha256Hex(bytes) {
+    const digest = await crypto.subtle.digest('SHA-256', bytes);
+    return Array.from(new Uint8Array(digest), (b) => b.toString(16).padStart(2, '0')).join('');
+  }
+
   /**
    * Build video content HTML based on transcode status.
    * @param {Object} data - Upload response data
@@ -206,11 +297,16 @@
 
   /**
    * Build image content HTML.
+   * Photos resized in the background show a polling status until ready.
    * @param {Object} data - Upload response data
    * @param {string} altText - Alt text for image
+   * @param {string} modelName - Model name for polling
    * @returns {string} HTML string
    */
-  function buildImageContent(data, altText) {
+  function buildImageContent(data, altText, modelName) {
+    if (data.transcode_status === 'pending') {
+      return `<div class="media-grid__status" data-media-poll-id="${data.media_id}" data-media-poll-model="${modelName}" data-failed-message="Photo processing failed.">Processing photo...</div>`;
+    }
     return `
       <a href="${data.media_url}" target="_blank">
         <img src="${data.thumbnail_url}" alt="${altText}">
@@ -233,7 +329,7 @@
     const content =
       data.media_type === 'video'
         ? buildVideoContent(data, modelName)
-        : buildImageContent(data, altText);
+        : buildImageContent(data, altText, modelName);
 
     mediaItem.innerHTML = `
       ${content}
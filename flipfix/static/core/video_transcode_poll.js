@@ -1,19 +1,21 @@
 /**
- * Transcode status polling for video processing.
+ * Status polling for video transcoding and background photo processing.
  *
  * Auto-initializes on DOMContentLoaded, finds elements with [data-media-poll-id]
- * and polls the server for status updates until videos are ready or failed.
+ * and polls the server for status updates until media is ready or failed.
  *
  * Features:
  * - Batched requests (all pending media in one API call)
  * - Exponential backoff (2s -> 4s -> 8s -> 10s cap)
- * - Max attempts with timeout message
+ * - Unchanged polls are revalidated by the browser and answered with a 304
+ * - Shows a transcoding video's percent done and time left
+ * - Max attempts with timeout message, counted only while progress stalls
  * - Pauses when tab is hidden
  * - Updates DOM when status changes to ready/failed
  *
  * Events:
- * - Listens for 'media:uploaded' on document to start polling after video uploads
- * - Dispatches 'media:ready' on container when video transcoding completes
+ * - Listens for 'media:uploaded' on document to start polling after uploads
+ * - Dispatches 'media:ready' on container when transcoding or photo processing completes
  *
  * Expected DOM structure:
  *   <div class="media-grid__status"
@@ -39,6 +41,7 @@
   let attemptCount = 0;
   let timeoutId = null;
   let isPaused = false;
+  const lastProgress = {};
 
   /**
    * Get all elements currently polling for status.
@@ -77,12 +80,20 @@
 
   /**
    * Handle successful API response.
+   * A video whose transcode is still advancing restarts the attempt count,
+   * so long transcodes aren't reported as taking too long.
    * @param {Object} data - Response data from API
    */
   function handlePollSuccess(data) {
     Object.entries(data).forEach(([id, info]) => {
       if (info.status === 'ready' || info.status === 'failed') {
         updateMediaElement(id, info);
+      } else if (info.progress !== undefined) {
+        if (info.progress !== lastProgress[id]) {
+          lastProgress[id] = info.progress;
+          attemptCount = 0;
+        }
+        showProgress(id, info);
       }
     });
     scheduleNextPoll();
@@ -137,6 +148,34 @@
       .catch(handlePollError);
   }
 
+  /**
+   * Format seconds left as a short phrase.
+   * @param {number} seconds - Estimated seconds left
+   * @returns {string} e.g. "about 40s left" or "about 3 min left"
+   */
+  function formatTimeLeft(seconds) {
+    if (seconds < 60) {
+      return `about ${Math.max(seconds, 1)}s left`;
+    }
+    return `about ${Math.round(seconds / 60)} min left`;
+  }
+
+  /**
+   * Show a transcoding video's progress in its status element.
+   * @param {string} id - Media ID
+   * @param {Object} info - Status info from API, with progress and eta_seconds
+   */
+  function showProgress(id, info) {
+    const el = document.querySelector(`[data-media-poll-id="${id}"]`);
+    if (!el) return;
+
+    let text = `Processing video... ${info.progress}%`;
+    if (info.eta_seconds !== null && info.eta_seconds !== undefined && info.progress < 100) {
+      text += ` (${formatTimeLeft(info.eta_seconds)})`;
+    }
+    el.textContent = text;
+  }
+
   /**
    * Build HTML for video player.
    * @param {Object} info - Video info from API
@@ -146,8 +185,13 @@
    */
   function buildVideoPlayerHtml(info, mediaId, hasDeleteBtn) {
     const posterAttr = info.poster_url ? ` poster="${info.poster_url}"` : '';
+    // Browsers that can't play HLS skip it for the MP4
+    const hlsSource = info.hls_url
+      ? `<source src="${info.hls_url}" type="application/vnd.apple.mpegurl">`
+      : '';
     let html = `
       <video controls${posterAttr}>
+        ${hlsSource}
         <source src="${info.video_url}" type="video/mp4">
         Your browser doesn't support video playback.
       </video>
@@ -162,14 +206,37 @@
     return html;
   }
 
+  /**
+   * Build HTML for a processed photo.
+   * Read-only grids already sit inside a link to the record, so only
+   * editable grids link the thumbnail to the full-size photo.
+   * @param {Object} info - Photo info from API
+   * @param {string} mediaId - Media ID for delete button
+   * @param {boolean} hasDeleteBtn - Whether to include delete button
+   * @param {boolean} insideLink - Whether the grid is already inside a link
+   * @returns {string} HTML string
+   */
+  function buildPhotoHtml(info, mediaId, hasDeleteBtn, insideLink) {
+    const img = `<img src="${info.thumbnail_url}" alt="Photo">`;
+    let html = insideLink ? img : `<a href="${info.photo_url}" target="_blank">${img}</a>`;
+
+    if (hasDeleteBtn) {
+      html += `
+        <button type="button" class="media-grid__delete" data-media-id="${mediaId}" aria-label="Delete media">&times;</button>
+      `;
+    }
+
+    return html;
+  }
+
   /**
    * Mark element as failed.
-   * @param {Element} el - The status element
+   * @param {Element} el - The status element (photos set data-failed-message)
    * @param {string} [message] - Optional error message from API
    */
   function markAsFailed(el, message) {
     el.className = 'media-grid__status media-grid__status--error';
-    el.textContent = message || 'Video processing failed.';
+    el.textContent = message || el.dataset.failedMessage || 'Video processing failed.';
     el.removeAttribute('data-media-poll-id');
     el.removeAttribute('data-media-poll-model');
   }
@@ -190,7 +257,9 @@
       const deleteBtn = container.querySelector('.media-grid__delete');
       const mediaId = deleteBtn ? deleteBtn.dataset.mediaId : id;
 
-      container.innerHTML = buildVideoPlayerHtml(info, mediaId, !!deleteBtn);
+      container.innerHTML = info.photo_url
+        ? buildPhotoHtml(info, mediaId, !!deleteBtn, !!container.closest('a'))
+        : buildVideoPlayerHtml(info, mediaId, !!deleteBtn);
 
       // Dispatch event so media_grid.js can re-attach delete handler
       container.dispatchEvent(
@@ -218,7 +287,7 @@
 
   /**
    * Start or restart polling.
-   * Called when new videos are uploaded via media:uploaded event.
+   * Called when new videos or queued photos are uploaded via media:uploaded event.
    */
   function startPolling() {
     currentInterval = INITIAL_INTERVAL_MS;
@@ -233,9 +302,9 @@
     }
   }
 
-  // Listen for video upload events from media_grid.js
+  // Listen for upload events from media_grid.js
   document.addEventListener('media:uploaded', (e) => {
-    if (e.detail && e.detail.hasVideo) {
+    if (e.detail && e.detail.needsPolling) {
       startPolling();
     }
   });
@@ -29,11 +29,13 @@ from flipfix.apps.catalog.views import (
 from flipfix.apps.catalog.views_inline import MachineInlineUpdateView
 from flipfix.apps.core.admin_views import admin_debug_view
 from flipfix.apps.core.routing import path
+from flipfix.apps.core.views.derived import DerivedImageView
 from flipfix.apps.core.views.feed import GlobalActivityFeedPartialView
 from flipfix.apps.core.views.health import healthz
 from flipfix.apps.core.views.home import HomeView, SiteSettingsEditView
 from flipfix.apps.core.views.link_targets import LinkTargetsView, LinkTypesView
 from flipfix.apps.core.views.transcode import TranscodeStatusView
+from flipfix.apps.core.views.uploads import ChunkedUploadView
 from flipfix.apps.maintenance.views.autocomplete import (
     MachineAutocompleteView,
     MaintainerAutocompleteView,
@@ -57,6 +59,7 @@ from flipfix.apps.maintenance.views.problem_reports import (
 )
 from flipfix.apps.maintenance.views.qr_codes import MachineBulkQRCodeView, MachineQRView
 from flipfix.apps.maintenance.views.transcoding import (
+    ReceivePhotoDerivativesView,
     ReceiveTranscodedMediaView,
     ServeSourceMediaView,
 )
@@ -312,7 +315,7 @@ urlpatterns = [
     ###
     # API endpoints
     ###
-    # Worker: download source video for transcoding
+    # Worker: download source video or photo for processing
     path(
         "api/transcoding/download/<str:model_name>/<int:media_id>/",
         ServeSourceMediaView.as_view(),
@@ -326,6 +329,13 @@ urlpatterns = [
         name="api-transcoding-upload",
         access="always_public",
     ),
+    # Worker: upload resized photo and thumbnail
+    path(
+        "api/transcoding/photo-upload/<str:model_name>/<int:media_id>/",
+        ReceivePhotoDerivativesView.as_view(),
+        name="api-transcoding-photo-upload",
+        access="always_public",
+    ),
     # Discord bot: upload media file
     path(
         "api/media/<str:model_name>/<int:parent_id>/",
@@ -333,12 +343,25 @@ urlpatterns = [
         name="api-media-upload",
         access="always_public",
     ),
-    # AJAX: poll video transcode status
+    # Photo resized and re-encoded on demand (before the catch-all media route)
+    path(
+        "media/derived/<str:model_name>/<int:media_id>/<str:spec>/",
+        DerivedImageView.as_view(),
+        name="media-derived",
+        access="always_public",
+    ),
+    # AJAX: poll video transcode and photo processing status
     path(
         "api/transcoding/status/",
         TranscodeStatusView.as_view(),
         name="api-transcoding-status",
     ),
+    # AJAX: resumable upload chunks (sessions start and finish on the record's page)
+    path(
+        "api/uploads/<uuid:upload_id>/",
+        ChunkedUploadView.as_view(),
+        name="api-chunked-upload",
+    ),
     # AJAX: maintainer autocomplete for forms
     path(
         "api/maintainers/",